@@ -0,0 +1,201 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import dataclasses
+import json
+import sys
+from typing import Dict, List, Optional
+
+from algoworld_contracts import contracts
+from algoworld_contracts.common.analysis import cond_branch_costs
+from algoworld_contracts.common.assembler import assemble
+from algoworld_contracts.common.optimizer import OPTIMIZE_LEVELS
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+
+"""
+Program size and opcode budget analyzer
+Reports how close a contract is to the logic signature limits, per `Cond`
+branch, and predicts how many ASAs fit in a multi ASA swapper.
+"""
+
+# Logic signature limits of the Algorand consensus protocol
+MAX_PROGRAM_SIZE = 1000
+MAX_OPCODE_COST = 20000
+MAX_GROUP_SIZE = 16
+
+# Group transactions surrounding the offered ASAs in the largest branch
+MULTI_SWAPPER_GROUP_OVERHEAD = 2
+
+SWAP_BRANCHES = ["optin", "swap", "close"]
+PROXY_BRANCHES = ["store"]
+
+CONTRACT_BRANCHES = {
+    "swapper": SWAP_BRANCHES,
+    "multi_swapper": SWAP_BRANCHES,
+    "multi_swapper_loop": SWAP_BRANCHES,
+    "swapper_proxy": PROXY_BRANCHES,
+}
+
+
+@dataclasses.dataclass
+class ProgramReport:
+    contract: Optional[str]
+    program_bytes: int
+    size_headroom: int
+    branch_costs: Dict[str, int]
+    cost_headroom: Dict[str, int]
+
+    @property
+    def fits(self) -> bool:
+        return self.size_headroom >= 0 and all(
+            headroom >= 0 for headroom in self.cost_headroom.values()
+        )
+
+
+def analyze_teal(
+    teal: str, branches: Optional[List[str]] = None, contract: Optional[str] = None
+) -> ProgramReport:
+    """
+    Analyze TEAL source whose top level `Cond` branches are named `branches`.
+    """
+    if branches is None:
+        branches = CONTRACT_BRANCHES.get(contract, [])  # type: ignore
+    size = len(assemble(teal))
+    costs = cond_branch_costs(teal, branches)
+    return ProgramReport(
+        contract=contract,
+        program_bytes=size,
+        size_headroom=MAX_PROGRAM_SIZE - size,
+        branch_costs=costs,
+        cost_headroom={k: MAX_OPCODE_COST - v for k, v in costs.items()},
+    )
+
+
+def analyze(cfg: contracts.SwapConfig, optimize: int = 0) -> ProgramReport:
+    """
+    Analyze the contract described by `cfg`, optimized up to level `optimize`.
+    """
+    return analyze_teal(
+        contracts.get_teal(cfg, optimize), contract=contracts.contract_name(cfg)
+    )
+
+
+def optimization_savings(cfg: contracts.SwapConfig, optimize: int) -> Dict[str, object]:
+    """
+    Return the program bytes and per branch opcode cost saved by optimization
+    level `optimize` against the unoptimized contract described by `cfg`.
+    """
+    baseline, optimized = analyze(cfg), analyze(cfg, optimize)
+    return {
+        "program_bytes": baseline.program_bytes - optimized.program_bytes,
+        "branch_costs": {
+            branch: cost - optimized.branch_costs[branch]
+            for branch, cost in baseline.branch_costs.items()
+        },
+    }
+
+
+def worst_case_asas(body_size: int) -> Dict[int, int]:
+    """
+    Return `body_size` offered ASAs whose ids and amounts take the most space.
+    """
+    return {
+        2**64 - 1 - asa: 2**64 - 1 - MAX_GROUP_SIZE - asa
+        for asa in range(body_size)
+    }
+
+
+def max_offered_asas(cfg: AsasToAlgoSwapConfig, optimize: int = 0) -> int:
+    """
+    Return the largest number of offered ASAs a multi ASA swapper with the
+    other parameters of `cfg` can hold whatever their ids and amounts, or 0 if
+    even a single ASA does not fit, once optimized up to level `optimize`.
+    """
+    limit = min(cfg.MAX_OFFERED_ASAS, MAX_GROUP_SIZE - MULTI_SWAPPER_GROUP_OVERHEAD)
+    for body_size in range(limit, 0, -1):
+        candidate = dataclasses.replace(
+            cfg, offered_asa_amounts=worst_case_asas(body_size)
+        )
+        if analyze(candidate, optimize).fits:
+            return body_size
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="algoworld-contracts-analyze",
+        description="Report program size, per branch opcode cost and headroom "
+        "against the logic signature limits.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="JSON config (one per line) or TEAL source (default: stdin)",
+    )
+    parser.add_argument(
+        "-c",
+        "--contract",
+        choices=list(contracts.CONTRACT_CONFIGS),
+        help="contract kind of configs without a `contract` key, or of TEAL input",
+    )
+    parser.add_argument(
+        "--teal", action="store_true", help="input is TEAL source instead of JSON"
+    )
+    parser.add_argument(
+        "-O",
+        "--optimize",
+        type=int,
+        choices=OPTIMIZE_LEVELS,
+        default=0,
+        help="analyze configs optimized up to this level and report the savings "
+        "against the unoptimized output (default: 0)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.teal:
+        reports = [analyze_teal(args.input.read(), contract=args.contract)]
+    else:
+        configs = [
+            contracts.config_from_dict(json.loads(line), args.contract)
+            for line in args.input
+            if line.strip()
+        ]
+        reports = [analyze(cfg, args.optimize) for cfg in configs]
+
+    for index, report in enumerate(reports):
+        result = {**dataclasses.asdict(report), "fits": report.fits}
+        if not args.teal and args.optimize:
+            result["savings"] = optimization_savings(configs[index], args.optimize)
+        if not args.teal and isinstance(configs[index], AsasToAlgoSwapConfig):
+            result["max_offered_asas"] = max_offered_asas(configs[index], args.optimize)
+        sys.stdout.write(json.dumps(result) + "\n")
+
+    return 0 if all(report.fits for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from algoworld_contracts.common.assembler import program_address
+from algoworld_contracts.contracts import SwapConfig, get_program
+from algoworld_contracts.decoder import DecodedProgram, decode_program
+
+"""
+Bulk contract generation and decoding
+Inputs are read in chunks, each chunk is processed in a worker process, and
+results are yielded back as chunks complete.
+"""
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _chunked(configs: Iterable[SwapConfig], chunk_size: int) -> Iterator[list]:
+    iterator = iter(configs)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_chunks(
+    func: Callable[[list], list],
+    items: Iterable,
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+) -> Iterator[Tuple[list, list]]:
+    """
+    Apply `func` to chunks of `chunk_size` items across `processes` worker
+    processes (one per core by default), yielding `(chunk, func(chunk))`.
+    Chunks come back in input order unless `ordered` is False. At most two
+    chunks per worker are in flight, so `items` can be an arbitrarily long
+    stream.
+    """
+    processes = processes or os.cpu_count() or 1
+    chunks = _chunked(items, chunk_size)
+
+    if processes == 1:
+        for chunk in chunks:
+            yield chunk, func(chunk)
+        return
+
+    executor = ProcessPoolExecutor(processes)
+    try:
+        pending: Dict[Future, list] = {}
+        for chunk in chunks:
+            pending[executor.submit(func, chunk)] = chunk
+            if len(pending) >= 2 * processes:
+                yield from _collect(pending, ordered, FIRST_COMPLETED)
+        while pending:
+            yield from _collect(pending, ordered, ALL_COMPLETED)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _collect(pending: Dict[Future, list], ordered: bool, return_when: str):
+    if ordered:
+        future = next(iter(pending))
+        yield pending.pop(future), future.result()
+        return
+
+    done, _ = wait(pending, return_when=return_when)
+    for future in done:
+        yield pending.pop(future), future.result()
+
+
+def _derive_chunk(chunk: List[SwapConfig], optimize: int) -> List[Tuple[bytes, str]]:
+    programs = [get_program(cfg, optimize) for cfg in chunk]
+    return [(program, program_address(program)) for program in programs]
+
+
+def derive_escrow_addresses(
+    configs: Iterable[SwapConfig],
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    optimize: int = 0,
+) -> Iterator[Tuple[SwapConfig, bytes, str]]:
+    """
+    Yield `(config, program, address)` for every config in `configs`, in input
+    order, spreading the work across `processes` worker processes.
+    """
+    derive_chunk = partial(_derive_chunk, optimize=optimize)
+    for chunk, results in map_chunks(derive_chunk, configs, processes, chunk_size):
+        for cfg, (program, address) in zip(chunk, results):
+            yield cfg, program, address
+
+
+def _decode_chunk(chunk: List[bytes]) -> List[Optional[DecodedProgram]]:
+    return [decode_program(program) for program in chunk]
+
+
+def decode_programs(
+    programs: Iterable[bytes],
+    processes: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[bytes, Optional[DecodedProgram]]]:
+    """
+    Yield `(program, decoded)` for every program in `programs`, in input
+    order, where `decoded` is None for programs that are not AlgoWorld
+    contracts. Each of the `processes` worker processes compiles the contract
+    templates once.
+    """
+    for chunk, results in map_chunks(_decode_chunk, programs, processes, chunk_size):
+        yield from zip(chunk, results)
@@ -0,0 +1,176 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import base64
+import json
+import sys
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+from algoworld_contracts import contracts
+from algoworld_contracts.batch import DEFAULT_CHUNK_SIZE, map_chunks
+from algoworld_contracts.common.assembler import program_address
+from algoworld_contracts.common.optimizer import OPTIMIZE_LEVELS
+
+"""
+Streaming contract compiler
+Reads one JSON swap config per line and writes one JSON result per line with
+the TEAL source, the base64 program and the escrow address of the contract.
+"""
+
+
+def _read_lines(stream: TextIO) -> Iterator[Tuple[int, str]]:
+    index = 0
+    for line in stream:
+        if line.strip():
+            yield index, line
+            index += 1
+
+
+def _read_configs(stream: TextIO) -> Iterator[Tuple[int, str]]:
+    """
+    Yield `(index, raw config)` for a JSONL stream or a single JSON array.
+    """
+    first = stream.read(1)
+    while first.isspace():
+        first = stream.read(1)
+
+    if first == "[":
+        configs = json.loads(first + stream.read())
+        yield from ((i, json.dumps(cfg)) for i, cfg in enumerate(configs))
+        return
+
+    lines = _read_lines(stream)
+    head = next(lines, None)
+    if head is not None:
+        yield head[0], first + head[1]
+        yield from lines
+
+
+def compile_record(
+    index: int,
+    line: str,
+    contract: Optional[str] = None,
+    teal: bool = True,
+    optimize: int = 0,
+) -> Dict[str, object]:
+    """
+    Compile the JSON config in `line` into a result record, holding an
+    `error` instead when the config is invalid.
+    """
+    try:
+        cfg = contracts.config_from_dict(json.loads(line), contract)
+        program = contracts.get_program(cfg, optimize)
+        result = {
+            "index": index,
+            "contract": contracts.contract_name(cfg),
+            "address": program_address(program),
+            "program": base64.b64encode(program).decode(),
+        }
+        if teal:
+            result["teal"] = contracts.get_teal(cfg, optimize)
+    except Exception as e:
+        result = {"index": index, "error": f"{type(e).__name__}: {e}"}
+    return result
+
+
+class _CompileChunk:
+    def __init__(self, contract: Optional[str], teal: bool, optimize: int):
+        self.contract = contract
+        self.teal = teal
+        self.optimize = optimize
+
+    def __call__(self, chunk: List[Tuple[int, str]]) -> List[Tuple[bool, str]]:
+        results = []
+        for index, line in chunk:
+            result = compile_record(
+                index, line, self.contract, self.teal, self.optimize
+            )
+            results.append(("error" in result, json.dumps(result)))
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="algoworld-contracts",
+        description="Compile a stream of JSON swap configs into TEAL, program "
+        "bytes and escrow addresses, one JSON result per line.",
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="JSONL file or JSON array of configs (default: stdin)",
+    )
+    parser.add_argument(
+        "-c",
+        "--contract",
+        choices=list(contracts.CONTRACT_CONFIGS),
+        help="contract kind of configs without a `contract` key",
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        default=1,
+        help="number of worker processes, 0 for one per core (default: 1)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="write results as soon as they are ready instead of in input order",
+    )
+    parser.add_argument(
+        "--no-teal", action="store_true", help="omit the TEAL source from results"
+    )
+    parser.add_argument(
+        "-O",
+        "--optimize",
+        type=int,
+        choices=OPTIMIZE_LEVELS,
+        default=0,
+        help="optimization level, 1 for peephole rewrites (default: 0)",
+    )
+    args = parser.parse_args(argv)
+
+    failed = False
+    chunks = map_chunks(
+        _CompileChunk(args.contract, not args.no_teal, args.optimize),
+        _read_configs(args.input),
+        processes=args.processes or None,
+        chunk_size=args.chunk_size,
+        ordered=not args.unordered,
+    )
+    for _, results in chunks:
+        for error, result in results:
+            failed = failed or error
+            sys.stdout.write(result + "\n")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import operator
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+
+from algoworld_contracts.common.assembler import (
+    TealAssemblyError,
+    _parse_uint,
+    tokenize,
+)
+
+"""
+Static analysis of TEAL programs
+Walks every execution path of a program to compute its opcode cost, keeping
+track of constant values so that bounded loops are unrolled and only jumps
+on transaction dependent conditions fork the walk. Field values learned from
+`field == constant` tests prune paths contradicting earlier tests.
+"""
+
+# Opcodes costing more than 1 in TEAL v6, the rest cost 1
+OPCODE_COSTS = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "ed25519verify": 1900,
+}
+
+CONDITIONAL_BRANCHES = ("bnz", "bz")
+TERMINATORS = ("return", "err")
+MAX_PATHS = 100_000
+MAX_STEPS = 100_000
+
+# Number of values popped and pushed by opcodes not evaluated on constants
+STACK_EFFECTS = {
+    "addr": (0, 1),
+    "byte": (0, 1),
+    "pushbytes": (0, 1),
+    "arg": (0, 1),
+    "txn": (0, 1),
+    "gtxn": (0, 1),
+    "txna": (0, 1),
+    "gtxna": (0, 1),
+    "global": (0, 1),
+    "gtxns": (1, 1),
+    "gtxnsa": (1, 1),
+    "len": (1, 1),
+    "itob": (1, 1),
+    "btoi": (1, 1),
+    "sha256": (1, 1),
+    "keccak256": (1, 1),
+    "sha512_256": (1, 1),
+    "extract": (1, 1),
+    "substring": (1, 1),
+    "bitlen": (1, 1),
+    "ed25519verify": (3, 1),
+    "concat": (2, 1),
+    "extract3": (3, 1),
+    "substring3": (3, 1),
+    "extract_uint16": (2, 1),
+    "extract_uint32": (2, 1),
+    "extract_uint64": (2, 1),
+    "getbit": (2, 1),
+    "getbyte": (2, 1),
+    "b==": (2, 1),
+    "b!=": (2, 1),
+    "select": (3, 1),
+    "pop": (1, 0),
+}
+
+# Opcodes evaluated when all their operands are constants
+UNARY_OPS: Dict[str, Callable[[int], int]] = {
+    "!": lambda a: int(not a),
+    "~": lambda a: ~a % 2**64,
+}
+BINARY_OPS: Dict[str, Callable[[int, int], int]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.floordiv,
+    "%": operator.mod,
+    "<": lambda a, b: int(a < b),
+    ">": lambda a, b: int(a > b),
+    "<=": lambda a, b: int(a <= b),
+    ">=": lambda a, b: int(a >= b),
+    "==": lambda a, b: int(a == b),
+    "!=": lambda a, b: int(a != b),
+    "&&": lambda a, b: int(bool(a and b)),
+    "||": lambda a, b: int(bool(a or b)),
+    "&": operator.and_,
+    "|": operator.or_,
+    "^": operator.xor,
+}
+
+Instruction = Tuple[str, List[str]]
+
+
+class Field(NamedTuple):
+    """
+    Transaction dependent value read by the program, like `gtxn 0 TypeEnum`.
+    """
+
+    name: str
+
+
+class Condition(NamedTuple):
+    """
+    Transaction dependent condition holding at least when every `field ==
+    value` pair of `equals` holds, and exactly then if `exact`.
+    """
+
+    equals: Tuple[Tuple[str, int], ...]
+    exact: bool
+
+
+# Constant uint64, symbolic value or None when nothing is known about it
+Value = Union[int, Field, Condition, None]
+
+
+class Path(NamedTuple):
+    """
+    Execution path through a program, where `branch` is the label of the last
+    conditional jump taken on a transaction dependent condition.
+    """
+
+    branch: Optional[str]
+    approved: bool
+    cost: int
+
+
+class _State(NamedTuple):
+    pc: int
+    branch: Optional[str]
+    cost: int
+    steps: int
+    stack: List[Value]
+    scratch: Dict[int, Value]
+    frames: List[int]
+    # Field values, or values they cannot take, learned from the conditions
+    known: Dict[str, int]
+    excluded: Dict[str, FrozenSet[int]]
+
+    def copy(self, **changes) -> "_State":
+        return self._replace(
+            stack=list(self.stack),
+            scratch=dict(self.scratch),
+            frames=list(self.frames),
+            known=dict(self.known),
+            excluded=dict(self.excluded),
+            **changes,
+        )
+
+    def assume(self, condition: Condition, holds: bool) -> bool:
+        """
+        Record that `condition` `holds` or not, returning False when it
+        contradicts what is known already.
+        """
+        if holds:
+            for field, value in condition.equals:
+                if self.known.get(field, value) != value:
+                    return False
+                if value in self.excluded.get(field, ()):
+                    return False
+                self.known[field] = value
+            return True
+
+        if all(self.known.get(field) == value for field, value in condition.equals):
+            return not condition.exact
+        if condition.exact and len(condition.equals) == 1:
+            ((field, value),) = condition.equals
+            self.excluded[field] = self.excluded.get(field, frozenset()) | {value}
+        return True
+
+
+def parse_teal(source: str) -> Tuple[List[Instruction], Dict[str, int]]:
+    """
+    Return the instructions of TEAL `source` and the index of each label.
+    """
+    instructions: List[Instruction] = []
+    labels: Dict[str, int] = {}
+    for line in source.splitlines():
+        tokens = tokenize(line)
+        if not tokens or tokens[0] == "#pragma":
+            continue
+        if tokens[0].endswith(":") and len(tokens) == 1:
+            labels[tokens[0][:-1]] = len(instructions)
+        else:
+            instructions.append((tokens[0], tokens[1:]))
+    return instructions, labels
+
+
+def opcode_cost(op: str) -> int:
+    return OPCODE_COSTS.get(op, 1)
+
+
+def _pop(stack: List[Value], op: str) -> Value:
+    if not stack:
+        raise TealAssemblyError(f"{op} on an empty stack")
+    return stack.pop()
+
+
+def _read(state: _State, name: str) -> Value:
+    return state.known.get(name, Field(name))
+
+
+def _equals(a: Value, b: Value, state: _State) -> Value:
+    if isinstance(a, int):
+        a, b = b, a
+    if not isinstance(a, Field) or not isinstance(b, int):
+        return None
+    if b in state.excluded.get(a.name, ()):
+        return 0
+    return Condition(((a.name, b),), True)
+
+
+def _and(a: Value, b: Value) -> Value:
+    if 0 in (a, b):
+        return 0
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        return a if isinstance(a, Condition) else None
+    conditions = [c for c in (a, b) if isinstance(c, Condition)]
+    if not conditions:
+        return None
+    return Condition(
+        tuple(pair for c in conditions for pair in c.equals),
+        len(conditions) == 2 and all(c.exact for c in conditions),
+    )
+
+
+def _execute(op: str, args: List[str], state: _State):
+    """
+    Apply the stack effect of the non branching opcode `op`.
+    """
+    stack, scratch = state.stack, state.scratch
+    if op in ("int", "pushint"):
+        stack.append(_parse_uint(args[0]))
+    elif op in ("global", "txn", "gtxn"):
+        stack.append(_read(state, " ".join([op, *args])))
+    elif op == "gtxns":
+        index = _pop(stack, op)
+        if isinstance(index, int):
+            stack.append(_read(state, f"gtxn {index} {args[0]}"))
+        else:
+            stack.append(None)
+    elif op == "load":
+        stack.append(scratch.get(int(args[0]), 0))
+    elif op == "store":
+        scratch[int(args[0])] = _pop(stack, op)
+    elif op == "dup":
+        value = _pop(stack, op)
+        stack.extend([value, value])
+    elif op == "dup2":
+        b, a = _pop(stack, op), _pop(stack, op)
+        stack.extend([a, b, a, b])
+    elif op == "swap":
+        b, a = _pop(stack, op), _pop(stack, op)
+        stack.extend([b, a])
+    elif op in UNARY_OPS:
+        a = _pop(stack, op)
+        stack.append(UNARY_OPS[op](a) if isinstance(a, int) else None)
+    elif op in BINARY_OPS:
+        b, a = _pop(stack, op), _pop(stack, op)
+        if isinstance(a, int) and isinstance(b, int):
+            stack.append(BINARY_OPS[op](a, b))
+        elif op == "==":
+            stack.append(_equals(a, b, state))
+        elif op == "&&":
+            stack.append(_and(a, b))
+        else:
+            stack.append(None)
+    elif op in STACK_EFFECTS:
+        pops, pushes = STACK_EFFECTS[op]
+        for _ in range(pops):
+            _pop(stack, op)
+        stack.extend([None] * pushes)
+    else:
+        raise TealAssemblyError(f"unsupported opcode {op}")
+
+
+def _exits(state: _State) -> List[bool]:
+    """
+    Return whether the program may approve, reject or both when it exits in
+    `state`, as transaction dependent results can go either way.
+    """
+    if not state.stack:
+        return [False]
+    return [holds for holds, _ in _outcomes(state, state.stack[-1])]
+
+
+def _outcomes(state: _State, condition: Value) -> List[Tuple[bool, _State]]:
+    """
+    Return the feasible outcomes of testing `condition` in `state`, each with
+    the state knowing the outcome.
+    """
+    if isinstance(condition, int):
+        return [(bool(condition), state)]
+
+    outcomes = []
+    for holds in (True, False):
+        outcome = state.copy()
+        if not isinstance(condition, Condition) or outcome.assume(condition, holds):
+            outcomes.append((holds, outcome))
+    return outcomes
+
+
+def execution_paths(source: str) -> List[Path]:
+    """
+    Enumerate every feasible execution path of TEAL `source` with its opcode
+    cost.
+    """
+    instructions, labels = parse_teal(source)
+    paths: List[Path] = []
+    pending = [_State(0, None, 0, 0, [], {}, [], {}, {})]
+    while pending:
+        state = pending.pop()
+        while True:
+            if state.steps > MAX_STEPS:
+                raise TealAssemblyError(f"path longer than {MAX_STEPS} steps")
+            if state.pc >= len(instructions):
+                for approved in _exits(state):
+                    paths.append(Path(state.branch, approved, state.cost))
+                break
+
+            op, args = instructions[state.pc]
+            state = state._replace(
+                cost=state.cost + opcode_cost(op), steps=state.steps + 1
+            )
+            if op in TERMINATORS:
+                for approved in _exits(state) if op == "return" else [False]:
+                    paths.append(Path(state.branch, approved, state.cost))
+                break
+            if op == "b":
+                state = state._replace(pc=labels[args[0]])
+            elif op == "callsub":
+                state.frames.append(state.pc + 1)
+                state = state._replace(pc=labels[args[0]])
+            elif op == "retsub":
+                state = state._replace(pc=state.frames.pop())
+            elif op == "assert":
+                outcomes = _outcomes(state, _pop(state.stack, op))
+                if any(not holds for holds, _ in outcomes):
+                    paths.append(Path(state.branch, False, state.cost))
+                passed = [outcome for holds, outcome in outcomes if holds]
+                if not passed:
+                    break
+                state = passed[0]._replace(pc=state.pc + 1)
+            elif op in CONDITIONAL_BRANCHES:
+                condition = _pop(state.stack, op)
+                outcomes = _outcomes(state, condition)
+                forked = len(outcomes) > 1
+                for holds, outcome in reversed(outcomes):
+                    if holds == (op == "bnz"):
+                        target = labels[args[0]]
+                        branch = args[0] if forked else outcome.branch
+                        outcome = outcome._replace(pc=target, branch=branch)
+                    else:
+                        outcome = outcome._replace(pc=state.pc + 1)
+                    pending.append(outcome)
+                break
+            else:
+                _execute(op, args, state)
+                state = state._replace(pc=state.pc + 1)
+
+        if len(paths) > MAX_PATHS:
+            raise TealAssemblyError(f"more than {MAX_PATHS} execution paths")
+    return paths
+
+
+def cond_branch_costs(source: str, branches: List[str]) -> Dict[str, int]:
+    """
+    Return the worst case opcode cost of the approving paths through each
+    branch of a top level `Cond`, named after `branches` in declaration order,
+    and of the rejecting paths under `reject`. Approving paths through no
+    named branch, as in programs without a `Cond`, are under `approve`.
+    """
+    instructions, _ = parse_teal(source)
+    paths = execution_paths(source)
+    # Bodies do not branch on the transaction group, so paths reaching one
+    # last jumped to its `Cond` label, and only bodies can approve
+    approving = {path.branch for path in paths if path.approved}
+    targets = [
+        args[0]
+        for op, args in instructions
+        if op in CONDITIONAL_BRANCHES and args[0] in approving
+    ]
+    names = dict(zip(dict.fromkeys(targets), branches))
+
+    costs: Dict[str, int] = {}
+    for path in paths:
+        if path.approved:
+            name = names.get(path.branch, "approve")  # type: ignore
+        else:
+            name = "reject"
+        costs[name] = max(costs.get(name, 0), path.cost)
+    return costs
@@ -0,0 +1,629 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import base64
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from algosdk import constants, encoding
+
+from algoworld_contracts.common.templates import (
+    BYTES_SLOT,
+    validate_addr,
+    validate_base16,
+    validate_int,
+)
+
+"""
+Offline TEAL assembler
+Mirrors the bytecode produced by algod `/v2/teal/compile` for the opcodes used
+by AlgoWorld contracts, including the constant block optimization applied by
+go-algorand from TEAL v4 onwards:
+1. Constants referenced more than once go into `intcblock`/`bytecblock`,
+   sorted by frequency and then by first appearance.
+2. Constants referenced exactly once are inlined with `pushint`/`pushbytes`.
+"""
+
+OPTIMIZE_CONSTANTS_VERSION = 4
+
+# name: (opcode, immediates)
+OPCODES: Dict[str, Tuple[int, Tuple[str, ...]]] = {
+    "err": (0x00, ()),
+    "sha256": (0x01, ()),
+    "keccak256": (0x02, ()),
+    "sha512_256": (0x03, ()),
+    "ed25519verify": (0x04, ()),
+    "+": (0x08, ()),
+    "-": (0x09, ()),
+    "/": (0x0A, ()),
+    "*": (0x0B, ()),
+    "<": (0x0C, ()),
+    ">": (0x0D, ()),
+    "<=": (0x0E, ()),
+    ">=": (0x0F, ()),
+    "&&": (0x10, ()),
+    "||": (0x11, ()),
+    "==": (0x12, ()),
+    "!=": (0x13, ()),
+    "!": (0x14, ()),
+    "len": (0x15, ()),
+    "itob": (0x16, ()),
+    "btoi": (0x17, ()),
+    "%": (0x18, ()),
+    "|": (0x19, ()),
+    "&": (0x1A, ()),
+    "^": (0x1B, ()),
+    "~": (0x1C, ()),
+    "intcblock": (0x20, ("intcblock",)),
+    "intc": (0x21, ("uint8",)),
+    "intc_0": (0x22, ()),
+    "intc_1": (0x23, ()),
+    "intc_2": (0x24, ()),
+    "intc_3": (0x25, ()),
+    "bytecblock": (0x26, ("bytecblock",)),
+    "bytec": (0x27, ("uint8",)),
+    "bytec_0": (0x28, ()),
+    "bytec_1": (0x29, ()),
+    "bytec_2": (0x2A, ()),
+    "bytec_3": (0x2B, ()),
+    "arg": (0x2C, ("uint8",)),
+    "arg_0": (0x2D, ()),
+    "arg_1": (0x2E, ()),
+    "arg_2": (0x2F, ()),
+    "arg_3": (0x30, ()),
+    "txn": (0x31, ("txnfield",)),
+    "global": (0x32, ("globalfield",)),
+    "gtxn": (0x33, ("uint8", "txnfield")),
+    "load": (0x34, ("uint8",)),
+    "store": (0x35, ("uint8",)),
+    "gtxns": (0x38, ("txnfield",)),
+    "loads": (0x3E, ()),
+    "stores": (0x3F, ()),
+    "bnz": (0x40, ("label",)),
+    "bz": (0x41, ("label",)),
+    "b": (0x42, ("label",)),
+    "return": (0x43, ()),
+    "assert": (0x44, ()),
+    "pop": (0x48, ()),
+    "dup": (0x49, ()),
+    "dup2": (0x4A, ()),
+    "dig": (0x4B, ("uint8",)),
+    "swap": (0x4C, ()),
+    "select": (0x4D, ()),
+    "cover": (0x4E, ("uint8",)),
+    "uncover": (0x4F, ("uint8",)),
+    "concat": (0x50, ()),
+    "substring": (0x51, ("uint8", "uint8")),
+    "substring3": (0x52, ()),
+    "extract": (0x57, ("uint8", "uint8")),
+    "extract3": (0x58, ()),
+    "extract_uint16": (0x59, ()),
+    "extract_uint32": (0x5A, ()),
+    "extract_uint64": (0x5B, ()),
+    "pushbytes": (0x80, ("bytes",)),
+    "pushint": (0x81, ("varuint",)),
+    "callsub": (0x88, ("label",)),
+    "retsub": (0x89, ()),
+}
+
+TXN_FIELDS = [
+    "Sender",
+    "Fee",
+    "FirstValid",
+    "FirstValidTime",
+    "LastValid",
+    "Note",
+    "Lease",
+    "Receiver",
+    "Amount",
+    "CloseRemainderTo",
+    "VotePK",
+    "SelectionPK",
+    "VoteFirst",
+    "VoteLast",
+    "VoteKeyDilution",
+    "Type",
+    "TypeEnum",
+    "XferAsset",
+    "AssetAmount",
+    "AssetSender",
+    "AssetReceiver",
+    "AssetCloseTo",
+    "GroupIndex",
+    "TxID",
+    "ApplicationID",
+    "OnCompletion",
+    "ApplicationArgs",
+    "NumAppArgs",
+    "Accounts",
+    "NumAccounts",
+    "ApprovalProgram",
+    "ClearStateProgram",
+    "RekeyTo",
+    "ConfigAsset",
+    "ConfigAssetTotal",
+    "ConfigAssetDecimals",
+    "ConfigAssetDefaultFrozen",
+    "ConfigAssetUnitName",
+    "ConfigAssetName",
+    "ConfigAssetURL",
+    "ConfigAssetMetadataHash",
+    "ConfigAssetManager",
+    "ConfigAssetReserve",
+    "ConfigAssetFreeze",
+    "ConfigAssetClawback",
+    "FreezeAsset",
+    "FreezeAssetAccount",
+    "FreezeAssetFrozen",
+    "Assets",
+    "NumAssets",
+    "Applications",
+    "NumApplications",
+    "GlobalNumUint",
+    "GlobalNumByteSlice",
+    "LocalNumUint",
+    "LocalNumByteSlice",
+    "ExtraProgramPages",
+    "Nonparticipation",
+    "Logs",
+    "NumLogs",
+    "CreatedAssetID",
+    "CreatedApplicationID",
+    "LastLog",
+    "StateProofPK",
+]
+
+GLOBAL_FIELDS = [
+    "MinTxnFee",
+    "MinBalance",
+    "MaxTxnLife",
+    "ZeroAddress",
+    "GroupSize",
+    "LogicSigVersion",
+    "Round",
+    "LatestTimestamp",
+    "CurrentApplicationID",
+    "CreatorAddress",
+    "CurrentApplicationAddress",
+    "GroupID",
+    "OpcodeBudget",
+    "CallerApplicationID",
+    "CallerApplicationAddress",
+]
+
+TXN_TYPES = {
+    "unknown": 0,
+    "pay": 1,
+    "keyreg": 2,
+    "acfg": 3,
+    "axfer": 4,
+    "afrz": 5,
+    "appl": 6,
+}
+
+INT_REF = "int"
+BYTE_REF = "byte"
+LABEL = "label"
+BRANCH = "branch"
+CODE = "code"
+
+
+class TealAssemblyError(Exception):
+    pass
+
+
+def uvarint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _checksum(data: bytes) -> bytes:
+    return hashlib.new("sha512_256", data).digest()
+
+
+try:
+    _checksum(b"")
+except ValueError:  # OpenSSL build without SHA-512/256
+    _checksum = encoding.checksum  # noqa: F811
+
+
+def program_address(program: bytes) -> str:
+    """
+    Return the logic signature (escrow) address of assembled `program`.
+    """
+    return encoding.encode_address(_checksum(constants.logic_prefix + program))
+
+
+def tokenize(line: str) -> List[str]:
+    tokens = []
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char.isspace():
+            i += 1
+        elif line.startswith("//", i):
+            break
+        elif char == '"':
+            j = i + 1
+            while j < len(line) and line[j] != '"':
+                j += 2 if line[j] == "\\" else 1
+            tokens.append(line[i : j + 1])
+            i = j + 1
+        else:
+            j = i
+            while j < len(line) and not line[j].isspace():
+                j += 1
+            tokens.append(line[i:j])
+            i = j
+    return tokens
+
+
+def _parse_string(token: str) -> bytes:
+    if not token.endswith('"') or len(token) < 2:
+        raise TealAssemblyError(f"unterminated string literal {token}")
+    return token[1:-1].encode("latin-1").decode("unicode_escape").encode("latin-1")
+
+
+def _parse_bytes(args: List[str]) -> bytes:
+    if len(args) == 1 and args[0].startswith('"'):
+        return _parse_string(args[0])
+    if len(args) == 1 and args[0].startswith("0x"):
+        return bytes.fromhex(args[0][2:])
+    if len(args) == 2 and args[0] in ("base64", "b64"):
+        return base64.b64decode(args[1])
+    if len(args) == 2 and args[0] in ("base32", "b32"):
+        return base64.b32decode(args[1] + "=" * (-len(args[1]) % 8))
+    raise TealAssemblyError(f"unsupported byte literal {' '.join(args)}")
+
+
+def _parse_uint(token: str) -> int:
+    if token in TXN_TYPES:
+        return TXN_TYPES[token]
+    try:
+        return int(token, 0)
+    except ValueError:
+        raise TealAssemblyError(f"unable to parse {token} as integer")
+
+
+class ProgramTemplate:
+    """
+    TEAL source parsed once into bytecode fragments and constant references,
+    assembled into a program by filling in the constant values. References to
+    `slots` (placeholder token -> (name, kind), see `Placeholders`) are resolved
+    from the values passed to `assemble`.
+    """
+
+    def __init__(self, source: str, slots: Optional[Dict[str, tuple]] = None):
+        self.slots = slots or {}
+        self.kinds = dict(self.slots.values())
+        self.version = 1
+        self.intcblock: Optional[List[int]] = None
+        self.bytecblock: Optional[List[bytes]] = None
+        self.ops: List[tuple] = []
+        for number, line in enumerate(source.splitlines(), start=1):
+            try:
+                self._parse_line(line)
+            except (TealAssemblyError, ValueError) as e:
+                raise TealAssemblyError(f"line {number}: {e}") from e
+        self.refs = {
+            kind: [(op[1], op[2]) for op in self.ops if op[0] == kind]
+            for kind in (INT_REF, BYTE_REF)
+        }
+
+    def _code(self, code: bytes):
+        if self.ops and self.ops[-1][0] == CODE:
+            self.ops[-1] = (CODE, self.ops[-1][1] + code)
+        else:
+            self.ops.append((CODE, code))
+
+    def _parse_line(self, line: str):
+        tokens = tokenize(line)
+        if not tokens:
+            return
+        op, args = tokens[0], tokens[1:]
+
+        if op == "#pragma":
+            if args[0] != "version":
+                raise TealAssemblyError(f"unsupported pragma {args[0]}")
+            self.version = int(args[1])
+        elif op.endswith(":") and not args:
+            self.ops.append((LABEL, op[:-1]))
+        elif op == "int":
+            self._int_ref(args[0])
+        elif op == "addr":
+            slot = self.slots.get(args[0])
+            if slot is not None:
+                self.ops.append((BYTE_REF, None, slot[0]))
+            else:
+                self.ops.append((BYTE_REF, encoding.decode_address(args[0]), None))
+        elif op == "byte":
+            slot = self.slots.get(args[0])
+            if slot is not None:
+                self.ops.append((BYTE_REF, None, slot[0]))
+            else:
+                self.ops.append((BYTE_REF, _parse_bytes(args), None))
+        elif op in OPCODES:
+            self._opcode(op, args)
+        else:
+            raise TealAssemblyError(f"unknown opcode {op}")
+
+    def _int_ref(self, token: str):
+        slot = self.slots.get(token)
+        if slot is not None:
+            self.ops.append((INT_REF, None, slot[0]))
+        else:
+            self.ops.append((INT_REF, _parse_uint(token), None))
+
+    def _opcode(self, op: str, args: List[str]):
+        opcode, immediates = OPCODES[op]
+        if len(args) != len(immediates) and immediates[-1:] not in [
+            ("intcblock",),
+            ("bytecblock",),
+            ("bytes",),
+        ]:
+            raise TealAssemblyError(f"{op} expects {len(immediates)} immediates")
+
+        if immediates == ("label",):
+            self.ops.append((BRANCH, opcode, args[0]))
+            return
+
+        code = bytearray([opcode])
+        for kind, arg in zip(immediates, args):
+            if kind == "uint8":
+                code.append(_parse_uint(arg))
+            elif kind == "txnfield":
+                code.append(TXN_FIELDS.index(arg))
+            elif kind == "globalfield":
+                code.append(GLOBAL_FIELDS.index(arg))
+            elif kind == "varuint":
+                code += uvarint(_parse_uint(arg))
+        if immediates == ("bytes",):
+            value = _parse_bytes(args)
+            code += uvarint(len(value)) + value
+        elif immediates == ("intcblock",):
+            self.intcblock = [_parse_uint(arg) for arg in args]
+            code += uvarint(len(args)) + b"".join(uvarint(v) for v in self.intcblock)
+        elif immediates == ("bytecblock",):
+            self.bytecblock = [_parse_bytes([arg]) for arg in args]
+            code += uvarint(len(args))
+            code += b"".join(uvarint(len(v)) + v for v in self.bytecblock)
+        self._code(bytes(code))
+
+    def _constants(self, kind: str, values: Dict[str, object]) -> List[object]:
+        constants = []
+        resolved: Dict[str, object] = {}
+        for constant, name in self.refs[kind]:
+            if name is None:
+                constants.append(constant)
+                continue
+            if name not in resolved:
+                value = values[name]
+                if kind == INT_REF:
+                    validate_int(value)
+                    resolved[name] = value
+                elif self.kinds[name] == BYTES_SLOT:
+                    validate_base16(value)
+                    resolved[name] = bytes.fromhex(value)  # type: ignore
+                else:
+                    validate_addr(value)
+                    resolved[name] = encoding.decode_address(value)
+            constants.append(resolved[name])
+        return constants
+
+    def _constant_block(
+        self, refs: List[object], explicit: Optional[List[object]]
+    ) -> Tuple[List[object], Dict[object, int]]:
+        """
+        Return the constant block and a map from value to block index, where
+        -1 marks a value that should be pushed inline.
+        """
+        if explicit is not None:
+            return [], {v: explicit.index(v) for v in refs if v in explicit}
+
+        freqs: Dict[object, int] = {}
+        for value in refs:
+            freqs[value] = freqs.get(value, 0) + 1
+
+        if self.version < OPTIMIZE_CONSTANTS_VERSION:
+            block = list(freqs)
+            return block, {v: i for i, v in enumerate(block)}
+
+        # Stable sort keeps first referenced first among equal frequencies
+        block = [v for v in sorted(freqs, key=lambda v: -freqs[v]) if freqs[v] > 1]
+        index = {v: i for i, v in enumerate(block)}
+        return block, {v: index.get(v, -1) for v in freqs}
+
+    def assemble(self, values: Optional[Dict[str, object]] = None) -> bytes:
+        values = values or {}
+        int_refs = self._constants(INT_REF, values)
+        byte_refs = self._constants(BYTE_REF, values)
+        intc, int_index = self._constant_block(int_refs, self.intcblock)
+        bytec, byte_index = self._constant_block(byte_refs, self.bytecblock)
+
+        header = bytearray(uvarint(self.version))
+        if intc:
+            header.append(0x20)
+            header += uvarint(len(intc)) + b"".join(uvarint(v) for v in intc)
+        if bytec:
+            header.append(0x26)
+            header += uvarint(len(bytec))
+            header += b"".join(uvarint(len(v)) + v for v in bytec)
+
+        int_codes = {
+            v: _reference(i, 0x22, 0x21, 0x81, uvarint(v)) for v, i in int_index.items()
+        }
+        byte_codes = {
+            v: _reference(i, 0x28, 0x27, 0x80, uvarint(len(v)) + v)
+            for v, i in byte_index.items()
+        }
+
+        code = bytearray()
+        labels: Dict[str, int] = {}
+        branches: List[Tuple[int, str]] = []
+        ints, byteslices = iter(int_refs), iter(byte_refs)
+        for op in self.ops:
+            kind = op[0]
+            if kind == CODE:
+                code += op[1]
+            elif kind == INT_REF:
+                code += _lookup(int_codes, next(ints))
+            elif kind == BYTE_REF:
+                code += _lookup(byte_codes, next(byteslices))
+            elif kind == LABEL:
+                labels[op[1]] = len(code)
+            else:
+                branches.append((len(code), op[2]))
+                code += bytes([op[1], 0, 0])
+
+        for position, label in branches:
+            if label not in labels:
+                raise TealAssemblyError(f"reference to undefined label {label}")
+            jump = labels[label] - (position + 3)
+            if not -0x8000 <= jump < 0x8000:
+                raise TealAssemblyError(f"label {label} is too far away")
+            code[position + 1 : position + 3] = (jump & 0xFFFF).to_bytes(2, "big")
+
+        return bytes(header + code)
+
+
+def _reference(
+    index: int, short_opcode: int, opcode: int, push_opcode: int, inline: bytes
+) -> bytes:
+    if index < 0:
+        return bytes([push_opcode]) + inline
+    if index < 4:
+        return bytes([short_opcode + index])
+    return bytes([opcode, index])
+
+
+def _lookup(codes: Dict[object, bytes], value: object) -> bytes:
+    if value not in codes:
+        raise TealAssemblyError(f"value {value!r} not in constant block")
+    return codes[value]
+
+
+def assemble(source: str) -> bytes:
+    """
+    Assemble TEAL `source` into program bytes.
+    """
+    return ProgramTemplate(source).assemble()
+
+
+OPCODE_NAMES = {
+    opcode: (name, immediates) for name, (opcode, immediates) in OPCODES.items()
+}
+
+
+def _read_uvarint(program: bytes, pc: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        if pc >= len(program):
+            raise TealAssemblyError("truncated varuint")
+        byte = program[pc]
+        value |= (byte & 0x7F) << shift
+        pc += 1
+        if byte < 0x80:
+            return value, pc
+        shift += 7
+
+
+def _read_bytes(program: bytes, pc: int) -> Tuple[bytes, int]:
+    length, pc = _read_uvarint(program, pc)
+    if pc + length > len(program):
+        raise TealAssemblyError("truncated byte constant")
+    return program[pc : pc + length], pc + length
+
+
+def disassemble(program: bytes) -> str:
+    """
+    Return TEAL source of assembled `program`, with branch targets as
+    generated labels, that assembles back into the same bytes.
+    """
+    version, pc = _read_uvarint(program, 0)
+    instructions: List[Tuple[int, str, List[str]]] = []
+    targets: Dict[int, str] = {}
+    while pc < len(program):
+        start = pc
+        if program[pc] not in OPCODE_NAMES:
+            raise TealAssemblyError(f"unknown opcode {program[pc]:#04x} at {pc}")
+        op, immediates = OPCODE_NAMES[program[pc]]
+        pc += 1
+        args: List[str] = []
+        for kind in immediates:
+            if kind in ("uint8", "txnfield", "globalfield"):
+                if pc >= len(program):
+                    raise TealAssemblyError(f"{op} at {start} is truncated")
+                index = program[pc]
+                pc += 1
+                if kind == "uint8":
+                    args.append(str(index))
+                else:
+                    fields = TXN_FIELDS if kind == "txnfield" else GLOBAL_FIELDS
+                    if index >= len(fields):
+                        raise TealAssemblyError(f"{op} field {index} at {start}")
+                    args.append(fields[index])
+            elif kind == "varuint":
+                value, pc = _read_uvarint(program, pc)
+                args.append(str(value))
+            elif kind == "bytes":
+                value, pc = _read_bytes(program, pc)
+                args.append("0x" + value.hex())
+            elif kind == "intcblock":
+                count, pc = _read_uvarint(program, pc)
+                for _ in range(count):
+                    value, pc = _read_uvarint(program, pc)
+                    args.append(str(value))
+            elif kind == "bytecblock":
+                count, pc = _read_uvarint(program, pc)
+                for _ in range(count):
+                    value, pc = _read_bytes(program, pc)
+                    args.append("0x" + value.hex())
+            else:
+                if pc + 2 > len(program):
+                    raise TealAssemblyError(f"{op} at {start} is truncated")
+                jump = int.from_bytes(program[pc : pc + 2], "big", signed=True)
+                pc += 2
+                targets.setdefault(pc + jump, f"label{len(targets) + 1}")
+                args.append(str(pc + jump))
+        instructions.append((start, op, args))
+
+    offsets = {start for start, _, _ in instructions} | {len(program)}
+    for target in targets:
+        if target not in offsets:
+            raise TealAssemblyError(f"branch target {target} is not an instruction")
+
+    lines = [f"#pragma version {version}"]
+    for start, op, args in instructions:
+        if start in targets:
+            lines.append(f"{targets[start]}:")
+        if OPCODES[op][1] == ("label",):
+            args = [targets[int(args[0])]]
+        lines.append(" ".join([op, *args]))
+    if len(program) in targets:
+        lines.append(f"{targets[len(program)]}:")
+    return "\n".join(lines)
@@ -0,0 +1,100 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import dataclasses
+from typing import Dict, List
+
+from pyteal import And, Assert, Cond, Expr, Global, Int, NaryExpr, Op, Seq
+
+"""
+Branch dispatch builders
+By default swapper branches compile to a `Cond` whose predicates check the
+group size and shape, and whose bodies are a plain `And`, evaluating every
+term. With `short_circuit` the `Cond` dispatches on the group size alone and
+bodies fail the program at the first false check, so rejected groups stop
+early and branches only test the shape of their own group size.
+"""
+
+
+@dataclasses.dataclass
+class Branch:
+    group_size: int
+    # Transaction types and other checks telling apart branches of a size
+    checks: List[Expr]
+    body: Expr
+
+
+def flatten_and(terms) -> List[Expr]:
+    """
+    Return `terms` with their nested `And` expressions expanded in order.
+    """
+    flat: List[Expr] = []
+    for term in terms:
+        if isinstance(term, NaryExpr) and term.op == Op.logic_and:
+            flat += flatten_and(term.args)
+        else:
+            flat.append(term)
+    return flat
+
+
+def require_all(*terms: Expr, short_circuit: bool = False) -> Expr:
+    """
+    Return whether all `terms` hold, as the result of a `Cond` branch.
+    """
+    if not short_circuit:
+        return And(*terms)
+
+    flat = flatten_and(terms)
+    return Seq(*[Assert(term) for term in flat[:-1]], flat[-1])
+
+
+def dispatch(branches: List[Branch], short_circuit: bool = False) -> Expr:
+    """
+    Return the `Cond` running the body of the first of `branches` matching
+    the transaction group, failing if none does.
+    """
+    if not short_circuit:
+        return Cond(
+            *[
+                [
+                    And(Global.group_size() == Int(b.group_size), *b.checks),
+                    b.body,
+                ]
+                for b in branches
+            ]
+        )
+
+    by_size: Dict[int, List[Branch]] = {}
+    for branch in branches:
+        by_size.setdefault(branch.group_size, []).append(branch)
+
+    cases = []
+    for group_size, candidates in by_size.items():
+        if len(candidates) == 1:
+            (branch,) = candidates
+            body = Seq(*[Assert(check) for check in branch.checks], branch.body)
+        else:
+            body = Cond(*[[And(*b.checks), b.body] for b in candidates])
+        cases.append([Global.group_size() == Int(group_size), body])
+    return Cond(*cases)
@@ -0,0 +1,858 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import dataclasses
+import hashlib
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from algosdk import constants, encoding
+
+from algoworld_contracts.common.analysis import OPCODE_COSTS
+from algoworld_contracts.common.assembler import (
+    GLOBAL_FIELDS,
+    OPCODES,
+    TXN_FIELDS,
+    TXN_TYPES,
+    TealAssemblyError,
+    _checksum,
+    _parse_bytes,
+    _parse_uint,
+    tokenize,
+)
+
+"""
+Offline TEAL evaluator
+Runs logic signatures on a transaction group in-process, without algod. The
+source is compiled once into one Python closure per instruction, so that a
+compiled program can validate tens of thousands of groups per second.
+Transactions are dicts from TEAL field name (`Sender`, `TypeEnum`, ...) to
+value, with addresses as 32 raw bytes; `transaction_fields` converts SDK
+transactions. Only opcodes used by AlgoWorld contracts are supported.
+"""
+
+MAX_UINT64 = 2**64 - 1
+MAX_STACK_SIZE = 1000
+MAX_BYTES_LENGTH = 4096
+MAX_SCRATCH_SLOTS = 256
+MAX_GROUP_SIZE = 16
+LOGIC_SIG_BUDGET = 20000
+
+ZERO_ADDRESS = bytes(32)
+
+ADDRESS_FIELDS = {
+    "Sender",
+    "Receiver",
+    "CloseRemainderTo",
+    "AssetSender",
+    "AssetReceiver",
+    "AssetCloseTo",
+    "RekeyTo",
+    "FreezeAssetAccount",
+    "ConfigAssetManager",
+    "ConfigAssetReserve",
+    "ConfigAssetFreeze",
+    "ConfigAssetClawback",
+}
+BYTES_FIELDS = ADDRESS_FIELDS | {
+    "Note",
+    "Lease",
+    "Type",
+    "TxID",
+    "VotePK",
+    "SelectionPK",
+    "ConfigAssetUnitName",
+    "ConfigAssetName",
+    "ConfigAssetURL",
+    "ConfigAssetMetadataHash",
+}
+
+# Global values of a logic signature evaluation, overridable per evaluation
+DEFAULT_GLOBALS: Dict[str, "StackValue"] = {
+    "MinTxnFee": constants.min_txn_fee,
+    "MinBalance": 100_000,
+    "MaxTxnLife": 1000,
+    "ZeroAddress": ZERO_ADDRESS,
+    "LogicSigVersion": 6,
+    "GroupID": bytes(32),
+}
+
+StackValue = Union[int, bytes]
+
+
+class TealEvaluationError(Exception):
+    pass
+
+
+class TraceStep(NamedTuple):
+    """
+    Instruction at source `line` and the stack just before it executed.
+    """
+
+    line: int
+    source: str
+    stack: Tuple[StackValue, ...]
+
+
+@dataclasses.dataclass
+class Evaluation:
+    approved: bool
+    cost: int
+    error: Optional[str] = None
+    trace: List[TraceStep] = dataclasses.field(default_factory=list)
+
+
+def field_default(field: str) -> object:
+    """
+    Return the value of transaction field `field` when it is not set.
+    """
+    if field in ADDRESS_FIELDS or field == "Lease":
+        return ZERO_ADDRESS
+    if field in BYTES_FIELDS:
+        return b""
+    return 0
+
+
+def _address(address: Optional[str]) -> bytes:
+    return encoding.decode_address(address) if address else ZERO_ADDRESS
+
+
+def transaction_fields(txn) -> Dict[str, object]:
+    """
+    Return the TEAL fields of SDK transaction `txn` (signed or not).
+    """
+    txn = getattr(txn, "transaction", txn)
+    fields: Dict[str, object] = {
+        "Sender": _address(txn.sender),
+        "Fee": txn.fee,
+        "FirstValid": txn.first_valid_round,
+        "LastValid": txn.last_valid_round,
+        "Note": txn.note or b"",
+        "Lease": txn.lease or ZERO_ADDRESS,
+        "Type": txn.type.encode(),
+        "TypeEnum": TXN_TYPES.get(txn.type, 0),
+        "RekeyTo": _address(txn.rekey_to),
+    }
+    if txn.type == constants.payment_txn:
+        fields["Receiver"] = _address(txn.receiver)
+        fields["Amount"] = txn.amt
+        fields["CloseRemainderTo"] = _address(txn.close_remainder_to)
+    elif txn.type == constants.assettransfer_txn:
+        fields["XferAsset"] = txn.index
+        fields["AssetAmount"] = txn.amount
+        fields["AssetSender"] = _address(txn.revocation_target)
+        fields["AssetReceiver"] = _address(txn.receiver)
+        fields["AssetCloseTo"] = _address(txn.close_assets_to)
+    return fields
+
+
+class _Context:
+    __slots__ = ("stack", "group", "index", "args", "globals", "scratch", "frames")
+
+    def __init__(self, group, index, args, global_fields):
+        self.stack: List[StackValue] = []
+        self.group = group
+        self.index = index
+        self.args = args
+        self.globals = global_fields
+        self.scratch: List[StackValue] = [0] * MAX_SCRATCH_SLOTS
+        self.frames: List[int] = []
+
+
+Step = Callable[[_Context], int]
+
+
+def _fail(message: str):
+    raise TealEvaluationError(message)
+
+
+def _uint(value: StackValue, op: str) -> int:
+    if value.__class__ is not int:
+        _fail(f"{op} arg is not uint64")
+    return value  # type: ignore
+
+
+def _bytes(value: StackValue, op: str) -> bytes:
+    if value.__class__ is not bytes:
+        _fail(f"{op} arg is not bytes")
+    return value  # type: ignore
+
+
+def _add(a: int, b: int) -> int:
+    if a + b > MAX_UINT64:
+        _fail("+ overflowed")
+    return a + b
+
+
+def _sub(a: int, b: int) -> int:
+    if a < b:
+        _fail("- would result negative")
+    return a - b
+
+
+def _mul(a: int, b: int) -> int:
+    if a * b > MAX_UINT64:
+        _fail("* overflowed")
+    return a * b
+
+
+def _div(a: int, b: int) -> int:
+    if not b:
+        _fail("/ 0")
+    return a // b
+
+
+def _mod(a: int, b: int) -> int:
+    if not b:
+        _fail("% 0")
+    return a % b
+
+
+UINT_BINARY_OPS: Dict[str, Callable[[int, int], int]] = {
+    "+": _add,
+    "-": _sub,
+    "*": _mul,
+    "/": _div,
+    "%": _mod,
+    "<": lambda a, b: int(a < b),
+    ">": lambda a, b: int(a > b),
+    "<=": lambda a, b: int(a <= b),
+    ">=": lambda a, b: int(a >= b),
+    "&&": lambda a, b: int(bool(a and b)),
+    "||": lambda a, b: int(bool(a or b)),
+    "&": lambda a, b: a & b,
+    "|": lambda a, b: a | b,
+    "^": lambda a, b: a ^ b,
+}
+
+
+def _itob(a: StackValue) -> StackValue:
+    return _uint(a, "itob").to_bytes(8, "big")
+
+
+def _btoi(a: StackValue) -> StackValue:
+    if len(_bytes(a, "btoi")) > 8:
+        _fail("btoi arg too long")
+    return int.from_bytes(a, "big")  # type: ignore
+
+
+UNARY_OPS: Dict[str, Callable[[StackValue], StackValue]] = {
+    "!": lambda a: int(not _uint(a, "!")),
+    "~": lambda a: MAX_UINT64 - _uint(a, "~"),
+    "len": lambda a: len(_bytes(a, "len")),
+    "itob": _itob,
+    "btoi": _btoi,
+    "sha256": lambda a: hashlib.sha256(_bytes(a, "sha256")).digest(),
+    "sha512_256": lambda a: _checksum(_bytes(a, "sha512_256")),
+}
+
+
+def _substring(value: StackValue, start: int, end: int, op: str) -> bytes:
+    value = _bytes(value, op)
+    if end < start or end > len(value):
+        _fail(f"{op} range beyond length of string")
+    return value[start:end]
+
+
+def _extract_uint(size: int) -> Callable[[StackValue, StackValue], StackValue]:
+    op = f"extract_uint{size * 8}"
+
+    def extract(value: StackValue, start: StackValue) -> StackValue:
+        start = _uint(start, op)
+        return int.from_bytes(_substring(value, start, start + size, op), "big")
+
+    return extract
+
+
+def _concat(a: StackValue, b: StackValue) -> StackValue:
+    result = _bytes(a, "concat") + _bytes(b, "concat")
+    if len(result) > MAX_BYTES_LENGTH:
+        _fail("concat produced a too big byte array")
+    return result
+
+
+BINARY_OPS: Dict[str, Callable[[StackValue, StackValue], StackValue]] = {
+    "concat": _concat,
+    "extract_uint16": _extract_uint(2),
+    "extract_uint32": _extract_uint(4),
+    "extract_uint64": _extract_uint(8),
+}
+
+
+class TealProgram:
+    """
+    TEAL `source` compiled into closures, evaluated with `evaluate`.
+    """
+
+    def __init__(self, source: str):
+        self.steps: List[Step] = []
+        self.costs: List[int] = []
+        self.lines: List[Tuple[int, str]] = []
+        self.intcblock: List[int] = []
+        self.bytecblock: List[bytes] = []
+
+        instructions = []
+        labels: Dict[str, int] = {}
+        for number, line in enumerate(source.splitlines(), start=1):
+            tokens = tokenize(line)
+            if not tokens or tokens[0].startswith("#"):
+                continue
+            if tokens[0].endswith(":") and len(tokens) == 1:
+                labels[tokens[0][:-1]] = len(instructions)
+                continue
+            instructions.append((number, line.strip(), tokens[0], tokens[1:]))
+
+        for pc, (number, line, op, args) in enumerate(instructions):
+            try:
+                step = self._compile(op, args, pc + 1, labels, len(instructions))
+            except (TealAssemblyError, ValueError, IndexError) as e:
+                raise TealAssemblyError(f"line {number}: {e}") from e
+            self.steps.append(step)
+            self.costs.append(OPCODE_COSTS.get(op, 1))
+            self.lines.append((number, line))
+
+        # Without backward jumps every instruction runs at most once, so that
+        # the budget and stack size checks can be skipped
+        jumps_back = any(
+            op == "retsub"
+            or (op in ("b", "bz", "bnz", "callsub") and labels[args[0]] <= pc)
+            for pc, (_, _, op, args) in enumerate(instructions)
+        )
+        self.bounded = (
+            not jumps_back
+            and sum(self.costs) <= LOGIC_SIG_BUDGET
+            and 2 * len(self.steps) <= MAX_STACK_SIZE
+        )
+
+    def _compile(
+        self, op: str, args: List[str], nxt: int, labels: Dict[str, int], end: int
+    ) -> Step:
+        if op == "int" or op == "pushint":
+            return _push(_parse_uint(args[0]), nxt)
+        if op == "byte" or op == "pushbytes":
+            return _push(_parse_bytes(args), nxt)
+        if op == "addr":
+            return _push(encoding.decode_address(args[0]), nxt)
+        if op not in OPCODES or op in ("keccak256", "ed25519verify"):
+            raise TealAssemblyError(f"unsupported opcode {op}")
+        immediates = [_parse_uint(arg) for arg in args if arg.isdigit()]
+
+        if op == "intcblock":
+            self.intcblock = [_parse_uint(arg) for arg in args]
+            return _noop(nxt)
+        if op == "bytecblock":
+            self.bytecblock = [_parse_bytes([arg]) for arg in args]
+            return _noop(nxt)
+        if op.startswith("intc") or op.startswith("bytec"):
+            block = self.intcblock if op.startswith("intc") else self.bytecblock
+            index = immediates[0] if "_" not in op else int(op[-1])
+            return _push(block[index], nxt)
+        if op.startswith("arg"):
+            return _arg(immediates[0] if "_" not in op else int(op[-1]), nxt)
+
+        if op in ("b", "bz", "bnz", "callsub"):
+            if args[0] not in labels:
+                raise TealAssemblyError(f"reference to undefined label {args[0]}")
+            target = labels[args[0]]
+            if op == "b":
+                return lambda cx: target
+            if op == "callsub":
+                return _callsub(target, nxt)
+            return _branch(target, nxt, op == "bnz")
+        if op == "retsub":
+            return _retsub
+        if op == "return":
+            return _return(end)
+        if op == "err":
+            return _err
+        if op == "assert":
+            return _assert(nxt)
+
+        if op == "txn":
+            return _txn(None, args[0], nxt)
+        if op == "gtxn":
+            return _txn(_parse_uint(args[0]), args[1], nxt)
+        if op == "gtxns":
+            return _gtxns(args[0], nxt)
+        if op == "global":
+            if args[0] not in GLOBAL_FIELDS:
+                raise TealAssemblyError(f"unknown global field {args[0]}")
+            return _global(args[0], nxt)
+
+        if op in ("==", "!="):
+            return _compare(op == "!=", nxt)
+        if op in UINT_BINARY_OPS:
+            return _uint_binary(op, UINT_BINARY_OPS[op], nxt)
+        if op in BINARY_OPS:
+            return _binary(BINARY_OPS[op], nxt)
+        if op in UNARY_OPS:
+            return _unary(UNARY_OPS[op], nxt)
+        if op in STACK_OPS:
+            return STACK_OPS[op](immediates, nxt)
+        raise TealAssemblyError(f"unsupported opcode {op}")
+
+    def evaluate(
+        self,
+        group: Sequence[object],
+        index: int = 0,
+        args: Sequence[bytes] = (),
+        global_fields: Optional[Dict[str, StackValue]] = None,
+        trace: bool = False,
+    ) -> Evaluation:
+        """
+        Evaluate the program as the logic signature of transaction `index` of
+        `group`, a sequence of field dicts or SDK transactions. The trace is
+        only recorded when `trace` is set.
+        """
+        if not 0 < len(group) <= MAX_GROUP_SIZE:
+            raise ValueError(f"group of {len(group)} transactions")
+        if not 0 <= index < len(group):
+            raise ValueError(f"transaction {index} is not in the group")
+        group = [
+            txn if isinstance(txn, dict) else transaction_fields(txn) for txn in group
+        ]
+        cx = _Context(group, index, args, {**DEFAULT_GLOBALS, **(global_fields or {})})
+
+        steps, costs, lines = self.steps, self.costs, self.lines
+        end = len(steps)
+        stack = cx.stack
+        recorded: List[TraceStep] = []
+        pc = cost = 0
+        try:
+            if self.bounded and not trace:
+                while pc < end:
+                    cost += costs[pc]
+                    pc = steps[pc](cx)
+            while pc < end:
+                cost += costs[pc]
+                if cost > LOGIC_SIG_BUDGET:
+                    _fail("dynamic cost budget exceeded")
+                if trace:
+                    recorded.append(TraceStep(*lines[pc], tuple(stack)))
+                pc = steps[pc](cx)
+                if len(stack) > MAX_STACK_SIZE:
+                    _fail("stack overflow")
+            if len(stack) != 1:
+                _fail(f"stack len is {len(stack)} instead of 1")
+            if stack[0].__class__ is not int:
+                _fail("stack finished with bytes not int")
+            approved = stack[0] != 0
+        except TealEvaluationError as e:
+            return Evaluation(False, cost, str(e), recorded)
+        except IndexError:
+            return Evaluation(False, cost, "stack underflow", recorded)
+        return Evaluation(approved, cost, None, recorded)
+
+
+def _noop(nxt: int) -> Step:
+    return lambda cx: nxt
+
+
+def _push(value: StackValue, nxt: int) -> Step:
+    def push(cx: _Context) -> int:
+        cx.stack.append(value)
+        return nxt
+
+    return push
+
+
+def _arg(index: int, nxt: int) -> Step:
+    def arg(cx: _Context) -> int:
+        if index >= len(cx.args):
+            _fail(f"cannot load arg[{index}] of {len(cx.args)}")
+        cx.stack.append(cx.args[index])
+        return nxt
+
+    return arg
+
+
+def _branch(target: int, nxt: int, if_nonzero: bool) -> Step:
+    def branch(cx: _Context) -> int:
+        value = cx.stack.pop()
+        if value.__class__ is not int:
+            _fail("branch arg is not uint64")
+        return target if bool(value) is if_nonzero else nxt
+
+    return branch
+
+
+def _callsub(target: int, nxt: int) -> Step:
+    def callsub(cx: _Context) -> int:
+        cx.frames.append(nxt)
+        return target
+
+    return callsub
+
+
+def _retsub(cx: _Context) -> int:
+    if not cx.frames:
+        _fail("retsub with empty callstack")
+    return cx.frames.pop()
+
+
+def _return(end: int) -> Step:
+    def ret(cx: _Context) -> int:
+        cx.stack[:] = [cx.stack[-1]]
+        return end
+
+    return ret
+
+
+def _err(cx: _Context) -> int:
+    _fail("err opcode executed")
+    return -1
+
+
+def _assert(nxt: int) -> Step:
+    def check(cx: _Context) -> int:
+        if not _uint(cx.stack.pop(), "assert"):
+            _fail("assert failed")
+        return nxt
+
+    return check
+
+
+def _txn_value(cx: _Context, group_index: int, field: str, default):
+    if field == "GroupIndex":
+        return group_index
+    if group_index >= len(cx.group):
+        _fail(f"txn index {group_index}, len(group) is {len(cx.group)}")
+    return cx.group[group_index].get(field, default)
+
+
+def _txn(group_index: Optional[int], field: str, nxt: int) -> Step:
+    if field not in TXN_FIELDS:
+        raise TealAssemblyError(f"unknown txn field {field}")
+    default = field_default(field)
+
+    if group_index is not None and field != "GroupIndex":
+        # Fast path of `gtxn n Field`, by far the most common read
+        def gtxn(cx: _Context) -> int:
+            group = cx.group
+            if group_index >= len(group):
+                _fail(f"txn index {group_index}, len(group) is {len(group)}")
+            cx.stack.append(group[group_index].get(field, default))
+            return nxt
+
+        return gtxn
+
+    def txn(cx: _Context) -> int:
+        position = cx.index if group_index is None else group_index
+        cx.stack.append(_txn_value(cx, position, field, default))
+        return nxt
+
+    return txn
+
+
+def _gtxns(field: str, nxt: int) -> Step:
+    if field not in TXN_FIELDS:
+        raise TealAssemblyError(f"unknown txn field {field}")
+    default = field_default(field)
+
+    def gtxns(cx: _Context) -> int:
+        position = _uint(cx.stack.pop(), "gtxns")
+        cx.stack.append(_txn_value(cx, position, field, default))
+        return nxt
+
+    return gtxns
+
+
+def _global(field: str, nxt: int) -> Step:
+    if field == "GroupSize":
+
+        def group_size(cx: _Context) -> int:
+            cx.stack.append(len(cx.group))
+            return nxt
+
+        return group_size
+
+    def read(cx: _Context) -> int:
+        if field not in cx.globals:
+            _fail(f"global {field} is not available to logic signatures")
+        cx.stack.append(cx.globals[field])
+        return nxt
+
+    return read
+
+
+def _compare(negate: bool, nxt: int) -> Step:
+    def compare(cx: _Context) -> int:
+        stack = cx.stack
+        b = stack.pop()
+        a = stack.pop()
+        if a.__class__ is not b.__class__:
+            _fail("cannot compare uint64 to bytes")
+        stack.append(int((a == b) is not negate))
+        return nxt
+
+    return compare
+
+
+def _uint_binary(op: str, fn: Callable[[int, int], int], nxt: int) -> Step:
+    def binary(cx: _Context) -> int:
+        stack = cx.stack
+        b = stack.pop()
+        a = stack.pop()
+        if a.__class__ is not int or b.__class__ is not int:
+            _fail(f"{op} arg is not uint64")
+        stack.append(fn(a, b))  # type: ignore
+        return nxt
+
+    return binary
+
+
+def _binary(fn: Callable[[StackValue, StackValue], StackValue], nxt: int) -> Step:
+    def binary(cx: _Context) -> int:
+        stack = cx.stack
+        b = stack.pop()
+        stack.append(fn(stack.pop(), b))
+        return nxt
+
+    return binary
+
+
+def _unary(fn: Callable[[StackValue], StackValue], nxt: int) -> Step:
+    def unary(cx: _Context) -> int:
+        stack = cx.stack
+        stack.append(fn(stack.pop()))
+        return nxt
+
+    return unary
+
+
+def _pop(immediates: List[int], nxt: int) -> Step:
+    def pop(cx: _Context) -> int:
+        cx.stack.pop()
+        return nxt
+
+    return pop
+
+
+def _dup(immediates: List[int], nxt: int) -> Step:
+    def dup(cx: _Context) -> int:
+        cx.stack.append(cx.stack[-1])
+        return nxt
+
+    return dup
+
+
+def _dup2(immediates: List[int], nxt: int) -> Step:
+    def dup2(cx: _Context) -> int:
+        stack = cx.stack
+        stack.extend((stack[-2], stack[-1]))
+        return nxt
+
+    return dup2
+
+
+def _dig(immediates: List[int], nxt: int) -> Step:
+    depth = immediates[0]
+
+    def dig(cx: _Context) -> int:
+        cx.stack.append(cx.stack[-1 - depth])
+        return nxt
+
+    return dig
+
+
+def _swap(immediates: List[int], nxt: int) -> Step:
+    def swap(cx: _Context) -> int:
+        stack = cx.stack
+        stack[-1], stack[-2] = stack[-2], stack[-1]
+        return nxt
+
+    return swap
+
+
+def _select(immediates: List[int], nxt: int) -> Step:
+    def select(cx: _Context) -> int:
+        stack = cx.stack
+        condition = _uint(stack.pop(), "select")
+        b = stack.pop()
+        if not condition:
+            return nxt
+        stack[-1] = b
+        return nxt
+
+    return select
+
+
+def _cover(immediates: List[int], nxt: int) -> Step:
+    depth = immediates[0]
+
+    def cover(cx: _Context) -> int:
+        stack = cx.stack
+        if depth >= len(stack):
+            _fail(f"cover {depth} below stack depth")
+        stack.insert(len(stack) - 1 - depth, stack.pop())
+        return nxt
+
+    return cover
+
+
+def _uncover(immediates: List[int], nxt: int) -> Step:
+    depth = immediates[0]
+
+    def uncover(cx: _Context) -> int:
+        stack = cx.stack
+        if depth >= len(stack):
+            _fail(f"uncover {depth} below stack depth")
+        stack.append(stack.pop(len(stack) - 1 - depth))
+        return nxt
+
+    return uncover
+
+
+def _load(immediates: List[int], nxt: int) -> Step:
+    slot = immediates[0]
+
+    def load(cx: _Context) -> int:
+        cx.stack.append(cx.scratch[slot])
+        return nxt
+
+    return load
+
+
+def _store(immediates: List[int], nxt: int) -> Step:
+    slot = immediates[0]
+
+    def store(cx: _Context) -> int:
+        cx.scratch[slot] = cx.stack.pop()
+        return nxt
+
+    return store
+
+
+def _slot(value: StackValue, op: str) -> int:
+    slot = _uint(value, op)
+    if slot >= MAX_SCRATCH_SLOTS:
+        _fail(f"invalid scratch space position {slot}")
+    return slot
+
+
+def _loads(immediates: List[int], nxt: int) -> Step:
+    def loads(cx: _Context) -> int:
+        cx.stack.append(cx.scratch[_slot(cx.stack.pop(), "loads")])
+        return nxt
+
+    return loads
+
+
+def _stores(immediates: List[int], nxt: int) -> Step:
+    def stores(cx: _Context) -> int:
+        value = cx.stack.pop()
+        cx.scratch[_slot(cx.stack.pop(), "stores")] = value
+        return nxt
+
+    return stores
+
+
+def _substring_immediate(immediates: List[int], nxt: int) -> Step:
+    start, end = immediates
+
+    def substring(cx: _Context) -> int:
+        stack = cx.stack
+        stack.append(_substring(stack.pop(), start, end, "substring"))
+        return nxt
+
+    return substring
+
+
+def _substring3(immediates: List[int], nxt: int) -> Step:
+    def substring3(cx: _Context) -> int:
+        stack = cx.stack
+        end = _uint(stack.pop(), "substring3")
+        start = _uint(stack.pop(), "substring3")
+        stack.append(_substring(stack.pop(), start, end, "substring3"))
+        return nxt
+
+    return substring3
+
+
+def _extract(immediates: List[int], nxt: int) -> Step:
+    start, length = immediates
+
+    def extract(cx: _Context) -> int:
+        stack = cx.stack
+        value = stack.pop()
+        # A zero length extracts up to the end of the string
+        end = start + length if length else len(_bytes(value, "extract"))
+        stack.append(_substring(value, start, end, "extract"))
+        return nxt
+
+    return extract
+
+
+def _extract3(immediates: List[int], nxt: int) -> Step:
+    def extract3(cx: _Context) -> int:
+        stack = cx.stack
+        length = _uint(stack.pop(), "extract3")
+        start = _uint(stack.pop(), "extract3")
+        stack.append(_substring(stack.pop(), start, start + length, "extract3"))
+        return nxt
+
+    return extract3
+
+
+STACK_OPS: Dict[str, Callable[[List[int], int], Step]] = {
+    "pop": _pop,
+    "dup": _dup,
+    "dup2": _dup2,
+    "dig": _dig,
+    "swap": _swap,
+    "select": _select,
+    "cover": _cover,
+    "uncover": _uncover,
+    "load": _load,
+    "store": _store,
+    "loads": _loads,
+    "stores": _stores,
+    "substring": _substring_immediate,
+    "substring3": _substring3,
+    "extract": _extract,
+    "extract3": _extract3,
+}
+
+
+@lru_cache(maxsize=None)
+def compile_program(source: str) -> TealProgram:
+    """
+    Return `source` compiled for evaluation, compiling each source only once.
+    """
+    return TealProgram(source)
+
+
+def evaluate(
+    source: str,
+    group: Sequence[object],
+    index: int = 0,
+    args: Sequence[bytes] = (),
+    global_fields: Optional[Dict[str, StackValue]] = None,
+    trace: bool = False,
+) -> Evaluation:
+    """
+    Evaluate TEAL `source` as the logic signature of transaction `index` of
+    `group`, see `TealProgram.evaluate`.
+    """
+    return compile_program(source).evaluate(group, index, args, global_fields, trace)
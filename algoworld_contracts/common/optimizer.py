@@ -0,0 +1,93 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from typing import List
+
+from algoworld_contracts.common.assembler import tokenize
+
+"""
+TEAL optimizer
+Rewrites compiled TEAL into an equivalent smaller program. Constants need no
+rewrite, as from TEAL v4 the assembler already pools them into `intcblock` and
+`bytecblock` with one byte `intc_n` / `bytec_n` references. Neither do
+repeated field reads: a `load` from a scratch slot costs the same opcode as
+the `gtxn` read it replaces, and filling the slot costs a `dup` and `store`.
+1. Peephole: `int 0; ==` becomes `!`, jumps to `return` or `err` become it
+"""
+
+OPTIMIZE_LEVELS = (0, 1)
+
+JUMP_REPLACEMENTS = ("return", "err")
+
+
+def _is_label(tokens: List[str]) -> bool:
+    return len(tokens) == 1 and tokens[0].endswith(":")
+
+
+def _peephole(lines: List[str]) -> List[str]:
+    tokens = [tokenize(line) for line in lines]
+    labels = {t[0][:-1]: i for i, t in enumerate(tokens) if _is_label(t)}
+
+    def jump_replacement(label: str):
+        i = labels[label]
+        while i < len(tokens) and (not tokens[i] or _is_label(tokens[i])):
+            i += 1
+        if i < len(tokens) and len(tokens[i]) == 1:
+            if tokens[i][0] in JUMP_REPLACEMENTS:
+                return tokens[i][0]
+        return None
+
+    result: List[str] = []
+    i = 0
+    while i < len(lines):
+        line_tokens = tokens[i]
+        if line_tokens == ["int", "0"] and i + 1 < len(lines):
+            if tokens[i + 1] == ["=="]:
+                result.append("!")
+                i += 2
+                continue
+        if line_tokens[:1] == ["b"]:
+            replacement = jump_replacement(line_tokens[1])
+            if replacement is not None:
+                result.append(replacement)
+                i += 1
+                continue
+        result.append(lines[i])
+        i += 1
+    return result
+
+
+def optimize_teal(source: str, level: int = 1) -> str:
+    """
+    Return TEAL `source` optimized up to `level`, where 0 leaves it as is.
+    """
+    if level not in OPTIMIZE_LEVELS:
+        raise ValueError(
+            f"Unknown optimization level {level}, expected one of {OPTIMIZE_LEVELS}"
+        )
+
+    lines = source.splitlines()
+    if level >= 1:
+        lines = _peephole(lines)
+    return "\n".join(lines) + ("\n" if source.endswith("\n") else "")
@@ -0,0 +1,365 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from typing import Callable, Dict, List, Sequence
+
+from algosdk import encoding
+from pyteal import (
+    Addr,
+    Assert,
+    BinaryExpr,
+    Bytes,
+    Cond,
+    EnumInt,
+    Err,
+    Expr,
+    For,
+    Global,
+    GtxnExpr,
+    If,
+    Int,
+    NaryExpr,
+    Op,
+    Return,
+    ScratchLoad,
+    ScratchStore,
+    Seq,
+    TxnExpr,
+    UnaryExpr,
+)
+from pyteal.ast.return_ import ExitProgram
+from pyteal.ast.substring import SubstringExpr
+
+from algoworld_contracts.common.assembler import TXN_TYPES, _parse_bytes
+from algoworld_contracts.common.evaluator import (
+    BINARY_OPS,
+    DEFAULT_GLOBALS,
+    LOGIC_SIG_BUDGET,
+    UNARY_OPS,
+    TealEvaluationError,
+    _add,
+    _div,
+    _mod,
+    _mul,
+    _sub,
+    _substring,
+    field_default,
+    transaction_fields,
+)
+
+"""
+PyTeal predicate compiler
+Translates the PyTeal expression of a logic signature into the source of a
+Python function taking a transaction group, executed once to get a native
+closure. Terms are evaluated in the same order as the compiled TEAL, with
+`&&` and `||` evaluating both operands, so that reads of transactions beyond
+the group or failing arithmetic reject the group exactly like algod would.
+The opcode budget is not tracked, loops give up after as many iterations as
+the budget has opcodes.
+"""
+
+COMPARISONS = {
+    Op.eq: "==",
+    Op.neq: "!=",
+    Op.lt: "<",
+    Op.gt: ">",
+    Op.le: "<=",
+    Op.ge: ">=",
+}
+
+ARITHMETIC = {
+    Op.add: "_add",
+    Op.minus: "_sub",
+    Op.mul: "_mul",
+    Op.div: "_div",
+    Op.mod: "_mod",
+    Op.extract_uint16: "_extract_uint16",
+    Op.extract_uint32: "_extract_uint32",
+    Op.extract_uint64: "_extract_uint64",
+    Op.concat: "_concat",
+}
+
+LOGIC = {Op.logic_and: " & ", Op.logic_or: " | "}
+
+UNARY = {
+    Op.len: "_len",
+    Op.itob: "_itob",
+    Op.btoi: "_btoi",
+    Op.sha256: "_sha256",
+    Op.sha512_256: "_sha512_256",
+    Op.bitwise_not: "_bitwise_not",
+}
+
+NAMESPACE = {
+    "_add": _add,
+    "_sub": _sub,
+    "_mul": _mul,
+    "_div": _div,
+    "_mod": _mod,
+    "_substring": _substring,
+    "_fields": transaction_fields,
+    "TealEvaluationError": TealEvaluationError,
+    **{f"_{op}": fn for op, fn in BINARY_OPS.items()},
+    "_len": UNARY_OPS["len"],
+    "_itob": UNARY_OPS["itob"],
+    "_btoi": UNARY_OPS["btoi"],
+    "_sha256": UNARY_OPS["sha256"],
+    "_sha512_256": UNARY_OPS["sha512_256"],
+    "_bitwise_not": UNARY_OPS["~"],
+}
+
+INDENT = "    "
+
+
+class UnsupportedExpressionError(Exception):
+    pass
+
+
+def _is_boolean(expr: Expr) -> bool:
+    if isinstance(expr, BinaryExpr):
+        return expr.op in COMPARISONS
+    if isinstance(expr, NaryExpr):
+        return expr.op in LOGIC
+    return isinstance(expr, UnaryExpr) and expr.op == Op.logic_not
+
+
+class _Translator:
+    def __init__(self):
+        self.lines: List[str] = []
+        self.slots: Dict[int, str] = {}
+        self.temporaries = 0
+
+    def emit(self, depth: int, line: str):
+        self.lines.append(INDENT * depth + line)
+
+    def temporary(self, prefix: str) -> str:
+        self.temporaries += 1
+        return f"_{prefix}{self.temporaries}"
+
+    def slot(self, slot) -> str:
+        return self.slots.setdefault(slot.id, f"_s{slot.id}")
+
+    def block(self, depth: int, translate: Callable[[], None]):
+        start = len(self.lines)
+        translate()
+        if len(self.lines) == start:
+            self.emit(depth, "pass")
+
+    def truth(self, expr: Expr, depth: int) -> str:
+        value = self.value(expr, depth)
+        return value if _is_boolean(expr) else f"({value} != 0)"
+
+    def value(self, expr: Expr, depth: int) -> str:
+        """
+        Return the Python expression of `expr`, emitting at `depth` the
+        statements that have to run before it.
+        """
+        if isinstance(expr, EnumInt):
+            if expr.name not in TXN_TYPES:
+                raise UnsupportedExpressionError(f"enum {expr.name}")
+            return str(TXN_TYPES[expr.name])
+        if isinstance(expr, Int):
+            return str(expr.value)
+        if isinstance(expr, Addr):
+            return repr(encoding.decode_address(expr.address))
+        if isinstance(expr, Bytes):
+            return repr(bytes_value(expr))
+        if isinstance(expr, Global):
+            return self.global_field(expr.field.arg_name)
+        if isinstance(expr, GtxnExpr):
+            index = expr.txnIndex
+            position = (
+                str(index) if isinstance(index, int) else self.value(index, depth)
+            )
+            return self.txn_field(position, expr.field.arg_name)
+        if isinstance(expr, TxnExpr):
+            return self.txn_field("i", expr.field.arg_name)
+        if isinstance(expr, ScratchLoad):
+            return self.slot(expr.slot)
+        if isinstance(expr, BinaryExpr):
+            left = self.value(expr.argLeft, depth)
+            right = self.value(expr.argRight, depth)
+            if expr.op in COMPARISONS:
+                return f"({left} {COMPARISONS[expr.op]} {right})"
+            if expr.op in ARITHMETIC:
+                return f"{ARITHMETIC[expr.op]}({left}, {right})"
+        if isinstance(expr, NaryExpr):
+            if expr.op in LOGIC:
+                terms = [self.truth(arg, depth) for arg in expr.args]
+                return f"({LOGIC[expr.op].join(terms)})"
+            if expr.op in ARITHMETIC:
+                result = self.value(expr.args[0], depth)
+                for arg in expr.args[1:]:
+                    result = (
+                        f"{ARITHMETIC[expr.op]}({result}, {self.value(arg, depth)})"
+                    )
+                return result
+        if isinstance(expr, UnaryExpr):
+            if expr.op == Op.logic_not:
+                return f"(not {self.value(expr.arg, depth)})"
+            if expr.op in UNARY:
+                return f"{UNARY[expr.op]}({self.value(expr.arg, depth)})"
+        if isinstance(expr, SubstringExpr):
+            string = self.value(expr.stringArg, depth)
+            start = self.value(expr.startArg, depth)
+            end = self.value(expr.endArg, depth)
+            return f'_substring({string}, {start}, {end}, "substring")'
+        if isinstance(expr, Seq):
+            for arg in expr.args[:-1]:
+                self.statement(arg, depth)
+            return self.value(expr.args[-1], depth)
+        if isinstance(expr, (Cond, If)):
+            result = self.temporary("t")
+            self.branches(_cases(expr), depth, result)
+            return result
+        if isinstance(expr, (Return, ExitProgram, Err)):
+            self.statement(expr, depth)
+            return "0"
+        raise UnsupportedExpressionError(type(expr).__name__)
+
+    def global_field(self, name: str) -> str:
+        if name == "GroupSize":
+            return "len(g)"
+        if name not in DEFAULT_GLOBALS:
+            raise UnsupportedExpressionError(f"global {name}")
+        return repr(DEFAULT_GLOBALS[name])
+
+    def txn_field(self, position: str, name: str) -> str:
+        if name == "GroupIndex":
+            # Still fails on transactions beyond the group, like gtxn
+            return f"(g[{position}], {position})[1]"
+        return f"g[{position}].get({name!r}, {field_default(name)!r})"
+
+    def branches(self, cases: list, depth: int, result: str):
+        """
+        Emit the first of `cases` whose condition holds, assigning its value
+        to `result` or failing if none does.
+        """
+        if not cases:
+            self.emit(depth, "return False")
+            return
+        (condition, body), rest = cases[0], cases[1:]
+        self.emit(depth, f"if {self.truth(condition, depth)}:")
+
+        def then():
+            if body is not None:
+                self.emit(depth + 1, f"{result} = {self.value(body, depth + 1)}")
+
+        self.block(depth + 1, then)
+        self.emit(depth, "else:")
+        self.block(depth + 1, lambda: self.branches(rest, depth + 1, result))
+
+    def statement(self, expr: Expr, depth: int):
+        if isinstance(expr, Assert):
+            self.emit(depth, f"if not {self.truth(expr.cond, depth)}:")
+            self.emit(depth + 1, "return False")
+        elif isinstance(expr, ScratchStore):
+            value = self.value(expr.value, depth)
+            self.emit(depth, f"{self.slot(expr.slot)} = {value}")
+        elif isinstance(expr, Seq):
+            for arg in expr.args:
+                self.statement(arg, depth)
+        elif isinstance(expr, For):
+            self.statement(expr.start, depth)
+            iterations = self.temporary("n")
+            self.emit(depth, f"{iterations} = 0")
+            self.emit(depth, "while True:")
+            self.emit(depth + 1, f"if not {self.truth(expr.cond, depth + 1)}:")
+            self.emit(depth + 2, "break")
+            self.emit(depth + 1, f"{iterations} += 1")
+            self.emit(depth + 1, f"if {iterations} > {LOGIC_SIG_BUDGET}:")
+            self.emit(depth + 2, "return False")
+            self.statement(expr.doBlock, depth + 1)
+            self.statement(expr.step, depth + 1)
+        elif isinstance(expr, If) and expr.elseBranch is None:
+            self.emit(depth, f"if {self.truth(expr.cond, depth)}:")
+            self.block(depth + 1, lambda: self.statement(expr.thenBranch, depth + 1))
+        elif isinstance(expr, Return):
+            self.emit(depth, f"return {self.truth(expr.value, depth)}")
+        elif isinstance(expr, ExitProgram):
+            self.emit(depth, f"return {self.truth(expr.success, depth)}")
+        elif isinstance(expr, Err):
+            self.emit(depth, "return False")
+        else:
+            # Evaluated for its failures only
+            self.emit(depth, self.value(expr, depth))
+
+
+def bytes_value(expr: Bytes) -> bytes:
+    """
+    Return the byte string of the PyTeal `Bytes` constant `expr`.
+    """
+    if expr.base == "utf8":
+        return _parse_bytes([expr.byte_str])
+    if expr.base == "base16":
+        return bytes.fromhex(expr.byte_str)
+    return _parse_bytes([expr.base, expr.byte_str])
+
+
+def _cases(expr) -> list:
+    if isinstance(expr, Cond):
+        return [tuple(case) for case in expr.args]
+    cases = [(expr.cond, expr.thenBranch)]
+    if expr.elseBranch is not None:
+        cases.append((Int(1), expr.elseBranch))
+    return cases
+
+
+def predicate_source(expr: Expr) -> str:
+    """
+    Return the source of the Python function `predicate(group, index=0)`
+    approving `group` exactly when logic signature `expr` approves transaction
+    `index` of it.
+    """
+    translator = _Translator()
+    result = translator.value(expr, 2)
+    body = translator.lines
+    return "\n".join(
+        [
+            "def predicate(g, i=0):",
+            *[f"{INDENT}{slot} = 0" for slot in translator.slots.values()],
+            f"{INDENT}try:",
+            f"{INDENT * 2}if g[0].__class__ is not dict:",
+            f"{INDENT * 3}g = [_fields(txn) for txn in g]",
+            *body,
+            f"{INDENT * 2}return {result} != 0",
+            f"{INDENT}except (IndexError, TealEvaluationError):",
+            f"{INDENT * 2}return False",
+            "",
+        ]
+    )
+
+
+def compile_predicate(expr: Expr) -> Callable[[Sequence[object], int], bool]:
+    """
+    Return the native Python predicate of logic signature `expr`, which takes
+    a group of transaction field dicts or SDK transactions and the index of
+    the transaction signed by the logic signature.
+    """
+    source = predicate_source(expr)
+    namespace = dict(NAMESPACE)
+    exec(compile(source, "<predicate>", "exec"), namespace)
+    predicate = namespace["predicate"]
+    predicate.source = source
+    return predicate
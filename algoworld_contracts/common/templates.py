@@ -0,0 +1,143 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import hashlib
+import re
+from typing import Dict, List, Tuple
+
+from algosdk import encoding
+from pyteal import TealInputError
+from pyteal.types import valid_address
+
+INT_SLOT = "int"
+ADDR_SLOT = "addr"
+BYTES_SLOT = "bytes"
+
+# Sentinels are picked from the top of the uint64 range so they never collide
+# with the small constants hardcoded in the contracts.
+_INT_SENTINEL_BASE = 2**64 - 1
+
+
+def validate_int(value):
+    """
+    Same check as `pyteal.Int`, without building an expression.
+    """
+    if type(value) is not int:
+        raise TealInputError("invalid input type {} to Int".format(type(value)))
+    if not 0 <= value < 2**64:
+        raise TealInputError("Int {} is out of range".format(value))
+
+
+def validate_addr(value):
+    """
+    Same check as `pyteal.Addr`, without building an expression.
+    """
+    valid_address(value)
+
+
+def validate_base16(value):
+    """
+    Same check as `pyteal.Bytes("base16", value)`, without building an
+    expression.
+    """
+    if type(value) is not str:
+        raise TealInputError("invalid input type {} to Bytes".format(type(value)))
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        raise TealInputError("{} is not a valid base16 string".format(value))
+
+
+class Placeholders:
+    """
+    Hands out unique sentinel values to be used in place of config constants
+    while compiling a contract template.
+    """
+
+    def __init__(self):
+        self.slots: Dict[str, Tuple[str, str]] = {}
+
+    def int(self, name: str) -> int:
+        value = _INT_SENTINEL_BASE - len(self.slots)
+        self.slots[str(value)] = (name, INT_SLOT)
+        return value
+
+    def addr(self, name: str) -> str:
+        value = encoding.encode_address(
+            hashlib.sha256(f"algoworld:{name}".encode()).digest()
+        )
+        self.slots[value] = (name, ADDR_SLOT)
+        return value
+
+    def base16(self, name: str, value: str) -> str:
+        """
+        Register the base16 `value`, derived from other placeholders, as the
+        placeholder of a byte constant.
+        """
+        self.slots["0x" + value] = (name, BYTES_SLOT)
+        return value
+
+
+class TealTemplate:
+    """
+    TEAL source compiled once with placeholders, rendered by substituting
+    the actual config constants.
+    """
+
+    def __init__(self, source: str, placeholders: Placeholders):
+        self.source = source
+        self.placeholders = placeholders
+        pattern = re.compile(
+            r"\b(" + "|".join(re.escape(p) for p in placeholders.slots) + r")\b"
+        )
+        self.parts: List[str] = pattern.split(source)
+        # re.split with a capturing group puts the matched tokens on odd indexes
+        self.slots: List[Tuple[int, str]] = [
+            (i, placeholders.slots[self.parts[i]][0])
+            for i in range(1, len(self.parts), 2)
+        ]
+        self.kinds: Dict[str, str] = dict(placeholders.slots.values())
+
+    def render(self, values: Dict[str, object]) -> str:
+        """
+        Render the template with provided `values`, raising the same
+        `TealInputError` as pyteal would on invalid constants.
+        """
+        rendered = {}
+        for name, kind in self.kinds.items():
+            value = values[name]
+            if kind == INT_SLOT:
+                validate_int(value)
+                rendered[name] = str(value)
+            elif kind == BYTES_SLOT:
+                validate_base16(value)
+                rendered[name] = "0x" + value  # type: ignore
+            else:
+                validate_addr(value)
+                rendered[name] = value
+
+        parts = list(self.parts)
+        for i, name in self.slots:
+            parts[i] = rendered[name]
+        return "".join(parts)
@@ -22,9 +22,26 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from pyteal import Mode, compileTeal
+import dataclasses
+import hashlib
+import json
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from typing import Callable, Dict, Optional, Tuple, Union
 
+from pyteal import Expr, Mode, compileTeal
+
+from algoworld_contracts.common.assembler import ProgramTemplate, program_address
+from algoworld_contracts.common.cache import DiskCache, LRUCache
+from algoworld_contracts.common.optimizer import optimize_teal
+from algoworld_contracts.common.predicates import compile_predicate
+from algoworld_contracts.common.templates import Placeholders, TealTemplate
 from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig, swapper
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+    asa_table,
+    multi_asa_loop_swapper,
+)
 from algoworld_contracts.swapper.asas_to_algo_swapper import (
     AsasToAlgoSwapConfig,
     multi_asa_swapper,
@@ -32,8 +49,325 @@ from algoworld_contracts.swapper.asas_to_algo_swapper import (
 from algoworld_contracts.swapper.swap_proxy import SwapProxy, swapper_proxy
 
 TEAL_VERSION = 6
+PYTEAL_VERSION = version("pyteal")
+try:
+    LIBRARY_VERSION = version("algoworld_contracts")
+except PackageNotFoundError:  # running from a source checkout
+    LIBRARY_VERSION = "dev"
+
+SwapConfig = Union[
+    AsaToAsaSwapConfig, AsasToAlgoSwapConfig, AsasToAlgoLoopSwapConfig, SwapProxy
+]
+
+CONTRACT_CONFIGS = {
+    "swapper": AsaToAsaSwapConfig,
+    "multi_swapper": AsasToAlgoSwapConfig,
+    "multi_swapper_loop": AsasToAlgoLoopSwapConfig,
+    "swapper_proxy": SwapProxy,
+}
+
+
+def _compile(program):
+    return compileTeal(program, Mode.Signature, version=TEAL_VERSION)
+
+
+# TEMPLATES
+################################################################
+# Only the config constants change between two contracts of the same shape,
+# so each shape is compiled once with placeholders and then rendered.
+@lru_cache(maxsize=None)
+def _swapper_template(short_circuit: bool) -> TealTemplate:
+    ph = Placeholders()
+    cfg = AsaToAsaSwapConfig(
+        swap_creator=ph.addr("swap_creator"),
+        offered_asa_id=ph.int("offered_asa_id"),
+        offered_asa_amount=ph.int("offered_asa_amount"),
+        requested_asa_id=ph.int("requested_asa_id"),
+        requested_asa_amount=ph.int("requested_asa_amount"),
+        incentive_fee_address=ph.addr("incentive_fee_address"),
+        incentive_fee_amount=ph.int("incentive_fee_amount"),
+        short_circuit=short_circuit,
+    )
+    return TealTemplate(_compile(swapper(cfg)), ph)
+
+
+@lru_cache(maxsize=None)
+def _swapper_proxy_template() -> TealTemplate:
+    ph = Placeholders()
+    cfg = SwapProxy(swap_creator=ph.addr("swap_creator"), version="")
+    return TealTemplate(_compile(swapper_proxy(cfg)), ph)
+
+
+def _multi_swapper_placeholders(
+    config_type, body_size: int, short_circuit: bool, ph: Placeholders
+):
+    return config_type(
+        swap_creator=ph.addr("swap_creator"),
+        offered_asa_amounts={
+            ph.int(f"offered_asa_id_{asa}"): ph.int(f"offered_asa_amount_{asa}")
+            for asa in range(body_size)
+        },
+        requested_algo_amount=ph.int("requested_algo_amount"),
+        max_fee=ph.int("max_fee"),
+        optin_funding_amount=ph.int("optin_funding_amount"),
+        incentive_fee_address=ph.addr("incentive_fee_address"),
+        incentive_fee_amount=ph.int("incentive_fee_amount"),
+        short_circuit=short_circuit,
+    )
+
+
+@lru_cache(maxsize=None)
+def _multi_swapper_template(body_size: int, short_circuit: bool) -> TealTemplate:
+    ph = Placeholders()
+    cfg = _multi_swapper_placeholders(
+        AsasToAlgoSwapConfig, body_size, short_circuit, ph
+    )
+    return TealTemplate(_compile(multi_asa_swapper(cfg)), ph)
+
+
+@lru_cache(maxsize=None)
+def _multi_swapper_loop_template(body_size: int, short_circuit: bool) -> TealTemplate:
+    ph = Placeholders()
+    cfg = _multi_swapper_placeholders(
+        AsasToAlgoLoopSwapConfig, body_size, short_circuit, ph
+    )
+    # The offered ASAs only appear in the program through their table
+    ph.base16("asa_table", asa_table(cfg))
+    return TealTemplate(_compile(multi_asa_loop_swapper(cfg)), ph)
+
+
+def _multi_swapper_values(cfg: AsasToAlgoSwapConfig) -> Dict[str, object]:
+    values = vars(cfg).copy()
+    for asa, (k, v) in enumerate(cfg.offered_asa_amounts.items()):
+        values[f"offered_asa_id_{asa}"] = int(k)
+        values[f"offered_asa_amount_{asa}"] = int(v)
+    return values
+
+
+def _template(cfg) -> Tuple[TealTemplate, Dict[str, object]]:
+    """
+    Return the template matching the shape of `cfg` with its render values.
+    """
+    # Exact types, as loop swapper configs are also multi swapper configs
+    if type(cfg) is AsaToAsaSwapConfig:
+        return _swapper_template(cfg.short_circuit), vars(cfg)
+
+    if type(cfg) is SwapProxy:
+        return _swapper_proxy_template(), vars(cfg)
+
+    if type(cfg) is AsasToAlgoSwapConfig:
+        template = _multi_swapper_template(cfg.body_size, cfg.short_circuit)
+        return template, _multi_swapper_values(cfg)
+
+    if type(cfg) is AsasToAlgoLoopSwapConfig:
+        values = _multi_swapper_values(cfg)
+        values["asa_table"] = asa_table(cfg)
+        template = _multi_swapper_loop_template(cfg.body_size, cfg.short_circuit)
+        return template, values
+
+    raise TypeError(f"Unsupported swap config type {type(cfg).__name__}")
+
+
+def config_from_dict(params: Dict[str, object], contract: Optional[str] = None):
+    """
+    Build the swap config described by `params`, where the contract kind is
+    taken from its `contract` key or from `contract` otherwise.
+    """
+    params = dict(params)
+    contract = params.pop("contract", contract)  # type: ignore
+    if contract not in CONTRACT_CONFIGS:
+        raise ValueError(
+            f"Unknown contract {contract!r}, expected one of {list(CONTRACT_CONFIGS)}"
+        )
+    return CONTRACT_CONFIGS[contract](**params)  # type: ignore
+
+
+def contract_name(cfg: SwapConfig) -> str:
+    return next(k for k, v in CONTRACT_CONFIGS.items() if type(cfg) is v)
+
+
+@lru_cache(maxsize=None)
+def _optimized_template(template: TealTemplate, optimize: int) -> TealTemplate:
+    # Optimizing the shape leaves config constants untouched, even if 0
+    if not optimize:
+        return template
+    return TealTemplate(optimize_teal(template.source, optimize), template.placeholders)
+
+
+@lru_cache(maxsize=None)
+def _program_template(template: TealTemplate) -> ProgramTemplate:
+    return ProgramTemplate(template.source, template.placeholders.slots)
+
+
+# CACHE
+################################################################
+_cache: Optional[LRUCache] = None
+
+
+def enable_cache(maxsize: int = 1024, ttl: Optional[float] = None):
+    """
+    Cache generated TEAL and programs in memory, keeping at most `maxsize`
+    entries for at most `ttl` seconds each.
+    """
+    global _cache
+    _cache = LRUCache(maxsize, ttl)
+
 
+def disable_cache():
+    global _cache
+    _cache = None
 
+
+def cache_stats() -> Dict[str, int]:
+    """
+    Return hit, miss and eviction counters of the cache, empty if disabled.
+    """
+    return _cache.stats() if _cache is not None else {}
+
+
+_disk_cache: Optional[DiskCache] = None
+
+
+def enable_disk_cache(directory: str, max_bytes: int = 256 * 2**20):
+    """
+    Persist generated TEAL and programs in `directory`, which can be shared by
+    several processes, keeping it under `max_bytes`.
+    """
+    global _disk_cache
+    _disk_cache = DiskCache(directory, max_bytes)
+
+
+def disable_disk_cache():
+    global _disk_cache
+    _disk_cache = None
+
+
+def disk_cache_stats() -> Dict[str, int]:
+    """
+    Return hit, miss and eviction counters of the disk cache of this process,
+    empty if disabled.
+    """
+    return _disk_cache.stats() if _disk_cache is not None else {}
+
+
+def _typed(value) -> tuple:
+    # Equal values of other types, like 1, True and 1.0, may not be valid
+    if isinstance(value, dict):
+        return ("dict", tuple((*_typed(k), *_typed(v)) for k, v in value.items()))
+    return (type(value).__name__, value)
+
+
+def _config_key(cfg: SwapConfig) -> tuple:
+    return (type(cfg).__name__, TEAL_VERSION, PYTEAL_VERSION) + tuple(
+        _typed(getattr(cfg, f.name)) for f in dataclasses.fields(cfg)
+    )
+
+
+def _disk_key(key: tuple) -> str:
+    canonical = json.dumps([LIBRARY_VERSION, *key], separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _cached(
+    kind: str,
+    cfg: SwapConfig,
+    optimize: int,
+    build: Callable[[SwapConfig, int], object],
+):
+    cache, disk_cache = _cache, _disk_cache
+    if cache is None and disk_cache is None:
+        return build(cfg, optimize)
+
+    key = (kind, optimize, *_config_key(cfg))
+    result = cache.get(key) if cache is not None else None
+    if result is not None:
+        return result
+
+    if disk_cache is not None:
+        disk_key = _disk_key(key)
+        data = disk_cache.get(disk_key)
+        if data is not None:
+            result = data.decode() if kind == "teal" else data
+        else:
+            result = build(cfg, optimize)
+            disk_cache.set(disk_key, result.encode() if kind == "teal" else result)
+    else:
+        result = build(cfg, optimize)
+
+    if cache is not None:
+        cache.set(key, result)
+    return result
+
+
+def _build_teal(cfg: SwapConfig, optimize: int) -> str:
+    template, values = _template(cfg)
+    return _optimized_template(template, optimize).render(values)
+
+
+def _build_program(cfg: SwapConfig, optimize: int) -> bytes:
+    template, values = _template(cfg)
+    return _program_template(_optimized_template(template, optimize)).assemble(values)
+
+
+def get_teal(cfg: SwapConfig, optimize: int = 0) -> str:
+    """
+    Return the TEAL source of the contract described by `cfg`, optimized up to
+    level `optimize` (see `optimize_teal`).
+    """
+    return _cached("teal", cfg, optimize, _build_teal)  # type: ignore
+
+
+def get_program(cfg: SwapConfig, optimize: int = 0) -> bytes:
+    """
+    Return the assembled program of the contract described by `cfg`, without
+    compiling it through algod.
+    """
+    return _cached("program", cfg, optimize, _build_program)  # type: ignore
+
+
+def get_escrow_address(cfg: SwapConfig, optimize: int = 0) -> str:
+    """
+    Return the logic signature address of the contract described by `cfg`.
+    """
+    return program_address(get_program(cfg, optimize))
+
+
+# PREDICATES
+################################################################
+# Compiled closures cannot go through the TEAL caches, they are kept apart
+_predicates = LRUCache(maxsize=1024)
+
+
+def get_expression(cfg: SwapConfig) -> Expr:
+    """
+    Return the PyTeal expression of the contract described by `cfg`.
+    """
+    if type(cfg) is AsaToAsaSwapConfig:
+        return swapper(cfg)
+    if type(cfg) is SwapProxy:
+        return swapper_proxy(cfg)
+    if type(cfg) is AsasToAlgoSwapConfig:
+        return multi_asa_swapper(cfg)
+    if type(cfg) is AsasToAlgoLoopSwapConfig:
+        return multi_asa_loop_swapper(cfg)
+    raise TypeError(f"Unsupported swap config type {type(cfg).__name__}")
+
+
+def get_predicate(cfg: SwapConfig) -> Callable[..., bool]:
+    """
+    Return a native Python predicate telling whether the contract described by
+    `cfg` approves a transaction group, see `compile_predicate`.
+    """
+    key = _config_key(cfg)
+    predicate = _predicates.get(key)
+    if predicate is None:
+        predicate = compile_predicate(get_expression(cfg))
+        _predicates.set(key, predicate)
+    return predicate
+
+
+# GETTERS
+################################################################
 def get_swapper_teal(
     swap_creator: str,
     offered_asa_id: int,
@@ -42,30 +376,26 @@ def get_swapper_teal(
     requested_asa_amount: int,
     incentive_fee_address: str,
     incentive_fee_amount: int,
+    short_circuit: bool = False,
+    optimize: int = 0,
 ):
-    return compileTeal(
-        swapper(
-            AsaToAsaSwapConfig(
-                swap_creator=swap_creator,
-                offered_asa_id=offered_asa_id,
-                offered_asa_amount=offered_asa_amount,
-                requested_asa_id=requested_asa_id,
-                requested_asa_amount=requested_asa_amount,
-                incentive_fee_address=incentive_fee_address,
-                incentive_fee_amount=incentive_fee_amount,
-            )
+    return get_teal(
+        AsaToAsaSwapConfig(
+            swap_creator=swap_creator,
+            offered_asa_id=offered_asa_id,
+            offered_asa_amount=offered_asa_amount,
+            requested_asa_id=requested_asa_id,
+            requested_asa_amount=requested_asa_amount,
+            incentive_fee_address=incentive_fee_address,
+            incentive_fee_amount=incentive_fee_amount,
+            short_circuit=short_circuit,
         ),
-        Mode.Signature,
-        version=TEAL_VERSION,
+        optimize,
     )
 
 
-def get_swapper_proxy_teal(swap_creator: str, version: str):
-    return compileTeal(
-        swapper_proxy(SwapProxy(swap_creator, version)),
-        Mode.Signature,
-        version=TEAL_VERSION,
-    )
+def get_swapper_proxy_teal(swap_creator: str, version: str, optimize: int = 0):
+    return get_teal(SwapProxy(swap_creator, version), optimize)
 
 
 def get_multi_swapper_teal(
@@ -76,19 +406,19 @@ def get_multi_swapper_teal(
     optin_funding_amount: int,
     incentive_fee_address: str,
     incentive_fee_amount: int,
+    short_circuit: bool = False,
+    optimize: int = 0,
 ):
-    return compileTeal(
-        multi_asa_swapper(
-            AsasToAlgoSwapConfig(
-                swap_creator=swap_creator,
-                offered_asa_amounts=offered_asa_amounts,
-                requested_algo_amount=requested_algo_amount,
-                max_fee=max_fee,
-                optin_funding_amount=optin_funding_amount,
-                incentive_fee_address=incentive_fee_address,
-                incentive_fee_amount=incentive_fee_amount,
-            )
+    return get_teal(
+        AsasToAlgoSwapConfig(
+            swap_creator=swap_creator,
+            offered_asa_amounts=offered_asa_amounts,
+            requested_algo_amount=requested_algo_amount,
+            max_fee=max_fee,
+            optin_funding_amount=optin_funding_amount,
+            incentive_fee_address=incentive_fee_address,
+            incentive_fee_amount=incentive_fee_amount,
+            short_circuit=short_circuit,
         ),
-        Mode.Signature,
-        version=TEAL_VERSION,
+        optimize,
     )
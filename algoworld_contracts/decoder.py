@@ -0,0 +1,714 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import dataclasses
+import re
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from algosdk import encoding
+
+from algoworld_contracts import contracts
+from algoworld_contracts.common.assembler import (
+    BRANCH,
+    BYTE_REF,
+    CODE,
+    INT_REF,
+    LABEL,
+    OPCODE_NAMES,
+    ProgramTemplate,
+    TealAssemblyError,
+    _read_bytes,
+    _read_uvarint,
+    _reference,
+    uvarint,
+)
+from algoworld_contracts.common.cache import LRUCache
+from algoworld_contracts.common.optimizer import OPTIMIZE_LEVELS
+from algoworld_contracts.common.templates import ADDR_SLOT, BYTES_SLOT, INT_SLOT
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+
+"""
+Swap config recovery from program bytes
+Matches logic signature programs against the contract templates, for every
+contract, ASA count, `short_circuit` variant and optimization level, and
+extracts the config constants they embed.
+
+Programs of a template only differ by their constants, which are either
+inlined or stored in the constant blocks depending on how many times each
+value is referenced. Each layout of a template is turned into a regular
+expression over the program bytes, capturing the constants and the branch
+offsets, so that decoding a program is one `re` match plus the decoding of
+its constants. Layouts where config values coincide with each other or with
+the contract constants (e.g. amounts of 1) are learned the first time such a
+program is seen, by disassembling it against the template.
+
+A program is only decoded if it is byte for byte the one generated for the
+decoded config: a layout is checked against `get_program` the first time it
+is seen with given constant lengths, and later programs must carry the same
+branch offsets. The version of a `SwapProxy` is not part of its program and
+is decoded as an empty string.
+"""
+
+# Minimally encoded uvarint, at most 10 bytes
+_UVARINT = rb"([\x80-\xff]{0,9}[\x00-\x7f])"
+_BRANCH_OFFSET = rb"(..)"
+
+_CONSTANT_OPCODES = {
+    0x21: (INT_REF, None),
+    0x22: (INT_REF, 0),
+    0x23: (INT_REF, 1),
+    0x24: (INT_REF, 2),
+    0x25: (INT_REF, 3),
+    0x81: (INT_REF, -1),
+    0x27: (BYTE_REF, None),
+    0x28: (BYTE_REF, 0),
+    0x29: (BYTE_REF, 1),
+    0x2A: (BYTE_REF, 2),
+    0x2B: (BYTE_REF, 3),
+    0x80: (BYTE_REF, -1),
+}
+
+# Version and size of the first constant block at least
+_MIN_PREFIX = 3
+_MAX_PREFIX = 16
+_MAX_PENDING = 8
+
+# Decoded constants repeat a lot across programs (ASA ids, creators)
+_MEMO_SIZE = 2**16
+_uvarints: Dict[bytes, Optional[int]] = {}
+_addresses: Dict[bytes, str] = {}
+
+
+def _uvarint_value(raw: bytes) -> Optional[int]:
+    """
+    Return the value of uvarint `raw`, or None if it is not minimally encoded
+    or out of the uint64 range, as the assembler would never produce it.
+    """
+    value = _uvarints.get(raw)
+    if value is not None or raw in _uvarints:
+        return value
+    if len(raw) > 1 and raw[-1] == 0:
+        value = None
+    else:
+        value = 0
+        for shift, byte in enumerate(raw):
+            value |= (byte & 0x7F) << (7 * shift)
+        if value >= 2**64:
+            value = None
+    if len(_uvarints) >= _MEMO_SIZE:
+        _uvarints.clear()
+    _uvarints[raw] = value
+    return value
+
+
+def _address(raw: bytes) -> str:
+    address = _addresses.get(raw)
+    if address is None:
+        if len(_addresses) >= _MEMO_SIZE:
+            _addresses.clear()
+        address = _addresses[raw] = encoding.encode_address(raw)
+    return address
+
+
+def _getter(indexes: List[int]) -> Callable[[tuple], tuple]:
+    # itemgetter returns a bare item instead of a tuple for a single index
+    if len(indexes) == 1:
+        index = indexes[0]
+        return lambda items: (items[index],)
+    if not indexes:
+        return lambda items: ()
+    return itemgetter(*indexes)
+
+
+@dataclasses.dataclass(frozen=True)
+class DecodedProgram:
+    contract: str
+    config: contracts.SwapConfig
+    optimize: int
+
+
+# VARIANTS
+################################################################
+@dataclasses.dataclass
+class _Variant:
+    """
+    One contract template: contract, ASA count, `short_circuit` variant and
+    optimization level.
+    """
+
+    contract: str
+    body_size: int
+    short_circuit: bool
+    optimize: int
+    template: ProgramTemplate
+
+    def placeholder_values(self) -> Dict[str, object]:
+        """
+        Return the placeholder constants, distinct from each other and from
+        the contract constants, which give the common layout of the template.
+        """
+        values: Dict[str, object] = {}
+        for token, (name, kind) in self.template.slots.items():
+            if kind == INT_SLOT:
+                values[name] = int(token)
+            elif kind == ADDR_SLOT:
+                values[name] = encoding.decode_address(token)
+            else:
+                values[name] = bytes.fromhex(token[2:])
+        return values
+
+    def skeleton(self) -> tuple:
+        """
+        Return the code of the template with constant references replaced by
+        their kind and branches by their opcode, labels being invisible in
+        program bytes.
+        """
+        items: list = []
+        for op in self.template.ops:
+            if op[0] == CODE:
+                if items and isinstance(items[-1], bytes):
+                    items[-1] += op[1]
+                else:
+                    items.append(op[1])
+            elif op[0] == BRANCH:
+                items.append(op[1])
+            elif op[0] != LABEL:
+                items.append(op[0])
+        return tuple(items)
+
+    def config(self, values: Dict[str, object]) -> contracts.SwapConfig:
+        if self.contract == "swapper_proxy":
+            return SwapProxy(swap_creator=values["swap_creator"], version="")
+        if self.contract == "swapper":
+            return AsaToAsaSwapConfig(
+                swap_creator=values["swap_creator"],
+                offered_asa_id=values["offered_asa_id"],
+                offered_asa_amount=values["offered_asa_amount"],
+                requested_asa_id=values["requested_asa_id"],
+                requested_asa_amount=values["requested_asa_amount"],
+                incentive_fee_address=values["incentive_fee_address"],
+                incentive_fee_amount=values["incentive_fee_amount"],
+                short_circuit=self.short_circuit,
+            )
+
+        if self.contract == "multi_swapper":
+            config_type = AsasToAlgoSwapConfig
+            offered_asa_amounts = {
+                values[f"offered_asa_id_{asa}"]: values[f"offered_asa_amount_{asa}"]
+                for asa in range(self.body_size)
+            }
+        else:
+            config_type = AsasToAlgoLoopSwapConfig
+            table = values["asa_table"]
+            offered_asa_amounts = {
+                int.from_bytes(table[i : i + 8], "big"): int.from_bytes(
+                    table[i + 8 : i + 16], "big"
+                )
+                for i in range(0, len(table), 16)
+            }
+            if len(offered_asa_amounts) != self.body_size:
+                raise ValueError("ASA table lists an ASA twice")
+        return config_type(
+            swap_creator=values["swap_creator"],
+            offered_asa_amounts=offered_asa_amounts,  # type: ignore
+            requested_algo_amount=values["requested_algo_amount"],
+            max_fee=values["max_fee"],
+            optin_funding_amount=values["optin_funding_amount"],
+            incentive_fee_address=values["incentive_fee_address"],
+            incentive_fee_amount=values["incentive_fee_amount"],
+            short_circuit=self.short_circuit,
+        )
+
+
+def _variants(optimize_levels: Iterable[int]) -> List[_Variant]:
+    templates = [("swapper_proxy", 0, False, contracts._swapper_proxy_template())]
+    for short_circuit in (False, True):
+        templates.append(
+            ("swapper", 0, short_circuit, contracts._swapper_template(short_circuit))
+        )
+        for body_size in range(1, AsasToAlgoSwapConfig.MAX_OFFERED_ASAS + 1):
+            template = contracts._multi_swapper_template(body_size, short_circuit)
+            templates.append(("multi_swapper", body_size, short_circuit, template))
+        for body_size in range(1, AsasToAlgoLoopSwapConfig.MAX_OFFERED_ASAS + 1):
+            template = contracts._multi_swapper_loop_template(body_size, short_circuit)
+            templates.append(("multi_swapper_loop", body_size, short_circuit, template))
+
+    # The lowest level wins when optimizing leaves a template unchanged
+    return [
+        _Variant(
+            contract,
+            body_size,
+            short_circuit,
+            optimize,
+            contracts._program_template(
+                contracts._optimized_template(template, optimize)
+            ),
+        )
+        for optimize in sorted(optimize_levels)
+        for contract, body_size, short_circuit, template in templates
+    ]
+
+
+# LAYOUTS
+################################################################
+class _Layout:
+    """
+    Regular expression matching the programs of a template whose constants
+    have the same equalities as `values` (slot name -> int or raw bytes), and
+    thus the same constant blocks.
+    """
+
+    def __init__(self, variant: _Variant, values: Dict[str, object]):
+        self.variant = variant
+        template = variant.template
+        self.known: Dict[str, object] = {}
+        fixed: Dict[str, Set[object]] = {INT_REF: set(), BYTE_REF: set()}
+        kinds = dict(template.slots.values())
+
+        refs: Dict[str, List[object]] = {}
+        names: Dict[object, List[str]] = {}
+        for kind in (INT_REF, BYTE_REF):
+            refs[kind] = []
+            for constant, name in template.refs[kind]:
+                if name is None:
+                    fixed[kind].add(constant)
+                else:
+                    constant = values[name]
+                    names.setdefault(constant, [])
+                    if name not in names[constant]:
+                        names[constant].append(name)
+                refs[kind].append(constant)
+        # Names sharing a value with a contract constant are known upfront
+        for kind in (INT_REF, BYTE_REF):
+            for constant in fixed[kind]:
+                for name in names.pop(constant, []):
+                    self.known[name] = constant
+
+        parts: List[bytes] = []
+        literal = bytearray(uvarint(template.version))
+        groups: List[Tuple[str, Tuple[str, ...]]] = []
+
+        def capture(pattern: bytes, kind: str, captured: Tuple[str, ...] = ()):
+            if not groups:
+                self.prefix = bytes(literal)
+            parts.append(re.escape(bytes(literal)))
+            literal.clear()
+            parts.append(pattern)
+            groups.append((kind, captured))
+
+        intc, int_index = template._constant_block(refs[INT_REF], template.intcblock)
+        bytec, byte_index = template._constant_block(
+            refs[BYTE_REF], template.bytecblock
+        )
+        if intc:
+            literal += b"\x20" + uvarint(len(intc))
+            for value in intc:
+                if value in names:
+                    capture(_UVARINT, INT_SLOT, tuple(names[value]))
+                else:
+                    literal += uvarint(value)
+        if bytec:
+            literal += b"\x26" + uvarint(len(bytec))
+            for value in bytec:
+                literal += uvarint(len(value))  # type: ignore
+                if value in names:
+                    captured = tuple(names[value])
+                    pattern = b"(.{%d})" % len(value)  # type: ignore
+                    capture(pattern, kinds[captured[0]], captured)
+                else:
+                    literal += value  # type: ignore
+
+        ints, byteslices = iter(refs[INT_REF]), iter(refs[BYTE_REF])
+        for op in template.ops:
+            if op[0] == CODE:
+                literal += op[1]
+            elif op[0] == BRANCH:
+                literal.append(op[1])
+                capture(_BRANCH_OFFSET, BRANCH)
+            elif op[0] == INT_REF:
+                value = next(ints)
+                if int_index[value] < 0 and value in names:
+                    literal.append(0x81)
+                    capture(_UVARINT, INT_SLOT, tuple(names[value]))
+                else:
+                    literal += _reference(
+                        int_index[value], 0x22, 0x21, 0x81, uvarint(value)
+                    )
+            elif op[0] == BYTE_REF:
+                value = next(byteslices)
+                if byte_index[value] < 0 and value in names:
+                    literal += b"\x80" + uvarint(len(value))
+                    captured = tuple(names[value])
+                    pattern = b"(.{%d})" % len(value)
+                    capture(pattern, kinds[captured[0]], captured)
+                else:
+                    literal += _reference(
+                        byte_index[value], 0x28, 0x27, 0x80, uvarint(len(value)) + value
+                    )
+        if not groups:
+            self.prefix = bytes(literal)
+        parts.append(re.escape(bytes(literal)))
+
+        self.source = b"".join(parts)
+        self.pattern = re.compile(self.source, re.DOTALL)
+        self.groups = len(groups)
+        self.branches = _getter([i for i, (k, _) in enumerate(groups) if k == BRANCH])
+        int_groups = [i for i, (kind, _) in enumerate(groups) if kind == INT_SLOT]
+        addr_groups = [i for i, (kind, _) in enumerate(groups) if kind == ADDR_SLOT]
+        bytes_groups = [i for i, (kind, _) in enumerate(groups) if kind == BYTES_SLOT]
+        self.fixed_ints = frozenset(fixed[INT_REF])
+        self.fixed_byteslices = frozenset(fixed[BYTE_REF])
+        self.int_count = len(self.fixed_ints) + len(int_groups)
+        self.byteslice_count = (
+            len(self.fixed_byteslices) + len(addr_groups) + len(bytes_groups)
+        )
+        self.ints = _getter(int_groups)
+        self.addresses = _getter(addr_groups)
+        self.byteslices = _getter(bytes_groups)
+        # Slot names with the position of their value in the decoded constants
+        self.names = [
+            name
+            for positions in (int_groups, addr_groups, bytes_groups)
+            for i in positions
+            for name in groups[i][1]
+        ]
+        self.spread = _getter(
+            [
+                position
+                for position, i in enumerate(int_groups + addr_groups + bytes_groups)
+                for _ in groups[i][1]
+            ]
+        )
+        # Lengths of the int constants -> branch offsets checked against
+        # `get_program`, other constants having a fixed length
+        self.offsets: Dict[tuple, tuple] = {}
+
+    def decode(self, program: bytes) -> Optional[DecodedProgram]:
+        match = self.pattern.fullmatch(program)
+        if match is None:
+            return None
+        return self.decode_groups(program, match.groups())
+
+    def decode_groups(self, program: bytes, groups: tuple) -> Optional[DecodedProgram]:
+        raw_ints = self.ints(groups)
+        raw_addresses = self.addresses(groups)
+        raw_bytes = self.byteslices(groups)
+        ints = [_uvarint_value(raw) for raw in raw_ints]
+
+        # Equal values would have been merged into another layout
+        distinct = self.fixed_ints.union(ints)
+        if len(distinct) != self.int_count or None in distinct:
+            return None
+        byteslices = raw_addresses + raw_bytes
+        if len(self.fixed_byteslices.union(byteslices)) != self.byteslice_count:
+            return None
+
+        constants = [*ints, *map(_address, raw_addresses), *raw_bytes]
+        values = dict(zip(self.names, self.spread(constants)))
+        if self.known:
+            values.update(self.known)
+
+        variant = self.variant
+        try:
+            config = variant.config(values)
+        except (AssertionError, KeyError, ValueError):
+            return None
+
+        key = tuple(map(len, raw_ints))
+        branches = self.branches(groups)
+        offsets = self.offsets.get(key)
+        if offsets is None:
+            if contracts.get_program(config, variant.optimize) != program:
+                return None
+            self.offsets[key] = branches
+        elif offsets != branches:
+            return None
+        return DecodedProgram(variant.contract, config, variant.optimize)
+
+
+class _Layouts:
+    """
+    Layouts of programs starting with the same bytes, matched at once by an
+    alternation of their expressions. Compiling the alternation is costly,
+    so learned layouts are tried one by one until enough of them are merged.
+    """
+
+    def __init__(self):
+        self.layouts: List[_Layout] = []
+        self.pending: List[_Layout] = []
+        self.starts: Dict[int, int] = {}
+        self.pattern: Optional[re.Pattern] = None
+
+    def add(self, layout: _Layout):
+        self.pending.append(layout)
+        if len(self.pending) >= max(_MAX_PENDING, len(self.layouts) // 4):
+            self.merge()
+
+    def merge(self):
+        if not self.pending:
+            return
+        self.layouts += self.pending
+        self.pending = []
+        # Each alternative is wrapped in a group, the last one to close
+        sources = []
+        group = 1
+        for index, layout in enumerate(self.layouts):
+            self.starts[group] = index
+            sources.append(b"(" + layout.source + b")")
+            group += layout.groups + 1
+        self.pattern = re.compile(b"|".join(sources), re.DOTALL)
+
+    def decode(self, program: bytes) -> Optional[DecodedProgram]:
+        candidates = self.pending
+        match = self.pattern.fullmatch(program) if self.pattern else None
+        if match is not None:
+            group = match.lastindex
+            index = self.starts[group]  # type: ignore
+            layout = self.layouts[index]
+            result = layout.decode_groups(
+                program, match.groups()[group : group + layout.groups]  # type: ignore
+            )
+            if result is not None:
+                return result
+            # Rejected constants may still fit a later layout
+            candidates = self.layouts[index + 1 :] + candidates
+        for layout in candidates:
+            result = layout.decode(program)
+            if result is not None:
+                return result
+        return None
+
+
+def _tokens(program: bytes) -> Tuple[int, tuple, Dict[str, List[object]]]:
+    """
+    Return the version of `program`, its skeleton (see `_Variant.skeleton`)
+    and the values of its constant references, in program order.
+    """
+    version, pc = _read_uvarint(program, 0)
+    blocks: Dict[str, List[object]] = {INT_REF: [], BYTE_REF: []}
+    if program[pc : pc + 1] == b"\x20":
+        count, pc = _read_uvarint(program, pc + 1)
+        for _ in range(count):
+            value, pc = _read_uvarint(program, pc)
+            blocks[INT_REF].append(value)
+    if program[pc : pc + 1] == b"\x26":
+        count, pc = _read_uvarint(program, pc + 1)
+        for _ in range(count):
+            value, pc = _read_bytes(program, pc)  # type: ignore
+            blocks[BYTE_REF].append(value)
+
+    items: list = []
+    refs: Dict[str, List[object]] = {INT_REF: [], BYTE_REF: []}
+    code = bytearray()
+    while pc < len(program):
+        opcode = program[pc]
+        if opcode in _CONSTANT_OPCODES:
+            kind, index = _CONSTANT_OPCODES[opcode]
+            pc += 1
+            if index is None:
+                index = program[pc]
+                pc += 1
+            if index >= 0:
+                value = blocks[kind][index]
+            elif kind == INT_REF:
+                value, pc = _read_uvarint(program, pc)
+            else:
+                value, pc = _read_bytes(program, pc)  # type: ignore
+            items += [bytes(code), kind] if code else [kind]
+            code.clear()
+            refs[kind].append(value)
+            continue
+
+        if opcode not in OPCODE_NAMES:
+            raise TealAssemblyError(f"unknown opcode {opcode:#04x} at {pc}")
+        _, immediates = OPCODE_NAMES[opcode]
+        start, pc = pc, pc + 1
+        if immediates == ("label",):
+            items += [bytes(code), opcode] if code else [opcode]
+            code.clear()
+            pc += 2
+            continue
+        for kind in immediates:
+            if kind == "varuint":
+                _, pc = _read_uvarint(program, pc)
+            elif kind == "bytes":
+                _, pc = _read_bytes(program, pc)
+            elif kind in ("intcblock", "bytecblock"):
+                raise TealAssemblyError(f"constant block at {start}")
+            else:
+                pc += 1
+        code += program[start:pc]
+    if code:
+        items.append(bytes(code))
+    return version, tuple(items), refs
+
+
+# DECODER
+################################################################
+class ProgramDecoder:
+    """
+    Decodes logic signature programs into the swap configs they were
+    generated from, see `decode`. Templates are compiled on creation, once
+    for each of `optimize_levels`, and the results of the last `cache_size`
+    programs are kept.
+    """
+
+    def __init__(
+        self,
+        optimize_levels: Iterable[int] = OPTIMIZE_LEVELS,
+        cache_size: int = 2**16,
+    ):
+        self.variants = _variants(optimize_levels)
+        self.skeletons: Dict[tuple, List[_Variant]] = {}
+        for variant in self.variants:
+            self.skeletons.setdefault(variant.skeleton(), []).append(variant)
+
+        # Literal prefix of the programs -> layouts, with the lengths of the
+        # prefixes sharing their first bytes, looked up longest first
+        self.layouts: Dict[bytes, _Layouts] = {}
+        self.prefix_lengths: Dict[bytes, List[int]] = {}
+        for variant in self.variants:
+            self._add(_Layout(variant, variant.placeholder_values()))
+        for layouts in self.layouts.values():
+            layouts.merge()
+        self.cache = LRUCache(cache_size)
+        self.decoded = 0
+        self.learned = 0
+
+    def _add(self, layout: _Layout):
+        prefix = layout.prefix[:_MAX_PREFIX]
+        key = prefix[:_MIN_PREFIX] if len(prefix) >= _MIN_PREFIX else b""
+        lengths = self.prefix_lengths.setdefault(key, [])
+        if len(prefix) not in lengths:
+            lengths.append(len(prefix))
+            lengths.sort(reverse=True)
+        self.layouts.setdefault(prefix, _Layouts()).add(layout)
+
+    def decode(self, program: bytes) -> Optional[DecodedProgram]:
+        """
+        Return the contract, config and optimization level `program` was
+        generated from, or None if it is not an AlgoWorld contract.
+        """
+        # Escrows sign several transactions, so programs repeat in backfills
+        cached = self.cache.get(program)
+        if cached is not None:
+            return cached or None
+        result = self._match(program) or self._learn(program)
+        self.cache.set(program, result or False)
+        if result is not None:
+            self.decoded += 1
+        return result
+
+    def _match(self, program: bytes) -> Optional[DecodedProgram]:
+        lengths = self.prefix_lengths.get(program[:_MIN_PREFIX], ())
+        for length in [*lengths, *self.prefix_lengths.get(b"", ())]:
+            layouts = self.layouts.get(program[:length])
+            if layouts is not None:
+                result = layouts.decode(program)
+                if result is not None:
+                    return result
+        return None
+
+    def decode_many(self, programs: Iterable[bytes]) -> List[Optional[DecodedProgram]]:
+        decode = self.decode
+        return [decode(program) for program in programs]
+
+    def _learn(self, program: bytes) -> Optional[DecodedProgram]:
+        """
+        Decode `program` by disassembling it against the templates of the
+        same skeleton, and add its layout when it is a contract.
+        """
+        try:
+            version, skeleton, refs = _tokens(program)
+        except (TealAssemblyError, IndexError):
+            return None
+        if version != contracts.TEAL_VERSION:
+            return None
+
+        for variant in self.skeletons.get(skeleton, ()):
+            values = _template_values(variant, refs)
+            if values is None:
+                continue
+            layout = _Layout(variant, values)
+            result = layout.decode(program)
+            if result is not None:
+                self._add(layout)
+                self.learned += 1
+                return result
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "decoded": self.decoded,
+            "learned": self.learned,
+            "layouts": sum(
+                len(v.layouts) + len(v.pending) for v in self.layouts.values()
+            ),
+            "cached": self.cache.stats()["hits"],
+        }
+
+
+def _template_values(
+    variant: _Variant, refs: Dict[str, List[object]]
+) -> Optional[Dict[str, object]]:
+    """
+    Return the slot values of `variant` given the constant references of a
+    program of the same skeleton, or None if its constants do not fit.
+    """
+    values: Dict[str, object] = {}
+    kinds = dict(variant.template.slots.values())
+    for kind in (INT_REF, BYTE_REF):
+        expected = variant.template.refs[kind]
+        if len(expected) != len(refs[kind]):
+            return None
+        for (constant, name), value in zip(expected, refs[kind]):
+            if name is None:
+                if constant != value:
+                    return None
+            elif values.setdefault(name, value) != value:
+                return None
+            elif kinds[name] == ADDR_SLOT and len(value) != 32:  # type: ignore
+                return None
+    return values
+
+
+_decoder: Optional[ProgramDecoder] = None
+
+
+def decode_program(program: bytes) -> Optional[DecodedProgram]:
+    """
+    Return the contract, config and optimization level `program` was
+    generated from, or None if it is not an AlgoWorld contract, using a
+    decoder shared by the process.
+    """
+    global _decoder
+    if _decoder is None:
+        _decoder = ProgramDecoder()
+    return _decoder.decode(program)
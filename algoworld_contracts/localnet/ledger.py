@@ -0,0 +1,498 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import base64
+import copy
+import dataclasses
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from algosdk import constants, encoding
+from algosdk.future.transaction import (
+    LogicSigTransaction,
+    MultisigTransaction,
+    SignedTransaction,
+    SuggestedParams,
+    Transaction,
+    calculate_group_id,
+)
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+from algoworld_contracts.common.assembler import (
+    TealAssemblyError,
+    _checksum,
+    disassemble,
+)
+from algoworld_contracts.common.evaluator import (
+    MAX_GROUP_SIZE,
+    TealProgram,
+    compile_program,
+    transaction_fields,
+)
+
+"""
+In-memory Algorand ledger
+Accepts signed transaction groups and confirms each one in a block of its own
+at once, like algod in dev mode. Payments, asset transfers (opt-in, clawback,
+close out) and asset configuration are applied with the algod checks for
+validity rounds, pooled fees, signatures and minimum balances; logic
+signatures are run with the offline TEAL evaluator. A group is applied
+atomically: the first failing check rejects all of it with `LedgerError`.
+"""
+
+GENESIS_ID = "algoworld-localnet-v1"
+GENESIS_HASH = base64.b64encode(_checksum(GENESIS_ID.encode())).decode()
+CONSENSUS_VERSION = "https://github.com/algorandfoundation/specs/tree/d5ac876"
+
+MIN_TXN_FEE = constants.min_txn_fee
+MIN_BALANCE = 100_000
+ASSET_MIN_BALANCE = 100_000
+MAX_TXN_LIFE = 1000
+
+SUPPORTED_TYPES = (
+    constants.payment_txn,
+    constants.assettransfer_txn,
+    constants.assetconfig_txn,
+)
+
+
+class LedgerError(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class Account:
+    address: str
+    amount: int = 0
+    # asset id -> amount held
+    assets: Dict[int, int] = dataclasses.field(default_factory=dict)
+    created_at_round: int = 0
+    status: str = "Offline"
+    auth_addr: Optional[str] = None
+
+    @property
+    def min_balance(self) -> int:
+        return MIN_BALANCE + ASSET_MIN_BALANCE * len(self.assets)
+
+
+@dataclasses.dataclass
+class Asset:
+    index: int
+    creator: str
+    total: int
+    decimals: int = 0
+    default_frozen: bool = False
+    unit_name: str = ""
+    name: str = ""
+    url: str = ""
+    metadata_hash: Optional[bytes] = None
+    manager: Optional[str] = None
+    reserve: Optional[str] = None
+    freeze: Optional[str] = None
+    clawback: Optional[str] = None
+    created_at_round: int = 0
+
+
+@dataclasses.dataclass
+class ConfirmedTransaction:
+    txid: str
+    signed: object
+    round: int
+    intra_round_offset: int
+    asset_index: Optional[int] = None
+    closing_amount: Optional[int] = None
+    asset_closing_amount: Optional[int] = None
+
+    @property
+    def transaction(self) -> Transaction:
+        return self.signed.transaction  # type: ignore
+
+
+@dataclasses.dataclass
+class Block:
+    round: int
+    timestamp: int
+    transactions: List[ConfirmedTransaction] = dataclasses.field(default_factory=list)
+
+
+class _Delta:
+    """
+    Accounts and assets changed by a group, merged into the ledger only once
+    the whole group has been applied.
+    """
+
+    def __init__(self, ledger: "Ledger", round: int):
+        self.ledger = ledger
+        self.round = round
+        self.accounts: Dict[str, Account] = {}
+        self.assets: Dict[int, Optional[Asset]] = {}
+        self.next_asset = ledger.next_asset
+
+    def account(self, address: str) -> Account:
+        if address not in self.accounts:
+            base = self.ledger.accounts.get(address)
+            self.accounts[address] = (
+                copy.deepcopy(base)
+                if base is not None
+                else Account(address, created_at_round=self.round)
+            )
+        return self.accounts[address]
+
+    def asset(self, index: int) -> Asset:
+        if index not in self.assets:
+            self.assets[index] = copy.deepcopy(self.ledger.assets.get(index))
+        asset = self.assets[index]
+        if asset is None:
+            raise LedgerError(f"asset {index} does not exist or has been deleted")
+        return asset
+
+
+class Ledger:
+    """
+    Ledger whose genesis block gives `genesis` (address -> microAlgos) to
+    online accounts.
+    """
+
+    def __init__(self, genesis: Optional[Dict[str, int]] = None):
+        self.accounts: Dict[str, Account] = {
+            address: Account(address, amount, status="Online")
+            for address, amount in (genesis or {}).items()
+        }
+        self.assets: Dict[int, Asset] = {}
+        self.blocks: List[Block] = [Block(0, int(time.time()))]
+        self.transactions: Dict[str, ConfirmedTransaction] = {}
+        self.next_asset = 1
+        self._programs: Dict[bytes, TealProgram] = {}
+        # Held while reading or changing the ledger from several threads
+        self.lock = threading.RLock()
+        self._changed = threading.Condition(self.lock)
+
+    @property
+    def last_round(self) -> int:
+        return self.blocks[-1].round
+
+    def suggested_params(self) -> SuggestedParams:
+        return SuggestedParams(
+            0,
+            self.last_round,
+            self.last_round + MAX_TXN_LIFE,
+            GENESIS_HASH,
+            GENESIS_ID,
+            False,
+            CONSENSUS_VERSION,
+            MIN_TXN_FEE,
+        )
+
+    def account(self, address: str) -> Account:
+        """
+        Return the account at `address`, empty if it was never funded.
+        """
+        with self.lock:
+            account = self.accounts.get(address)
+            return copy.deepcopy(account) if account else Account(address)
+
+    def wait_for_round(self, round: int, timeout: Optional[float] = None) -> int:
+        """
+        Block until `round` is confirmed or `timeout` seconds passed, and
+        return the last round.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.last_round >= round, timeout)
+            return self.last_round
+
+    #### Submission
+
+    def submit(self, group: Sequence[object]) -> str:
+        """
+        Verify and apply signed transaction `group` in a new block, and
+        return the id of its first transaction.
+        """
+        with self.lock:
+            block = Block(
+                self.last_round + 1, max(int(time.time()), self.blocks[-1].timestamp)
+            )
+            txids = [stxn.transaction.get_txid() for stxn in group]  # type: ignore
+            failing = txids[0]
+            try:
+                global_fields = self._check_group(group)
+                fields = [transaction_fields(stxn) for stxn in group]
+                for index, (stxn, txid) in enumerate(zip(group, txids)):
+                    failing = txid
+                    self._check_transaction(stxn.transaction, txid, block.round)
+                    self._check_signature(stxn, fields, index, global_fields)
+
+                delta = _Delta(self, block.round)
+                for offset, (stxn, txid) in enumerate(zip(group, txids)):
+                    failing = txid
+                    confirmed = ConfirmedTransaction(txid, stxn, block.round, offset)
+                    self._apply(delta, stxn.transaction, confirmed)  # type: ignore
+                    block.transactions.append(confirmed)
+
+                failing = txids[0]
+                for account in delta.accounts.values():
+                    if (account.amount or account.assets) and (
+                        account.amount < account.min_balance
+                    ):
+                        raise LedgerError(
+                            f"account {account.address} balance {account.amount} "
+                            f"below min {account.min_balance} "
+                            f"({len(account.assets)} assets)"
+                        )
+            except LedgerError as e:
+                raise LedgerError(
+                    f"TransactionPool.Remember: transaction {failing}: {e}"
+                ) from e
+
+            self._commit(delta, block)
+            return txids[0]
+
+    def _check_group(self, group: Sequence[object]) -> Dict[str, object]:
+        """
+        Check the group id and pooled fees of `group`, and return the globals
+        of its logic signatures.
+        """
+        if not 0 < len(group) <= MAX_GROUP_SIZE:
+            raise LedgerError(f"group size {len(group)} is not supported")
+        transactions = [stxn.transaction for stxn in group]  # type: ignore
+
+        group_id = bytes(32)
+        if len(group) > 1 or transactions[0].group:
+            group_id = calculate_group_id(_ungrouped(transactions))
+            if any(txn.group != group_id for txn in transactions):
+                raise LedgerError("incomplete group or wrong group id")
+
+        fees = sum(txn.fee for txn in transactions)
+        if fees < MIN_TXN_FEE * len(group):
+            raise LedgerError(
+                f"txgroup had {fees} in fees, which is less than the minimum "
+                f"{len(group)} * {MIN_TXN_FEE}"
+            )
+        return {"GroupID": group_id}
+
+    def _check_transaction(self, txn: Transaction, txid: str, round: int):
+        if txid in self.transactions:
+            raise LedgerError(f"transaction already in ledger: {txid}")
+        if txn.type not in SUPPORTED_TYPES:
+            raise LedgerError(f"transaction type {txn.type} is not supported")
+        if txn.genesis_hash != GENESIS_HASH:
+            raise LedgerError("genesis hash mismatch")
+        if txn.genesis_id and txn.genesis_id != GENESIS_ID:
+            raise LedgerError(f"genesis id mismatch {txn.genesis_id}")
+        if not txn.first_valid_round <= round <= txn.last_valid_round:
+            raise LedgerError(
+                f"txn dead: round {round} outside of "
+                f"{txn.first_valid_round}--{txn.last_valid_round}"
+            )
+        if txn.last_valid_round - txn.first_valid_round > MAX_TXN_LIFE:
+            raise LedgerError("validity window is too large")
+
+    def _check_signature(
+        self,
+        stxn: object,
+        fields: List[Dict[str, object]],
+        index: int,
+        global_fields: Dict[str, object],
+    ):
+        txn: Transaction = stxn.transaction  # type: ignore
+        account = self.accounts.get(txn.sender)
+        authorizer = (account and account.auth_addr) or txn.sender
+        public_key = encoding.decode_address(authorizer)
+        message = constants.txid_prefix + base64.b64decode(encoding.msgpack_encode(txn))
+
+        if isinstance(stxn, LogicSigTransaction):
+            lsig = stxn.lsig
+            if not lsig.verify(public_key):
+                raise LedgerError(f"logic signature does not authorize {authorizer}")
+            evaluation = self._program(lsig.logic).evaluate(
+                fields, index, lsig.args or (), global_fields
+            )
+            if not evaluation.approved:
+                raise LedgerError(
+                    f"rejected by logic err={evaluation.error or 'returned false'}"
+                )
+        elif isinstance(stxn, MultisigTransaction):
+            msig = stxn.multisig
+            if encoding.decode_address(msig.address()) != public_key or not (
+                msig.verify(message)
+            ):
+                raise LedgerError(f"multisig does not authorize {authorizer}")
+        elif isinstance(stxn, SignedTransaction):
+            try:
+                VerifyKey(public_key).verify(message, base64.b64decode(stxn.signature))
+            except (BadSignatureError, TypeError, ValueError):
+                raise LedgerError(f"signature does not authorize {authorizer}")
+        else:
+            raise LedgerError("transaction is not signed")
+
+    def _program(self, program: bytes) -> TealProgram:
+        compiled = self._programs.get(program)
+        if compiled is None:
+            try:
+                compiled = compile_program(disassemble(program))
+            except TealAssemblyError as e:
+                raise LedgerError(f"unsupported logic signature program: {e}")
+            self._programs[program] = compiled
+        return compiled
+
+    #### Application
+
+    def _apply(self, delta: _Delta, txn: Transaction, confirmed: ConfirmedTransaction):
+        sender = delta.account(txn.sender)
+        _debit(sender, txn.fee)
+        if txn.rekey_to:
+            sender.auth_addr = None if txn.rekey_to == txn.sender else txn.rekey_to
+
+        if txn.type == constants.payment_txn:
+            self._pay(delta, txn, sender, confirmed)
+        elif txn.type == constants.assettransfer_txn:
+            self._transfer_asset(delta, txn, confirmed)
+        else:
+            self._configure_asset(delta, txn, sender, confirmed)
+
+    def _pay(self, delta, txn, sender: Account, confirmed: ConfirmedTransaction):
+        _debit(sender, txn.amt)
+        delta.account(txn.receiver).amount += txn.amt
+        if txn.close_remainder_to:
+            if sender.assets:
+                raise LedgerError(
+                    f"cannot close account {sender.address} with "
+                    f"{len(sender.assets)} outstanding assets"
+                )
+            confirmed.closing_amount = sender.amount
+            delta.account(txn.close_remainder_to).amount += sender.amount
+            sender.amount = 0
+
+    def _transfer_asset(self, delta, txn, confirmed: ConfirmedTransaction):
+        asset = delta.asset(txn.index)
+        source = delta.account(txn.revocation_target or txn.sender)
+        if txn.revocation_target and txn.sender != asset.clawback:
+            raise LedgerError("clawback not allowed: sender != clawback")
+
+        receiver = delta.account(txn.receiver)
+        if receiver is source and not txn.amount and txn.index not in source.assets:
+            source.assets[txn.index] = 0
+            return
+        for account in (source, receiver):
+            if txn.index not in account.assets:
+                raise LedgerError(f"asset {txn.index} missing from {account.address}")
+        if source.assets[txn.index] < txn.amount:
+            raise LedgerError(
+                f"underflow on subtracting {txn.amount} from sender amount "
+                f"{source.assets[txn.index]}"
+            )
+        source.assets[txn.index] -= txn.amount
+        receiver.assets[txn.index] += txn.amount
+
+        if txn.close_assets_to:
+            if source.address == asset.creator:
+                raise LedgerError(
+                    f"cannot close asset ID in allocating account {source.address}"
+                )
+            close_to = delta.account(txn.close_assets_to)
+            if txn.index not in close_to.assets:
+                raise LedgerError(f"asset {txn.index} missing from {close_to.address}")
+            confirmed.asset_closing_amount = source.assets.pop(txn.index)
+            close_to.assets[txn.index] += confirmed.asset_closing_amount
+
+    def _configure_asset(
+        self, delta, txn, sender: Account, confirmed: ConfirmedTransaction
+    ):
+        if not txn.index:
+            index = delta.next_asset
+            delta.next_asset += 1
+            delta.assets[index] = Asset(
+                index,
+                sender.address,
+                txn.total,
+                txn.decimals,
+                bool(txn.default_frozen),
+                txn.unit_name or "",
+                txn.asset_name or "",
+                txn.url or "",
+                txn.metadata_hash,
+                txn.manager,
+                txn.reserve,
+                txn.freeze,
+                txn.clawback,
+                delta.round,
+            )
+            sender.assets[index] = txn.total
+            confirmed.asset_index = index
+            return
+
+        asset = delta.asset(txn.index)
+        if sender.address != asset.manager:
+            raise LedgerError("this transaction should be issued by the manager")
+        if txn.manager or txn.reserve or txn.freeze or txn.clawback:
+            asset.manager = txn.manager
+            asset.reserve = txn.reserve
+            asset.freeze = txn.freeze
+            asset.clawback = txn.clawback
+            return
+
+        creator = delta.account(asset.creator)
+        if creator.assets.get(asset.index) != asset.total:
+            raise LedgerError(
+                "cannot destroy asset: creator is holding only "
+                f"{creator.assets.get(asset.index, 0)}/{asset.total}"
+            )
+        del creator.assets[asset.index]
+        delta.assets[asset.index] = None
+
+    def _commit(self, delta: _Delta, block: Block):
+        for address, account in delta.accounts.items():
+            if account.amount or account.assets:
+                self.accounts[address] = account
+            else:
+                self.accounts.pop(address, None)
+        for index, asset in delta.assets.items():
+            if asset is None:
+                self.assets.pop(index, None)
+            else:
+                self.assets[index] = asset
+        self.next_asset = delta.next_asset
+        for confirmed in block.transactions:
+            self.transactions[confirmed.txid] = confirmed
+        self.blocks.append(block)
+        self._changed.notify_all()
+
+
+def _debit(account: Account, amount: int):
+    if account.amount < amount:
+        raise LedgerError(
+            f"overspend (account {account.address}, data {account.amount}, "
+            f"tried to spend {amount})"
+        )
+    account.amount -= amount
+
+
+def _ungrouped(transactions: List[Transaction]) -> List[Transaction]:
+    ungrouped = []
+    for txn in transactions:
+        txn = copy.copy(txn)
+        txn.group = None
+        ungrouped.append(txn)
+    return ungrouped
@@ -0,0 +1,782 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import base64
+import json
+import re
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import msgpack
+from algosdk import account, encoding, mnemonic
+from algosdk.v2client import algod, indexer
+
+from algoworld_contracts.common.assembler import (
+    TealAssemblyError,
+    assemble,
+    program_address,
+)
+from algoworld_contracts.localnet.ledger import (
+    CONSENSUS_VERSION,
+    GENESIS_HASH,
+    GENESIS_ID,
+    Account,
+    Asset,
+    ConfirmedTransaction,
+    Ledger,
+    LedgerError,
+)
+
+"""
+Local algod and indexer
+Serves the algod and indexer REST endpoints used by the AlgoWorld helpers and
+tests from an in-process `Ledger`, so that a suite runs against instant blocks
+without docker. Only the JSON response format is supported, except for the
+msgpack encoding of algod blocks, and API tokens are accepted but not checked.
+"""
+
+ALGOD_PORT = 4001
+INDEXER_PORT = 8980
+DISPENSER_FUNDS = 10**15
+DEFAULT_LIMIT = 1000
+# Longest wait of `/v2/status/wait-for-block-after` for a block to arrive
+BLOCK_WAIT_TIMEOUT = 1.0
+
+# Keys of the msgpack transaction encoding that hold addresses
+ADDRESS_KEYS = {
+    "snd",
+    "rcv",
+    "close",
+    "arcv",
+    "aclose",
+    "asnd",
+    "rekey",
+    "sgnr",
+    "m",
+    "r",
+    "f",
+    "c",
+    "fadd",
+}
+
+Route = Tuple["re.Pattern[str]", Callable]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+#### JSON encoding
+
+
+def _b64(value: bytes) -> str:
+    return base64.b64encode(value).decode()
+
+
+def _json_value(key: str, value: object) -> object:
+    if isinstance(value, dict):
+        return {k: _json_value(k, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_value(key, v) for v in value]
+    if isinstance(value, bytes):
+        if key in ADDRESS_KEYS and len(value) == 32:
+            return encoding.encode_address(value)
+        return _b64(value)
+    return value
+
+
+def signed_transaction_json(signed: object) -> Dict[str, object]:
+    """
+    Return signed transaction `signed` in the algod JSON encoding.
+    """
+    return _json_value("", signed.dictify())  # type: ignore
+
+
+def signed_transaction_in_block(confirmed: ConfirmedTransaction) -> Dict[str, object]:
+    """
+    Return `confirmed` in the msgpack encoding of block transactions, where
+    the genesis id and hash are implied by the block and the apply data holds
+    the created asset id and closing amounts.
+    """
+    stib = confirmed.signed.dictify()  # type: ignore
+    stib["txn"] = {k: v for k, v in stib["txn"].items() if k not in ("gen", "gh")}
+    stib["hgi"] = True
+    if confirmed.asset_index is not None:
+        stib["caid"] = confirmed.asset_index
+    if confirmed.closing_amount:
+        stib["ca"] = confirmed.closing_amount
+    if confirmed.asset_closing_amount:
+        stib["aca"] = confirmed.asset_closing_amount
+    return stib
+
+
+def asset_params_json(asset: Asset) -> Dict[str, object]:
+    params = {
+        "creator": asset.creator,
+        "decimals": asset.decimals,
+        "default-frozen": asset.default_frozen,
+        "total": asset.total,
+        "unit-name": asset.unit_name,
+        "name": asset.name,
+        "url": asset.url,
+        "manager": asset.manager,
+        "reserve": asset.reserve,
+        "freeze": asset.freeze,
+        "clawback": asset.clawback,
+    }
+    if asset.metadata_hash:
+        params["metadata-hash"] = _b64(asset.metadata_hash)
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def account_json(ledger: Ledger, account: Account) -> Dict[str, object]:
+    created = [
+        asset for asset in ledger.assets.values() if asset.creator == account.address
+    ]
+    result = {
+        "address": account.address,
+        "amount": account.amount,
+        "amount-without-pending-rewards": account.amount,
+        "assets": [
+            {"asset-id": index, "amount": amount, "is-frozen": False}
+            for index, amount in sorted(account.assets.items())
+        ],
+        "created-assets": [
+            {"index": asset.index, "params": asset_params_json(asset)}
+            for asset in created
+        ],
+        "created-at-round": account.created_at_round,
+        "min-balance": account.min_balance if account.amount else 0,
+        "pending-rewards": 0,
+        "reward-base": 0,
+        "rewards": 0,
+        "round": ledger.last_round,
+        "status": account.status,
+        "total-apps-opted-in": 0,
+        "total-assets-opted-in": len(account.assets),
+        "total-created-apps": 0,
+        "total-created-assets": len(created),
+    }
+    if account.auth_addr:
+        result["auth-addr"] = account.auth_addr
+    return result
+
+
+def pending_transaction_json(
+    ledger: Ledger, confirmed: ConfirmedTransaction
+) -> Dict[str, object]:
+    result = {
+        "confirmed-round": confirmed.round,
+        "pool-error": "",
+        "txn": signed_transaction_json(confirmed.signed),
+    }
+    if confirmed.asset_index is not None:
+        result["asset-index"] = confirmed.asset_index
+    if confirmed.closing_amount is not None:
+        result["closing-amount"] = confirmed.closing_amount
+    if confirmed.asset_closing_amount is not None:
+        result["asset-closing-amount"] = confirmed.asset_closing_amount
+    return result
+
+
+def indexer_transaction_json(
+    ledger: Ledger, confirmed: ConfirmedTransaction
+) -> Dict[str, object]:
+    """
+    Return `confirmed` in the indexer JSON encoding.
+    """
+    txn = confirmed.transaction
+    result: Dict[str, object] = {
+        "id": confirmed.txid,
+        "confirmed-round": confirmed.round,
+        "round-time": ledger.blocks[confirmed.round].timestamp,
+        "intra-round-offset": confirmed.intra_round_offset,
+        "sender": txn.sender,
+        "fee": txn.fee,
+        "first-valid": txn.first_valid_round,
+        "last-valid": txn.last_valid_round,
+        "genesis-id": txn.genesis_id,
+        "genesis-hash": txn.genesis_hash,
+        "tx-type": txn.type,
+        "sender-rewards": 0,
+        "receiver-rewards": 0,
+        "close-rewards": 0,
+    }
+    if txn.note:
+        result["note"] = _b64(txn.note)
+    if txn.group:
+        result["group"] = _b64(txn.group)
+    if txn.lease:
+        result["lease"] = _b64(txn.lease)
+    if txn.rekey_to:
+        result["rekey-to"] = txn.rekey_to
+
+    if txn.type == "pay":
+        payment = {"amount": txn.amt, "receiver": txn.receiver}
+        if txn.close_remainder_to:
+            payment["close-remainder-to"] = txn.close_remainder_to
+            payment["close-amount"] = confirmed.closing_amount
+            result["closing-amount"] = confirmed.closing_amount
+        result["payment-transaction"] = payment
+    elif txn.type == "axfer":
+        transfer = {
+            "asset-id": txn.index,
+            "amount": txn.amount,
+            "receiver": txn.receiver,
+        }
+        if txn.close_assets_to:
+            transfer["close-to"] = txn.close_assets_to
+            transfer["close-amount"] = confirmed.asset_closing_amount
+        if txn.revocation_target:
+            transfer["sender"] = txn.revocation_target
+        result["asset-transfer-transaction"] = transfer
+    else:
+        asset = Asset(
+            txn.index or 0,
+            txn.sender,
+            txn.total or 0,
+            txn.decimals or 0,
+            bool(txn.default_frozen),
+            txn.unit_name or "",
+            txn.asset_name or "",
+            txn.url or "",
+            txn.metadata_hash,
+            txn.manager,
+            txn.reserve,
+            txn.freeze,
+            txn.clawback,
+        )
+        result["asset-config-transaction"] = {
+            "asset-id": txn.index or 0,
+            "params": asset_params_json(asset),
+        }
+        if confirmed.asset_index is not None:
+            result["created-asset-index"] = confirmed.asset_index
+
+    signed = signed_transaction_json(confirmed.signed)
+    if "sig" in signed:
+        result["signature"] = {"sig": signed["sig"]}
+    elif "msig" in signed:
+        result["signature"] = {"multisig": signed["msig"]}
+    else:
+        lsig = signed["lsig"]
+        logicsig = {"logic": lsig["l"], "args": lsig.get("arg", [])}
+        if "sig" in lsig:
+            logicsig["signature"] = lsig["sig"]
+        elif "msig" in lsig:
+            logicsig["multisig-signature"] = lsig["msig"]
+        result["signature"] = {"logicsig": logicsig}
+    if "sgnr" in signed:
+        result["auth-addr"] = signed["sgnr"]
+    return result
+
+
+def _position(confirmed: ConfirmedTransaction) -> str:
+    return f"{confirmed.round:016d}{confirmed.intra_round_offset:04d}"
+
+
+def _signature_type(confirmed: ConfirmedTransaction) -> str:
+    signed = confirmed.signed
+    if hasattr(signed, "lsig"):
+        return "lsig"
+    return "msig" if hasattr(signed, "multisig") else "sig"
+
+
+def _addresses(
+    confirmed: ConfirmedTransaction, role: Optional[str], exclude_close_to: bool
+) -> List[str]:
+    txn = confirmed.transaction
+    senders = [txn.sender, getattr(txn, "revocation_target", None)]
+    receivers = [getattr(txn, "receiver", None)]
+    if not exclude_close_to:
+        receivers += [
+            getattr(txn, "close_remainder_to", None),
+            getattr(txn, "close_assets_to", None),
+        ]
+    if role == "sender":
+        return [a for a in senders if a]
+    if role == "receiver":
+        return [a for a in receivers if a]
+    return [a for a in senders + receivers if a]
+
+
+#### Request handling
+
+
+def _param(query: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _int_param(query: Dict[str, List[str]], name: str) -> Optional[int]:
+    value = _param(query, name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"invalid {name}: {value}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately on keep-alive connections
+    disable_nagle_algorithm = True
+    routes: Dict[str, List[Route]] = {}
+    service: "_Service"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        query = parse_qs(url.query)
+        response_format = "json"
+        try:
+            for pattern, handler in self.routes.get(method, []):
+                match = pattern.fullmatch(url.path)
+                if match:
+                    response_format = _param(query, "format") or response_format
+                    if response_format != "json" and not (
+                        response_format == "msgpack"
+                        and handler in self.service.msgpack_handlers
+                    ):
+                        raise HTTPError(
+                            HTTPStatus.BAD_REQUEST, "only json format is supported"
+                        )
+                    with self.service.ledger.lock:
+                        response = handler(self.service, query, body, *match.groups())
+                    break
+            else:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"{url.path} not found")
+        except HTTPError as e:
+            self._respond(e.status, {"message": str(e)})
+        else:
+            if response_format == "msgpack":
+                self._respond(HTTPStatus.OK, response, "application/msgpack")
+            else:
+                self._respond(HTTPStatus.OK, response)
+
+    def _respond(
+        self,
+        status: HTTPStatus,
+        response: object,
+        content_type: str = "application/json",
+    ):
+        if content_type == "application/msgpack":
+            data = msgpack.packb(response, use_bin_type=True)
+        else:
+            data = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _routes(*routes: Tuple[str, str, Callable]) -> Dict[str, List[Route]]:
+    table: Dict[str, List[Route]] = {}
+    for method, path, handler in routes:
+        table.setdefault(method, []).append((re.compile(path), handler))
+    return table
+
+
+class _Service:
+    # Handlers that also serve `?format=msgpack`
+    msgpack_handlers: FrozenSet[Callable] = frozenset()
+
+    def __init__(self, ledger: Ledger, block_wait_timeout: float):
+        self.ledger = ledger
+        self.block_wait_timeout = block_wait_timeout
+
+
+class _Algod(_Service):
+    def health(self, query, body):
+        return None
+
+    def status(self, query, body):
+        ledger = self.ledger
+        return {
+            "catchup-time": 0,
+            "last-round": ledger.last_round,
+            "last-version": CONSENSUS_VERSION,
+            "next-version": CONSENSUS_VERSION,
+            "next-version-round": ledger.last_round + 1,
+            "next-version-supported": True,
+            "stopped-at-unsupported-round": False,
+            "time-since-last-round": 0,
+        }
+
+    def wait_for_block_after(self, query, body, round):
+        self.ledger.wait_for_round(int(round) + 1, self.block_wait_timeout)
+        return self.status(query, body)
+
+    def params(self, query, body):
+        return {
+            "consensus-version": CONSENSUS_VERSION,
+            "fee": 0,
+            "genesis-hash": GENESIS_HASH,
+            "genesis-id": GENESIS_ID,
+            "last-round": self.ledger.last_round,
+            "min-fee": self.ledger.suggested_params().min_fee,
+        }
+
+    def submit(self, query, body):
+        unpacker = msgpack.Unpacker(raw=False, strict_map_key=False)
+        unpacker.feed(body)
+        try:
+            group = [encoding.future_msgpack_decode(decoded) for decoded in unpacker]
+        except (ValueError, KeyError, TypeError, msgpack.UnpackException) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"msgpack decode error: {e}")
+        if not group or not all(hasattr(stxn, "transaction") for stxn in group):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "expected signed transactions")
+        try:
+            return {"txId": self.ledger.submit(group)}
+        except LedgerError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+
+    def pending(self, query, body, txid):
+        confirmed = self.ledger.transactions.get(txid)
+        if confirmed is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "txn does not exist")
+        return pending_transaction_json(self.ledger, confirmed)
+
+    def compile(self, query, body):
+        try:
+            program = assemble(body.decode())
+        except (TealAssemblyError, UnicodeDecodeError) as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        return {"hash": program_address(program), "result": _b64(program)}
+
+    def account(self, query, body, address):
+        if not encoding.is_valid_address(address):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"failed to parse {address}")
+        return account_json(self.ledger, self.ledger.account(address))
+
+    def asset(self, query, body, index):
+        asset = self.ledger.assets.get(int(index))
+        if asset is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "asset does not exist")
+        return {"index": asset.index, "params": asset_params_json(asset)}
+
+    def block(self, query, body, round):
+        round = int(round)
+        if round > self.ledger.last_round:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"ledger does not have entry {round}")
+        block = self.ledger.blocks[round]
+        if _param(query, "format") == "msgpack":
+            return {
+                "block": {
+                    "gen": GENESIS_ID,
+                    "gh": base64.b64decode(GENESIS_HASH),
+                    "rnd": block.round,
+                    "ts": block.timestamp,
+                    "txns": [
+                        signed_transaction_in_block(confirmed)
+                        for confirmed in block.transactions
+                    ],
+                }
+            }
+        return {
+            "block": {
+                "gen": GENESIS_ID,
+                "gh": GENESIS_HASH,
+                "rnd": block.round,
+                "ts": block.timestamp,
+                "txns": [
+                    signed_transaction_json(confirmed.signed)
+                    for confirmed in block.transactions
+                ],
+            }
+        }
+
+    routes = _routes(
+        ("GET", r"/health", health),
+        ("GET", r"/v2/status", status),
+        ("GET", r"/v2/status/wait-for-block-after/(\d+)", wait_for_block_after),
+        ("GET", r"/v2/transactions/params", params),
+        ("POST", r"/v2/transactions", submit),
+        ("GET", r"/v2/transactions/pending/(\w+)", pending),
+        ("POST", r"/v2/teal/compile", compile),
+        ("GET", r"/v2/accounts/(\w+)", account),
+        ("GET", r"/v2/assets/(\d+)", asset),
+        ("GET", r"/v2/blocks/(\d+)", block),
+    )
+    msgpack_handlers = frozenset({block})
+
+
+class _Indexer(_Service):
+    def health(self, query, body):
+        return {
+            "db-available": True,
+            "is-migrating": False,
+            "message": str(self.ledger.last_round),
+            "round": self.ledger.last_round,
+            "version": "localnet",
+        }
+
+    def _page(
+        self, query, items: list, key: str, token: Callable, descending=False
+    ) -> dict:
+        limit = _int_param(query, "limit") or DEFAULT_LIMIT
+        cursor = _param(query, "next")
+        if cursor is not None:
+            items = [
+                item
+                for item in items
+                if (token(item) < cursor if descending else token(item) > cursor)
+            ]
+        page = items[:limit]
+        result = {"current-round": self.ledger.last_round, key: page}
+        if len(items) > limit:
+            result["next-token"] = token(page[-1])
+        return result
+
+    def accounts(self, query, body):
+        asset_id = _int_param(query, "asset-id")
+        above = _int_param(query, "currency-greater-than")
+        below = _int_param(query, "currency-less-than")
+        accounts = []
+        for address in sorted(self.ledger.accounts):
+            account = self.ledger.account(address)
+            amount = account.amount
+            if asset_id is not None:
+                if asset_id not in account.assets:
+                    continue
+                amount = account.assets[asset_id]
+            if (above is not None and amount <= above) or (
+                below is not None and amount >= below
+            ):
+                continue
+            accounts.append(account_json(self.ledger, account))
+        return self._page(query, accounts, "accounts", lambda a: a["address"])
+
+    def account(self, query, body, address):
+        if address not in self.ledger.accounts:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no accounts found for {address}")
+        return {
+            "account": account_json(self.ledger, self.ledger.account(address)),
+            "current-round": self.ledger.last_round,
+        }
+
+    def transactions(self, query, body, address=None, newest_first=False):
+        address = address or _param(query, "address")
+        role = _param(query, "address-role")
+        exclude_close_to = _param(query, "exclude-close-to") == "true"
+        tx_type = _param(query, "tx-type")
+        sig_type = _param(query, "sig-type")
+        txid = _param(query, "txid")
+        asset_id = _int_param(query, "asset-id")
+        note_prefix = _param(query, "note-prefix")
+        prefix = base64.b64decode(note_prefix) if note_prefix else b""
+        round = _int_param(query, "round")
+        min_round = _int_param(query, "min-round")
+        max_round = _int_param(query, "max-round")
+        if round is not None:
+            min_round = max_round = round
+        above = _int_param(query, "currency-greater-than")
+        below = _int_param(query, "currency-less-than")
+
+        last_round = self.ledger.last_round
+        if max_round is not None:
+            last_round = min(max_round, last_round)
+        blocks = self.ledger.blocks[max(min_round or 1, 1) : last_round + 1]
+        transactions = []
+        for block in blocks:
+            for confirmed in block.transactions:
+                txn = confirmed.transaction
+                if txid is not None and confirmed.txid != txid:
+                    continue
+                if tx_type is not None and txn.type != tx_type:
+                    continue
+                if sig_type is not None and _signature_type(confirmed) != sig_type:
+                    continue
+                if prefix and not (txn.note or b"").startswith(prefix):
+                    continue
+                if asset_id is not None and getattr(txn, "index", None) != asset_id:
+                    continue
+                if address is not None and address not in _addresses(
+                    confirmed, role, exclude_close_to
+                ):
+                    continue
+                amount = getattr(txn, "amt", None)
+                if amount is None:
+                    amount = getattr(txn, "amount", 0)
+                if (above is not None and amount <= above) or (
+                    below is not None and amount >= below
+                ):
+                    continue
+                transactions.append(confirmed)
+
+        # Global searches list the oldest first, account histories the newest
+        if newest_first:
+            transactions.reverse()
+        result = self._page(
+            query, transactions, "transactions", _position, descending=newest_first
+        )
+        result["transactions"] = [
+            indexer_transaction_json(self.ledger, c) for c in result["transactions"]
+        ]
+        return result
+
+    def account_transactions(self, query, body, address):
+        return self.transactions(query, body, address, newest_first=True)
+
+    def transaction(self, query, body, txid):
+        confirmed = self.ledger.transactions.get(txid)
+        if confirmed is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no transaction found for {txid}")
+        return {
+            "current-round": self.ledger.last_round,
+            "transaction": indexer_transaction_json(self.ledger, confirmed),
+        }
+
+    def asset(self, query, body, index):
+        asset = self.ledger.assets.get(int(index))
+        if asset is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"no assets found for {index}")
+        return {
+            "asset": {
+                "index": asset.index,
+                "created-at-round": asset.created_at_round,
+                "deleted": False,
+                "params": asset_params_json(asset),
+            },
+            "current-round": self.ledger.last_round,
+        }
+
+    def block(self, query, body, round):
+        round = int(round)
+        if round > self.ledger.last_round:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"block {round} not found")
+        block = self.ledger.blocks[round]
+        return {
+            "genesis-hash": GENESIS_HASH,
+            "genesis-id": GENESIS_ID,
+            "round": block.round,
+            "timestamp": block.timestamp,
+            "transactions": [
+                indexer_transaction_json(self.ledger, c) for c in block.transactions
+            ],
+        }
+
+    routes = _routes(
+        ("GET", r"/health", health),
+        ("GET", r"/v2/accounts", accounts),
+        ("GET", r"/v2/accounts/(\w+)", account),
+        ("GET", r"/v2/accounts/(\w+)/transactions", account_transactions),
+        ("GET", r"/v2/transactions", transactions),
+        ("GET", r"/v2/transactions/(\w+)", transaction),
+        ("GET", r"/v2/assets/(\d+)", asset),
+        ("GET", r"/v2/blocks/(\d+)", block),
+    )
+
+
+class LocalNet:
+    """
+    Local algod and indexer serving `ledger`, by default a new ledger whose
+    only genesis account is the `dispenser`. Ports 0 bind to free ports.
+    """
+
+    def __init__(
+        self,
+        ledger: Optional[Ledger] = None,
+        host: str = "localhost",
+        algod_port: int = ALGOD_PORT,
+        indexer_port: int = INDEXER_PORT,
+        block_wait_timeout: float = BLOCK_WAIT_TIMEOUT,
+    ):
+        self.dispenser_key, self.dispenser = account.generate_account()
+        self.ledger = ledger or Ledger({self.dispenser: DISPENSER_FUNDS})
+        self.host = host
+        self.ports = {"algod": algod_port, "indexer": indexer_port}
+        self.block_wait_timeout = block_wait_timeout
+        self._servers: List[ThreadingHTTPServer] = []
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def dispenser_mnemonic(self) -> str:
+        return mnemonic.from_private_key(self.dispenser_key)
+
+    @property
+    def algod_address(self) -> str:
+        return f"http://{self.host}:{self.ports['algod']}"
+
+    @property
+    def indexer_address(self) -> str:
+        return f"http://{self.host}:{self.ports['indexer']}"
+
+    def algod_client(self, token: str = "a" * 64) -> algod.AlgodClient:
+        return algod.AlgodClient(token, self.algod_address)
+
+    def indexer_client(self, token: str = "a" * 64) -> indexer.IndexerClient:
+        return indexer.IndexerClient(token, self.indexer_address)
+
+    def start(self) -> "LocalNet":
+        for name, service in (("algod", _Algod), ("indexer", _Indexer)):
+            handler = type(
+                f"_{name.title()}Handler",
+                (_Handler,),
+                {
+                    "routes": service.routes,
+                    "service": service(self.ledger, self.block_wait_timeout),
+                },
+            )
+            server = ThreadingHTTPServer((self.host, self.ports[name]), handler)
+            server.daemon_threads = True
+            self.ports[name] = server.server_address[1]
+            thread = threading.Thread(
+                target=server.serve_forever, name=f"localnet-{name}", daemon=True
+            )
+            thread.start()
+            self._servers.append(server)
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._servers.clear()
+        self._threads.clear()
+
+    def __enter__(self) -> "LocalNet":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
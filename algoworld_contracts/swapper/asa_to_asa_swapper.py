@@ -25,8 +25,9 @@ SOFTWARE.
 import dataclasses
 import sys
 
-from pyteal import Addr, And, Cond, Global, Gtxn, Int, Mode, TxnType, compileTeal
+from pyteal import Addr, And, Global, Gtxn, Int, Mode, TxnType, compileTeal
 
+from algoworld_contracts.common.dispatch import Branch, dispatch, require_all
 from algoworld_contracts.common.utils import parse_params
 
 """
@@ -41,16 +42,20 @@ TEAL_VERSION = 6
 MAX_FEE = Int(1000)
 OPTIN_FUNDING_AMOUNT = 210000
 
-ASA_OPTIN_GSIZE = Int(2)
+# Plain group sizes for Python side users, next to their PyTeal constants
+ASA_OPTIN_GROUP_SIZE = 2
+ASA_OPTIN_GSIZE = Int(ASA_OPTIN_GROUP_SIZE)
 OPTIN_FEE = 0
 ASA_OPTIN = 1
 
-ASA_SWAP_GSIZE = Int(3)
+ASA_SWAP_GROUP_SIZE = 3
+ASA_SWAP_GSIZE = Int(ASA_SWAP_GROUP_SIZE)
 OFFERED_ASA_XFER = 0
 REQUESTED_ASA_XFER = 1
 INCENTIVE_FEE = 2
 
-CLOSE_SWAP_GSIZE = Int(3)
+CLOSE_SWAP_GROUP_SIZE = 3
+CLOSE_SWAP_GSIZE = Int(CLOSE_SWAP_GROUP_SIZE)
 ASA_CLOSE = 0
 SWAP_CLOSE = 1
 PROOF = 2
@@ -65,33 +70,35 @@ class AsaToAsaSwapConfig:
     requested_asa_amount: int
     incentive_fee_address: str
     incentive_fee_amount: int
+    # Stop evaluating conditions at the first failing check
+    short_circuit: bool = False
 
 
 def swapper(cfg: AsaToAsaSwapConfig):
-    is_asa_optin = And(
-        Global.group_size() == ASA_OPTIN_GSIZE,
+    asa_optin_type_check = [
         Gtxn[OPTIN_FEE].type_enum() == TxnType.Payment,
         Gtxn[ASA_OPTIN].type_enum() == TxnType.AssetTransfer,
-    )
+    ]
 
-    is_asa_swap = And(
-        Global.group_size() == ASA_SWAP_GSIZE,
+    asa_swap_type_check = [
         Gtxn[OFFERED_ASA_XFER].type_enum() == TxnType.AssetTransfer,
         Gtxn[REQUESTED_ASA_XFER].type_enum() == TxnType.AssetTransfer,
         Gtxn[INCENTIVE_FEE].type_enum() == TxnType.Payment,
-    )
+    ]
 
-    is_close_swap = And(
-        Global.group_size() == CLOSE_SWAP_GSIZE,
+    close_swap_type_check = [
         Gtxn[ASA_CLOSE].type_enum() == TxnType.AssetTransfer,
         Gtxn[SWAP_CLOSE].type_enum() == TxnType.Payment,
         Gtxn[PROOF].type_enum() == TxnType.Payment,
-    )
-
-    return Cond(
-        [is_asa_optin, asa_optin(cfg)],
-        [is_asa_swap, asa_swap(cfg)],
-        [is_close_swap, close_swap(cfg)],
+    ]
+
+    return dispatch(
+        [
+            Branch(ASA_OPTIN_GROUP_SIZE, asa_optin_type_check, asa_optin(cfg)),
+            Branch(ASA_SWAP_GROUP_SIZE, asa_swap_type_check, asa_swap(cfg)),
+            Branch(CLOSE_SWAP_GROUP_SIZE, close_swap_type_check, close_swap(cfg)),
+        ],
+        cfg.short_circuit,
     )
 
 
@@ -109,7 +116,7 @@ def asa_optin(cfg: AsaToAsaSwapConfig):
         Gtxn[ASA_OPTIN].asset_close_to() == Global.zero_address(),
     )
 
-    return And(
+    return require_all(
         optin_fee_precondition,
         asa_optin_precondition,
         Gtxn[OPTIN_FEE].sender() == Addr(cfg.swap_creator),
@@ -118,6 +125,7 @@ def asa_optin(cfg: AsaToAsaSwapConfig):
         Gtxn[ASA_OPTIN].xfer_asset() == Int(cfg.offered_asa_id),
         Gtxn[ASA_OPTIN].sender() == Gtxn[ASA_OPTIN].asset_receiver(),
         Gtxn[ASA_OPTIN].asset_amount() == Int(0),
+        short_circuit=cfg.short_circuit,
     )
 
 
@@ -129,7 +137,7 @@ def asa_swap(cfg: AsaToAsaSwapConfig):
         Gtxn[OFFERED_ASA_XFER].asset_close_to() == Global.zero_address(),
     )
 
-    return And(
+    return require_all(
         offered_asa_xfer_precondition,
         Gtxn[OFFERED_ASA_XFER].xfer_asset() == Int(cfg.offered_asa_id),
         Gtxn[OFFERED_ASA_XFER].asset_amount() == Int(cfg.offered_asa_amount),
@@ -140,6 +148,7 @@ def asa_swap(cfg: AsaToAsaSwapConfig):
         Gtxn[INCENTIVE_FEE].receiver() == Addr(cfg.incentive_fee_address),
         Gtxn[INCENTIVE_FEE].sender() == Gtxn[REQUESTED_ASA_XFER].sender(),
         Gtxn[INCENTIVE_FEE].amount() == Int(cfg.incentive_fee_amount),
+        short_circuit=cfg.short_circuit,
     )
 
 
@@ -155,7 +164,7 @@ def close_swap(cfg: AsaToAsaSwapConfig):
         Gtxn[SWAP_CLOSE].rekey_to() == Global.zero_address(),
     )
 
-    return And(
+    return require_all(
         asa_close_precondition,
         swap_close_precondition,
         Gtxn[ASA_CLOSE].xfer_asset() == Int(cfg.offered_asa_id),
@@ -166,6 +175,7 @@ def close_swap(cfg: AsaToAsaSwapConfig):
         Gtxn[PROOF].sender() == Addr(cfg.swap_creator),
         Gtxn[PROOF].receiver() == Addr(cfg.swap_creator),
         Gtxn[PROOF].amount() == Int(0),
+        short_circuit=cfg.short_circuit,
     )
 
 
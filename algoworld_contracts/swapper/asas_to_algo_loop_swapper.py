@@ -0,0 +1,269 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import dataclasses
+import sys
+from typing import Callable
+
+from pyteal import (
+    Addr,
+    And,
+    Assert,
+    Bytes,
+    Expr,
+    ExtractUint64,
+    For,
+    Global,
+    Gtxn,
+    Int,
+    Mode,
+    ScratchVar,
+    Seq,
+    TealType,
+    TxnType,
+    compileTeal,
+)
+
+from algoworld_contracts.common.dispatch import Branch, dispatch, require_all
+from algoworld_contracts.common.utils import parse_params
+from algoworld_contracts.swapper.asas_to_algo_swapper import (
+    BASE_OPTIN_FUNDING_AMOUNT,
+    AsasToAlgoSwapConfig,
+)
+
+"""
+Multi ASA to ALGO Atomic Swapper (loop based)
+Same branches and checks as the unrolled Multi ASA to ALGO Atomic Swapper,
+with the offered ASAs section of each group walked by a loop over a table of
+offered ASA ids and amounts, so program size barely grows with the bundle.
+1. Multi ASA Opt-In
+2. Offered Multi ASA / Requested ALGO Swap
+3. Close Multi ASA Swap
+"""
+
+TEAL_VERSION = 6
+MAX_GROUP_SIZE = 16
+
+# Offered ASA table entries are (id, amount) pairs of big endian uint64
+ASA_TABLE_ENTRY_SIZE = 16
+ASA_AMOUNT_OFFSET = 8
+
+
+@dataclasses.dataclass
+class AsasToAlgoLoopSwapConfig(AsasToAlgoSwapConfig):
+    # Swap and close groups carry 2 transactions besides the offered ASAs
+    MAX_OFFERED_ASAS = MAX_GROUP_SIZE - 2
+
+
+def asa_table(cfg: AsasToAlgoSwapConfig) -> str:
+    """
+    Return the base16 table of offered ASA ids and amounts, in offer order.
+    """
+    return "".join(
+        int(k).to_bytes(8, "big").hex() + int(v).to_bytes(8, "big").hex()
+        for k, v in cfg.offered_asa_amounts.items()
+    )
+
+
+def for_each_asa(
+    cfg: AsasToAlgoSwapConfig,
+    start: int,
+    check: Callable[[Expr, Expr], Expr],
+    fail_fast: bool = False,
+) -> Expr:
+    """
+    Return whether `check(txn, entry)` holds for every offered ASA, where `txn`
+    is the group index of its transfer and `entry` its ASA table offset. With
+    `fail_fast` the program fails at the first ASA not passing the check.
+    """
+    asa = ScratchVar(TealType.uint64)
+    valid = ScratchVar(TealType.uint64)
+
+    def offered_asas() -> For:
+        return For(
+            asa.store(Int(0)),
+            asa.load() < Int(cfg.body_size),
+            asa.store(asa.load() + Int(1)),
+        )
+
+    def asa_check() -> Expr:
+        return check(asa.load() + Int(start), asa.load() * Int(ASA_TABLE_ENTRY_SIZE))
+
+    if fail_fast:
+        return Seq(offered_asas().Do(Assert(asa_check())), Int(1))
+
+    return Seq(
+        valid.store(Int(1)),
+        offered_asas().Do(valid.store(And(valid.load(), asa_check()))),
+        valid.load(),
+    )
+
+
+def offered_asa_id(cfg: AsasToAlgoSwapConfig, entry: Expr) -> Expr:
+    return ExtractUint64(Bytes("base16", asa_table(cfg)), entry)
+
+
+def offered_asa_amount(cfg: AsasToAlgoSwapConfig, entry: Expr) -> Expr:
+    return ExtractUint64(
+        Bytes("base16", asa_table(cfg)), entry + Int(ASA_AMOUNT_OFFSET)
+    )
+
+
+def multi_asa_loop_swapper(cfg: AsasToAlgoSwapConfig) -> Expr:
+    def is_asset_transfer(txn: Expr, entry: Expr) -> Expr:
+        return Gtxn[txn].type_enum() == TxnType.AssetTransfer
+
+    is_multi_asa_optin = [
+        Gtxn[cfg.optin_header["fee"]].type_enum() == TxnType.Payment,
+        for_each_asa(cfg, len(cfg.optin_header), is_asset_transfer),
+    ]
+
+    is_multi_asa_swap = [
+        Gtxn[cfg.swap_header["incentive_fee"]].type_enum() == TxnType.Payment,
+        Gtxn[cfg.swap_header["requested_algo_xfer"]].type_enum() == TxnType.Payment,
+        for_each_asa(cfg, len(cfg.swap_header), is_asset_transfer),
+    ]
+
+    is_close_swap = [
+        for_each_asa(cfg, len(cfg.close_swap_header), is_asset_transfer),
+        Gtxn[cfg.close_swap_bottom["close_out"]].type_enum() == TxnType.Payment,
+        Gtxn[cfg.close_swap_bottom["proof"]].type_enum() == TxnType.Payment,
+    ]
+
+    return dispatch(
+        [
+            Branch(cfg.optin_gsize, is_multi_asa_optin, multi_asa_loop_optin(cfg)),
+            Branch(cfg.swap_gsize, is_multi_asa_swap, multi_asa_loop_swap(cfg)),
+            Branch(cfg.close_swap_gsize, is_close_swap, multi_asa_loop_close_swap(cfg)),
+        ],
+        cfg.short_circuit,
+    )
+
+
+def multi_asa_loop_optin(cfg: AsasToAlgoSwapConfig):
+    fee = cfg.optin_header["fee"]
+
+    def asa_optin(txn: Expr, entry: Expr) -> Expr:
+        return And(
+            Gtxn[txn].sender() == Gtxn[fee].receiver(),
+            Gtxn[txn].xfer_asset() == offered_asa_id(cfg, entry),
+            Gtxn[txn].sender() == Gtxn[txn].asset_receiver(),
+            Gtxn[txn].asset_amount() == Int(0),
+        )
+
+    return require_all(
+        Gtxn[fee].sender() == Addr(cfg.swap_creator),
+        Gtxn[fee].amount() >= Int(cfg.optin_funding_amount),
+        Gtxn[fee].fee() <= Int(cfg.max_fee),
+        Gtxn[fee].rekey_to() == Global.zero_address(),
+        Gtxn[fee].close_remainder_to() == Global.zero_address(),
+        for_each_asa(
+            cfg, len(cfg.optin_header), asa_optin, fail_fast=cfg.short_circuit
+        ),
+        short_circuit=cfg.short_circuit,
+    )
+
+
+def multi_asa_loop_swap(cfg: AsasToAlgoSwapConfig):
+    incentive_fee = cfg.swap_header["incentive_fee"]
+    requested_algo_xfer = cfg.swap_header["requested_algo_xfer"]
+
+    def offered_asa_xfer(txn: Expr, entry: Expr) -> Expr:
+        return And(
+            Gtxn[txn].fee() <= Int(cfg.max_fee),
+            Gtxn[txn].rekey_to() == Global.zero_address(),
+            Gtxn[txn].asset_sender() == Global.zero_address(),
+            Gtxn[txn].asset_close_to() == Global.zero_address(),
+            Gtxn[txn].xfer_asset() == offered_asa_id(cfg, entry),
+            Gtxn[txn].asset_amount() == offered_asa_amount(cfg, entry),
+            Gtxn[txn].asset_receiver() == Gtxn[requested_algo_xfer].sender(),
+        )
+
+    return require_all(
+        Gtxn[incentive_fee].receiver() == Addr(cfg.incentive_fee_address),
+        Gtxn[incentive_fee].amount() == Int(cfg.incentive_fee_amount),
+        Gtxn[incentive_fee].rekey_to() == Global.zero_address(),
+        Gtxn[incentive_fee].close_remainder_to() == Global.zero_address(),
+        Gtxn[requested_algo_xfer].amount() == Int(cfg.requested_algo_amount),
+        Gtxn[requested_algo_xfer].receiver() == Addr(cfg.swap_creator),
+        Gtxn[requested_algo_xfer].rekey_to() == Global.zero_address(),
+        Gtxn[requested_algo_xfer].close_remainder_to() == Global.zero_address(),
+        for_each_asa(
+            cfg, len(cfg.swap_header), offered_asa_xfer, fail_fast=cfg.short_circuit
+        ),
+        short_circuit=cfg.short_circuit,
+    )
+
+
+def multi_asa_loop_close_swap(cfg: AsasToAlgoSwapConfig):
+    close_out = cfg.close_swap_bottom["close_out"]
+    proof = cfg.close_swap_bottom["proof"]
+
+    def asa_close(txn: Expr, entry: Expr) -> Expr:
+        return And(
+            Gtxn[txn].fee() <= Int(cfg.max_fee),
+            Gtxn[txn].rekey_to() == Global.zero_address(),
+            Gtxn[txn].asset_sender() == Global.zero_address(),
+            Gtxn[txn].xfer_asset() == offered_asa_id(cfg, entry),
+            Gtxn[txn].asset_receiver() == Addr(cfg.swap_creator),
+            Gtxn[txn].asset_close_to() == Addr(cfg.swap_creator),
+        )
+
+    return require_all(
+        Gtxn[close_out].fee() <= Int(cfg.max_fee),
+        Gtxn[close_out].rekey_to() == Global.zero_address(),
+        Gtxn[close_out].receiver() == Addr(cfg.swap_creator),
+        Gtxn[close_out].close_remainder_to() == Addr(cfg.swap_creator),
+        Gtxn[proof].sender() == Addr(cfg.swap_creator),
+        Gtxn[proof].receiver() == Addr(cfg.swap_creator),
+        Gtxn[proof].amount() == Int(0),
+        for_each_asa(
+            cfg, len(cfg.close_swap_header), asa_close, fail_fast=cfg.short_circuit
+        ),
+        short_circuit=cfg.short_circuit,
+    )
+
+
+def compile_stateless(program):
+    return compileTeal(program, Mode.Signature, version=TEAL_VERSION)
+
+
+if __name__ == "__main__":
+    offered_asas = {"1": 10, "2": 10}
+
+    params = {
+        "swap_creator": "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ",
+        "offered_asa_amounts": offered_asas,
+        "requested_algo_amount": 1_000_000,
+        "max_fee": 1_000,
+        "optin_funding_amount": BASE_OPTIN_FUNDING_AMOUNT * len(offered_asas),
+        "incentive_fee_address": "RJVRGSPGSPOG7W3V7IMZZ2BAYCABW3YC5MWGKEOPAEEI5ZK5J2GSF6Y26A",
+        "incentive_fee_amount": 10_000,
+    }
+
+    # Overwrite params if sys.argv[1] is passed
+    if len(sys.argv) > 1:
+        params = parse_params(sys.argv[1], params)
+
+    print(compile_stateless(multi_asa_loop_swapper(AsasToAlgoLoopSwapConfig(**params))))
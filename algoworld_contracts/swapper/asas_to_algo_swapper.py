@@ -25,8 +25,9 @@ SOFTWARE.
 import dataclasses
 import sys
 
-from pyteal import Addr, And, Cond, Expr, Global, Gtxn, Int, Mode, TxnType, compileTeal
+from pyteal import Addr, And, Expr, Global, Gtxn, Int, Mode, TxnType, compileTeal
 
+from algoworld_contracts.common.dispatch import Branch, dispatch, require_all
 from algoworld_contracts.common.utils import parse_params
 
 """
@@ -49,9 +50,13 @@ class AsasToAlgoSwapConfig:
     optin_funding_amount: int
     incentive_fee_address: str
     incentive_fee_amount: int
+    # Stop evaluating conditions at the first failing check
+    short_circuit: bool = False
+
+    MAX_OFFERED_ASAS = 5
 
     def __post_init__(self):
-        assert len(self.offered_asa_amounts) <= 5
+        assert len(self.offered_asa_amounts) <= self.MAX_OFFERED_ASAS
         self.body_size = len(self.offered_asa_amounts)
 
         # MULTI ASA OPTIN
@@ -83,40 +88,40 @@ def multi_asa_swapper(cfg: AsasToAlgoSwapConfig) -> Expr:
         for asa in range(cfg.body_size)
     ]
 
-    is_multi_asa_optin = And(
-        Global.group_size() == Int(cfg.optin_gsize),
+    is_multi_asa_optin = [
         Gtxn[cfg.optin_header["fee"]].type_enum() == TxnType.Payment,
         *multi_asa_optin_type_check,
-    )
+    ]
 
     multi_asa_xfer_type_check = [
         Gtxn[len(cfg.swap_header) + asa].type_enum() == TxnType.AssetTransfer
         for asa in range(cfg.body_size)
     ]
 
-    is_multi_asa_swap = And(
-        Global.group_size() == Int(cfg.swap_gsize),
+    is_multi_asa_swap = [
         Gtxn[cfg.swap_header["incentive_fee"]].type_enum() == TxnType.Payment,
         Gtxn[cfg.swap_header["requested_algo_xfer"]].type_enum() == TxnType.Payment,
         *multi_asa_xfer_type_check,
-    )
+    ]
 
     multi_asa_close_type_check = [
         Gtxn[len(cfg.close_swap_header) + asa].type_enum() == TxnType.AssetTransfer
         for asa in range(cfg.body_size)
     ]
 
-    is_close_swap = And(
-        Global.group_size() == Int(cfg.close_swap_gsize),
+    is_close_swap = [
         *multi_asa_close_type_check,
         Gtxn[cfg.close_swap_bottom["close_out"]].type_enum() == TxnType.Payment,
         Gtxn[cfg.close_swap_bottom["proof"]].type_enum() == TxnType.Payment,
-    )
+    ]
 
-    return Cond(
-        [is_multi_asa_optin, multi_asa_optin(cfg)],
-        [is_multi_asa_swap, multi_asa_swap(cfg)],
-        [is_close_swap, multi_asa_close_swap(cfg)],
+    return dispatch(
+        [
+            Branch(cfg.optin_gsize, is_multi_asa_optin, multi_asa_optin(cfg)),
+            Branch(cfg.swap_gsize, is_multi_asa_swap, multi_asa_swap(cfg)),
+            Branch(cfg.close_swap_gsize, is_close_swap, multi_asa_close_swap(cfg)),
+        ],
+        cfg.short_circuit,
     )
 
 
@@ -150,7 +155,7 @@ def multi_asa_optin(cfg: AsasToAlgoSwapConfig):
         for asa in range(cfg.body_size)
     ]
 
-    return And(
+    return require_all(
         Gtxn[cfg.optin_header["fee"]].sender() == Addr(cfg.swap_creator),
         Gtxn[cfg.optin_header["fee"]].amount() >= Int(cfg.optin_funding_amount),
         Gtxn[cfg.optin_header["fee"]].fee() <= Int(cfg.max_fee),
@@ -160,6 +165,7 @@ def multi_asa_optin(cfg: AsasToAlgoSwapConfig):
         *multi_asa_optin_xfer_asset,
         *multi_asa_optin_assets_receivers,
         *multi_asa_optin_assets_amounts,
+        short_circuit=cfg.short_circuit,
     )
 
 
@@ -209,7 +215,7 @@ def multi_asa_swap(cfg: AsasToAlgoSwapConfig):
         *offered_multi_asa_xfer_asset_close_to,
     )
 
-    return And(
+    return require_all(
         offered_multi_asa_xfer_precondition,
         Gtxn[cfg.swap_header["incentive_fee"]].receiver()
         == Addr(cfg.incentive_fee_address),
@@ -229,6 +235,7 @@ def multi_asa_swap(cfg: AsasToAlgoSwapConfig):
         *offered_multi_asa_xfer_asset_ids,
         *offered_multi_asa_xfer_asset_amounts,
         *offered_multi_asa_xfer_asset_receiver,
+        short_circuit=cfg.short_circuit,
     )
 
 
@@ -279,7 +286,7 @@ def multi_asa_close_swap(cfg: AsasToAlgoSwapConfig):
         Gtxn[cfg.close_swap_bottom["close_out"]].rekey_to() == Global.zero_address(),
     )
 
-    return And(
+    return require_all(
         asa_close_precondition,
         swap_close_precondition,
         *multi_asa_close_asset_ids,
@@ -291,6 +298,7 @@ def multi_asa_close_swap(cfg: AsasToAlgoSwapConfig):
         Gtxn[cfg.close_swap_bottom["proof"]].sender() == Addr(cfg.swap_creator),
         Gtxn[cfg.close_swap_bottom["proof"]].receiver() == Addr(cfg.swap_creator),
         Gtxn[cfg.close_swap_bottom["proof"]].amount() == Int(0),
+        short_circuit=cfg.short_circuit,
     )
 
 
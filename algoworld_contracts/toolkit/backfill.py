@@ -0,0 +1,422 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import argparse
+import base64
+import dataclasses
+import json
+import sqlite3
+import sys
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from algosdk.v2client import indexer
+
+from algoworld_contracts.batch import map_chunks
+from algoworld_contracts.common.assembler import program_address
+from algoworld_contracts.contracts import config_from_dict, contract_name
+from algoworld_contracts.decoder import DecodedProgram, decode_program
+from algoworld_contracts.toolkit.classifier import LifecycleEvent, _groups, branch_kind
+from algoworld_contracts.toolkit.clients import (
+    DEFAULT_INDEXER_ADDRESS,
+    DEFAULT_TOKEN,
+    PooledIndexerClient,
+)
+
+"""
+Historical backfill of swap lifecycle events
+Splits a round range into shards processed by worker processes. Each worker
+pages through the logic signature transactions of its shard, fetches the
+blocks holding them and labels the groups whose logic signature decodes to an
+AlgoWorld contract (see `decoder`) with the branch matching their layout.
+Confirmed groups were approved by their logic signatures, so no predicate is
+run. Events are written to SQLite together with the checkpoint of their
+shard, so that an interrupted backfill resumes where each shard stopped.
+"""
+
+DEFAULT_SHARD_SIZE = 10_000
+DEFAULT_CHECKPOINT_ROUNDS = 1_000
+PAGE_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    first_round INTEGER PRIMARY KEY,
+    last_round INTEGER NOT NULL,
+    next_round INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    txid TEXT PRIMARY KEY,
+    round INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    escrow TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    group_id TEXT NOT NULL,
+    txids TEXT NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_round ON events (round);
+CREATE INDEX IF NOT EXISTS events_by_escrow ON events (escrow, round);
+"""
+
+Shard = Tuple[int, int, int]
+
+
+# CLASSIFICATION
+################################################################
+def classify_transactions(
+    transactions: List[dict],
+    decode: Callable[[bytes], Optional[DecodedProgram]] = decode_program,
+) -> List[LifecycleEvent]:
+    """
+    Return the lifecycle events of confirmed `transactions`, in the indexer
+    JSON encoding, listed in block order. Only transactions sent by the
+    escrow of their logic signature program are classified.
+    """
+    events = []
+    for group in _groups(transactions, "group"):
+        shape = tuple(txn["tx-type"] for txn in group)
+        for index, txn in enumerate(group):
+            logicsig = txn.get("signature", {}).get("logicsig")
+            if logicsig is None:
+                continue
+            program = base64.b64decode(logicsig["logic"])
+            # Delegated signatures sign the program for an ordinary account
+            if (
+                "signature" in logicsig
+                or "multisig-signature" in logicsig
+                or txn["sender"] != program_address(program)
+            ):
+                continue
+            decoded = decode(program)
+            if decoded is None:
+                continue
+            kind = branch_kind(decoded.config, shape, index)
+            if kind is not None:
+                events.append(
+                    LifecycleEvent(
+                        kind=kind,
+                        escrow=txn["sender"],
+                        config=decoded.config,
+                        round=txn["confirmed-round"],
+                        group=base64.b64decode(txn.get("group", "")),
+                        txids=[txn["id"] for txn in group],
+                    )
+                )
+                break
+    return events
+
+
+def fetch_events(
+    indexer: indexer.IndexerClient,
+    min_round: int,
+    max_round: int,
+    page_size: int = PAGE_SIZE,
+) -> Tuple[List[LifecycleEvent], int]:
+    """
+    Return the lifecycle events confirmed from `min_round` to `max_round` and
+    the number of blocks read. Only the blocks holding logic signature
+    transactions are fetched.
+    """
+    rounds = set()
+    next_page = None
+    while True:
+        response = indexer.search_transactions(
+            limit=page_size,
+            next_page=next_page,
+            sig_type="lsig",
+            min_round=min_round,
+            max_round=max_round,
+        )
+        rounds.update(txn["confirmed-round"] for txn in response["transactions"])
+        next_page = response.get("next-token")
+        if not next_page or not response["transactions"]:
+            break
+
+    events = []
+    for round in sorted(rounds):
+        events += classify_transactions(indexer.block_info(round)["transactions"])
+    return events, len(rounds)
+
+
+# STORE
+################################################################
+class BackfillStore:
+    """
+    Shards and lifecycle events of a backfill, stored in the SQLite database
+    at `path`, which workers of other processes open concurrently.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self) -> "BackfillStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def plan(self, first_round: int, last_round: int, shard_size: int) -> List[Shard]:
+        """
+        Split the rounds from `first_round` to `last_round` not yet planned
+        into shards of `shard_size` rounds, and return the unfinished shards
+        as `(first_round, last_round, next_round)`. Planned rounds keep their
+        shards, so that a rerun resumes from their checkpoints.
+        """
+        with self._lock, self._db:
+            planned = self._db.execute(
+                "SELECT first_round, last_round FROM shards ORDER BY first_round"
+            ).fetchall()
+            gaps = []
+            start = first_round
+            for first, last in [*planned, (last_round + 1, last_round + 1)]:
+                if first > start:
+                    gaps.append((start, min(first - 1, last_round)))
+                start = max(start, last + 1)
+            self._db.executemany(
+                "INSERT INTO shards VALUES (?, ?, ?)",
+                [
+                    (first, min(first + shard_size - 1, end), first)
+                    for start, end in gaps
+                    for first in range(start, end + 1, shard_size)
+                ],
+            )
+            return self._db.execute(
+                "SELECT first_round, last_round, next_round FROM shards "
+                "WHERE next_round <= last_round ORDER BY first_round"
+            ).fetchall()
+
+    def checkpoint(self, shard: int, next_round: int, events: List[LifecycleEvent]):
+        """
+        Store `events` and mark the rounds of `shard` before `next_round` as
+        done, atomically.
+        """
+        rows = [
+            (
+                event.txids[0],
+                event.round,
+                event.kind,
+                contract_name(event.config),
+                event.escrow,
+                event.config.swap_creator,
+                base64.b64encode(event.group).decode(),
+                json.dumps(event.txids),
+                json.dumps(dataclasses.asdict(event.config)),
+            )
+            for event in events
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.execute(
+                "UPDATE shards SET next_round = ? WHERE first_round = ?",
+                (next_round, shard),
+            )
+
+    #### Lookups
+
+    def events(
+        self,
+        escrow: Optional[str] = None,
+        min_round: int = 0,
+        max_round: Optional[int] = None,
+    ) -> List[LifecycleEvent]:
+        """
+        Return the stored events from `min_round` to `max_round`, of `escrow`
+        if given, oldest first.
+        """
+        query = "SELECT * FROM events WHERE round >= ? AND round <= ?"
+        params: list = [min_round, max_round if max_round is not None else 2**63 - 1]
+        if escrow is not None:
+            query += " AND escrow = ?"
+            params.append(escrow)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY round, txid", params).fetchall()
+        return [
+            LifecycleEvent(
+                kind=kind,
+                escrow=escrow,
+                config=config_from_dict(json.loads(config), contract),
+                round=round,
+                group=base64.b64decode(group_id),
+                txids=json.loads(txids),
+            )
+            for _, round, kind, contract, escrow, _, group_id, txids, config in rows
+        ]
+
+    def progress(self) -> Dict[str, int]:
+        """
+        Return the number of planned and done rounds and of stored events.
+        """
+        with self._lock:
+            planned, done = self._db.execute(
+                "SELECT COALESCE(SUM(last_round - first_round + 1), 0), "
+                "COALESCE(SUM(next_round - first_round), 0) FROM shards"
+            ).fetchone()
+            (events,) = self._db.execute("SELECT COUNT(*) FROM events").fetchone()
+        return {"planned_rounds": planned, "done_rounds": done, "events": events}
+
+
+# BACKFILL
+################################################################
+def backfill_shard(
+    shard: Shard,
+    indexer: indexer.IndexerClient,
+    store: BackfillStore,
+    checkpoint_rounds: int = DEFAULT_CHECKPOINT_ROUNDS,
+    page_size: int = PAGE_SIZE,
+) -> Dict[str, int]:
+    """
+    Process the rounds of `shard` from its checkpoint, storing a checkpoint
+    every `checkpoint_rounds` rounds, and return the counts of rounds,
+    fetched blocks and events.
+    """
+    first_round, last_round, next_round = shard
+    counts = {"rounds": 0, "blocks": 0, "events": 0}
+    while next_round <= last_round:
+        end = min(next_round + checkpoint_rounds - 1, last_round)
+        events, blocks = fetch_events(indexer, next_round, end, page_size)
+        store.checkpoint(first_round, end + 1, events)
+        counts["rounds"] += end + 1 - next_round
+        counts["blocks"] += blocks
+        counts["events"] += len(events)
+        next_round = end + 1
+    return counts
+
+
+def _backfill_shards(
+    shards: List[Shard],
+    path: str,
+    indexer_address: str,
+    indexer_token: str,
+    checkpoint_rounds: int,
+    page_size: int,
+) -> List[Dict[str, int]]:
+    client = PooledIndexerClient(indexer_token, indexer_address)
+    with BackfillStore(path) as store:
+        return [
+            backfill_shard(shard, client, store, checkpoint_rounds, page_size)
+            for shard in shards
+        ]
+
+
+def backfill(
+    path: str,
+    first_round: int,
+    last_round: int,
+    indexer_address: str = DEFAULT_INDEXER_ADDRESS,
+    indexer_token: str = DEFAULT_TOKEN,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    processes: Optional[int] = None,
+    checkpoint_rounds: int = DEFAULT_CHECKPOINT_ROUNDS,
+    page_size: int = PAGE_SIZE,
+) -> Dict[str, float]:
+    """
+    Backfill the lifecycle events from `first_round` to `last_round` into the
+    SQLite database at `path`, spreading shards of `shard_size` rounds across
+    `processes` worker processes (one per core by default), and return the
+    counts of the run with its duration.
+    """
+    start = time.perf_counter()
+    with BackfillStore(path) as store:
+        shards = store.plan(first_round, last_round, shard_size)
+
+    backfill_shards = partial(
+        _backfill_shards,
+        path=path,
+        indexer_address=indexer_address,
+        indexer_token=indexer_token,
+        checkpoint_rounds=checkpoint_rounds,
+        page_size=page_size,
+    )
+    totals = {"shards": len(shards), "rounds": 0, "blocks": 0, "events": 0}
+    for _, results in map_chunks(
+        backfill_shards, shards, processes, chunk_size=1, ordered=False
+    ):
+        for counts in results:
+            for key, value in counts.items():
+                totals[key] += value
+    return {**totals, "seconds": time.perf_counter() - start}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="algoworld-contracts-backfill",
+        description="Backfill the swapper and proxy lifecycle events of a round "
+        "range from an indexer into a SQLite database, resuming from its "
+        "checkpoints.",
+    )
+    parser.add_argument("database", help="path of the SQLite database")
+    parser.add_argument("--first-round", type=int, default=1)
+    parser.add_argument(
+        "--last-round",
+        type=int,
+        help="last round to backfill (default: last round of the indexer)",
+    )
+    parser.add_argument("--indexer-address", default=DEFAULT_INDEXER_ADDRESS)
+    parser.add_argument("--indexer-token", default=DEFAULT_TOKEN)
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument(
+        "--checkpoint-rounds", type=int, default=DEFAULT_CHECKPOINT_ROUNDS
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        help="number of worker processes (default: one per core)",
+    )
+    args = parser.parse_args(argv)
+
+    last_round = args.last_round
+    if last_round is None:
+        client = PooledIndexerClient(args.indexer_token, args.indexer_address)
+        last_round = client.health()["round"]
+    counts = backfill(
+        args.database,
+        args.first_round,
+        last_round,
+        args.indexer_address,
+        args.indexer_token,
+        args.shard_size,
+        args.processes,
+        args.checkpoint_rounds,
+    )
+    json.dump(counts, sys.stdout)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import dataclasses
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from algosdk import constants, encoding
+from algosdk.future.transaction import Transaction
+from algosdk.v2client import algod
+
+from algoworld_contracts import contracts
+from algoworld_contracts.swapper import asa_to_asa_swapper as asa_to_asa
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import (
+    STORE_GSIZE,
+    STORE_PROXY_NOTE,
+    SwapProxy,
+)
+from algoworld_contracts.toolkit.confirmations import (
+    block_transaction_dicts,
+    fetch_block,
+)
+
+"""
+Swap lifecycle classifier
+Labels the groups of followed blocks as the opt-in, swap or close of watched
+swappers. Each branch of a swapper has a fixed layout: its group size, the
+type of each transaction and the position of a transaction sent by the
+escrow. Layouts index the watched escrows, so that a group costs a dict lookup
+on its shape and the sender at each escrow position of that shape, and only
+groups sent by a watched escrow in the layout of one of its branches run the
+full predicate of the swapper.
+"""
+
+PAY = constants.payment_txn
+AXFER = constants.assettransfer_txn
+
+Shape = Tuple[str, ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class Layout:
+    # Type of each transaction of the group
+    shape: Shape
+    # Position of a transaction sent by the escrow
+    escrow_index: int
+
+
+@dataclasses.dataclass
+class LifecycleEvent:
+    # Branch of the swapper, "optin", "swap" or "close", or "store" for proxies
+    kind: str
+    escrow: str
+    config: contracts.SwapConfig
+    round: int
+    group: bytes
+    txids: List[str]
+
+
+def _shape(size: int, types: Dict[int, str], default: str) -> Shape:
+    return tuple(types.get(i, default) for i in range(size))
+
+
+def branch_layouts(cfg: contracts.SwapConfig) -> Dict[str, Layout]:
+    """
+    Return the layout of each branch of the swapper described by `cfg`.
+    """
+    if isinstance(cfg, AsaToAsaSwapConfig):
+        return {
+            "optin": Layout(
+                _shape(
+                    asa_to_asa.ASA_OPTIN_GROUP_SIZE,
+                    {asa_to_asa.OPTIN_FEE: PAY, asa_to_asa.ASA_OPTIN: AXFER},
+                    PAY,
+                ),
+                asa_to_asa.ASA_OPTIN,
+            ),
+            "swap": Layout(
+                _shape(
+                    asa_to_asa.ASA_SWAP_GROUP_SIZE,
+                    {
+                        asa_to_asa.OFFERED_ASA_XFER: AXFER,
+                        asa_to_asa.REQUESTED_ASA_XFER: AXFER,
+                        asa_to_asa.INCENTIVE_FEE: PAY,
+                    },
+                    PAY,
+                ),
+                asa_to_asa.OFFERED_ASA_XFER,
+            ),
+            "close": Layout(
+                _shape(
+                    asa_to_asa.CLOSE_SWAP_GROUP_SIZE,
+                    {
+                        asa_to_asa.ASA_CLOSE: AXFER,
+                        asa_to_asa.SWAP_CLOSE: PAY,
+                        asa_to_asa.PROOF: PAY,
+                    },
+                    PAY,
+                ),
+                asa_to_asa.ASA_CLOSE,
+            ),
+        }
+
+    if isinstance(cfg, AsasToAlgoSwapConfig):
+        # Headers and bottoms are payments around the offered ASA transfers
+        layouts = {}
+        for kind, size, header, bottom in (
+            ("optin", cfg.optin_gsize, cfg.optin_header, cfg.optin_bottom),
+            ("swap", cfg.swap_gsize, cfg.swap_header, cfg.swap_bottom),
+            (
+                "close",
+                cfg.close_swap_gsize,
+                cfg.close_swap_header,
+                cfg.close_swap_bottom,
+            ),
+        ):
+            payments = {i: PAY for i in [*header.values(), *bottom.values()]}
+            layouts[kind] = Layout(_shape(size, payments, AXFER), len(header))
+        return layouts
+
+    if isinstance(cfg, SwapProxy):
+        return {"store": Layout(_shape(STORE_GSIZE.value, {}, PAY), STORE_PROXY_NOTE)}
+
+    raise TypeError(f"Unsupported swap config type {type(cfg).__name__}")
+
+
+def branch_kind(
+    cfg: contracts.SwapConfig, shape: Shape, escrow_index: int
+) -> Optional[str]:
+    """
+    Return the branch of the swapper described by `cfg` with layout `shape`
+    and `escrow_index`, if any.
+    """
+    for kind, layout in branch_layouts(cfg).items():
+        if layout == Layout(shape, escrow_index):
+            return kind
+    return None
+
+
+@dataclasses.dataclass
+class _Candidate:
+    kind: str
+    escrow: str
+    config: contracts.SwapConfig
+    predicate: Callable[..., bool]
+
+
+class SwapClassifier:
+    """
+    Classifier of the groups of watched swappers, see `watch`.
+    """
+
+    def __init__(self, configs: Iterable[contracts.SwapConfig] = ()):
+        # shape -> escrow index -> escrow public key -> candidate branches
+        self._index: Dict[Shape, Dict[int, Dict[bytes, List[_Candidate]]]] = {}
+        self.groups = 0
+        self.checked = 0
+        self.round: Optional[int] = None
+        for cfg in configs:
+            self.watch(cfg)
+
+    def watch(self, cfg: contracts.SwapConfig) -> str:
+        """
+        Classify the groups of the swapper described by `cfg` and return its
+        escrow address.
+        """
+        escrow = contracts.get_escrow_address(cfg)
+        public_key = encoding.decode_address(escrow)
+        predicate = contracts.get_predicate(cfg)
+        for kind, layout in branch_layouts(cfg).items():
+            by_escrow = self._index.setdefault(layout.shape, {}).setdefault(
+                layout.escrow_index, {}
+            )
+            by_escrow.setdefault(public_key, []).append(
+                _Candidate(kind, escrow, cfg, predicate)
+            )
+        return escrow
+
+    #### Classification
+
+    def classify_group(
+        self, txns: List[dict], round: int = 0
+    ) -> Optional[LifecycleEvent]:
+        """
+        Return the lifecycle event of group `txns`, msgpack transaction dicts
+        genesis fields included, if it is approved by a watched swapper.
+        """
+        self.groups += 1
+        by_index = self._index.get(tuple(txn.get("type") for txn in txns))
+        if by_index is None:
+            return None
+
+        for escrow_index, by_escrow in by_index.items():
+            candidates = by_escrow.get(txns[escrow_index].get("snd"))
+            if not candidates:
+                continue
+            group = [Transaction.undictify(txn) for txn in txns]
+            for candidate in candidates:
+                self.checked += 1
+                if candidate.predicate(group, escrow_index):
+                    return LifecycleEvent(
+                        kind=candidate.kind,
+                        escrow=candidate.escrow,
+                        config=candidate.config,
+                        round=round,
+                        group=txns[0].get("grp", b""),
+                        txids=[txn.get_txid() for txn in group],
+                    )
+        return None
+
+    def classify_block(self, block: dict) -> List[LifecycleEvent]:
+        """
+        Return the lifecycle events of `block`, a msgpack decoded algod block.
+        """
+        round = block["block"]["rnd"]
+        events = []
+        for group in _groups([txn for txn, _ in block_transaction_dicts(block)]):
+            # No swapper branch has a single transaction
+            if len(group) > 1:
+                event = self.classify_group(group, round)
+                if event is not None:
+                    events.append(event)
+        self.round = round
+        return events
+
+    def follow(
+        self, algod: algod.AlgodClient, round: Optional[int] = None
+    ) -> Iterator[LifecycleEvent]:
+        """
+        Yield the lifecycle events of the blocks of `algod` from `round`, by
+        default the next one, waiting for each block to be confirmed.
+        """
+        last_round = algod.status()["last-round"]
+        if round is None:
+            round = last_round + 1
+        while True:
+            if round > last_round:
+                last_round = algod.status_after_block(round - 1)["last-round"]
+                if round > last_round:
+                    continue
+            yield from self.classify_block(fetch_block(algod, round))
+            round += 1
+
+
+def _groups(txns: List[dict], key: str = "grp") -> Iterator[List[dict]]:
+    """
+    Yield the groups of `txns`, whose transactions are adjacent in a block,
+    with group ids under `key`.
+    """
+    group: List[dict] = []
+    for txn in txns:
+        gid = txn.get(key)
+        if group and (gid is None or gid != group[0].get(key)):
+            yield group
+            group = []
+        group.append(txn)
+        if gid is None:
+            yield group
+            group = []
+    if group:
+        yield group
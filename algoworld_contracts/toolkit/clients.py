@@ -0,0 +1,313 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import copy
+import http.client
+import json
+import queue
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from algosdk import constants, error
+from algosdk.future.transaction import SuggestedParams
+from algosdk.v2client import algod, indexer
+
+"""
+Pooled algod and indexer clients
+The SDK clients open a new connection for every request. The clients below
+keep up to `pool_size` keep-alive connections per node and share them across
+threads, and `ParamsCache` serves suggested params from memory until the TTL
+expires or a later round is observed, so that a burst of transactions costs
+one params fetch.
+"""
+
+DEFAULT_ALGOD_ADDRESS = "http://localhost:4001"
+DEFAULT_INDEXER_ADDRESS = "http://localhost:8980"
+DEFAULT_TOKEN = "a" * 64
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30.0
+# About one block time
+DEFAULT_PARAMS_TTL = 4.0
+
+API_VERSION_PREFIX = "/v2"
+
+# Raised when a pooled connection was closed by the node while idle
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+# Methods safe to send again when the node may have received them
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of keep-alive HTTP connections to `address`, holding at
+    most `maxsize` idle connections.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        maxsize: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        url = urlsplit(address)
+        if url.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported address {address}")
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+        self.timeout = timeout
+        self.created = 0
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(
+            maxsize
+        )
+
+    def _connect(self) -> http.client.HTTPConnection:
+        self.created += 1
+        connection_type = (
+            http.client.HTTPSConnection
+            if self.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_type(self.host, self.port, timeout=self.timeout)
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, bytes]:
+        """
+        Send a request and return the response status and body. A request
+        failing on a stale pooled connection is sent again on a new one when
+        idempotent, or when the failure happened before it was written.
+        """
+        try:
+            connection, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self._connect(), False
+        try:
+            written = False
+            try:
+                connection.request(method, self.base_path + path, body, headers or {})
+                written = True
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused or (written and method not in IDEMPOTENT_METHODS):
+                    raise
+                connection.close()
+                connection = self._connect()
+                response = self._send(connection, method, path, body, headers)
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            try:
+                self._idle.put_nowait(connection)
+            except queue.Full:
+                connection.close()
+        return response.status, data
+
+    def _send(self, connection, method, path, body, headers):
+        connection.request(method, self.base_path + path, body, headers or {})
+        return connection.getresponse()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _request_path(requrl: str, params: Optional[dict]) -> str:
+    if requrl not in constants.unversioned_paths:
+        requrl = API_VERSION_PREFIX + requrl
+    if params:
+        requrl = requrl + "?" + urlencode(params)
+    return requrl
+
+
+def _error_message(data: bytes) -> str:
+    text = data.decode("utf-8", "replace")
+    try:
+        return json.loads(text)["message"]
+    except (ValueError, KeyError, TypeError):
+        return text
+
+
+class PooledAlgodClient(algod.AlgodClient):
+    """
+    `algod.AlgodClient` sending its requests over a `ConnectionPool`.
+    """
+
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        super().__init__(algod_token, algod_address, headers)
+        self.pool = ConnectionPool(algod_address, pool_size)
+
+    def algod_request(
+        self,
+        method,
+        requrl,
+        params=None,
+        data=None,
+        headers=None,
+        response_format="json",
+    ):
+        header = {"User-Agent": "py-algorand-sdk", **(self.headers or {})}
+        header.update(headers or {})
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+
+        status, body = self.pool.request(
+            method, _request_path(requrl, params), data, header
+        )
+        if status >= 400:
+            raise error.AlgodHTTPError(_error_message(body), status)
+        if response_format != "json":
+            return body
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise error.AlgodResponseError(
+                "Failed to parse JSON response from algod"
+            ) from e
+
+
+class PooledIndexerClient(indexer.IndexerClient):
+    """
+    `indexer.IndexerClient` sending its requests over a `ConnectionPool`.
+    """
+
+    def __init__(
+        self,
+        indexer_token: str,
+        indexer_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+    ):
+        super().__init__(indexer_token, indexer_address, headers)
+        self.pool = ConnectionPool(indexer_address, pool_size)
+
+    def indexer_request(self, method, requrl, params=None, data=None, headers=None):
+        header = {"User-Agent": "py-algorand-sdk", **(self.headers or {})}
+        header.update(headers or {})
+        if requrl not in constants.no_auth and self.indexer_token:
+            header[constants.indexer_auth_header] = self.indexer_token
+
+        status, body = self.pool.request(
+            method, _request_path(requrl, params), data, header
+        )
+        if status >= 400:
+            raise error.IndexerHTTPError(_error_message(body))
+        return json.loads(body)
+
+
+@lru_cache(maxsize=None)
+def algod_client(
+    address: str = DEFAULT_ALGOD_ADDRESS, token: str = DEFAULT_TOKEN
+) -> PooledAlgodClient:
+    """
+    Return the client shared by all callers of the algod node at `address`.
+    """
+    return PooledAlgodClient(token, address)
+
+
+@lru_cache(maxsize=None)
+def indexer_client(
+    address: str = DEFAULT_INDEXER_ADDRESS, token: str = DEFAULT_TOKEN
+) -> PooledIndexerClient:
+    """
+    Return the client shared by all callers of the indexer at `address`.
+    """
+    return PooledIndexerClient(token, address)
+
+
+class ParamsCache:
+    """
+    Suggested params of `client` fetched at most once per `ttl` seconds, and
+    again as soon as a round later than the cached one is observed.
+    Concurrent callers of a stale cache wait for a single fetch.
+    """
+
+    def __init__(
+        self,
+        client: algod.AlgodClient,
+        ttl: float = DEFAULT_PARAMS_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.clock = clock
+        self.fetches = 0
+        self._params: Optional[SuggestedParams] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def round(self) -> Optional[int]:
+        params = self._params
+        return params.first if params else None
+
+    def get(self) -> SuggestedParams:
+        """
+        Return a copy of the cached params, fetching them when stale.
+        """
+        with self._lock:
+            if self._params is None or self.clock() - self._fetched_at > self.ttl:
+                self._params = self.client.suggested_params()
+                self._fetched_at = self.clock()
+                self.fetches += 1
+            return copy.copy(self._params)
+
+    def observe_round(self, round: int):
+        """
+        Drop the cached params if `round` is later than their round.
+        """
+        with self._lock:
+            if self._params is not None and round > self._params.first:
+                self._params = None
+
+    def invalidate(self):
+        with self._lock:
+            self._params = None
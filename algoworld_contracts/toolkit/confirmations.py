@@ -0,0 +1,314 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import base64
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, List, Optional, Tuple, Union
+
+import msgpack
+from algosdk import constants, encoding, error
+from algosdk.v2client import algod
+
+from algoworld_contracts.toolkit.clients import ParamsCache
+
+"""
+Block driven confirmations
+`wait_for_confirmation` polls the pending info of each transaction id. The
+tracker below follows rounds once for all callers instead: it waits for each
+block with `/v2/status/wait-for-block-after`, fetches it, and resolves the
+futures of every transaction id or group id it holds, so that confirmation
+costs two requests per block whatever the number of transactions in flight.
+"""
+
+DEFAULT_WAIT_ROUNDS = 4
+# Backoff in seconds between attempts at a round failing to be followed
+RETRY_DELAY = 0.25
+MAX_RETRY_DELAY = 8.0
+# Failed attempts at a round before failing the transactions due by it
+RETRIES = 4
+
+Key = Union[str, bytes]
+
+
+def fetch_block(algod: algod.AlgodClient, round: int) -> dict:
+    """Return block `round` of `algod` in its msgpack decoded encoding."""
+    raw = algod.block_info(round, response_format="msgpack")
+    return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+def block_transaction_dicts(block: dict) -> List[Tuple[dict, dict]]:
+    """
+    Return the transactions of `block`, a msgpack decoded algod block, as
+    pairs of their msgpack transaction dict, genesis fields included, and
+    their signed transaction in block.
+    """
+    header = block["block"]
+    result = []
+    for stib in header.get("txns", []):
+        txn = dict(stib["txn"])
+        if stib.get("hgi"):
+            txn["gen"] = header["gen"]
+        # Networks requiring the genesis hash leave it out of every transaction
+        txn["gh"] = header["gh"]
+        result.append((txn, stib))
+    return result
+
+
+def _canonical(value):
+    # Blocks already omit zero values, canonical msgpack also sorts map keys
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def transaction_id(txn: dict) -> str:
+    """
+    Return the id of `txn`, a msgpack transaction dict with its genesis
+    fields, hashing its canonical encoding rather than decoding it, so that
+    transaction types unknown to the SDK keep their id.
+    """
+    packed = msgpack.packb(_canonical(txn), use_bin_type=True)
+    digest = encoding.checksum(constants.txid_prefix + packed)
+    return base64.b32encode(digest).decode().strip("=")
+
+
+def block_transactions(block: dict) -> List[dict]:
+    """
+    Return the confirmed transactions of `block`, a msgpack decoded algod
+    block, as pending transaction infos holding their `txid` and `group`.
+    """
+    infos = []
+    for txn, stib in block_transaction_dicts(block):
+        info = {
+            "confirmed-round": block["block"]["rnd"],
+            "pool-error": "",
+            "txid": transaction_id(txn),
+            "group": txn.get("grp"),
+        }
+        if "caid" in stib:
+            info["asset-index"] = stib["caid"]
+        if "ca" in stib:
+            info["closing-amount"] = stib["ca"]
+        if "aca" in stib:
+            info["asset-closing-amount"] = stib["aca"]
+        infos.append(info)
+    return infos
+
+
+class _Pending:
+    def __init__(self, last_round: int):
+        self.future: Future = Future()
+        self.last_round = last_round
+
+
+class ConfirmationTracker:
+    """
+    Confirmations of the transactions sent to `algod`, resolved by a single
+    thread following its blocks. Every followed round is also reported to
+    `params`, when set.
+
+    Transactions must be tracked before they are sent, and their futures
+    fail with `ConfirmationTimeoutError` once `wait_rounds` rounds passed
+    without them. A round that can't be followed is retried with backoff,
+    and after `RETRIES` attempts the futures due by that round fail with the
+    error.
+    """
+
+    def __init__(
+        self,
+        algod: algod.AlgodClient,
+        params: Optional[ParamsCache] = None,
+        wait_rounds: int = DEFAULT_WAIT_ROUNDS,
+    ):
+        self.algod = algod
+        self.params = params
+        self.wait_rounds = wait_rounds
+        self.blocks = 0
+        self._pending: Dict[Key, _Pending] = {}
+        # Last followed round, None while nothing is pending
+        self._round: Optional[int] = None
+        self._last_round = 0
+        self._changed = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def track(self, txid: str, wait_rounds: Optional[int] = None) -> Future:
+        """
+        Return a future of the pending transaction info of `txid` once
+        confirmed.
+        """
+        return self._track(txid, wait_rounds)
+
+    def track_group(self, group: bytes, wait_rounds: Optional[int] = None) -> Future:
+        """
+        Return a future of the pending transaction infos of the transactions
+        of group id `group` once confirmed.
+        """
+        return self._track(group, wait_rounds)
+
+    def _track(self, key: Key, wait_rounds: Optional[int]) -> Future:
+        with self._changed:
+            if self._stopped:
+                raise RuntimeError("confirmation tracker is stopped")
+            if self._round is None:
+                # Blocks before the tracked transaction is sent can't hold it
+                self._round = self._last_round = self.algod.status()["last-round"]
+            if wait_rounds is None:
+                wait_rounds = self.wait_rounds
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _Pending(self._last_round + wait_rounds)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._follow, name="confirmation-tracker", daemon=True
+                )
+                self._thread.start()
+            self._changed.notify_all()
+            return pending.future
+
+    def stop(self):
+        """
+        Stop following blocks and cancel the pending futures.
+        """
+        with self._changed:
+            self._stopped = True
+            for pending in self._pending.values():
+                pending.future.cancel()
+            self._pending.clear()
+            self._changed.notify_all()
+
+    def __enter__(self) -> "ConfirmationTracker":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    #### Following
+
+    def _next_round(self) -> Optional[int]:
+        with self._changed:
+            while not self._stopped:
+                for key, pending in list(self._pending.items()):
+                    if pending.future.cancelled():
+                        del self._pending[key]
+                if self._pending:
+                    return self._round + 1  # type: ignore
+                self._round = None
+                self._changed.wait()
+            return None
+
+    def _follow(self):
+        failures = 0
+        while True:
+            round = self._next_round()
+            if round is None:
+                return
+            try:
+                if round > self._last_round:
+                    status = self.algod.status_after_block(round - 1)
+                    self._last_round = status["last-round"]
+                    if round > self._last_round:
+                        continue
+                infos = block_transactions(fetch_block(self.algod, round))
+            except Exception as e:
+                failures += 1
+                if failures >= RETRIES:
+                    self._fail(round, e)
+                self._backoff(failures)
+                continue
+            failures = 0
+            self._resolve(round, infos)
+
+    def _backoff(self, failures: int):
+        deadline = time.monotonic() + min(
+            RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY
+        )
+        with self._changed:
+            while not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._changed.wait(remaining)
+
+    def _resolve(self, round: int, infos: List[dict]):
+        groups: Dict[bytes, List[dict]] = {}
+        for info in infos:
+            if info["group"]:
+                groups.setdefault(info["group"], []).append(info)
+
+        with self._changed:
+            self.blocks += 1
+            self._round = round
+            for info in infos:
+                pending = self._pending.pop(info["txid"], None)
+                if pending:
+                    _set_result(pending.future, info)
+            for group, group_infos in groups.items():
+                pending = self._pending.pop(group, None)
+                if pending:
+                    _set_result(pending.future, group_infos)
+            for key, pending in list(self._pending.items()):
+                if round >= pending.last_round:
+                    del self._pending[key]
+                    _set_exception(
+                        pending.future,
+                        error.ConfirmationTimeoutError(
+                            f"Wait for transaction id {_key_name(key)} timed out"
+                        ),
+                    )
+        if self.params is not None:
+            self.params.observe_round(round)
+
+    def _fail(self, round: int, exception: Exception):
+        # Later transactions may still be confirmed once the round is followed
+        with self._changed:
+            for key, pending in list(self._pending.items()):
+                if round >= pending.last_round:
+                    del self._pending[key]
+                    _set_exception(pending.future, exception)
+
+
+def _key_name(key: Key) -> str:
+    return base64.b64encode(key).decode() if isinstance(key, bytes) else key
+
+
+# Futures may be cancelled by their callers at any time
+
+
+def _set_result(future: Future, result: object):
+    try:
+        future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _set_exception(future: Future, exception: BaseException):
+    try:
+        future.set_exception(exception)
+    except InvalidStateError:
+        pass
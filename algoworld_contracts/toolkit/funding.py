@@ -0,0 +1,123 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, List, Optional, Sequence
+
+from algosdk import account
+from algosdk.future.transaction import PaymentTxn
+
+from algoworld_contracts.common.evaluator import MAX_GROUP_SIZE
+from algoworld_contracts.toolkit.transactions import Toolkit, Wallet, pack
+
+"""
+Wallet funding
+`Funder` pays any number of wallets from one dispenser account in groups of
+up to 16 payments confirmed together, and `WalletPool` hands out wallets
+funded ahead of time in such groups, so that a test session resolves its
+dispenser once and funds its wallets a group at a time.
+"""
+
+DEFAULT_FUNDING_AMOUNT = 10 * 10**6
+FUNDING_NOTE = b"Initial funds"
+
+
+class Funder:
+    """
+    Funds wallets from `dispenser` through `toolkit`.
+    """
+
+    def __init__(self, toolkit: Toolkit, dispenser: Wallet):
+        self.toolkit = toolkit
+        self.dispenser = dispenser
+
+    def fund(
+        self,
+        addresses: Sequence[str],
+        amount: int = DEFAULT_FUNDING_AMOUNT,
+        note: Optional[bytes] = FUNDING_NOTE,
+    ) -> List[dict]:
+        """
+        Pay `amount` to each of `addresses` and return the pending transaction
+        infos of the payments once confirmed.
+        """
+        params = self.toolkit.suggested_params()
+        txns = [
+            PaymentTxn(self.dispenser.public_key, params, address, amount, None, note)
+            for address in addresses
+        ]
+        return self.toolkit.send_batch_wait(pack([self.dispenser] * len(txns), txns))
+
+    def fund_wallets(
+        self, count: int, amount: int = DEFAULT_FUNDING_AMOUNT
+    ) -> List[Wallet]:
+        """Create `count` wallets and fund each with `amount`."""
+        wallets = [Wallet(*account.generate_account()) for _ in range(count)]
+        self.fund([wallet.public_key for wallet in wallets], amount)
+        return wallets
+
+
+class WalletPool:
+    """
+    Wallets funded with `amount` by `funder`, `batch_size` at a time as the
+    pool runs out. Each wallet is handed out once.
+    """
+
+    def __init__(
+        self,
+        funder: Funder,
+        amount: int = DEFAULT_FUNDING_AMOUNT,
+        batch_size: int = MAX_GROUP_SIZE,
+    ):
+        self.funder = funder
+        self.amount = amount
+        self.batch_size = batch_size
+        self._wallets: Deque[Wallet] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._wallets)
+
+    def fill(self, count: int):
+        """Fund wallets until at least `count` are available."""
+        with self._lock:
+            self._fill(count)
+
+    def _fill(self, count: int):
+        missing = count - len(self._wallets)
+        if missing > 0:
+            # Whole groups cost the same block as partial ones
+            batches = -(-missing // self.batch_size)
+            self._wallets.extend(
+                self.funder.fund_wallets(batches * self.batch_size, self.amount)
+            )
+
+    def take(self) -> Wallet:
+        return self.take_many(1)[0]
+
+    def take_many(self, count: int) -> List[Wallet]:
+        with self._lock:
+            self._fill(count)
+            return [self._wallets.popleft() for _ in range(count)]
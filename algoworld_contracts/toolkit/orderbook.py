@@ -0,0 +1,300 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import dataclasses
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from algoworld_contracts import contracts
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.toolkit.classifier import LifecycleEvent
+
+"""
+Open swap order book
+Indexes the open swaps of the escrows by asset pair, cheapest unit price
+first, by requested ASA, smallest requested amount first, and the ASA bundles
+offered for ALGO by their price, and proposes the swaps that the holdings of
+a taker can fill. Each index is a sorted list split
+in buckets of bounded size, so that inserting or removing a swap costs a
+binary search and a bounded move within one bucket, and a query reads the
+first keys of one index.
+"""
+
+# Asset id of ALGO in holdings, payments and receipts
+ALGO = 0
+
+BUCKET_SIZE = 512
+
+
+@dataclasses.dataclass(frozen=True)
+class Match:
+    escrow: str
+    config: contracts.SwapConfig
+    # Amounts by asset id paid by the taker, incentive fee included
+    pays: Dict[int, int]
+    # Amounts by asset id received by the taker
+    receives: Dict[int, int]
+
+
+class _SortedList:
+    """
+    Sorted list of unique keys, split in buckets of at most 2 * `BUCKET_SIZE`
+    keys indexed by their last key.
+    """
+
+    def __init__(self):
+        self._buckets: List[list] = []
+        self._maxes: list = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key):
+        self._len += 1
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            return
+        i = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        bucket = self._buckets[i]
+        insort(bucket, key)
+        self._maxes[i] = bucket[-1]
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self._buckets[i : i + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self._maxes[i : i + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+
+    def irange(self, stop=None) -> Iterator:
+        """Iterate over the keys lower than `stop`, in order."""
+        end = len(self._buckets)
+        if stop is not None:
+            end = min(bisect_left(self._maxes, stop) + 1, end)
+        for i in range(end):
+            bucket = self._buckets[i]
+            if stop is not None and i == end - 1:
+                bucket = bucket[: bisect_left(bucket, stop)]
+            yield from bucket
+
+
+def _offered_asas(cfg: AsasToAlgoSwapConfig) -> Dict[int, int]:
+    # Decoded and loaded configs key the bundle by str
+    return {int(asa): amount for asa, amount in cfg.offered_asa_amounts.items()}
+
+
+def _discard(books: Dict[int, _SortedList], index, key):
+    book = books[index]
+    book.remove(key)
+    if not book:
+        del books[index]
+
+
+def _algo_price(cfg: AsasToAlgoSwapConfig) -> int:
+    return cfg.requested_algo_amount + cfg.incentive_fee_amount
+
+
+class OrderBook:
+    """
+    In memory book of the open swaps of escrows.
+    """
+
+    def __init__(self):
+        self._swaps: Dict[str, contracts.SwapConfig] = {}
+        # (offered, requested) -> (unit price, requested amount, escrow)
+        self._pairs: Dict[Tuple[int, int], _SortedList] = {}
+        # Requested ASA -> (requested amount, unit price, escrow)
+        self._requested: Dict[int, _SortedList] = {}
+        # (price, escrow) of the bundles for ALGO, all and by offered ASA
+        self._algo = _SortedList()
+        self._algo_by_asa: Dict[int, _SortedList] = {}
+
+    def __len__(self) -> int:
+        return len(self._swaps)
+
+    def __contains__(self, escrow: str) -> bool:
+        return escrow in self._swaps
+
+    def get(self, escrow: str) -> Optional[contracts.SwapConfig]:
+        return self._swaps.get(escrow)
+
+    #### Updates
+
+    def add(self, escrow: str, cfg: contracts.SwapConfig):
+        """Open the swap of `escrow`, replacing its previous config."""
+        if self._swaps.get(escrow) == cfg:
+            return
+        self.remove(escrow)
+        if isinstance(cfg, AsaToAsaSwapConfig):
+            price = cfg.requested_asa_amount / cfg.offered_asa_amount
+            self._pairs.setdefault(
+                (cfg.offered_asa_id, cfg.requested_asa_id), _SortedList()
+            ).add((price, cfg.requested_asa_amount, escrow))
+            self._requested.setdefault(cfg.requested_asa_id, _SortedList()).add(
+                (cfg.requested_asa_amount, price, escrow)
+            )
+        elif isinstance(cfg, AsasToAlgoSwapConfig):
+            key = (_algo_price(cfg), escrow)
+            self._algo.add(key)
+            for asa in _offered_asas(cfg):
+                self._algo_by_asa.setdefault(asa, _SortedList()).add(key)
+        else:
+            raise ValueError(f"{type(cfg).__name__} is not a swap")
+        self._swaps[escrow] = cfg
+
+    def remove(self, escrow: str) -> Optional[contracts.SwapConfig]:
+        """Close the swap of `escrow` and return its config, if open."""
+        cfg = self._swaps.pop(escrow, None)
+        if isinstance(cfg, AsaToAsaSwapConfig):
+            price = cfg.requested_asa_amount / cfg.offered_asa_amount
+            pair = (cfg.offered_asa_id, cfg.requested_asa_id)
+            _discard(self._pairs, pair, (price, cfg.requested_asa_amount, escrow))
+            _discard(
+                self._requested,
+                cfg.requested_asa_id,
+                (cfg.requested_asa_amount, price, escrow),
+            )
+        elif isinstance(cfg, AsasToAlgoSwapConfig):
+            key = (_algo_price(cfg), escrow)
+            self._algo.remove(key)
+            for asa in _offered_asas(cfg):
+                _discard(self._algo_by_asa, asa, key)
+        return cfg
+
+    def apply(self, event: LifecycleEvent):
+        """
+        Follow a lifecycle event: an opt-in opens the swap of the escrow, and
+        a swap or a close leaves the escrow empty.
+        """
+        if event.kind == "optin":
+            self.add(event.escrow, event.config)
+        elif event.kind in ("swap", "close"):
+            self.remove(event.escrow)
+
+    #### Queries
+
+    def asa_offers(
+        self,
+        offered_asa_id: int,
+        requested_asa_id: int,
+        max_requested_amount: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, AsaToAsaSwapConfig]]:
+        """
+        Return the swaps of `offered_asa_id` for `requested_asa_id`, cheapest
+        requested amount per offered unit first.
+        """
+        book = self._pairs.get((offered_asa_id, requested_asa_id))
+        offers: List[Tuple[str, AsaToAsaSwapConfig]] = []
+        if book is None or limit == 0:
+            return offers
+        for _, requested_amount, escrow in book.irange():
+            if max_requested_amount is None or requested_amount <= max_requested_amount:
+                offers.append((escrow, self._swaps[escrow]))
+                if len(offers) == limit:
+                    break
+        return offers
+
+    def algo_offers(
+        self,
+        offered_asa_id: Optional[int] = None,
+        max_price: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, AsasToAlgoSwapConfig]]:
+        """
+        Return the bundles offered for ALGO, all or those holding
+        `offered_asa_id`, cheapest first. The price of a bundle is the ALGO
+        paid by the taker, incentive fee included.
+        """
+        if offered_asa_id is None:
+            book = self._algo
+        elif offered_asa_id in self._algo_by_asa:
+            book = self._algo_by_asa[offered_asa_id]
+        else:
+            return []
+        # Keys of a price compare lower than the tuple of the next price
+        stop = None if max_price is None else (max_price + 1,)
+        offers: List[Tuple[str, AsasToAlgoSwapConfig]] = []
+        if limit == 0:
+            return offers
+        for _, escrow in book.irange(stop):
+            offers.append((escrow, self._swaps[escrow]))
+            if len(offers) == limit:
+                break
+        return offers
+
+    #### Matching
+
+    def match(self, holdings: Mapping[int, int], limit: int = 10) -> List[Match]:
+        """
+        Propose the swaps that a taker holding `holdings`, amounts by asset
+        id with ALGO under `ALGO`, can fill. Each proposal is fillable on its
+        own, transaction fees aside: for each held ASA, at most `limit` swaps
+        requesting it, smallest requested amount first, then at most `limit`
+        bundles for ALGO, cheapest first.
+        """
+        algos = holdings.get(ALGO, 0)
+        matches: List[Match] = []
+        for requested, held in holdings.items():
+            if requested == ALGO or held <= 0 or requested not in self._requested:
+                continue
+            count = 0
+            for amount, _, escrow in self._requested[requested].irange((held + 1,)):
+                cfg = self._swaps[escrow]
+                if cfg.incentive_fee_amount > algos:
+                    continue
+                matches.append(
+                    Match(
+                        escrow,
+                        cfg,
+                        {requested: amount, ALGO: cfg.incentive_fee_amount},
+                        {cfg.offered_asa_id: cfg.offered_asa_amount},
+                    )
+                )
+                count += 1
+                if count == limit:
+                    break
+
+        for escrow, cfg in self.algo_offers(max_price=algos, limit=limit):
+            matches.append(
+                Match(escrow, cfg, {ALGO: _algo_price(cfg)}, _offered_asas(cfg))
+            )
+        return matches
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "swaps": len(self._swaps),
+            "pairs": len(self._pairs),
+            "algo_offers": len(self._algo),
+        }
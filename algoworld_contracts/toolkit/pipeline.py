@@ -0,0 +1,329 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import asyncio
+import dataclasses
+import math
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, DefaultDict, Dict, List, Optional, Sequence
+
+from algoworld_contracts.toolkit.transactions import (
+    Group,
+    LogicSigWallet,
+    Toolkit,
+    Wallet,
+)
+
+"""
+Asynchronous swap lifecycle
+`SwapPipeline` runs the swap lifecycle operations of a `Toolkit` from
+asyncio. Groups are built, signed and sent by a small pool of threads, and
+their confirmations are awaited on the futures of the toolkit confirmation
+tracker, so that waiting costs no thread. At most `concurrency` operations are
+in flight; further ones wait for a slot, which holds back the workflows
+driving them.
+"""
+
+DEFAULT_CONCURRENCY = 64
+DEFAULT_SUBMIT_WORKERS = 8
+
+
+@dataclasses.dataclass
+class LatencyStats:
+    """
+    Latencies in seconds of the operations of one kind, from their start to
+    their confirmation, and the number of failed ones.
+    """
+
+    samples: List[float] = dataclasses.field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def record(self, seconds: float, failed: bool = False):
+        if failed:
+            self.errors += 1
+        else:
+            self.samples.append(seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Return the nearest rank `percent` percentile of the latencies."""
+        if not self.samples:
+            return math.nan
+        ordered = sorted(self.samples)
+        rank = math.ceil(percent / 100 * len(ordered))
+        return ordered[max(rank, 1) - 1]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": sum(self.samples) / self.count if self.samples else math.nan,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": max(self.samples, default=math.nan),
+        }
+
+
+class SwapPipeline:
+    """
+    asyncio front of the swap lifecycle operations of `toolkit`, keeping at
+    most `concurrency` of them in flight and sending their groups from
+    `submit_workers` threads. The latencies of each operation are recorded
+    in `metrics` under its name.
+    """
+
+    def __init__(
+        self,
+        toolkit: Toolkit,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        submit_workers: int = DEFAULT_SUBMIT_WORKERS,
+    ):
+        self.toolkit = toolkit
+        self.concurrency = concurrency
+        self.metrics: DefaultDict[str, LatencyStats] = defaultdict(LatencyStats)
+        self.in_flight = 0
+        self.waiting = 0
+        self._executor = ThreadPoolExecutor(
+            submit_workers, thread_name_prefix="swap-pipeline"
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def close(self):
+        self._executor.shutdown()
+
+    async def __aenter__(self) -> "SwapPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: stats.summary() for name, stats in self.metrics.items()}
+
+    #### Operations
+
+    async def fund(
+        self,
+        sender: Wallet,
+        receiver: str,
+        amount: int,
+        note: Optional[bytes] = None,
+    ) -> dict:
+        infos = await self._run(
+            "fund", lambda: [self.toolkit.pay_group(sender, receiver, amount, note)]
+        )
+        return infos[0]
+
+    async def swapper_opt_in(
+        self,
+        swap_creator: Wallet,
+        swapper_account: LogicSigWallet,
+        assets: Dict[int, int],
+        funding_amount: int,
+    ) -> dict:
+        infos = await self._run(
+            "swapper_opt_in",
+            lambda: [
+                self.toolkit.swapper_opt_in_group(
+                    swap_creator, swapper_account, assets, funding_amount
+                )
+            ],
+        )
+        return infos[0]
+
+    async def swapper_deposit(
+        self,
+        swap_creator: Wallet,
+        swapper_account: LogicSigWallet,
+        assets: Dict[int, int],
+    ) -> List[dict]:
+        """
+        Deposit `assets` to the swapper in groups confirmed together, and
+        return the pending transaction info of each deposit.
+        """
+        return await self._run(
+            "swapper_deposit",
+            lambda: self.toolkit.swapper_deposit_groups(
+                swap_creator, swapper_account, assets
+            ),
+        )
+
+    async def asa_to_asa_swap(
+        self,
+        offered_asset_sender: LogicSigWallet,
+        offered_asset_receiver: Wallet,
+        offered_assets: Dict[int, int],
+        requested_asset_sender: Wallet,
+        requested_asset_receiver: Wallet,
+        requested_assets: Dict[int, int],
+        incentive_wallet: Wallet,
+        incentive_amount: int,
+    ) -> dict:
+        infos = await self._run(
+            "asa_to_asa_swap",
+            lambda: [
+                self.toolkit.asa_to_asa_swap_group(
+                    offered_asset_sender,
+                    offered_asset_receiver,
+                    offered_assets,
+                    requested_asset_sender,
+                    requested_asset_receiver,
+                    requested_assets,
+                    incentive_wallet,
+                    incentive_amount,
+                )
+            ],
+        )
+        return infos[0]
+
+    async def asa_to_algo_swap(
+        self,
+        offered_assets_sender: LogicSigWallet,
+        offered_assets_receiver: Wallet,
+        offered_assets: Dict[int, int],
+        requested_algo_amount: int,
+        requested_algo_sender: Wallet,
+        requested_algo_receiver: Wallet,
+        incentive_wallet: Wallet,
+        incentive_amount: int,
+    ) -> dict:
+        infos = await self._run(
+            "asa_to_algo_swap",
+            lambda: [
+                self.toolkit.asa_to_algo_swap_group(
+                    offered_assets_sender,
+                    offered_assets_receiver,
+                    offered_assets,
+                    requested_algo_amount,
+                    requested_algo_sender,
+                    requested_algo_receiver,
+                    incentive_wallet,
+                    incentive_amount,
+                )
+            ],
+        )
+        return infos[0]
+
+    async def close_swap(
+        self,
+        asset_sender: LogicSigWallet,
+        asset_receiver: Wallet,
+        asset_close_to: Wallet,
+        asset_ids: Sequence[int],
+        swapper_funds_sender: LogicSigWallet,
+        swapper_funds_receiver: Wallet,
+        swapper_funds_close_to: Wallet,
+        proof_sender: Wallet,
+        proof_receiver: Wallet,
+        asset_amt: int = 0,
+        swapper_funds_amt: int = 0,
+        proof_amt: int = 0,
+    ) -> dict:
+        infos = await self._run(
+            "close_swap",
+            lambda: [
+                self.toolkit.close_swap_group(
+                    asset_sender,
+                    asset_receiver,
+                    asset_close_to,
+                    asset_ids,
+                    swapper_funds_sender,
+                    swapper_funds_receiver,
+                    swapper_funds_close_to,
+                    proof_sender,
+                    proof_receiver,
+                    asset_amt,
+                    swapper_funds_amt,
+                    proof_amt,
+                )
+            ],
+        )
+        return infos[0]
+
+    async def activate_or_save_proxy_note(
+        self,
+        creator: Wallet,
+        proxy: LogicSigWallet,
+        note: str,
+        fee_amount: int,
+        tx_fee_amount: int,
+        note_amount: int,
+    ) -> dict:
+        infos = await self._run(
+            "activate_or_save_proxy_note",
+            lambda: [
+                self.toolkit.activate_or_save_proxy_note_group(
+                    creator, proxy, note, fee_amount, tx_fee_amount, note_amount
+                )
+            ],
+        )
+        return infos[0]
+
+    #### Submission
+
+    def _send(self, build: Callable[[], List[Group]]) -> List[Future]:
+        return self.toolkit.send_batch_async(build())
+
+    async def _run(
+        self, operation: str, build: Callable[[], List[Group]]
+    ) -> List[dict]:
+        """
+        Build, sign and send the groups of `build` once a slot is free, and
+        return the pending transaction infos of all their transactions once
+        confirmed.
+        """
+        if self._slots is None:
+            # Created within the running loop, which python 3.9 binds it to
+            self._slots = asyncio.Semaphore(self.concurrency)
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            confirmations = await loop.run_in_executor(
+                self._executor, self._send, build
+            )
+            infos = await asyncio.gather(
+                *(asyncio.wrap_future(confirmation) for confirmation in confirmations)
+            )
+        except BaseException:
+            self.metrics[operation].record(time.perf_counter() - start, failed=True)
+            raise
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+        self.metrics[operation].record(time.perf_counter() - start)
+        return [info for group_infos in infos for info in group_infos]
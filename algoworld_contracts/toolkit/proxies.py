@@ -0,0 +1,205 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import base64
+import dataclasses
+import sqlite3
+import threading
+from typing import List, Optional
+
+from algosdk.v2client import indexer
+
+from algoworld_contracts.contracts import get_escrow_address
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+
+"""
+Swap proxy notes index
+Swap creators store the `ipfs://` links of their swap configurations in the
+notes of payments sent by their swap proxy. `ProxyIndex` keeps those notes in
+a local SQLite database and reads only the rounds after the last synced one
+from the indexer, so that the latest configuration of a creator is a local
+lookup.
+"""
+
+PAGE_SIZE = 1000
+PROXY_NOTE_PREFIX = b"ipfs://"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proxies (
+    proxy TEXT PRIMARY KEY,
+    creator TEXT NOT NULL,
+    version TEXT NOT NULL,
+    synced_round INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS notes (
+    txid TEXT PRIMARY KEY,
+    proxy TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    intra_round_offset INTEGER NOT NULL,
+    note TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_by_creator
+    ON notes (creator, round DESC, intra_round_offset DESC);
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class ProxyNote:
+    creator: str
+    proxy: str
+    round: int
+    intra_round_offset: int
+    txid: str
+    note: str
+
+
+class ProxyIndex:
+    """
+    Notes of the watched swap proxies, stored in the SQLite database at
+    `path` and synced from `indexer` in pages of `page_size` transactions.
+    Lookups don't use the indexer, which may be None for a read only index.
+    """
+
+    def __init__(
+        self,
+        indexer: Optional[indexer.IndexerClient],
+        path: str = ":memory:",
+        page_size: int = PAGE_SIZE,
+    ):
+        self.indexer = indexer
+        self.page_size = page_size
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self) -> "ProxyIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def watch(self, creator: str, version: str) -> str:
+        """
+        Watch the swap proxy of `creator` at `version` and return its address.
+        """
+        proxy = get_escrow_address(SwapProxy(creator, version))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO proxies (proxy, creator, version) "
+                "VALUES (?, ?, ?)",
+                (proxy, creator, version),
+            )
+        return proxy
+
+    def synced_round(self, proxy: str) -> Optional[int]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT synced_round FROM proxies WHERE proxy = ?", (proxy,)
+            ).fetchone()
+        return row[0] if row else None
+
+    #### Lookups
+
+    def latest(self, creator: str) -> Optional[ProxyNote]:
+        """Return the last note stored by a proxy of `creator`."""
+        notes = self._notes(creator, 1)
+        return notes[0] if notes else None
+
+    def notes(self, creator: str) -> List[ProxyNote]:
+        """Return the notes stored by the proxies of `creator`, newest first."""
+        return self._notes(creator, -1)
+
+    def _notes(self, creator: str, limit: int) -> List[ProxyNote]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT creator, proxy, round, intra_round_offset, txid, note "
+                "FROM notes WHERE creator = ? "
+                "ORDER BY round DESC, intra_round_offset DESC LIMIT ?",
+                (creator, limit),
+            ).fetchall()
+        return [ProxyNote(*row) for row in rows]
+
+    #### Syncing
+
+    def sync(self) -> int:
+        """
+        Read the notes confirmed since the last sync of each watched proxy and
+        return the number of new notes.
+        """
+        with self._lock:
+            proxies = self._db.execute(
+                "SELECT proxy, creator, synced_round FROM proxies"
+            ).fetchall()
+        return sum(self._sync(*proxy) for proxy in proxies)
+
+    def _sync(self, proxy: str, creator: str, synced_round: int) -> int:
+        assert self.indexer is not None, "a read only index can't sync"
+        min_round = synced_round + 1
+        rows = []
+        next_page = None
+        while True:
+            response = self.indexer.search_transactions(
+                limit=self.page_size,
+                next_page=next_page,
+                note_prefix=PROXY_NOTE_PREFIX,
+                txn_type="pay",
+                min_round=min_round,
+                address=proxy,
+                address_role="sender",
+            )
+            # Each page continues after the previous one, so that once the
+            # last page is read every round up to its current round is synced
+            synced_round = max(synced_round, response["current-round"])
+            for txn in response["transactions"]:
+                synced_round = max(synced_round, txn["confirmed-round"])
+                if txn["payment-transaction"]["receiver"] != proxy:
+                    continue
+                note = base64.b64decode(txn.get("note", ""))
+                rows.append(
+                    (
+                        txn["id"],
+                        proxy,
+                        creator,
+                        txn["confirmed-round"],
+                        txn["intra-round-offset"],
+                        note.decode("utf-8", "replace"),
+                    )
+                )
+            next_page = response.get("next-token")
+            if not next_page or not response["transactions"]:
+                break
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO notes VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.execute(
+                "UPDATE proxies SET synced_round = ? WHERE proxy = ?",
+                (synced_round, proxy),
+            )
+        return len(rows)
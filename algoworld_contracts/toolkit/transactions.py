@@ -0,0 +1,783 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import base64
+import dataclasses
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from algosdk.error import IndexerHTTPError
+from algosdk.future.transaction import (
+    AssetConfigTxn,
+    AssetTransferTxn,
+    LogicSig,
+    LogicSigTransaction,
+    PaymentTxn,
+    SignedTransaction,
+    SuggestedParams,
+    Transaction,
+    calculate_group_id,
+    write_to_file,
+)
+from algosdk.v2client import algod, indexer
+
+from algoworld_contracts.common.evaluator import MAX_GROUP_SIZE
+from algoworld_contracts.toolkit.clients import (
+    DEFAULT_PARAMS_TTL,
+    ParamsCache,
+    algod_client,
+    indexer_client,
+)
+from algoworld_contracts.toolkit.confirmations import (
+    DEFAULT_WAIT_ROUNDS,
+    ConfirmationTracker,
+)
+
+"""
+Transaction toolkit
+Builds, signs and submits the transaction groups of the swapper lifecycle:
+ASA minting and opt-ins, swapper opt-in and deposit, swaps, closing and proxy
+notes. All calls of a `Toolkit` share its pooled clients and its suggested
+params cache, and confirmations are resolved from the blocks followed by a
+single `ConfirmationTracker`.
+"""
+
+INDEXER_TIMEOUT = 10.0
+INDEXER_POLL_INTERVAL = 0.1
+DEFAULT_ASSET_URL = "https://path/to/my/asset/details"
+
+
+@dataclasses.dataclass
+class Wallet:
+    private_key: str
+    public_key: str
+
+
+@dataclasses.dataclass
+class LogicSigWallet:
+    logicsig: LogicSig
+    public_key: str
+
+
+Signer = Union[Wallet, LogicSigWallet]
+
+
+def sign(wallet: Signer, txn: Transaction) -> SignedTransaction:
+    """
+    Sign `txn` with the private key or the logic signature of `wallet`.
+    """
+    if isinstance(wallet, LogicSigWallet):
+        return LogicSigTransaction(txn, wallet.logicsig)  # type: ignore
+
+    assert wallet.private_key
+    return txn.sign(wallet.private_key)
+
+
+def sign_group(signers: Sequence[Signer], txns: Sequence[Transaction]) -> list:
+    """
+    Assign a group id to `txns` and sign each with its signer.
+    """
+    assert len(signers) == len(txns)
+    gid = calculate_group_id(txns)
+    for txn in txns:
+        txn.group = gid
+    return [sign(signer, txn) for signer, txn in zip(signers, txns)]
+
+
+@dataclasses.dataclass
+class Group:
+    """
+    Unsigned transactions of one submission, each with its signer. Groups of
+    a single transaction are signed without a group id.
+    """
+
+    signers: List[Signer]
+    transactions: List[Transaction]
+
+    def sign(self) -> list:
+        if len(self.transactions) == 1:
+            return [sign(self.signers[0], self.transactions[0])]
+        return sign_group(self.signers, self.transactions)
+
+
+def pack(
+    signers: Sequence[Signer],
+    transactions: Sequence[Transaction],
+    size: int = MAX_GROUP_SIZE,
+) -> List[Group]:
+    """
+    Pack independent `transactions` into as few groups of at most `size`
+    transactions as possible.
+    """
+    assert len(signers) == len(transactions)
+    return [
+        Group(list(signers[i : i + size]), list(transactions[i : i + size]))
+        for i in range(0, len(transactions), size)
+    ]
+
+
+class Toolkit:
+    """
+    Swapper lifecycle operations against `algod` and `indexer`, by default the
+    shared pooled clients of the local node. Signed groups are also written to
+    `debug_path`, when set, for debugging with `tealdbg`.
+    """
+
+    def __init__(
+        self,
+        algod: Optional[algod.AlgodClient] = None,
+        indexer: Optional[indexer.IndexerClient] = None,
+        params_ttl: float = DEFAULT_PARAMS_TTL,
+        wait_rounds: int = DEFAULT_WAIT_ROUNDS,
+        debug_path: Optional[str] = None,
+    ):
+        self.algod = algod or algod_client()
+        self.indexer = indexer or indexer_client()
+        self.params = ParamsCache(self.algod, params_ttl)
+        # Params of the previous round would yield the same ids for repeated
+        # transactions, so that the tracker refreshes them once per round
+        self.confirmations = ConfirmationTracker(self.algod, self.params, wait_rounds)
+        self.wait_rounds = wait_rounds
+        self.debug_path = debug_path
+
+    def suggested_params(self) -> SuggestedParams:
+        return self.params.get()
+
+    #### Submission
+
+    def send(self, signed: Sequence[object]) -> str:
+        """
+        Submit signed group `signed` and return the id of its first
+        transaction.
+        """
+        if self.debug_path:
+            write_to_file(list(signed), self.debug_path, overwrite=True)
+        return self.algod.send_transactions(signed)
+
+    def send_async(self, signed: Sequence[object]) -> Future:
+        """
+        Submit signed group `signed` and return a future of the pending
+        transaction info of its first transaction once confirmed.
+        """
+        confirmation = self.confirmations.track(signed[0].get_txid())  # type: ignore
+        try:
+            self.send(signed)
+        except BaseException:
+            confirmation.cancel()
+            raise
+        return confirmation
+
+    def send_wait(self, signed: Sequence[object]) -> dict:
+        """
+        Submit signed group `signed` and return the pending transaction info
+        of its first transaction once confirmed.
+        """
+        return self.send_async(signed).result()
+
+    def sign_send_wait(self, wallet: Signer, txn: Transaction) -> dict:
+        """Sign a transaction, submit it, and wait for its confirmation."""
+        return self.send_wait([sign(wallet, txn)])
+
+    def group_sign_send_wait(
+        self, signers: Sequence[Signer], txns: Sequence[Transaction]
+    ) -> dict:
+        """
+        Sign and send group transaction to network and wait for confirmation.
+        """
+        return self.send_wait(sign_group(signers, txns))
+
+    def send_group_wait(self, group: Group) -> dict:
+        return self.send_wait(group.sign())
+
+    def send_batch_async(self, groups: Sequence[Group]) -> List[Future]:
+        """
+        Submit `groups` one after the other, without waiting in between, and
+        return futures of the pending transaction infos of the transactions
+        of each group once confirmed.
+
+        When a submission fails, the futures of the groups submitted before
+        it are set as the `confirmations` attribute of the raised exception.
+        """
+        confirmations: List[Future] = []
+        for group in groups:
+            signed = sign_group(group.signers, group.transactions)
+            confirmation = self.confirmations.track_group(
+                signed[0].transaction.group  # type: ignore
+            )
+            try:
+                self.send(signed)
+            except BaseException as e:
+                confirmation.cancel()
+                e.confirmations = confirmations  # type: ignore
+                raise
+            confirmations.append(confirmation)
+        return confirmations
+
+    def send_batch_wait(self, groups: Sequence[Group]) -> List[dict]:
+        """
+        Submit `groups` and return the pending transaction infos of all their
+        transactions once confirmed.
+        """
+        return [
+            info
+            for confirmation in self.send_batch_async(groups)
+            for info in confirmation.result()
+        ]
+
+    #### Programs
+
+    def compile(self, teal_source: str) -> bytes:
+        """Compile and return teal binary code."""
+        return base64.b64decode(self.algod.compile(teal_source)["result"])
+
+    def logic_signature(self, teal_source: str) -> LogicSig:
+        """Create and return logic signature for provided `teal_source`."""
+        return LogicSig(self.compile(teal_source))
+
+    def logic_sig_wallet(self, teal_source: str) -> LogicSigWallet:
+        logicsig = self.logic_signature(teal_source)
+        return LogicSigWallet(logicsig, logicsig.address())
+
+    #### Accounts
+
+    def pay_group(
+        self,
+        sender: Wallet,
+        receiver: str,
+        amount: int,
+        note: Optional[bytes] = None,
+    ) -> Group:
+        txn = PaymentTxn(
+            sender.public_key, self.suggested_params(), receiver, amount, None, note
+        )
+        return Group([sender], [txn])
+
+    def pay(
+        self,
+        sender: Wallet,
+        receiver: str,
+        amount: int,
+        note: Optional[bytes] = None,
+    ) -> dict:
+        return self.send_group_wait(self.pay_group(sender, receiver, amount, note))
+
+    def account_balance(self, address: str) -> int:
+        """Return funds balance of the account having provided address."""
+        return self.algod.account_info(address).get("amount")
+
+    def transaction_info(
+        self, transaction_id: str, timeout: float = INDEXER_TIMEOUT
+    ) -> dict:
+        """
+        Return transaction with provided id from the indexer, waiting up to
+        `timeout` seconds for the indexer to catch up.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.indexer.transaction(transaction_id)
+            except IndexerHTTPError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        "Timeout reached waiting for transaction to be available "
+                        "in indexer"
+                    )
+                time.sleep(INDEXER_POLL_INTERVAL)
+
+    #### ASA
+
+    def mint_asa_txn(
+        self,
+        creator: Wallet,
+        asset_name: str,
+        total: int,
+        decimals: int,
+        url: str = DEFAULT_ASSET_URL,
+        params: Optional[SuggestedParams] = None,
+    ) -> Transaction:
+        return AssetConfigTxn(
+            sender=creator.public_key,
+            sp=params or self.suggested_params(),
+            total=total,
+            default_frozen=False,
+            unit_name="",
+            asset_name=asset_name,
+            manager=creator.public_key,
+            reserve=creator.public_key,
+            freeze=creator.public_key,
+            clawback=creator.public_key,
+            url=url,
+            decimals=decimals,
+        )
+
+    def mint_asa(
+        self,
+        creator: Wallet,
+        asset_name: str,
+        total: int,
+        decimals: int,
+        url: str = DEFAULT_ASSET_URL,
+    ) -> int:
+        """Mint an ASA managed by `creator` and return its id."""
+        txn = self.mint_asa_txn(creator, asset_name, total, decimals, url)
+        return self.sign_send_wait(creator, txn)["asset-index"]
+
+    def mint_asas(
+        self,
+        creator: Wallet,
+        assets: Sequence[Tuple[str, int, int]],
+        url: str = DEFAULT_ASSET_URL,
+    ) -> List[int]:
+        """
+        Mint an ASA managed by `creator` for each `(asset_name, total,
+        decimals)` of `assets`, in groups confirmed together, and return
+        their ids.
+        """
+        params = self.suggested_params()
+        txns = [
+            self.mint_asa_txn(creator, asset_name, total, decimals, url, params)
+            for asset_name, total, decimals in assets
+        ]
+        infos = self.send_batch_wait(pack([creator] * len(txns), txns))
+        return [info["asset-index"] for info in infos]
+
+    def opt_in_asa_groups(self, wallet: Wallet, assets: Sequence[int]) -> List[Group]:
+        params = self.suggested_params()
+        txns = [
+            AssetTransferTxn(
+                sender=wallet.public_key,
+                sp=params,
+                receiver=wallet.public_key,
+                amt=0,
+                index=asset_id,
+            )
+            for asset_id in assets
+        ]
+        return pack([wallet] * len(txns), txns)
+
+    def opt_in_asa(self, wallet: Wallet, assets: Sequence[int]) -> Optional[str]:
+        """
+        Submit the opt-ins of `wallet` to `assets` in groups, without waiting
+        for confirmation, and return the id of the last transaction.
+        """
+        txid = None
+        for group in self.opt_in_asa_groups(wallet, assets):
+            signed = group.sign()
+            self.send(signed)
+            txid = signed[-1].get_txid()
+        return txid
+
+    def opt_in_asas(self, wallet: Wallet, assets: Sequence[int]) -> List[dict]:
+        """
+        Opt `wallet` in to `assets` in groups confirmed together.
+        """
+        return self.send_batch_wait(self.opt_in_asa_groups(wallet, assets))
+
+    #### Swapper lifecycle groups
+    # Unsigned groups of the lifecycle operations, built with the cached params
+
+    def swapper_opt_in_group(
+        self,
+        swap_creator: Wallet,
+        swapper_account: LogicSigWallet,
+        assets: Dict[int, int],
+        funding_amount: int,
+    ) -> Group:
+        params = self.suggested_params()
+
+        signers: List[Signer] = [swap_creator]
+        transactions: List[Transaction] = [
+            PaymentTxn(
+                sender=swap_creator.public_key,
+                sp=params,
+                receiver=swapper_account.public_key,
+                amt=funding_amount,
+            )
+        ]
+
+        for asset_id, asset_amount in assets.items():
+            signers.append(swapper_account)
+            transactions.append(
+                AssetTransferTxn(
+                    sender=swapper_account.public_key,
+                    sp=params,
+                    receiver=swapper_account.public_key,
+                    amt=asset_amount,
+                    index=asset_id,
+                )
+            )
+
+        return Group(signers, transactions)
+
+    def swapper_deposit_groups(
+        self,
+        swap_creator: Wallet,
+        swapper_account: LogicSigWallet,
+        assets: Dict[int, int],
+    ) -> List[Group]:
+        params = self.suggested_params()
+        txns = [
+            AssetTransferTxn(
+                sender=swap_creator.public_key,
+                sp=params,
+                receiver=swapper_account.public_key,
+                amt=asset_amount,
+                index=asset_id,
+            )
+            for asset_id, asset_amount in assets.items()
+        ]
+        return pack([swap_creator] * len(txns), txns)
+
+    def asa_to_asa_swap_group(
+        self,
+        offered_asset_sender: LogicSigWallet,
+        offered_asset_receiver: Wallet,
+        offered_assets: Dict[int, int],
+        requested_asset_sender: Wallet,
+        requested_asset_receiver: Wallet,
+        requested_assets: Dict[int, int],
+        incentive_wallet: Wallet,
+        incentive_amount: int,
+    ) -> Group:
+        """Group swapping multiple offered asas to multiple requested asas"""
+        params = self.suggested_params()
+
+        signers: List[Signer] = []
+        transactions: List[Transaction] = []
+
+        for offered_asset_id, offered_asset_amt in offered_assets.items():
+            signers.append(offered_asset_sender)
+            transactions.append(
+                AssetTransferTxn(
+                    sender=offered_asset_sender.public_key,
+                    sp=params,
+                    receiver=offered_asset_receiver.public_key,
+                    amt=offered_asset_amt,
+                    index=offered_asset_id,
+                )
+            )
+
+        for requested_asset_id, requested_asset_amt in requested_assets.items():
+            signers.append(requested_asset_sender)
+            transactions.append(
+                AssetTransferTxn(
+                    sender=requested_asset_sender.public_key,
+                    sp=params,
+                    receiver=requested_asset_receiver.public_key,
+                    amt=requested_asset_amt,
+                    index=requested_asset_id,
+                )
+            )
+
+        signers.append(requested_asset_sender)
+        transactions.append(
+            PaymentTxn(
+                sender=requested_asset_sender.public_key,
+                sp=params,
+                receiver=incentive_wallet.public_key,
+                amt=incentive_amount,
+            )
+        )
+
+        return Group(signers, transactions)
+
+    def asa_to_algo_swap_group(
+        self,
+        offered_assets_sender: LogicSigWallet,
+        offered_assets_receiver: Wallet,
+        offered_assets: Dict[int, int],
+        requested_algo_amount: int,
+        requested_algo_sender: Wallet,
+        requested_algo_receiver: Wallet,
+        incentive_wallet: Wallet,
+        incentive_amount: int,
+    ) -> Group:
+        """
+        Group swapping multiple ASAs to ALGO of specified amount.
+        """
+        params = self.suggested_params()
+
+        signers: List[Signer] = []
+        transactions: List[Transaction] = []
+
+        ## Send incentive fees
+        transactions.append(
+            PaymentTxn(
+                sender=requested_algo_sender.public_key,
+                sp=params,
+                receiver=incentive_wallet.public_key,
+                amt=incentive_amount,
+            )
+        )
+        signers.append(requested_algo_sender)
+
+        ## Send algos to creator
+        transactions.append(
+            PaymentTxn(
+                sender=requested_algo_sender.public_key,
+                sp=params,
+                receiver=requested_algo_receiver.public_key,
+                amt=requested_algo_amount,
+            )
+        )
+        signers.append(requested_algo_sender)
+
+        ## Send ASAs
+        for asset_id, asset_amount in offered_assets.items():
+            transactions.append(
+                AssetTransferTxn(
+                    sender=offered_assets_sender.public_key,
+                    sp=params,
+                    receiver=offered_assets_receiver.public_key,
+                    amt=asset_amount,
+                    index=asset_id,
+                )
+            )
+            signers.append(offered_assets_sender)
+
+        return Group(signers, transactions)
+
+    def close_swap_group(
+        self,
+        asset_sender: LogicSigWallet,
+        asset_receiver: Wallet,
+        asset_close_to: Wallet,
+        asset_ids: Sequence[int],
+        swapper_funds_sender: LogicSigWallet,
+        swapper_funds_receiver: Wallet,
+        swapper_funds_close_to: Wallet,
+        proof_sender: Wallet,
+        proof_receiver: Wallet,
+        asset_amt: int = 0,
+        swapper_funds_amt: int = 0,
+        proof_amt: int = 0,
+    ) -> Group:
+        """
+        Group closing a swap by sending the funds back to the original sender.
+        """
+        params = self.suggested_params()
+
+        signers: List[Signer] = []
+        transactions: List[Transaction] = []
+
+        for asset_id in asset_ids:
+            transactions.append(
+                AssetTransferTxn(
+                    sender=asset_sender.public_key,
+                    sp=params,
+                    receiver=asset_receiver.public_key,
+                    amt=asset_amt,
+                    index=asset_id,
+                    close_assets_to=asset_close_to.public_key,
+                )
+            )
+            signers.append(asset_sender)
+
+        transactions.append(
+            PaymentTxn(
+                sender=swapper_funds_sender.public_key,
+                sp=params,
+                receiver=swapper_funds_receiver.public_key,
+                amt=swapper_funds_amt,
+                close_remainder_to=swapper_funds_close_to.public_key,
+            )
+        )
+        signers.append(swapper_funds_sender)
+
+        transactions.append(
+            PaymentTxn(
+                sender=proof_sender.public_key,
+                sp=params,
+                receiver=proof_receiver.public_key,
+                amt=proof_amt,
+            )
+        )
+        signers.append(proof_sender)
+
+        return Group(signers, transactions)
+
+    def activate_or_save_proxy_note_group(
+        self,
+        creator: Wallet,
+        proxy: LogicSigWallet,
+        note: str,
+        fee_amount: int,
+        tx_fee_amount: int,
+        note_amount: int,
+    ) -> Group:
+        params = self.suggested_params()
+
+        fee_tx = PaymentTxn(
+            sender=creator.public_key,
+            sp=params,
+            receiver=proxy.public_key,
+            amt=fee_amount,
+        )
+        fee_tx.fee = tx_fee_amount
+
+        note_tx = PaymentTxn(
+            sender=proxy.public_key,
+            sp=params,
+            receiver=proxy.public_key,
+            amt=note_amount,
+            note=note,
+        )
+        note_tx.fee = 0
+
+        return Group([creator, proxy], [fee_tx, note_tx])
+
+    #### Swapper lifecycle
+
+    def swapper_opt_in(
+        self,
+        swap_creator: Wallet,
+        swapper_account: LogicSigWallet,
+        assets: Dict[int, int],
+        funding_amount: int,
+    ) -> dict:
+        group = self.swapper_opt_in_group(
+            swap_creator, swapper_account, assets, funding_amount
+        )
+        return self.send_group_wait(group)
+
+    def swapper_deposit(
+        self,
+        swap_creator: Wallet,
+        swapper_account: LogicSigWallet,
+        assets: Dict[int, int],
+    ) -> List[dict]:
+        """
+        Deposit `assets` to the swapper in groups confirmed together, and
+        return the pending transaction info of each deposit.
+        """
+        groups = self.swapper_deposit_groups(swap_creator, swapper_account, assets)
+        return self.send_batch_wait(groups)
+
+    def asa_to_asa_swap(
+        self,
+        offered_asset_sender: LogicSigWallet,
+        offered_asset_receiver: Wallet,
+        offered_assets: Dict[int, int],
+        requested_asset_sender: Wallet,
+        requested_asset_receiver: Wallet,
+        requested_assets: Dict[int, int],
+        incentive_wallet: Wallet,
+        incentive_amount: int,
+    ) -> dict:
+        """Swap multiple offered asas to multiple requested asas"""
+        return self.send_group_wait(
+            self.asa_to_asa_swap_group(
+                offered_asset_sender,
+                offered_asset_receiver,
+                offered_assets,
+                requested_asset_sender,
+                requested_asset_receiver,
+                requested_assets,
+                incentive_wallet,
+                incentive_amount,
+            )
+        )
+
+    def asa_to_algo_swap(
+        self,
+        offered_assets_sender: LogicSigWallet,
+        offered_assets_receiver: Wallet,
+        offered_assets: Dict[int, int],
+        requested_algo_amount: int,
+        requested_algo_sender: Wallet,
+        requested_algo_receiver: Wallet,
+        incentive_wallet: Wallet,
+        incentive_amount: int,
+    ) -> dict:
+        """
+        Swap multiple ASAs to ALGO of specified amount.
+        """
+        return self.send_group_wait(
+            self.asa_to_algo_swap_group(
+                offered_assets_sender,
+                offered_assets_receiver,
+                offered_assets,
+                requested_algo_amount,
+                requested_algo_sender,
+                requested_algo_receiver,
+                incentive_wallet,
+                incentive_amount,
+            )
+        )
+
+    def close_swap(
+        self,
+        asset_sender: LogicSigWallet,
+        asset_receiver: Wallet,
+        asset_close_to: Wallet,
+        asset_ids: Sequence[int],
+        swapper_funds_sender: LogicSigWallet,
+        swapper_funds_receiver: Wallet,
+        swapper_funds_close_to: Wallet,
+        proof_sender: Wallet,
+        proof_receiver: Wallet,
+        asset_amt: int = 0,
+        swapper_funds_amt: int = 0,
+        proof_amt: int = 0,
+    ) -> dict:
+        """
+        Close a swap by sending the funds back to the original sender.
+        """
+        return self.send_group_wait(
+            self.close_swap_group(
+                asset_sender,
+                asset_receiver,
+                asset_close_to,
+                asset_ids,
+                swapper_funds_sender,
+                swapper_funds_receiver,
+                swapper_funds_close_to,
+                proof_sender,
+                proof_receiver,
+                asset_amt,
+                swapper_funds_amt,
+                proof_amt,
+            )
+        )
+
+    def activate_or_save_proxy_note(
+        self,
+        creator: Wallet,
+        proxy: LogicSigWallet,
+        note: str,
+        fee_amount: int,
+        tx_fee_amount: int,
+        note_amount: int,
+    ) -> dict:
+        return self.send_group_wait(
+            self.activate_or_save_proxy_note_group(
+                creator,
+                proxy,
+                note,
+                fee_amount,
+                tx_fee_amount,
+                note_amount,
+            )
+        )
@@ -0,0 +1,211 @@
+"""
+MIT License
+
+Copyright (c) 2022 AlgoWorld
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import dataclasses
+from typing import Dict, List, Sequence
+
+from algosdk import encoding
+from pyteal import (
+    Addr,
+    BinaryExpr,
+    Bytes,
+    Cond,
+    EnumInt,
+    Expr,
+    Global,
+    GtxnExpr,
+    Int,
+    NaryExpr,
+    Op,
+    UnaryExpr,
+)
+
+from algoworld_contracts import contracts
+from algoworld_contracts.analyzer import CONTRACT_BRANCHES
+from algoworld_contracts.common.assembler import TXN_TYPES
+from algoworld_contracts.common.dispatch import flatten_and
+from algoworld_contracts.common.evaluator import (
+    ADDRESS_FIELDS,
+    BYTES_FIELDS,
+    DEFAULT_GLOBALS,
+    field_default,
+)
+from algoworld_contracts.common.predicates import (
+    UnsupportedExpressionError,
+    bytes_value,
+)
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "algoworld_contracts.validator requires NumPy, install it with the "
+        "`validator` extra: pip install 'algoworld-contracts[validator]'"
+    ) from e
+
+"""
+Vectorized batch validation
+Checks many candidate groups of the same shape against one branch of a
+contract at once. Groups are given as columns, one array per TEAL field of
+shape `(groups, group size)`, holding uint64 values, raw 32 byte addresses
+(`S32`) or other byte strings (objects). Every check of the branch is
+evaluated as a NumPy comparison over all groups. Requires NumPy, from the
+`validator` extra.
+"""
+
+COMPARISONS = {
+    Op.eq: np.equal,
+    Op.neq: np.not_equal,
+    Op.lt: np.less,
+    Op.gt: np.greater,
+    Op.le: np.less_equal,
+    Op.ge: np.greater_equal,
+}
+
+
+@dataclasses.dataclass
+class BatchValidation:
+    # Whether each group passes every check
+    mask: np.ndarray
+    # Index in `checks` of the first check failed by each group, -1 if none
+    first_failure: np.ndarray
+    checks: List[str]
+
+
+def columns_from_groups(groups: Sequence[Sequence[Dict[str, object]]]):
+    """
+    Return the columns of `groups`, lists of transaction field dicts of the
+    same length, for the fields set in any of their transactions.
+    """
+    fields = sorted({field for group in groups for txn in group for field in txn})
+    columns = {}
+    for field in fields:
+        default = field_default(field)
+        values = [[txn.get(field, default) for txn in group] for group in groups]
+        columns[field] = np.array(values, dtype=_dtype(field))
+    return columns
+
+
+def _dtype(field: str):
+    if field in ADDRESS_FIELDS:
+        return "S32"
+    return object if field in BYTES_FIELDS else np.uint64
+
+
+def branch_checks(program: Expr, branch: int) -> List[Expr]:
+    """
+    Return the checks of `branch` of a `Cond` program built without short
+    circuit dispatch: its group shape checks, then the terms of its body.
+    """
+    if not isinstance(program, Cond):
+        raise UnsupportedExpressionError(type(program).__name__)
+    condition, body = program.args[branch]
+    return flatten_and([condition, body])
+
+
+class _OutOfGroup(Exception):
+    pass
+
+
+def _column(columns: Dict[str, np.ndarray], size: tuple, index: int, field: str):
+    if index >= size[1]:
+        raise _OutOfGroup()
+    if field == "GroupIndex":
+        return np.full(size[0], index, dtype=np.uint64)
+    if field not in columns:
+        return np.full(size[0], field_default(field), dtype=_dtype(field))
+    return columns[field][:, index]
+
+
+def _vector(expr: Expr, columns: Dict[str, np.ndarray], size: tuple):
+    if isinstance(expr, EnumInt):
+        return TXN_TYPES[expr.name]
+    if isinstance(expr, Int):
+        return expr.value
+    if isinstance(expr, Addr):
+        return np.bytes_(encoding.decode_address(expr.address))
+    if isinstance(expr, Bytes):
+        return np.bytes_(bytes_value(expr))
+    if isinstance(expr, Global):
+        name = expr.field.arg_name
+        if name == "GroupSize":
+            return size[1]
+        if name in DEFAULT_GLOBALS:
+            value = DEFAULT_GLOBALS[name]
+            return np.bytes_(value) if isinstance(value, bytes) else value
+    if isinstance(expr, GtxnExpr) and isinstance(expr.txnIndex, int):
+        return _column(columns, size, expr.txnIndex, expr.field.arg_name)
+    if isinstance(expr, BinaryExpr) and expr.op in COMPARISONS:
+        left = _vector(expr.argLeft, columns, size)
+        right = _vector(expr.argRight, columns, size)
+        return COMPARISONS[expr.op](left, right)
+    if isinstance(expr, NaryExpr) and expr.op in (Op.logic_and, Op.logic_or):
+        reduce = np.logical_and if expr.op == Op.logic_and else np.logical_or
+        return reduce.reduce([_truth(arg, columns, size) for arg in expr.args])
+    if isinstance(expr, UnaryExpr) and expr.op == Op.logic_not:
+        return np.logical_not(_truth(expr.arg, columns, size))
+    raise UnsupportedExpressionError(type(expr).__name__)
+
+
+def _truth(expr: Expr, columns: Dict[str, np.ndarray], size: tuple) -> np.ndarray:
+    try:
+        value = np.asarray(_vector(expr, columns, size))
+    except _OutOfGroup:
+        # Reading beyond the group fails the program
+        return np.zeros(size[0], dtype=bool)
+    return np.broadcast_to(value if value.dtype == bool else value != 0, size[:1])
+
+
+def validate_columns(
+    checks: List[Expr], columns: Dict[str, np.ndarray]
+) -> BatchValidation:
+    """
+    Evaluate `checks` on every group of `columns`.
+    """
+    size = next(iter(columns.values())).shape[:2]
+    for field, column in columns.items():
+        if column.shape[:2] != size:
+            raise ValueError(f"column {field} has shape {column.shape}, not {size}")
+
+    passed = np.stack([_truth(check, columns, size) for check in checks])
+    mask = passed.all(axis=0)
+    first_failure = np.where(mask, -1, np.argmin(passed, axis=0))
+    return BatchValidation(mask, first_failure, [str(check) for check in checks])
+
+
+def validate_batch(
+    cfg: contracts.SwapConfig, columns: Dict[str, np.ndarray], branch: str = "swap"
+) -> BatchValidation:
+    """
+    Evaluate the checks of `branch` of the contract described by `cfg` on
+    every group of `columns`. Groups built for another branch fail its group
+    shape checks.
+    """
+    branches = CONTRACT_BRANCHES[contracts.contract_name(cfg)]
+    program = contracts.get_expression(
+        dataclasses.replace(cfg, short_circuit=False)
+        if hasattr(cfg, "short_circuit")
+        else cfg
+    )
+    return validate_columns(branch_checks(program, branches.index(branch)), columns)
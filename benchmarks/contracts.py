@@ -0,0 +1,179 @@
+"""
+Offline benchmarks of AlgoWorld contract generation.
+
+Measures, for every contract shape, the PyTeal AST build and compileTeal
+latency, the template render and assembly latency, memory allocated while
+building and compiling, the TEAL line count, the assembled program size and
+the worst case opcode cost of every `Cond` branch. Results are printed as
+JSON so they can be compared release over release:
+
+    python -m benchmarks.contracts --repeat 20 --output results.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from pyteal import Mode, compileTeal
+
+from algoworld_contracts import contracts
+from algoworld_contracts.analyzer import PROXY_BRANCHES, SWAP_BRANCHES
+from algoworld_contracts.common.analysis import cond_branch_costs
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig, swapper
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+    multi_asa_loop_swapper,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import (
+    BASE_OPTIN_FUNDING_AMOUNT,
+    AsasToAlgoSwapConfig,
+    multi_asa_swapper,
+)
+from algoworld_contracts.swapper.swap_proxy import SwapProxy, swapper_proxy
+
+SWAP_CREATOR = "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ"
+INCENTIVE_FEE_ADDRESS = "RJVRGSPGSPOG7W3V7IMZZ2BAYCABW3YC5MWGKEOPAEEI5ZK5J2GSF6Y26A"
+INCENTIVE_FEE_AMOUNT = 10_000
+
+
+def variants() -> List[tuple]:
+    """
+    Return `(name, config, ast builder, cond branches)` for every shape.
+    """
+    result = [
+        (
+            "swapper",
+            AsaToAsaSwapConfig(
+                SWAP_CREATOR,
+                42,
+                1,
+                69,
+                1,
+                INCENTIVE_FEE_ADDRESS,
+                INCENTIVE_FEE_AMOUNT,
+            ),
+            swapper,
+            SWAP_BRANCHES,
+        ),
+        (
+            "swapper_proxy",
+            SwapProxy(SWAP_CREATOR, "0.0.3"),
+            swapper_proxy,
+            PROXY_BRANCHES,
+        ),
+    ]
+    for body_size in range(1, 6):
+        cfg = AsasToAlgoSwapConfig(
+            SWAP_CREATOR,
+            {1000 + asa: asa + 1 for asa in range(body_size)},
+            1_000_000,
+            1_000,
+            BASE_OPTIN_FUNDING_AMOUNT * body_size,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+        )
+        result.append(
+            (f"multi_swapper_{body_size}", cfg, multi_asa_swapper, SWAP_BRANCHES)
+        )
+    for body_size in (1, 5, AsasToAlgoLoopSwapConfig.MAX_OFFERED_ASAS):
+        cfg = AsasToAlgoLoopSwapConfig(
+            SWAP_CREATOR,
+            {1000 + asa: asa + 1 for asa in range(body_size)},
+            1_000_000,
+            1_000,
+            BASE_OPTIN_FUNDING_AMOUNT * body_size,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+        )
+        result.append(
+            (
+                f"multi_swapper_loop_{body_size}",
+                cfg,
+                multi_asa_loop_swapper,
+                SWAP_BRANCHES,
+            )
+        )
+    return result
+
+
+def timed(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "max_s": max(samples),
+    }
+
+
+def allocations(func: Callable[[], object]) -> Dict[str, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        func()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "peak_bytes": peak,
+        "allocated_blocks": sum(max(s.count_diff, 0) for s in stats),
+    }
+
+
+def compile_stateless(program):
+    return compileTeal(program, Mode.Signature, version=contracts.TEAL_VERSION)
+
+
+def benchmark(name, cfg, build, branches, repeat: int) -> Dict[str, object]:
+    ast = build(cfg)
+    teal = contracts.get_teal(cfg)
+    program = contracts.get_program(cfg)
+    return {
+        "contract": name,
+        "ast_build": timed(lambda: build(cfg), repeat),
+        "compile_teal": timed(lambda: compile_stateless(ast), repeat),
+        "template_render": timed(lambda: contracts.get_teal(cfg), repeat),
+        "assemble": timed(lambda: contracts.get_program(cfg), repeat),
+        "memory": allocations(lambda: compile_stateless(build(cfg))),
+        "teal_lines": len(teal.splitlines()),
+        "program_bytes": len(program),
+        "branch_costs": cond_branch_costs(teal, branches),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout)
+    args = parser.parse_args(argv)
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pyteal": contracts.PYTEAL_VERSION,
+            "algoworld_contracts": contracts.LIBRARY_VERSION,
+            "teal_version": contracts.TEAL_VERSION,
+            "repeat": args.repeat,
+        },
+        "benchmarks": [
+            benchmark(*variant, repeat=args.repeat) for variant in variants()
+        ],
+    }
+    json.dump(results, args.output, indent=2)
+    args.output.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
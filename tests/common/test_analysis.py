@@ -0,0 +1,145 @@
+import pytest
+
+from algoworld_contracts.common.analysis import (
+    cond_branch_costs,
+    execution_paths,
+    parse_teal,
+)
+from algoworld_contracts.common.assembler import TealAssemblyError
+
+COND_PROGRAM = """#pragma version 6
+global GroupSize
+int 1
+==
+bnz main_l3
+global GroupSize
+int 2
+==
+bnz main_l2
+err
+main_l2:
+int 1
+b main_l4
+main_l3:
+byte "a" // comment
+sha256
+len
+main_l4:
+return
+"""
+
+
+def test_parse_teal():
+    instructions, labels = parse_teal(COND_PROGRAM)
+
+    assert instructions[0] == ("global", ["GroupSize"])
+    assert instructions[11] == ("byte", ['"a"'])
+    assert labels == {"main_l2": 9, "main_l3": 11, "main_l4": 14}
+
+
+def test_execution_paths():
+    paths = execution_paths(COND_PROGRAM)
+
+    # The length of the hash is unknown, so its branch may approve or reject
+    assert sorted(paths, key=lambda path: (path.cost, path.approved)) == [
+        (None, False, 9),
+        ("main_l2", True, 11),
+        ("main_l3", False, 42),
+        ("main_l3", True, 42),
+    ]
+
+
+def test_cond_branch_costs():
+    assert cond_branch_costs(COND_PROGRAM, ["single", "pair"]) == {
+        "single": 42,
+        "pair": 11,
+        "reject": 42,
+    }
+
+
+def test_cond_branch_costs_by_exit():
+    # Failed asserts of a branch reject
+    program = COND_PROGRAM.replace(
+        "main_l2:\nint 1\n", "main_l2:\ntxn Fee\nint 0\n==\nassert\nint 1\n"
+    ).replace("len\n", "len\npop\nint 1\n")
+
+    assert cond_branch_costs(program, ["single", "pair"]) == {
+        "single": 44,
+        "pair": 15,
+        "reject": 12,
+    }
+    assert cond_branch_costs("#pragma version 6\nint 1\n", []) == {"approve": 1}
+    assert cond_branch_costs("#pragma version 6\nint 0\n", []) == {"reject": 1}
+
+
+def test_execution_paths_bounded_loop():
+    paths = execution_paths(
+        """#pragma version 6
+int 0
+store 0
+loop:
+load 0
+int 1
++
+dup
+store 0
+int 3
+<
+bnz loop
+txn Fee
+return
+"""
+    )
+
+    assert sorted(paths) == [(None, False, 28), (None, True, 28)]
+
+
+def test_execution_paths_assert():
+    paths = execution_paths(
+        """#pragma version 6
+txn Fee
+int 1
+==
+assert
+int 1
+return
+"""
+    )
+
+    assert sorted(paths) == [(None, False, 4), (None, True, 6)]
+
+
+def test_execution_paths_infeasible():
+    paths = execution_paths(
+        """#pragma version 6
+global GroupSize
+int 2
+==
+bnz size_2
+global GroupSize
+int 3
+==
+bnz size_3
+err
+size_2:
+global GroupSize
+int 2
+==
+return
+size_3:
+int 1
+return
+"""
+    )
+
+    # Known group sizes are not tested again, nor both taken on a same path
+    assert sorted(paths, key=lambda path: path.cost) == [
+        ("size_2", True, 8),
+        (None, False, 9),
+        ("size_3", True, 10),
+    ]
+
+
+def test_execution_paths_loop():
+    with pytest.raises(TealAssemblyError):
+        execution_paths("#pragma version 6\nloop:\nint 1\nbnz loop\nint 1")
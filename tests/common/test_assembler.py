@@ -0,0 +1,148 @@
+import base64
+
+import pytest
+from algosdk.future.transaction import LogicSig
+
+from algoworld_contracts.common.assembler import (
+    ProgramTemplate,
+    TealAssemblyError,
+    assemble,
+    disassemble,
+    program_address,
+)
+from algoworld_contracts.contracts import get_program
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+
+SWAP_CREATOR = "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ"
+
+
+@pytest.mark.parametrize(
+    "source,expected",
+    [
+        ("#pragma version 2\nint 1", "AiABASI="),
+        ("#pragma version 4\nint 1\nreturn", "BIEBQw=="),
+        (
+            '#pragma version 6\nbyte "ipfs://" // note\nint 1\nint 1\n==\n'
+            "bnz main_l2\nerr\nmain_l2:\nint 1",
+            "BiABAYAHaXBmczovLyIiEkAAAQAi",
+        ),
+    ],
+)
+def test_assemble(source: str, expected: str):
+    assert base64.b64encode(assemble(source)).decode() == expected
+
+
+def test_assemble_constant_blocks():
+    program = assemble(
+        "#pragma version 6\n"
+        + "int 7\n" * 2
+        + "int 5\n" * 3
+        + "int 9\n"
+        + 'byte "a"\n' * 5
+        + "b end\n"
+        + "end:"
+    )
+
+    assert program == bytes(
+        [0x06, 0x20, 0x02, 0x05, 0x07, 0x26, 0x01, 0x01, ord("a")]
+        + [0x23, 0x23, 0x22, 0x22, 0x22, 0x81, 0x09]
+        + [0x28] * 5
+        + [0x42, 0x00, 0x00]
+    )
+
+
+def test_program_template():
+    slots = {"18446744073709551615": ("amount", "int")}
+    template = ProgramTemplate(
+        "#pragma version 6\nint 18446744073709551615\nint 1\n==", slots
+    )
+
+    assert template.assemble({"amount": 1}) == assemble(
+        "#pragma version 6\nint 1\nint 1\n=="
+    )
+    assert template.assemble({"amount": 300}) == assemble(
+        "#pragma version 6\nint 300\nint 1\n=="
+    )
+
+
+def test_program_address():
+    program = assemble("#pragma version 6\nint 1")
+
+    assert program_address(program) == LogicSig(program).address()
+
+
+def test_assemble_errors():
+    with pytest.raises(TealAssemblyError):
+        assemble("#pragma version 6\nnot_an_opcode")
+
+    with pytest.raises(TealAssemblyError):
+        assemble("#pragma version 6\nb missing")
+
+
+@pytest.mark.parametrize(
+    "cfg",
+    [
+        AsaToAsaSwapConfig(
+            swap_creator=SWAP_CREATOR,
+            offered_asa_id=1,
+            offered_asa_amount=1,
+            requested_asa_id=2,
+            requested_asa_amount=1,
+            incentive_fee_address=SWAP_CREATOR,
+            incentive_fee_amount=10_000,
+        ),
+        AsasToAlgoSwapConfig(
+            swap_creator=SWAP_CREATOR,
+            offered_asa_amounts={"1": 1, "2": 300},
+            requested_algo_amount=1_000_000,
+            max_fee=1_000,
+            optin_funding_amount=420_000,
+            incentive_fee_address=SWAP_CREATOR,
+            incentive_fee_amount=10_000,
+        ),
+        AsasToAlgoLoopSwapConfig(
+            swap_creator=SWAP_CREATOR,
+            offered_asa_amounts={"1": 1, "2": 300},
+            requested_algo_amount=1_000_000,
+            max_fee=1_000,
+            optin_funding_amount=420_000,
+            incentive_fee_address=SWAP_CREATOR,
+            incentive_fee_amount=10_000,
+        ),
+        SwapProxy(swap_creator=SWAP_CREATOR, version="0.0.3"),
+    ],
+    ids=["asa_to_asa", "asas_to_algo", "asas_to_algo_loop", "proxy"],
+)
+def test_disassemble_round_trip(cfg):
+    program = get_program(cfg)
+
+    assert assemble(disassemble(program)) == program
+
+
+def test_disassemble():
+    program = assemble(
+        '#pragma version 6\nbyte "ipfs://"\nint 1\nint 1\n==\nbnz main_l2\nerr\n'
+        "main_l2:\ngtxn 1 Sender\nglobal ZeroAddress\nb end\nend:"
+    )
+
+    assert disassemble(program) == (
+        "#pragma version 6\nintcblock 1\npushbytes 0x697066733a2f2f\nintc_0\n"
+        "intc_0\n==\nbnz label1\nerr\nlabel1:\ngtxn 1 Sender\n"
+        "global ZeroAddress\nb label2\nlabel2:"
+    )
+
+
+def test_disassemble_errors():
+    with pytest.raises(TealAssemblyError):
+        disassemble(bytes([0x06, 0xFF]))
+
+    with pytest.raises(TealAssemblyError):
+        disassemble(bytes([0x06, 0x80, 0x05, 0x61]))
+
+    with pytest.raises(TealAssemblyError):
+        disassemble(bytes([0x06, 0x42, 0x00, 0x01, 0x81, 0x01]))
@@ -0,0 +1,75 @@
+import os
+
+from algoworld_contracts.common.cache import DiskCache, LRUCache
+
+
+def test_lru_cache_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "size": 2,
+        "maxsize": 2,
+    }
+
+
+def test_lru_cache_ttl():
+    now = [0.0]
+    cache = LRUCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+
+    now[0] = 10
+    assert cache.get("a") == 1
+
+    now[0] = 10.5
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_disk_cache(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=100)
+    cache.set("aa01", b"x" * 40)
+    os.utime(cache._path("aa01"), (0, 0))
+    cache.set("bb02", b"y" * 40)
+
+    assert DiskCache(str(tmp_path)).get("aa01") == b"x" * 40
+    assert cache.get("cc03") is None
+
+    cache.set("cc03", b"z" * 40)
+
+    assert cache.get("aa01") is None
+    assert cache.get("bb02") == b"y" * 40
+    assert cache.get("cc03") == b"z" * 40
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+        "max_bytes": 100,
+    }
+    assert not [p for p in tmp_path.rglob(".tmp-*")]
+
+
+def test_disk_cache_removes_stale_tmp_files(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=100, tmp_grace=60)
+    cache.set("aa01", b"x")
+    stale, recent = tmp_path / "aa" / ".tmp-stale", tmp_path / "aa" / ".tmp-recent"
+    stale.write_bytes(b"x" * 40)
+    recent.write_bytes(b"x" * 40)
+    os.utime(stale, (0, 0))
+
+    cache.evict()
+
+    assert not stale.exists()
+    assert recent.exists()
+    assert cache.get("aa01") == b"x"
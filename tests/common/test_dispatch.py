@@ -0,0 +1,48 @@
+from pyteal import And, Cond, Global, Int, Mode, Txn, compileTeal
+
+from algoworld_contracts.common.analysis import execution_paths
+from algoworld_contracts.common.dispatch import Branch, dispatch, require_all
+
+
+def _compile(program):
+    return compileTeal(program, Mode.Signature, version=6)
+
+
+def _branches():
+    return [
+        Branch(1, [Txn.fee() == Int(1)], Int(1)),
+        Branch(2, [Txn.fee() == Int(2)], Int(2)),
+        Branch(2, [Txn.fee() == Int(3)], Int(3)),
+    ]
+
+
+def test_dispatch_default():
+    expected = Cond(
+        [And(Global.group_size() == Int(1), Txn.fee() == Int(1)), Int(1)],
+        [And(Global.group_size() == Int(2), Txn.fee() == Int(2)), Int(2)],
+        [And(Global.group_size() == Int(2), Txn.fee() == Int(3)), Int(3)],
+    )
+
+    assert _compile(dispatch(_branches())) == _compile(expected)
+
+
+def test_dispatch_short_circuit():
+    teal = _compile(dispatch(_branches(), short_circuit=True))
+
+    assert teal.count("global GroupSize") == 2
+    assert teal.count("assert") == 1
+    # Groups of an unknown size fail after testing the two sizes
+    assert (None, False, 9) in execution_paths(teal)
+
+
+def test_require_all_short_circuit():
+    teal = _compile(
+        require_all(
+            And(Txn.fee() == Int(1), Txn.amount() == Int(2)),
+            Txn.first_valid() == Int(3),
+            short_circuit=True,
+        )
+    )
+
+    assert teal.count("assert") == 2
+    assert "&&" not in teal
@@ -0,0 +1,185 @@
+import pytest
+from algosdk import account, encoding
+from algosdk.future.transaction import AssetTransferTxn, PaymentTxn, SuggestedParams
+
+from algoworld_contracts import contracts
+from algoworld_contracts.common.analysis import cond_branch_costs
+from algoworld_contracts.common.assembler import TealAssemblyError
+from algoworld_contracts.common.evaluator import (
+    TealProgram,
+    evaluate,
+    transaction_fields,
+)
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+
+SWAP_CREATOR = "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ"
+SWAP_USER = account.generate_account()[1]
+OFFERED_ASAS = {42: 1, 43: 5}
+
+
+def _address(address):
+    return encoding.decode_address(address)
+
+
+def _axfer(sender, receiver, asa, amount):
+    return {
+        "Sender": _address(sender),
+        "TypeEnum": 4,
+        "Fee": 1000,
+        "XferAsset": asa,
+        "AssetAmount": amount,
+        "AssetReceiver": _address(receiver),
+    }
+
+
+def _pay(sender, receiver, amount):
+    return {
+        "Sender": _address(sender),
+        "TypeEnum": 1,
+        "Fee": 1000,
+        "Receiver": _address(receiver),
+        "Amount": amount,
+    }
+
+
+def _multi_swap_group(escrow, amounts=OFFERED_ASAS):
+    return [
+        _pay(SWAP_USER, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT),
+        _pay(SWAP_USER, SWAP_CREATOR, 1_000_000),
+        *(_axfer(escrow, SWAP_USER, asa, amount) for asa, amount in amounts.items()),
+    ]
+
+
+@pytest.mark.parametrize("short_circuit", [False, True])
+@pytest.mark.parametrize("optimize", [0, 1])
+def test_evaluate_swapper(short_circuit, optimize):
+    cfg = AsaToAsaSwapConfig(
+        SWAP_CREATOR,
+        42,
+        1,
+        69,
+        1,
+        INCENTIVE_FEE_ADDRESS,
+        INCENTIVE_FEE_AMOUNT,
+        short_circuit,
+    )
+    teal = contracts.get_teal(cfg, optimize)
+    escrow = contracts.get_escrow_address(cfg, optimize)
+    offered = _axfer(escrow, SWAP_USER, 42, 1)
+    fee = _pay(SWAP_USER, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT)
+
+    swap = evaluate(teal, [offered, _axfer(SWAP_USER, SWAP_CREATOR, 69, 1), fee])
+    wrong_amount = evaluate(
+        teal, [offered, _axfer(SWAP_USER, SWAP_CREATOR, 69, 2), fee]
+    )
+
+    assert swap.approved and swap.error is None
+    assert swap.cost <= cond_branch_costs(teal, ["optin", "swap", "close"])["swap"]
+    assert not wrong_amount.approved
+    assert (wrong_amount.error == "assert failed") is short_circuit
+
+
+@pytest.mark.parametrize(
+    "config_type", [AsasToAlgoSwapConfig, AsasToAlgoLoopSwapConfig]
+)
+def test_evaluate_multi_swapper(config_type):
+    cfg = config_type(
+        SWAP_CREATOR,
+        OFFERED_ASAS,
+        1_000_000,
+        1000,
+        420000,
+        INCENTIVE_FEE_ADDRESS,
+        INCENTIVE_FEE_AMOUNT,
+    )
+    teal = contracts.get_teal(cfg)
+    escrow = contracts.get_escrow_address(cfg)
+
+    swap = evaluate(teal, _multi_swap_group(escrow), index=2)
+    wrong_asa = evaluate(teal, _multi_swap_group(escrow, {42: 1, 44: 5}), index=2)
+
+    assert swap.approved
+    assert not wrong_asa.approved
+
+
+def test_evaluate_sdk_transactions():
+    params = SuggestedParams(1000, 1, 1000, "", flat_fee=True)
+    txn = AssetTransferTxn(SWAP_USER, params, SWAP_CREATOR, 3, 42)
+
+    fields = transaction_fields(txn)
+
+    assert fields["TypeEnum"] == 4 and fields["Type"] == b"axfer"
+    assert fields["AssetReceiver"] == _address(SWAP_CREATOR)
+    assert fields["AssetCloseTo"] == bytes(32)
+    assert evaluate(
+        "#pragma version 6\ngtxn 1 Amount\nint 7\n==\n",
+        [txn, PaymentTxn(SWAP_USER, params, SWAP_CREATOR, 7)],
+    ).approved
+
+
+def test_evaluate_trace():
+    teal = "#pragma version 6\nint 1\nint 2\n+\nint 3\n==\nreturn\n"
+
+    result = evaluate(teal, [{}], trace=True)
+
+    assert result.approved and result.cost == 6
+    assert [step.line for step in result.trace] == [2, 3, 4, 5, 6, 7]
+    assert result.trace[3].source == "int 3"
+    assert result.trace[3].stack == (3,)
+
+
+@pytest.mark.parametrize(
+    "teal, error",
+    [
+        ("err", "err opcode executed"),
+        ("int 0\nassert\nint 1", "assert failed"),
+        ("int 1\n+", "stack underflow"),
+        ("int 1\nint 1", "stack len is 2 instead of 1"),
+        ("byte 0x01", "stack finished with bytes not int"),
+        ("int 1\nbyte 0x01\n==", "cannot compare uint64 to bytes"),
+        ("int 18446744073709551615\nint 1\n+", "+ overflowed"),
+        ("int 1\nint 0\n/", "/ 0"),
+        ("byte 0x0102\nextract 1 2", "extract range beyond length of string"),
+        ("gtxn 1 Fee", "txn index 1, len(group) is 1"),
+        ("loop:\nb loop", "dynamic cost budget exceeded"),
+    ],
+)
+def test_evaluate_rejects(teal, error):
+    result = evaluate(f"#pragma version 6\n{teal}\n", [{}])
+
+    assert not result.approved
+    assert result.error == error
+
+
+def test_evaluate_bounded_loop():
+    teal = """#pragma version 6
+int 0
+store 0
+loop:
+load 0
+int 1
++
+dup
+store 0
+int 10
+<
+bnz loop
+load 0
+int 10
+==
+"""
+
+    result = TealProgram(teal).evaluate([{}])
+
+    assert result.approved
+    assert result.cost == 2 + 10 * 8 + 3
+
+
+def test_unsupported_opcode():
+    with pytest.raises(TealAssemblyError):
+        TealProgram("#pragma version 6\nbyte 0x01\nkeccak256\n")
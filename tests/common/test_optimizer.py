@@ -0,0 +1,38 @@
+import pytest
+
+from algoworld_contracts.common.analysis import execution_paths
+from algoworld_contracts.common.assembler import assemble
+from algoworld_contracts.common.optimizer import optimize_teal
+
+PEEPHOLE_TEAL = """#pragma version 6
+txn Fee
+int 0
+==
+bnz main_l2
+b main_l3
+main_l2:
+int 1
+return
+main_l3:
+err
+"""
+
+
+def test_optimize_teal_level_0():
+    assert optimize_teal(PEEPHOLE_TEAL, 0) == PEEPHOLE_TEAL
+
+
+def test_optimize_teal_peephole():
+    optimized = optimize_teal(PEEPHOLE_TEAL, 1)
+
+    assert optimized.splitlines()[1:4] == ["txn Fee", "!", "bnz main_l2"]
+    assert optimized.splitlines()[4] == "err"
+    assert len(assemble(optimized)) < len(assemble(PEEPHOLE_TEAL))
+    assert [path.approved for path in execution_paths(optimized)] == [
+        path.approved for path in execution_paths(PEEPHOLE_TEAL)
+    ]
+
+
+def test_optimize_teal_invalid_level():
+    with pytest.raises(ValueError):
+        optimize_teal(PEEPHOLE_TEAL, 2)
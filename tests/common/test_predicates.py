@@ -0,0 +1,275 @@
+import random
+import time
+
+import pytest
+from algosdk import account, encoding
+from pyteal import (
+    Assert,
+    Bytes,
+    For,
+    Global,
+    Gtxn,
+    If,
+    Int,
+    ScratchVar,
+    Seq,
+    Substring,
+    TealType,
+    Txn,
+)
+
+from algoworld_contracts import contracts
+from algoworld_contracts.common.evaluator import evaluate
+from algoworld_contracts.common.predicates import (
+    UnsupportedExpressionError,
+    compile_predicate,
+)
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+
+SWAP_CREATOR = "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ"
+SWAP_USER = account.generate_account()[1]
+ZERO_ADDRESS = bytes(32)
+CORPUS_SIZE = 300
+
+MUTATED_FIELDS = [
+    "TypeEnum",
+    "Fee",
+    "Sender",
+    "Receiver",
+    "Amount",
+    "CloseRemainderTo",
+    "XferAsset",
+    "AssetAmount",
+    "AssetReceiver",
+    "AssetSender",
+    "AssetCloseTo",
+    "RekeyTo",
+    "Note",
+]
+
+
+def _address(address):
+    return encoding.decode_address(address)
+
+
+def _pay(sender, receiver, amount, fee=1000, **fields):
+    return {
+        "TypeEnum": 1,
+        "Fee": fee,
+        "Sender": sender,
+        "Receiver": receiver,
+        "Amount": amount,
+        **fields,
+    }
+
+
+def _axfer(sender, receiver, asa, amount, **fields):
+    return {
+        "TypeEnum": 4,
+        "Fee": 1000,
+        "Sender": sender,
+        "XferAsset": asa,
+        "AssetAmount": amount,
+        "AssetReceiver": receiver,
+        **fields,
+    }
+
+
+def _swapper_groups(cfg, escrow):
+    creator, user = _address(SWAP_CREATOR), _address(SWAP_USER)
+    incentive = _address(INCENTIVE_FEE_ADDRESS)
+    return [
+        [
+            _pay(creator, escrow, 210000),
+            _axfer(escrow, escrow, cfg.offered_asa_id, 0),
+        ],
+        [
+            _axfer(escrow, user, cfg.offered_asa_id, cfg.offered_asa_amount),
+            _axfer(user, creator, cfg.requested_asa_id, cfg.requested_asa_amount),
+            _pay(user, incentive, INCENTIVE_FEE_AMOUNT),
+        ],
+        [
+            _axfer(escrow, creator, cfg.offered_asa_id, 0, AssetCloseTo=creator),
+            _pay(escrow, creator, 0, CloseRemainderTo=creator),
+            _pay(creator, creator, 0),
+        ],
+    ]
+
+
+def _multi_swapper_groups(cfg, escrow):
+    creator, user = _address(SWAP_CREATOR), _address(SWAP_USER)
+    incentive = _address(INCENTIVE_FEE_ADDRESS)
+    asas = cfg.offered_asa_amounts.items()
+    return [
+        [
+            _pay(creator, escrow, cfg.optin_funding_amount),
+            *(_axfer(escrow, escrow, asa, 0) for asa, _ in asas),
+        ],
+        [
+            _pay(user, incentive, INCENTIVE_FEE_AMOUNT),
+            _pay(user, creator, cfg.requested_algo_amount),
+            *(_axfer(escrow, user, asa, amount) for asa, amount in asas),
+        ],
+        [
+            *(_axfer(escrow, creator, asa, 0, AssetCloseTo=creator) for asa, _ in asas),
+            _pay(escrow, creator, 0, CloseRemainderTo=creator),
+            _pay(creator, creator, 0),
+        ],
+    ]
+
+
+def _proxy_groups(cfg, escrow):
+    creator = _address(SWAP_CREATOR)
+    return [
+        [
+            _pay(creator, escrow, 100000),
+            _pay(escrow, escrow, 0, fee=0, Note=b"ipfs://bafy"),
+        ]
+    ]
+
+
+CONFIGS = [
+    (AsaToAsaSwapConfig, _swapper_groups),
+    (AsasToAlgoSwapConfig, _multi_swapper_groups),
+    (AsasToAlgoLoopSwapConfig, _multi_swapper_groups),
+    (SwapProxy, _proxy_groups),
+]
+
+
+def _config(config_type, short_circuit):
+    if config_type is SwapProxy:
+        return SwapProxy(SWAP_CREATOR, "0.0.3")
+    if config_type is AsaToAsaSwapConfig:
+        return AsaToAsaSwapConfig(
+            SWAP_CREATOR,
+            42,
+            1,
+            69,
+            1,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+            short_circuit,
+        )
+    return config_type(
+        SWAP_CREATOR,
+        {42: 1, 43: 5, 44: 2},
+        1_000_000,
+        1000,
+        630000,
+        INCENTIVE_FEE_ADDRESS,
+        INCENTIVE_FEE_AMOUNT,
+        short_circuit,
+    )
+
+
+def _mutate(rng, group, escrow):
+    group = [dict(txn) for txn in group]
+    addresses = [
+        _address(SWAP_CREATOR),
+        _address(SWAP_USER),
+        _address(INCENTIVE_FEE_ADDRESS),
+        escrow,
+        ZERO_ADDRESS,
+    ]
+    for _ in range(rng.randint(0, 2)):
+        mutation = rng.random()
+        if mutation < 0.1 and len(group) > 1:
+            group.pop(rng.randrange(len(group)))
+        elif mutation < 0.2 and len(group) < 16:
+            group.insert(rng.randrange(len(group)), dict(rng.choice(group)))
+        elif mutation < 0.3:
+            i, j = rng.randrange(len(group)), rng.randrange(len(group))
+            group[i], group[j] = group[j], group[i]
+        else:
+            txn = rng.choice(group)
+            field = rng.choice(MUTATED_FIELDS)
+            if field == "Note":
+                txn[field] = rng.choice([b"", b"ipfs:/", b"ipfs://x", b"http://x"])
+            elif field == "TypeEnum":
+                txn[field] = rng.choice([1, 4, 3])
+            elif isinstance(txn.get(field, 0), bytes) or "To" in field:
+                txn[field] = rng.choice(addresses)
+            else:
+                value = txn.get(field, 0)
+                txn[field] = rng.choice([0, 1, value + 1, max(value - 1, 0), 42])
+    return group
+
+
+@pytest.mark.parametrize("short_circuit", [False, True])
+@pytest.mark.parametrize("config_type, groups", CONFIGS)
+def test_predicate_matches_teal(config_type, groups, short_circuit):
+    cfg = _config(config_type, short_circuit)
+    teal = contracts.get_teal(cfg)
+    escrow = _address(contracts.get_escrow_address(cfg))
+    predicate = contracts.get_predicate(cfg)
+    rng = random.Random(f"{config_type.__name__}-{short_circuit}")
+    valid = groups(cfg, escrow)
+
+    corpus = valid + [
+        _mutate(rng, rng.choice(valid), escrow) for _ in range(CORPUS_SIZE)
+    ]
+    outcomes = [predicate(group) for group in corpus]
+
+    assert outcomes == [evaluate(teal, group).approved for group in corpus]
+    assert all(outcomes[: len(valid)])
+    assert not all(outcomes)
+
+
+def test_get_predicate_cached():
+    cfg = _config(AsaToAsaSwapConfig, False)
+
+    assert contracts.get_predicate(cfg) is contracts.get_predicate(cfg)
+
+
+def test_predicate_speed():
+    cfg = _config(AsaToAsaSwapConfig, True)
+    escrow = _address(contracts.get_escrow_address(cfg))
+    group = _swapper_groups(cfg, escrow)[1]
+    predicate = contracts.get_predicate(cfg)
+    teal = contracts.get_teal(cfg)
+
+    def per_call(func, calls: int) -> float:
+        # Best of a few runs, so that a loaded machine slows both alike
+        runs = []
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(calls):
+                func()
+            runs.append((time.perf_counter() - start) / calls)
+        return min(runs)
+
+    # About 40 times faster than the evaluator, with slack for noisy runners
+    assert per_call(lambda: predicate(group), 1000) * 5 < per_call(
+        lambda: evaluate(teal, group), 50
+    )
+
+
+def test_compile_predicate_statements():
+    counter = ScratchVar(TealType.uint64)
+    expr = Seq(
+        For(
+            counter.store(Int(0)),
+            counter.load() < Global.group_size(),
+            counter.store(counter.load() + Int(1)),
+        ).Do(Assert(Gtxn[counter.load()].fee() <= Int(1000))),
+        If(Txn.group_index() == Int(1))
+        .Then(Substring(Txn.note(), Int(0), Int(2)) == Bytes("ok"))
+        .Else(Int(0)),
+    )
+    predicate = compile_predicate(expr)
+
+    assert predicate([{"Fee": 1000}, {"Fee": 0, "Note": b"ok!"}], 1)
+    assert not predicate([{"Fee": 1000}, {"Fee": 0, "Note": b"ok!"}], 0)
+    assert not predicate([{"Fee": 1001}, {"Fee": 0, "Note": b"ok!"}], 1)
+    assert not predicate([{"Fee": 1000}, {"Fee": 0, "Note": b"o"}], 1)
+
+
+def test_compile_predicate_unsupported():
+    with pytest.raises(UnsupportedExpressionError):
+        compile_predicate(Global.latest_timestamp() > Int(0))
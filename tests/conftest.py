@@ -1,3 +1,4 @@
+import os
 import subprocess
 from subprocess import PIPE
 from time import sleep
@@ -7,8 +8,14 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.toolkit.funding import WalletPool
+from tests.helpers import funder
 from tests.models import AlgorandSandbox
 
+# "localnet" runs the in-process algod and indexer, "docker" the sandbox images
+ALGORAND_SANDBOX = os.environ.get("ALGORAND_SANDBOX", "localnet")
+
 
 def run_command(command, timeout=1000):
     debugcommand = " - {0}".format(" ".join(command))
@@ -20,8 +27,7 @@ def run_command(command, timeout=1000):
     return popen
 
 
-@pytest.fixture(scope="session", autouse=True)
-def algorand_sandbox():
+def docker_sandbox():
     run_command(
         ["docker-compose", "-f", "tests/sandbox/docker-compose.yaml", "down"], 2000
     )
@@ -48,3 +54,28 @@ def algorand_sandbox():
     sleep(5)
 
     run_command(["docker-compose", "-f", "tests/sandbox/docker-compose.yaml", "down"])
+
+
+def localnet_sandbox():
+    with LocalNet() as localnet:
+        yield AlgorandSandbox(
+            None,
+            None,
+            f"{localnet.algod_address}/health",
+            f"{localnet.indexer_address}/health",
+            passphrases={localnet.dispenser: localnet.dispenser_mnemonic},
+        )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def algorand_sandbox():
+    if ALGORAND_SANDBOX == "docker":
+        yield from docker_sandbox()
+    else:
+        yield from localnet_sandbox()
+
+
+@pytest.fixture(scope="session")
+def wallet_pool(algorand_sandbox: AlgorandSandbox) -> WalletPool:
+    """Wallets funded with 10 Algos, 16 per group, for the whole session."""
+    return WalletPool(funder(algorand_sandbox))
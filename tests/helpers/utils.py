@@ -1,33 +1,31 @@
 """Module containing helper functions for accessing Algorand blockchain."""
 
-import base64
 import pty
 import subprocess
-import time
+from functools import lru_cache
 from random import randint
 from typing import Dict, List
 
 from algosdk import account, mnemonic
-from algosdk.error import IndexerHTTPError
 from algosdk.future.transaction import (
-    AssetConfigTxn,
-    AssetTransferTxn,
-    LogicSig,
-    LogicSigTransaction,
     PaymentTxn,
     SignedTransaction,
     Transaction,
     calculate_group_id,
-    wait_for_confirmation,
-    write_to_file,
 )
-from algosdk.v2client import algod, indexer
 
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+    multi_asa_loop_swapper,
+)
 from algoworld_contracts.swapper.asas_to_algo_swapper import (
     AsasToAlgoSwapConfig,
     compile_stateless,
     multi_asa_swapper,
 )
+from algoworld_contracts.toolkit import transactions
+from algoworld_contracts.toolkit.funding import Funder
+from algoworld_contracts.toolkit.transactions import Toolkit
 from tests.helpers.constants import INCENTIVE_FEE_AMOUNT
 from tests.models import AlgorandSandbox, LogicSigWallet, Wallet
 
@@ -38,6 +36,9 @@ INDEXER_TIMEOUT = 10  # 61 for devMode
 ################################################################
 def _cli_passphrase_for_account(address, algorand_sandbox: AlgorandSandbox):
     """Return passphrase for provided address."""
+    if address in algorand_sandbox.passphrases:
+        return algorand_sandbox.passphrases[address]
+
     process = call_sandbox_goal_command(
         "exec",
         "-it",
@@ -73,96 +74,60 @@ def call_sandbox_goal_command(*args):
 
 # CLIENTS
 ################################################################
+@lru_cache(maxsize=None)
+def _toolkit() -> Toolkit:
+    """Return the toolkit shared by all helpers."""
+    # Facilitating TEAL debugging
+    return Toolkit(debug_path="/tmp/txn.signed")
+
+
 def _algod_client():
-    """Instantiate and return Algod client object."""
-    algod_address = "http://localhost:4001"
-    algod_token = "a" * 64
-    return algod.AlgodClient(algod_token, algod_address)
+    """Return the shared pooled Algod client object."""
+    return _toolkit().algod
 
 
 def _indexer_client():
-    """Instantiate and return Indexer client object."""
-    indexer_address = "http://localhost:8980"
-    indexer_token = "a" * 64
-    return indexer.IndexerClient(indexer_token, indexer_address)
+    """Return the shared pooled Indexer client object."""
+    return _toolkit().indexer
 
 
 # TRANSACTIONS
 ################################################################
 def _add_transaction(sender, receiver, passphrase, amount, note):
-    """Create and sign transaction from provided arguments.
-
-    Returned non-empty tuple carries field where error was raised and
-    description.
-    If the first item is None then the error is non-field/integration error.
-    Returned two-tuple of empty strings marks successful transaction.
-    """
-    client = _algod_client()
-    params = client.suggested_params()
+    """Create, sign and send payment transaction and return its id."""
+    params = suggested_params()
     unsigned_txn = PaymentTxn(sender, params, receiver, amount, None, note.encode())
     signed_txn = unsigned_txn.sign(mnemonic.to_private_key(passphrase))
-    transaction_id = client.send_transaction(signed_txn)
-    wait_for_confirmation(client, transaction_id, 4)
-    return transaction_id
+    _toolkit().send_wait([signed_txn])
+    return signed_txn.get_txid()
 
 
 def process_transactions(transactions):
     """
     Send provided grouped `transactions` to network and wait for confirmation.
     """
-    client = _algod_client()
-    transaction_id = client.send_transactions(transactions)
-    wait_for_confirmation(client, transaction_id, 4)
-    return transaction_id
+    return _toolkit().send_wait(transactions)
 
 
 def suggested_params():
-    """Return the suggested params from the algod client."""
-    return _algod_client().suggested_params()
+    """Return the cached suggested params of the algod client."""
+    return _toolkit().suggested_params()
 
 
 def sign(wallet, txn: Transaction) -> SignedTransaction:
-    if isinstance(wallet, LogicSigWallet):
-        return LogicSigTransaction(txn, wallet.logicsig)  # type: ignore
-
-    assert wallet.private_key
-    return txn.sign(wallet.private_key)
+    return transactions.sign(wallet, txn)
 
 
 def sign_send_wait(wallet: Wallet, txn: Transaction):
     """Sign a transaction, submit it, and wait for its confirmation."""
-    signed_txn = sign(wallet, txn)
-    tx_id = signed_txn.transaction.get_txid()
-
-    # Facilitating TEAL debugging
-    write_to_file([signed_txn], "/tmp/txn.signed", overwrite=True)
-
-    algod_client = _algod_client()
-    algod_client.send_transactions([signed_txn])
-    wait_for_confirmation(algod_client, tx_id, 4)
-    return algod_client.pending_transaction_info(tx_id)
+    return _toolkit().sign_send_wait(wallet, txn)
 
 
 def group_sign_send_wait(signers: List, txns: List[Transaction]):
     """
     Sign and send group transaction to network and wait for confirmation.
     """
-
-    assert len(signers) == len(txns)
-    signed_group = []
-    gid = calculate_group_id(txns)
-
-    for signer, t in zip(signers, txns):
-        t.group = gid
-        signed_group.append(sign(signer, t))
-
-    # Facilitating TEAL debugging
-    write_to_file(signed_group, "/tmp/txn.signed", overwrite=True)
-
-    algod_client = _algod_client()
-    gtxn_id = algod_client.send_transactions(signed_group)
-    wait_for_confirmation(algod_client, gtxn_id, 4)
-    return algod_client.pending_transaction_info(gtxn_id)
+    return _toolkit().group_sign_send_wait(signers, txns)
 
 
 # CREATING
@@ -185,22 +150,20 @@ def generate_stateless_contract(compiled_teal: str) -> LogicSigWallet:
 
 
 def generate_swapper(cfg: AsasToAlgoSwapConfig):
-    swapper_lsig = logic_signature(compile_stateless(multi_asa_swapper(cfg)))
+    if isinstance(cfg, AsasToAlgoLoopSwapConfig):
+        program = multi_asa_loop_swapper(cfg)
+    else:
+        program = multi_asa_swapper(cfg)
+    swapper_lsig = logic_signature(compile_stateless(program))
     return LogicSigWallet(logicsig=swapper_lsig, public_key=swapper_lsig.address())
 
 
-def generate_random_offered_asas(swap_creator: Wallet) -> int:
+def generate_random_offered_asas(swap_creator: Wallet, count: int = 5) -> int:
+    specs = [(f"Card {i}", randint(1, 6000), randint(0, 10)) for i in range(count)]
+    asa_ids = _toolkit().mint_asas(swap_creator, specs)
+
     asas = []
-    for i in range(0, 5):
-        amount = randint(1, 6000)
-        decimals = randint(0, 10)
-        asa_id = mint_asa(
-            swap_creator.public_key,
-            swap_creator.private_key,
-            asset_name=f"Card {i}",
-            total=amount,
-            decimals=decimals,
-        )
+    for asa_id, (_, amount, decimals) in zip(asa_ids, specs):
         asas.append({"id": asa_id, "amount": amount, "decimals": decimals})
         print(
             f"\n --- ASA {asa_id} minted with amount {amount} and decimals {decimals}"
@@ -211,17 +174,43 @@ def generate_random_offered_asas(swap_creator: Wallet) -> int:
 #### Functions
 
 
+# algod url of each sandbox -> funder of its genesis account
+_FUNDERS: Dict[str, Funder] = {}
+
+
+def funder(algorand_sandbox: AlgorandSandbox) -> Funder:
+    """
+    Return the funder of `algorand_sandbox`, looking its genesis account and
+    passphrase up on first use only.
+    """
+    cached = _FUNDERS.get(algorand_sandbox.algod_api_url)
+    if cached is None:
+        initial_funds_address = (
+            next(iter(algorand_sandbox.passphrases), None) or _initial_funds_address()
+        )
+        if initial_funds_address is None:
+            raise Exception("Initial funds weren't transferred!")
+        passphrase = _cli_passphrase_for_account(
+            initial_funds_address, algorand_sandbox
+        )
+        cached = _FUNDERS[algorand_sandbox.algod_api_url] = Funder(
+            _toolkit(),
+            Wallet(mnemonic.to_private_key(passphrase), initial_funds_address),
+        )
+    return cached
+
+
 def fund_wallet(wallet: Wallet, algorand_sandbox, initial_funds: int = int(10 * 1e6)):
     """Fund provided `address` with `initial_funds` amount of microAlgos."""
-    initial_funds_address = _initial_funds_address()
-    if initial_funds_address is None:
-        raise Exception("Initial funds weren't transferred!")
-    _add_transaction(
-        initial_funds_address,
-        wallet.public_key,
-        _cli_passphrase_for_account(initial_funds_address, algorand_sandbox),
-        initial_funds,
-        "Initial funds",
+    funder(algorand_sandbox).fund([wallet.public_key], initial_funds)
+
+
+def fund_wallets(
+    wallets: List[Wallet], algorand_sandbox, initial_funds: int = int(10 * 1e6)
+):
+    """Fund each of `wallets` with `initial_funds`, 16 payments per group."""
+    funder(algorand_sandbox).fund(
+        [wallet.public_key for wallet in wallets], initial_funds
     )
 
 
@@ -256,26 +245,12 @@ def _initial_funds_address():
 
 def account_balance(address):
     """Return funds balance of the account having provided address."""
-    account_info = _algod_client().account_info(address)
-    return account_info.get("amount")
+    return _toolkit().account_balance(address)
 
 
 def transaction_info(transaction_id):
     """Return transaction with provided id."""
-    timeout = 0
-    while timeout < INDEXER_TIMEOUT:
-        try:
-            transaction = _indexer_client().transaction(transaction_id)
-            break
-        except IndexerHTTPError:
-            time.sleep(1)
-            timeout += 1
-    else:
-        raise TimeoutError(
-            "Timeout reached waiting for transaction to be available in indexer"
-        )
-
-    return transaction
+    return _toolkit().transaction_info(transaction_id, INDEXER_TIMEOUT)
 
 
 # UTILITY
@@ -284,54 +259,21 @@ def transaction_info(transaction_id):
 
 def _compile_source(source):
     """Compile and return teal binary code."""
-    compile_response = _algod_client().compile(source)
-    return base64.b64decode(compile_response["result"])
+    return _toolkit().compile(source)
 
 
 def logic_signature(teal_source):
     """Create and return logic signature for provided `teal_source`."""
-    compiled_binary = _compile_source(teal_source)
-    return LogicSig(compiled_binary)
+    return _toolkit().logic_signature(teal_source)
 
 
 # ASA
 ################################################################
 def mint_asa(sender: str, sender_pass: str, asset_name: str, total: int, decimals: int):
-    """Return transaction with provided id."""
-    algod_client = _algod_client()
-    params = algod_client.suggested_params()
-
-    txn = AssetConfigTxn(
-        sender=sender,
-        sp=params,
-        total=total,
-        default_frozen=False,
-        unit_name="",
-        asset_name=asset_name,
-        manager=sender,
-        reserve=sender,
-        freeze=sender,
-        clawback=sender,
-        url="https://path/to/my/asset/details",
-        decimals=decimals,
+    """Mint ASA from `sender` signed with private key `sender_pass`."""
+    asset_id = _toolkit().mint_asa(
+        Wallet(sender_pass, sender), asset_name, total, decimals
     )
-    print(txn)
-    # Sign with secret key of creator
-    stxn = txn.sign(sender_pass)
-
-    # Send the transaction to the network and retrieve the txid.
-    txid = algod_client.send_transaction(stxn)
-
-    # Retrieve the asset ID of the newly created asset by first
-    # ensuring that the creation transaction was confirmed,
-    # then grabbing the asset id from the transaction.
-
-    # Wait for the transaction to be confirmed
-    wait_for_confirmation(algod_client, txid, 4)
-
-    ptx = algod_client.pending_transaction_info(txid)
-
-    asset_id = ptx["asset-index"]
 
     print(f"\n --- ASA {asset_name} - {asset_id} minted.")
 
@@ -339,25 +281,10 @@ def mint_asa(sender: str, sender_pass: str, asset_name: str, total: int, decimal
 
 
 def opt_in_asa(wallet: Wallet, assets: List[int]):
-    """Return transaction with provided id."""
-    algod_client = _algod_client()
-    params = algod_client.suggested_params()
+    """Opt `wallet` in to `assets` and return the last transaction id."""
+    txid = _toolkit().opt_in_asa(wallet, assets)
 
     for asset_id in assets:
-        txn = AssetTransferTxn(
-            sender=wallet.public_key,
-            sp=params,
-            receiver=wallet.public_key,
-            amt=0,
-            index=asset_id,
-        )
-
-        # Sign with secret key of creator
-        stxn = txn.sign(wallet.private_key)
-
-        # Send the transaction to the network and retrieve the txid.
-        txid = algod_client.send_transaction(stxn)
-
         print(f"\n --- Account {wallet.public_key} opted-in ASA {asset_id}.")
 
     return txid
@@ -369,32 +296,7 @@ def swapper_opt_in(
     assets: Dict[int, int],
     funding_amount: int,
 ):
-    algod_client = _algod_client()
-    params = algod_client.suggested_params()
-
-    signers = [swap_creator]
-    transactions = [
-        PaymentTxn(
-            sender=swap_creator.public_key,
-            sp=params,
-            receiver=swapper_account.public_key,
-            amt=funding_amount,
-        )
-    ]
-
-    for asset_id, asset_amount in assets.items():
-        signers.append(swapper_account)
-        transactions.append(
-            AssetTransferTxn(
-                sender=swapper_account.public_key,
-                sp=params,
-                receiver=swapper_account.public_key,
-                amt=asset_amount,
-                index=asset_id,
-            )
-        )
-
-    group_sign_send_wait(signers, transactions)
+    _toolkit().swapper_opt_in(swap_creator, swapper_account, assets, funding_amount)
 
     print(f"\n --- Swapper {swapper_account.public_key} opted-in ASAs {assets.keys()}.")
 
@@ -402,20 +304,9 @@ def swapper_opt_in(
 def swapper_deposit(
     swap_creator: Wallet, swapper_account: LogicSigWallet, assets: Dict[int, int]
 ):
-    algod_client = _algod_client()
-    params = algod_client.suggested_params()
+    _toolkit().swapper_deposit(swap_creator, swapper_account, assets)
 
     for asset_id, asset_amount in assets.items():
-        deposit_asa_txn = AssetTransferTxn(
-            sender=swap_creator.public_key,
-            sp=params,
-            receiver=swapper_account.public_key,
-            amt=asset_amount,
-            index=asset_id,
-        )
-
-        sign_send_wait(swap_creator, deposit_asa_txn)
-
         print(
             f"\n --- Account {swap_creator.public_key} deposited {asset_amount} "
             f"units of ASA {asset_id} into {swapper_account.public_key}."
@@ -433,56 +324,24 @@ def asa_to_asa_swap(
     incentive_amount: int = INCENTIVE_FEE_AMOUNT,
 ):
     """Swap multiple offered asas to multiple requested asas"""
-
-    algod_client = _algod_client()
-    params = algod_client.suggested_params()
-
-    signers = []
-    transactions = []
-
-    for offered_asset_id, offered_asset_amt in offered_assets.items():
-        signers.append(offered_asset_sender)
-        transactions.append(
-            AssetTransferTxn(
-                sender=offered_asset_sender.public_key,
-                sp=params,
-                receiver=offered_asset_receiver.public_key,
-                amt=offered_asset_amt,
-                index=offered_asset_id,
-            )
-        )
-
-    for requested_asset_id, requested_asset_amt in requested_assets.items():
-        signers.append(requested_asset_sender)
-        transactions.append(
-            AssetTransferTxn(
-                sender=requested_asset_sender.public_key,
-                sp=params,
-                receiver=requested_asset_receiver.public_key,
-                amt=requested_asset_amt,
-                index=requested_asset_id,
-            )
-        )
-
-    signers.append(requested_asset_sender)
-    transactions.append(
-        PaymentTxn(
-            sender=requested_asset_sender.public_key,
-            sp=params,
-            receiver=incentive_wallet.public_key,
-            amt=incentive_amount,
-        )
+    _toolkit().asa_to_asa_swap(
+        offered_asset_sender,
+        offered_asset_receiver,
+        offered_assets,
+        requested_asset_sender,
+        requested_asset_receiver,
+        requested_assets,
+        incentive_wallet,
+        incentive_amount,
     )
 
-    group_sign_send_wait(signers, transactions)
-
     print(
-        f"\n --- Account {offered_asset_sender.public_key} sent {offered_asset_amt} "
-        f"units of ASA {offered_asset_id} to {offered_asset_receiver.public_key}."
+        f"\n --- Account {offered_asset_sender.public_key} sent {offered_assets} "
+        f"to {offered_asset_receiver.public_key}."
     )
     print(
-        f"\n --- Account {requested_asset_sender.public_key} sent {requested_asset_amt} "
-        f"units of ASA {requested_asset_id} to {requested_asset_receiver.public_key}."
+        f"\n --- Account {requested_asset_sender.public_key} sent {requested_assets} "
+        f"to {requested_asset_receiver.public_key}."
     )
 
 
@@ -499,49 +358,16 @@ def asa_to_algo_swap(
     """
     Swap multiple ASAs to ALGO of specified amount.
     """
-
-    algod_client = _algod_client()
-    params = algod_client.suggested_params()
-
-    signers = []
-    transactions = []
-
-    ## Send incentive fees
-    transactions.append(
-        PaymentTxn(
-            sender=requested_algo_sender.public_key,
-            sp=params,
-            receiver=incentive_wallet.public_key,
-            amt=incentive_amount,
-        )
-    )
-    signers.append(requested_algo_sender)
-
-    ## Send algos to creator
-    transactions.append(
-        PaymentTxn(
-            sender=requested_algo_sender.public_key,
-            sp=params,
-            receiver=requested_algo_receiver.public_key,
-            amt=requested_algo_amount,
-        )
+    _toolkit().asa_to_algo_swap(
+        offered_assets_sender,
+        offered_assets_receiver,
+        offered_assets,
+        requested_algo_amount,
+        requested_algo_sender,
+        requested_algo_receiver,
+        incentive_wallet,
+        incentive_amount,
     )
-    signers.append(requested_algo_sender)
-
-    ## Send ASAs
-    for asset_id, asset_amount in offered_assets.items():
-        transactions.append(
-            AssetTransferTxn(
-                sender=offered_assets_sender.public_key,
-                sp=params,
-                receiver=offered_assets_receiver.public_key,
-                amt=asset_amount,
-                index=asset_id,
-            )
-        )
-        signers.append(offered_assets_sender)
-
-    group_sign_send_wait(signers, transactions)
 
     print(
         f"\n --- Account {offered_assets_sender.public_key} sent {offered_assets} \
@@ -570,48 +396,20 @@ def close_swap(
     """
     Close a swap by sending the funds back to the original sender.
     """
-
-    algod_client = _algod_client()
-    params = algod_client.suggested_params()
-
-    signers = []
-    transactions = []
-
-    for asset_id in asset_ids:
-        transactions.append(
-            AssetTransferTxn(
-                sender=asset_sender.public_key,
-                sp=params,
-                receiver=asset_receiver.public_key,
-                amt=asset_amt,
-                index=asset_id,
-                close_assets_to=asset_close_to.public_key,
-            )
-        )
-        signers.append(asset_sender)
-
-    transactions.append(
-        PaymentTxn(
-            sender=swapper_funds_sender.public_key,
-            sp=params,
-            receiver=swapper_funds_receiver.public_key,
-            amt=swapper_funds_amt,
-            close_remainder_to=swapper_funds_close_to.public_key,
-        )
-    )
-    signers.append(swapper_funds_sender)
-
-    transactions.append(
-        PaymentTxn(
-            sender=proof_sender.public_key,
-            sp=params,
-            receiver=proof_receiver.public_key,
-            amt=proof_amt,
-        )
+    _toolkit().close_swap(
+        asset_sender,
+        asset_receiver,
+        asset_close_to,
+        asset_ids,
+        swapper_funds_sender,
+        swapper_funds_receiver,
+        swapper_funds_close_to,
+        proof_sender,
+        proof_receiver,
+        asset_amt,
+        swapper_funds_amt,
+        proof_amt,
     )
-    signers.append(proof_sender)
-
-    group_sign_send_wait(signers, transactions)
 
     print(f"\n --- Account {proof_sender.public_key} closed Swapper.")
 
@@ -624,27 +422,8 @@ def activate_or_save_proxy_note(
     tx_fee_amount: int,
     note_amount: int,
 ):
-    params = _algod_client().suggested_params()
-
-    fee_tx = PaymentTxn(
-        sender=creator.public_key,
-        sp=params,
-        receiver=proxy.public_key,
-        amt=fee_amount,
+    tx_info = _toolkit().activate_or_save_proxy_note(
+        creator, proxy, note, fee_amount, tx_fee_amount, note_amount
     )
-    fee_tx.fee = tx_fee_amount
-
-    note_tx = PaymentTxn(
-        **{
-            "sender": proxy.public_key,
-            "sp": params,
-            "receiver": proxy.public_key,
-            "amt": note_amount,
-            "note": note,
-        }
-    )
-    note_tx.fee = 0
-
-    tx_info = group_sign_send_wait([creator, proxy], [fee_tx, note_tx])
 
     print(f"\n --- Account {creator.public_key} {tx_info} saved note to proxy.")
@@ -0,0 +1,178 @@
+import pytest
+from algosdk import account
+from algosdk.future.transaction import (
+    AssetConfigTxn,
+    AssetTransferTxn,
+    LogicSig,
+    LogicSigTransaction,
+    PaymentTxn,
+    assign_group_id,
+)
+
+from algoworld_contracts.common.assembler import assemble
+from algoworld_contracts.localnet.ledger import MIN_BALANCE, Ledger, LedgerError
+
+FUNDS = 10_000_000
+
+
+@pytest.fixture()
+def keys():
+    return [account.generate_account() for _ in range(2)]
+
+
+@pytest.fixture()
+def ledger(keys):
+    return Ledger({address: FUNDS for _, address in keys})
+
+
+def _mint(ledger, key, address, total=10):
+    txn = AssetConfigTxn(
+        address,
+        ledger.suggested_params(),
+        total=total,
+        default_frozen=False,
+        decimals=0,
+        manager=address,
+        strict_empty_address_check=False,
+    )
+    txid = ledger.submit([txn.sign(key)])
+    return ledger.transactions[txid].asset_index
+
+
+def test_payment(ledger, keys):
+    (key, sender), (_, receiver) = keys
+    txn = PaymentTxn(sender, ledger.suggested_params(), receiver, 1_000)
+
+    txid = ledger.submit([txn.sign(key)])
+
+    assert ledger.last_round == 1
+    assert ledger.transactions[txid].round == 1
+    assert ledger.account(sender).amount == FUNDS - 2_000
+    assert ledger.account(receiver).amount == FUNDS + 1_000
+    with pytest.raises(LedgerError, match="already in ledger"):
+        ledger.submit([txn.sign(key)])
+
+
+def test_payment_rejects(ledger, keys):
+    (key, sender), (other_key, receiver) = keys
+    params = ledger.suggested_params()
+
+    with pytest.raises(LedgerError, match="signature does not authorize"):
+        ledger.submit([PaymentTxn(sender, params, receiver, 1).sign(other_key)])
+
+    with pytest.raises(LedgerError, match="overspend"):
+        ledger.submit([PaymentTxn(sender, params, receiver, FUNDS).sign(key)])
+
+    with pytest.raises(LedgerError, match="below min"):
+        ledger.submit(
+            [PaymentTxn(sender, params, receiver, FUNDS - MIN_BALANCE).sign(key)]
+        )
+
+    txn = PaymentTxn(sender, params, receiver, 1)
+    txn.fee = 0
+    with pytest.raises(LedgerError, match="in fees"):
+        ledger.submit([txn.sign(key)])
+
+    assert ledger.last_round == 0
+    assert ledger.account(sender).amount == FUNDS
+
+
+def test_close_remainder(ledger, keys):
+    (key, sender), (_, receiver) = keys
+    txn = PaymentTxn(sender, ledger.suggested_params(), receiver, 0, receiver)
+
+    txid = ledger.submit([txn.sign(key)])
+
+    assert ledger.transactions[txid].closing_amount == FUNDS - 1_000
+    assert sender not in ledger.accounts
+    assert ledger.account(receiver).amount == 2 * FUNDS - 1_000
+
+
+def test_group_is_atomic(ledger, keys):
+    (key, sender), (other_key, receiver) = keys
+    params = ledger.suggested_params()
+    txns = assign_group_id(
+        [
+            PaymentTxn(sender, params, receiver, 5_000),
+            PaymentTxn(receiver, params, sender, FUNDS + 10_000),
+        ]
+    )
+
+    with pytest.raises(LedgerError, match=f"transaction {txns[1].get_txid()}"):
+        ledger.submit([txns[0].sign(key), txns[1].sign(other_key)])
+    with pytest.raises(LedgerError, match="group id"):
+        ledger.submit([txns[0].sign(key)])
+
+    assert ledger.account(sender).amount == FUNDS
+    assert ledger.last_round == 0
+
+
+def test_assets(ledger, keys):
+    (key, creator), (other_key, holder) = keys
+    params = ledger.suggested_params()
+    asset_id = _mint(ledger, key, creator)
+
+    with pytest.raises(LedgerError, match="missing from"):
+        ledger.submit(
+            [AssetTransferTxn(creator, params, holder, 1, asset_id).sign(key)]
+        )
+
+    ledger.submit(
+        [AssetTransferTxn(holder, params, holder, 0, asset_id).sign(other_key)]
+    )
+    ledger.submit([AssetTransferTxn(creator, params, holder, 3, asset_id).sign(key)])
+    assert ledger.account(holder).assets == {asset_id: 3}
+    assert ledger.account(holder).min_balance == 2 * MIN_BALANCE
+
+    txid = ledger.submit(
+        [
+            AssetTransferTxn(
+                holder, params, creator, 1, asset_id, close_assets_to=creator
+            ).sign(other_key)
+        ]
+    )
+    assert ledger.transactions[txid].asset_closing_amount == 2
+    assert ledger.account(holder).assets == {}
+    assert ledger.account(creator).assets == {asset_id: 10}
+
+    with pytest.raises(LedgerError, match="allocating account"):
+        ledger.submit(
+            [
+                AssetTransferTxn(
+                    creator, params, creator, 0, asset_id, close_assets_to=holder
+                ).sign(key)
+            ]
+        )
+
+
+def test_logic_signature(ledger, keys):
+    (key, sender), _ = keys
+    lsig = LogicSig(
+        assemble("#pragma version 6\ntxn Amount\nint 100\n<=\nassert\nint 1")
+    )
+    params = ledger.suggested_params()
+    ledger.submit([PaymentTxn(sender, params, lsig.address(), 1_000_000).sign(key)])
+
+    ledger.submit(
+        [LogicSigTransaction(PaymentTxn(lsig.address(), params, sender, 100), lsig)]
+    )
+
+    with pytest.raises(LedgerError, match="rejected by logic err=assert failed"):
+        ledger.submit(
+            [LogicSigTransaction(PaymentTxn(lsig.address(), params, sender, 101), lsig)]
+        )
+    with pytest.raises(LedgerError, match="does not authorize"):
+        ledger.submit(
+            [LogicSigTransaction(PaymentTxn(sender, params, sender, 100), lsig)]
+        )
+
+
+def test_wait_for_round(ledger, keys):
+    (key, sender), (_, receiver) = keys
+
+    assert ledger.wait_for_round(1, timeout=0) == 0
+
+    ledger.submit(
+        [PaymentTxn(sender, ledger.suggested_params(), receiver, 1).sign(key)]
+    )
+    assert ledger.wait_for_round(1, timeout=0) == 1
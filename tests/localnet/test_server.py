@@ -0,0 +1,92 @@
+import base64
+
+import pytest
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+from algosdk.future.transaction import AssetConfigTxn, PaymentTxn, wait_for_confirmation
+
+from algoworld_contracts.localnet.server import LocalNet
+
+NOTE = b"ipfs://localnet"
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+def test_algod(localnet: LocalNet):
+    algod = localnet.algod_client()
+    receiver = algod.compile("#pragma version 6\nint 1")["hash"]
+    params = algod.suggested_params()
+
+    txn = PaymentTxn(localnet.dispenser, params, receiver, 200_000, note=NOTE)
+    txid = algod.send_transaction(txn.sign(localnet.dispenser_key))
+    info = wait_for_confirmation(algod, txid, 4)
+
+    assert info["confirmed-round"] == algod.status()["last-round"]
+    assert info["txn"]["txn"]["rcv"] == receiver
+    assert base64.b64decode(info["txn"]["txn"]["note"]) == NOTE
+    assert algod.account_info(receiver)["amount"] == 200_000
+    assert algod.block_info(info["confirmed-round"])["block"]["txns"] == [info["txn"]]
+
+    with pytest.raises(AlgodHTTPError, match="overspend"):
+        algod.send_transaction(
+            PaymentTxn(localnet.dispenser, params, receiver, 10**16).sign(
+                localnet.dispenser_key
+            )
+        )
+    with pytest.raises(AlgodHTTPError) as e:
+        algod.pending_transaction_info("A" * 52)
+    assert e.value.code == 404
+
+
+def test_asset_creation(localnet: LocalNet):
+    algod = localnet.algod_client()
+    txn = AssetConfigTxn(
+        localnet.dispenser,
+        algod.suggested_params(),
+        total=5,
+        default_frozen=False,
+        asset_name="Card",
+        decimals=0,
+        manager=localnet.dispenser,
+        strict_empty_address_check=False,
+    )
+
+    txid = algod.send_transaction(txn.sign(localnet.dispenser_key))
+    asset_id = algod.pending_transaction_info(txid)["asset-index"]
+
+    assert algod.asset_info(asset_id)["params"]["name"] == "Card"
+    assert (
+        localnet.indexer_client().transaction(txid)["transaction"][
+            "created-asset-index"
+        ]
+        == asset_id
+    )
+
+
+def test_indexer(localnet: LocalNet):
+    indexer = localnet.indexer_client()
+
+    accounts = indexer.accounts()["accounts"]
+    assert {
+        "address": localnet.dispenser,
+        "created-at-round": 0,
+        "status": "Online",
+    }.items() <= next(a for a in accounts if a["address"] == localnet.dispenser).items()
+
+    notes = indexer.search_transactions(note_prefix=b"ipfs://", txn_type="pay")
+    assert [t["note"] for t in notes["transactions"]] == [
+        base64.b64encode(NOTE).decode()
+    ]
+
+    page = indexer.search_transactions_by_address(localnet.dispenser, limit=1)
+    assert page["transactions"][0]["confirmed-round"] == localnet.ledger.last_round
+    older = indexer.search_transactions_by_address(
+        localnet.dispenser, limit=1, next_page=page["next-token"]
+    )
+    assert older["transactions"][0]["confirmed-round"] < localnet.ledger.last_round
+
+    with pytest.raises(IndexerHTTPError):
+        indexer.transaction("A" * 52)
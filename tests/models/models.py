@@ -1,25 +1,21 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 
-
-## Common Models
-@dataclass
-class Wallet:
-    private_key: str
-    public_key: str
-
-
-@dataclass
-class LogicSigWallet:
-    logicsig: str
-    public_key: str
+from algoworld_contracts.toolkit.transactions import (  # noqa: F401
+    LogicSigWallet,
+    Wallet,
+)
 
 
+## Common Models
 @dataclass
 class AlgorandSandbox:
-    algod_container_name: str
-    indexer_container_name: str
+    algod_container_name: Optional[str]
+    indexer_container_name: Optional[str]
     algod_api_url: str
     indexer_api_url: str
+    # address -> mnemonic of accounts funded at genesis, when known upfront
+    passphrases: Dict[str, str] = field(default_factory=dict)
 
 
 ## Auction models
@@ -7,12 +7,12 @@ from algoworld_contracts.swapper.asa_to_asa_swapper import (
     compile_stateless,
     swapper,
 )
+from algoworld_contracts.toolkit.funding import WalletPool
 from tests.helpers import (
     INCENTIVE_FEE_ADDRESS,
     asa_to_asa_swap,
     close_swap,
     fund_wallet,
-    generate_wallet,
     logic_signature,
     mint_asa,
     opt_in_asa,
@@ -23,17 +23,15 @@ from tests.models import AlgorandSandbox, LogicSigWallet, Wallet
 
 
 @pytest.fixture()
-def swap_creator(algorand_sandbox: AlgorandSandbox) -> Wallet:
-    funded_account = generate_wallet()
-    fund_wallet(funded_account, algorand_sandbox)
+def swap_creator(wallet_pool: WalletPool) -> Wallet:
+    funded_account = wallet_pool.take()
     print(f"\n --- Swapper Creator {funded_account.public_key} funded.")
     return funded_account
 
 
 @pytest.fixture()
-def swap_user(algorand_sandbox: AlgorandSandbox) -> Wallet:
-    funded_account = generate_wallet()
-    fund_wallet(funded_account, algorand_sandbox)
+def swap_user(wallet_pool: WalletPool) -> Wallet:
+    funded_account = wallet_pool.take()
     print(f"\n --- Swapper User {funded_account.public_key} funded.")
     return funded_account
 
@@ -79,9 +77,9 @@ def other_asa_idx(swap_user: Wallet) -> int:
     )
 
 
-@pytest.fixture()
+@pytest.fixture(params=[False, True], ids=["default", "short_circuit"])
 def swapper_account(
-    swap_creator: Wallet, offered_asa_idx: int, requested_asa_idx: int
+    request, swap_creator: Wallet, offered_asa_idx: int, requested_asa_idx: int
 ) -> LogicSigWallet:
     cfg = AsaToAsaSwapConfig(
         swap_creator=swap_creator.public_key,
@@ -91,6 +89,7 @@ def swapper_account(
         requested_asa_amount=1,
         incentive_fee_address="RJVRGSPGSPOG7W3V7IMZZ2BAYCABW3YC5MWGKEOPAEEI5ZK5J2GSF6Y26A",
         incentive_fee_amount=10_000,
+        short_circuit=request.param,
     )
 
     swapper_lsig = logic_signature(compile_stateless(swapper(cfg)))
@@ -1,16 +1,19 @@
+from functools import partial
+
 import pytest
 from algosdk.error import AlgodHTTPError
 
 from algoworld_contracts.swapper.asas_to_algo_swapper import BASE_OPTIN_FUNDING_AMOUNT
+from algoworld_contracts.toolkit.funding import WalletPool
 from tests.helpers import (
     INCENTIVE_FEE_ADDRESS,
+    AsasToAlgoLoopSwapConfig,
     AsasToAlgoSwapConfig,
     asa_to_algo_swap,
     close_swap,
     fund_wallet,
     generate_random_offered_asas,
     generate_swapper,
-    generate_wallet,
     mint_asa,
     opt_in_asa,
     swapper_deposit,
@@ -21,18 +24,29 @@ from tests.models import AlgorandSandbox, LogicSigWallet, Wallet
 #### Fixtures
 
 
+@pytest.fixture(
+    params=[
+        AsasToAlgoSwapConfig,
+        partial(AsasToAlgoSwapConfig, short_circuit=True),
+        AsasToAlgoLoopSwapConfig,
+        partial(AsasToAlgoLoopSwapConfig, short_circuit=True),
+    ],
+    ids=["unrolled", "unrolled_short_circuit", "loop", "loop_short_circuit"],
+)
+def swap_config_type(request) -> type:
+    return request.param
+
+
 @pytest.fixture()
-def swap_creator(algorand_sandbox: AlgorandSandbox) -> Wallet:
-    funded_account = generate_wallet()
-    fund_wallet(funded_account, algorand_sandbox)
+def swap_creator(wallet_pool: WalletPool) -> Wallet:
+    funded_account = wallet_pool.take()
     print(f"\n --- Swapper Creator {funded_account.public_key} funded.")
     return funded_account
 
 
 @pytest.fixture()
-def swap_user(algorand_sandbox: AlgorandSandbox) -> Wallet:
-    funded_account = generate_wallet()
-    fund_wallet(funded_account, algorand_sandbox)
+def swap_user(wallet_pool: WalletPool) -> Wallet:
+    funded_account = wallet_pool.take()
     print(f"\n --- Swapper User {funded_account.public_key} funded.")
     return funded_account
 
@@ -91,10 +105,13 @@ def other_asa_idx(swap_user: Wallet) -> int:
 
 @pytest.fixture()
 def swapper_account(
-    swap_creator: Wallet, offered_asa_a_idx: int, offered_asa_b_idx: int
+    swap_config_type: type,
+    swap_creator: Wallet,
+    offered_asa_a_idx: int,
+    offered_asa_b_idx: int,
 ) -> LogicSigWallet:
     return generate_swapper(
-        AsasToAlgoSwapConfig(
+        swap_config_type(
             swap_creator=swap_creator.public_key,
             offered_asa_amounts={str(offered_asa_a_idx): 1, str(offered_asa_b_idx): 1},
             requested_algo_amount=1_000_000,
@@ -282,12 +299,21 @@ def test_swapper_asa_swap(
     )
 
 
+@pytest.mark.parametrize(
+    "swap_config_type",
+    [AsasToAlgoSwapConfig, AsasToAlgoLoopSwapConfig],
+)
 def test_swapper_random_asas_swap(
-    swap_creator: Wallet, swap_user: Wallet, incentive_wallet: Wallet
+    swap_config_type: type,
+    swap_creator: Wallet,
+    swap_user: Wallet,
+    incentive_wallet: Wallet,
 ):
-    """Randomly generates 5 ASAs of different digits and unit amounts. And attempts a multi asa swap."""
+    """Randomly generates the maximum number of ASAs of different digits and unit amounts. And attempts a multi asa swap."""
 
-    random_offered_asas = generate_random_offered_asas(swap_creator)
+    random_offered_asas = generate_random_offered_asas(
+        swap_creator, swap_config_type.MAX_OFFERED_ASAS
+    )
     asa_ids = [asa["id"] for asa in random_offered_asas]
     offered_asas_opt_ins = {}
     offered_asas = {}
@@ -300,7 +326,7 @@ def test_swapper_random_asas_swap(
         offered_asas_opt_ins[asa_id] = 0
 
     swapper_account = generate_swapper(
-        AsasToAlgoSwapConfig(
+        swap_config_type(
             swap_creator=swap_creator.public_key,
             offered_asa_amounts=offered_asas,
             requested_algo_amount=requested_algo_amount,
@@ -6,16 +6,16 @@ from algoworld_contracts.swapper.swap_proxy import (
     compile_stateless,
     swapper_proxy,
 )
-from tests.helpers import fund_wallet, generate_wallet, logic_signature
+from algoworld_contracts.toolkit.funding import WalletPool
+from tests.helpers import logic_signature
 from tests.helpers.constants import SWAP_PROXY_VERSION
 from tests.helpers.utils import activate_or_save_proxy_note
-from tests.models import AlgorandSandbox, LogicSigWallet, Wallet
+from tests.models import LogicSigWallet, Wallet
 
 
 @pytest.fixture()
-def swap_creator(algorand_sandbox: AlgorandSandbox) -> Wallet:
-    funded_account = generate_wallet()
-    fund_wallet(funded_account, algorand_sandbox)
+def swap_creator(wallet_pool: WalletPool) -> Wallet:
+    funded_account = wallet_pool.take()
     print(f"\n --- Swapper Creator {funded_account.public_key} funded.")
     return funded_account
 
@@ -0,0 +1,102 @@
+import dataclasses
+import io
+import json
+
+import pytest
+
+from algoworld_contracts import analyzer, contracts
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+
+SWAP_CREATOR = "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ"
+
+
+def _multi_swapper_config(offered_asa_amounts, config_type=AsasToAlgoSwapConfig):
+    return config_type(
+        SWAP_CREATOR,
+        offered_asa_amounts,
+        1_000_000,
+        1000,
+        210000,
+        INCENTIVE_FEE_ADDRESS,
+        INCENTIVE_FEE_AMOUNT,
+    )
+
+
+def test_analyze():
+    cfg = _multi_swapper_config({1: 1, 2: 1})
+
+    report = analyzer.analyze(cfg)
+
+    assert report.contract == "multi_swapper"
+    assert report.program_bytes == len(contracts.get_program(cfg))
+    assert report.size_headroom == analyzer.MAX_PROGRAM_SIZE - report.program_bytes
+    assert set(report.branch_costs) == {"optin", "swap", "close", "reject"}
+    assert report.branch_costs["close"] > report.branch_costs["optin"]
+    assert report.fits
+
+
+@pytest.mark.parametrize(
+    "config_type", [AsasToAlgoSwapConfig, AsasToAlgoLoopSwapConfig]
+)
+def test_max_offered_asas(config_type):
+    cfg = _multi_swapper_config({1: 1}, config_type)
+
+    max_asas = analyzer.max_offered_asas(cfg)
+
+    worst_case = analyzer.worst_case_asas(max_asas)
+    assert analyzer.analyze(_multi_swapper_config(worst_case, config_type)).fits
+    if max_asas < config_type.MAX_OFFERED_ASAS:
+        worst_case = analyzer.worst_case_asas(max_asas + 1)
+        assert not analyzer.analyze(_multi_swapper_config(worst_case, config_type)).fits
+
+
+@pytest.mark.parametrize(
+    "config_type", [AsasToAlgoSwapConfig, AsasToAlgoLoopSwapConfig]
+)
+def test_analyze_short_circuit(config_type):
+    cfg = _multi_swapper_config({1: 1, 2: 1, 3: 1}, config_type)
+
+    default = analyzer.analyze(cfg).branch_costs
+    short_circuit = analyzer.analyze(
+        dataclasses.replace(cfg, short_circuit=True)
+    ).branch_costs
+
+    assert set(short_circuit) == set(default)
+    assert all(short_circuit[k] <= default[k] for k in default)
+    assert short_circuit["reject"] < default["reject"]
+    assert short_circuit["swap"] < default["swap"]
+
+
+def test_max_offered_asas_loop():
+    cfg = _multi_swapper_config({1: 1}, AsasToAlgoLoopSwapConfig)
+
+    assert analyzer.max_offered_asas(cfg) == AsasToAlgoLoopSwapConfig.MAX_OFFERED_ASAS
+
+
+def test_analyzer_cli(monkeypatch, capsys):
+    cfg = SwapProxy(SWAP_CREATOR, "0.0.3")
+    monkeypatch.setattr("sys.stdin", io.StringIO(contracts.get_teal(cfg)))
+
+    exit_code = analyzer.main(["--teal", "--contract", "swapper_proxy"])
+
+    report = json.loads(capsys.readouterr().out)
+    assert exit_code == 0
+    assert report["branch_costs"] == analyzer.analyze(cfg).branch_costs
+    assert report["fits"]
+
+
+def test_optimization_savings():
+    cfg = _multi_swapper_config({1: 1, 2: 1})
+
+    savings = analyzer.optimization_savings(cfg, 1)
+
+    baseline, optimized = analyzer.analyze(cfg), analyzer.analyze(cfg, 1)
+    assert savings["program_bytes"] == baseline.program_bytes - optimized.program_bytes
+    assert savings["program_bytes"] > 0
+    assert all(saved >= 0 for saved in savings["branch_costs"].values())
+    assert analyzer.max_offered_asas(cfg, 1) >= analyzer.max_offered_asas(cfg)
@@ -0,0 +1,56 @@
+import pytest
+from algosdk import account
+
+from algoworld_contracts import contracts
+from algoworld_contracts.batch import decode_programs, derive_escrow_addresses
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+
+
+def _configs(count: int):
+    for i in range(count):
+        creator = account.generate_account()[1]
+        yield [
+            AsaToAsaSwapConfig(
+                creator, i, 1, i + 1, 1, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+            ),
+            AsasToAlgoSwapConfig(
+                creator,
+                {asa: 1 for asa in range(i % 5 + 1)},
+                i,
+                1000,
+                210000,
+                INCENTIVE_FEE_ADDRESS,
+                INCENTIVE_FEE_AMOUNT,
+            ),
+            SwapProxy(creator, "0.0.3"),
+        ][i % 3]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_derive_escrow_addresses(processes: int):
+    configs = list(_configs(20))
+
+    results = list(derive_escrow_addresses(iter(configs), processes, chunk_size=3))
+
+    assert [cfg for cfg, _, _ in results] == configs
+    for cfg, program, address in results:
+        assert program == contracts.get_program(cfg)
+        assert address == contracts.get_escrow_address(cfg)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_decode_programs(processes: int):
+    configs = list(_configs(12))
+    programs = [contracts.get_program(cfg) for cfg in configs] + [b"\x06\x81\x01"]
+
+    results = list(decode_programs(iter(programs), processes, chunk_size=5))
+
+    assert [program for program, _ in results] == programs
+    for cfg, (_, decoded) in zip(configs, results):
+        if isinstance(cfg, SwapProxy):
+            cfg = SwapProxy(cfg.swap_creator, "")
+        assert decoded.config == cfg
+    assert results[-1][1] is None
@@ -0,0 +1,57 @@
+import io
+import json
+
+import pytest
+
+from algoworld_contracts import cli, contracts
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+
+SWAP_CREATOR = "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ"
+
+CONFIGS = [
+    AsaToAsaSwapConfig(
+        SWAP_CREATOR, 1, 1, 2, 1, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+    ),
+    SwapProxy(SWAP_CREATOR, "0.0.3"),
+]
+
+
+def _run(monkeypatch, capsys, stdin: str, *args: str):
+    monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    exit_code = cli.main(list(args))
+    lines = capsys.readouterr().out.splitlines()
+    return exit_code, [json.loads(line) for line in lines]
+
+
+@pytest.mark.parametrize("processes", ["1", "2"])
+def test_cli_jsonl(monkeypatch, capsys, processes: str):
+    stdin = "\n".join(
+        json.dumps({"contract": contracts.contract_name(cfg), **vars(cfg)})
+        for cfg in CONFIGS * 3
+    )
+
+    exit_code, results = _run(
+        monkeypatch, capsys, stdin, "-p", processes, "--chunk-size", "2"
+    )
+
+    assert exit_code == 0
+    assert [r["index"] for r in results] == list(range(6))
+    for cfg, result in zip(CONFIGS * 3, results):
+        assert result["teal"] == contracts.get_teal(cfg)
+        assert result["address"] == contracts.get_escrow_address(cfg)
+
+
+def test_cli_json_array_errors(monkeypatch, capsys):
+    stdin = json.dumps([vars(CONFIGS[1]), {"swap_creator": "invalid"}])
+
+    exit_code, results = _run(
+        monkeypatch, capsys, stdin, "--contract", "swapper_proxy", "--no-teal"
+    )
+
+    assert exit_code == 1
+    assert results[0]["address"] == contracts.get_escrow_address(CONFIGS[1])
+    assert "teal" not in results[0]
+    assert results[1]["index"] == 1
+    assert "error" in results[1]
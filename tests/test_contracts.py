@@ -0,0 +1,257 @@
+import dataclasses
+from random import randint
+
+import pytest
+from algosdk import account
+from pyteal import Mode, TealInputError, compileTeal
+
+from algoworld_contracts import contracts
+from algoworld_contracts.common.assembler import assemble, program_address
+from algoworld_contracts.common.optimizer import optimize_teal
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig, swapper
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+    multi_asa_loop_swapper,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import (
+    AsasToAlgoSwapConfig,
+    multi_asa_swapper,
+)
+from algoworld_contracts.swapper.swap_proxy import SwapProxy, swapper_proxy
+from tests.conftest import ALGORAND_SANDBOX
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT, logic_signature
+
+
+def _compile(program):
+    return compileTeal(program, Mode.Signature, version=contracts.TEAL_VERSION)
+
+
+def _address():
+    return account.generate_account()[1]
+
+
+@pytest.mark.parametrize("asa_amount", [0, 1, 1000, 2**64 - 1])
+def test_get_swapper_teal(asa_amount: int):
+    cfg = AsaToAsaSwapConfig(
+        swap_creator=_address(),
+        offered_asa_id=randint(1, 2**32),
+        offered_asa_amount=asa_amount,
+        requested_asa_id=randint(1, 2**32),
+        requested_asa_amount=asa_amount,
+        incentive_fee_address=INCENTIVE_FEE_ADDRESS,
+        incentive_fee_amount=INCENTIVE_FEE_AMOUNT,
+    )
+
+    assert contracts.get_swapper_teal(**vars(cfg)) == _compile(swapper(cfg))
+
+
+@pytest.mark.parametrize("body_size", [1, 2, 3, 4, 5])
+def test_get_multi_swapper_teal(body_size: int):
+    cfg = AsasToAlgoSwapConfig(
+        swap_creator=_address(),
+        offered_asa_amounts={
+            str(randint(1, 2**32)): randint(1, 100) for _ in range(body_size)
+        },
+        requested_algo_amount=randint(1, 10**9),
+        max_fee=1000,
+        optin_funding_amount=210000 * body_size,
+        incentive_fee_address=INCENTIVE_FEE_ADDRESS,
+        incentive_fee_amount=INCENTIVE_FEE_AMOUNT,
+    )
+    params = {k: getattr(cfg, k) for k in AsasToAlgoSwapConfig.__dataclass_fields__}
+
+    assert contracts.get_multi_swapper_teal(**params) == _compile(
+        multi_asa_swapper(cfg)
+    )
+
+
+@pytest.mark.parametrize("body_size", [1, 5, 14])
+def test_get_multi_swapper_loop_teal(body_size: int):
+    cfg = AsasToAlgoLoopSwapConfig(
+        swap_creator=_address(),
+        offered_asa_amounts={
+            str(randint(1, 2**64 - 1)): randint(0, 2**64 - 1)
+            for _ in range(body_size)
+        },
+        requested_algo_amount=randint(1, 10**9),
+        max_fee=1000,
+        optin_funding_amount=210000 * body_size,
+        incentive_fee_address=INCENTIVE_FEE_ADDRESS,
+        incentive_fee_amount=INCENTIVE_FEE_AMOUNT,
+    )
+
+    teal = contracts.get_teal(cfg)
+
+    assert teal == _compile(multi_asa_loop_swapper(cfg))
+    assert contracts.get_program(cfg) == assemble(teal)
+    assert contracts.contract_name(cfg) == "multi_swapper_loop"
+
+
+def test_multi_swapper_loop_max_offered_asas():
+    with pytest.raises(AssertionError):
+        AsasToAlgoLoopSwapConfig(
+            _address(),
+            {asa: 1 for asa in range(15)},
+            1,
+            1000,
+            0,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+        )
+
+
+@pytest.mark.parametrize(
+    "config_type", [AsasToAlgoSwapConfig, AsasToAlgoLoopSwapConfig]
+)
+def test_get_teal_short_circuit(config_type):
+    swapper_cfg = AsaToAsaSwapConfig(
+        _address(), 1, 1, 2, 1, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT, True
+    )
+    multi_swapper_cfg = config_type(
+        _address(),
+        {1: 1, 2: 1, 3: 1},
+        1_000_000,
+        1000,
+        210000 * 3,
+        INCENTIVE_FEE_ADDRESS,
+        INCENTIVE_FEE_AMOUNT,
+        short_circuit=True,
+    )
+    build = (
+        multi_asa_swapper
+        if config_type is AsasToAlgoSwapConfig
+        else multi_asa_loop_swapper
+    )
+
+    assert contracts.get_teal(swapper_cfg) == _compile(swapper(swapper_cfg))
+    assert contracts.get_teal(multi_swapper_cfg) == _compile(build(multi_swapper_cfg))
+    assert contracts.get_teal(multi_swapper_cfg) != contracts.get_teal(
+        dataclasses.replace(multi_swapper_cfg, short_circuit=False)
+    )
+
+
+def test_get_swapper_proxy_teal():
+    cfg = SwapProxy(swap_creator=_address(), version="0.0.3")
+
+    assert contracts.get_swapper_proxy_teal(**vars(cfg)) == _compile(swapper_proxy(cfg))
+
+
+def test_get_teal_invalid_constants():
+    with pytest.raises(TealInputError):
+        contracts.get_swapper_proxy_teal("not an address", "0.0.3")
+
+    with pytest.raises(TealInputError):
+        contracts.get_swapper_teal(
+            _address(), 1, -1, 2, 1, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+        )
+
+    with pytest.raises(AssertionError):
+        contracts.get_multi_swapper_teal(
+            _address(),
+            {asa: 1 for asa in range(6)},
+            1,
+            1000,
+            0,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+        )
+
+
+def _program_configs(body_size: int) -> list:
+    return [
+        AsaToAsaSwapConfig(
+            _address(), 1, 1, 2, 1, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+        ),
+        AsasToAlgoSwapConfig(
+            _address(),
+            {asa: asa for asa in range(1, body_size + 1)},
+            1_000_000,
+            1000,
+            210000 * body_size,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+        ),
+        SwapProxy(_address(), "0.0.3"),
+    ]
+
+
+@pytest.mark.parametrize("body_size", [1, 3, 5])
+def test_get_program(body_size: int):
+    for cfg in _program_configs(body_size):
+        program = contracts.get_program(cfg)
+
+        assert program == assemble(contracts.get_teal(cfg))
+        assert contracts.get_escrow_address(cfg) == program_address(program)
+
+
+# The local node compiles with the assembler of this package
+@pytest.mark.skipif(
+    ALGORAND_SANDBOX != "docker", reason="needs the algod of the docker sandbox"
+)
+@pytest.mark.parametrize("body_size", [1, 3, 5])
+def test_get_program_matches_algod(body_size: int):
+    for cfg in _program_configs(body_size):
+        teal = contracts.get_teal(cfg)
+
+        assert contracts.get_program(cfg) == logic_signature(teal).logic
+
+
+def test_contracts_cache():
+    cfg = SwapProxy(_address(), "0.0.3")
+    contracts.enable_cache(maxsize=1)
+    try:
+        teal = contracts.get_swapper_proxy_teal(cfg.swap_creator, cfg.version)
+
+        assert contracts.get_teal(cfg) is teal
+        assert contracts.cache_stats()["hits"] == 1
+
+        contracts.get_program(cfg)
+        assert contracts.cache_stats()["evictions"] == 1
+    finally:
+        contracts.disable_cache()
+
+    assert contracts.cache_stats() == {}
+
+
+@pytest.mark.parametrize("amount", [True, 1.0])
+def test_contracts_cache_checks_value_types(amount):
+    cfg = AsaToAsaSwapConfig(
+        _address(), 1, 1, 2, 1, INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+    )
+    contracts.enable_cache()
+    try:
+        contracts.get_teal(cfg)
+
+        with pytest.raises(TealInputError):
+            contracts.get_teal(dataclasses.replace(cfg, offered_asa_amount=amount))
+    finally:
+        contracts.disable_cache()
+
+
+def test_contracts_disk_cache(tmp_path):
+    cfg = SwapProxy(_address(), "0.0.3")
+    contracts.enable_disk_cache(str(tmp_path))
+    try:
+        teal = contracts.get_teal(cfg)
+        program = contracts.get_program(cfg)
+
+        assert contracts.get_teal(cfg) == teal
+        assert contracts.get_program(cfg) == program
+        assert contracts.disk_cache_stats()["hits"] == 2
+        assert contracts.disk_cache_stats()["misses"] == 2
+    finally:
+        contracts.disable_disk_cache()
+
+
+def test_get_teal_optimize():
+    optimize = 1
+    cfg = SwapProxy(_address(), "0.0.3")
+
+    teal = contracts.get_teal(cfg, optimize)
+
+    assert teal == optimize_teal(contracts.get_teal(cfg), optimize)
+    assert contracts.get_swapper_proxy_teal(cfg.swap_creator, "0.0.3", optimize) == teal
+    assert len(contracts.get_program(cfg, optimize)) < len(contracts.get_program(cfg))
+    assert contracts.get_escrow_address(cfg, optimize) != contracts.get_escrow_address(
+        cfg
+    )
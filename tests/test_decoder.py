@@ -0,0 +1,148 @@
+import random
+import time
+
+import pytest
+from algosdk import account
+
+from algoworld_contracts import contracts
+from algoworld_contracts.common.assembler import assemble, uvarint
+from algoworld_contracts.decoder import ProgramDecoder
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+
+SWAP_CREATOR = account.generate_account()[1]
+
+
+@pytest.fixture(scope="module")
+def decoder() -> ProgramDecoder:
+    return ProgramDecoder()
+
+
+def _asas(count: int, start: int = 10**8):
+    return {start + asa: 1_000 + asa for asa in range(count)}
+
+
+def _configs(short_circuit: bool):
+    yield SwapProxy(SWAP_CREATOR, "")
+    yield AsaToAsaSwapConfig(
+        SWAP_CREATOR,
+        123_456_789,
+        300,
+        987_654,
+        17,
+        INCENTIVE_FEE_ADDRESS,
+        INCENTIVE_FEE_AMOUNT,
+        short_circuit,
+    )
+    for count in range(1, AsasToAlgoSwapConfig.MAX_OFFERED_ASAS + 1):
+        yield AsasToAlgoSwapConfig(
+            SWAP_CREATOR,
+            _asas(count),
+            5_000_000,
+            1_234,
+            210_001,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+            short_circuit,
+        )
+    for count in (1, 7, AsasToAlgoLoopSwapConfig.MAX_OFFERED_ASAS):
+        yield AsasToAlgoLoopSwapConfig(
+            SWAP_CREATOR,
+            _asas(count),
+            5_000_000,
+            1_234,
+            210_001,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+            short_circuit,
+        )
+
+
+@pytest.mark.parametrize("optimize", [0, 1])
+@pytest.mark.parametrize("short_circuit", [False, True])
+def test_decode(decoder: ProgramDecoder, short_circuit: bool, optimize: int):
+    for cfg in _configs(short_circuit):
+        program = contracts.get_program(cfg, optimize)
+
+        decoded = decoder.decode(program)
+
+        assert decoded is not None
+        assert decoded.contract == contracts.contract_name(cfg)
+        assert decoded.config == cfg
+        assert contracts.get_program(decoded.config, decoded.optimize) == program
+
+
+def test_decode_coinciding_values(decoder: ProgramDecoder):
+    # Amounts of 1 and a creator collecting its own fee share the constant
+    # blocks with contract constants, which changes the program layout
+    configs = [
+        AsaToAsaSwapConfig(SWAP_CREATOR, asa, 1, asa + 1, 1, SWAP_CREATOR, 0)
+        for asa in range(10**6, 10**6 + 20)
+    ] + [
+        AsasToAlgoSwapConfig(
+            SWAP_CREATOR, {asa: 1, asa + 1: 1}, 0, 1000, 0, SWAP_CREATOR, 0
+        )
+        for asa in range(10**6, 10**6 + 20)
+    ]
+
+    learned = decoder.learned
+    for cfg in configs:
+        assert decoder.decode(contracts.get_program(cfg)).config == cfg
+    # Each new layout is learned once, then matched like the common ones
+    assert decoder.learned - learned == 2
+
+
+def test_decode_rejects(decoder: ProgramDecoder):
+    cfg = AsaToAsaSwapConfig(
+        SWAP_CREATOR, 42_000, 3, 69_000, 5, INCENTIVE_FEE_ADDRESS, 10_000
+    )
+    program = contracts.get_program(cfg)
+    assert decoder.decode(program) is not None
+
+    # Pushed int with a non minimal encoding
+    pushed = uvarint(69_000)
+    assert b"\x81" + pushed in program
+    padded = program.replace(
+        b"\x81" + pushed, b"\x81" + pushed[:-1] + bytes([pushed[-1] | 0x80, 0])
+    )
+    # Branch to another label
+    jumped = assemble(contracts.get_teal(cfg).replace("bnz main_l5", "bnz main_l6", 1))
+    assert len(jumped) == len(program)
+
+    assert decoder.decode(padded) is None
+    assert decoder.decode(jumped) is None
+    assert decoder.decode(program[:-1]) is None
+    assert decoder.decode(b"") is None
+    assert decoder.decode(assemble("#pragma version 6\nint 1\nreturn")) is None
+    assert decoder.decode(bytes(random.getrandbits(8) for _ in range(300))) is None
+
+
+def test_decode_throughput(decoder: ProgramDecoder):
+    creators = [account.generate_account()[1] for _ in range(10)]
+    programs = [
+        contracts.get_program(
+            AsaToAsaSwapConfig(
+                random.choice(creators),
+                random.randint(1, 2**40),
+                random.randint(2, 10**6),
+                random.randint(1, 2**40),
+                random.randint(2, 10**6),
+                INCENTIVE_FEE_ADDRESS,
+                INCENTIVE_FEE_AMOUNT,
+            )
+        )
+        for _ in range(5000)
+    ]
+    decoder.decode(programs[0])
+
+    start = time.perf_counter()
+    decoded = decoder.decode_many(programs)
+    elapsed = time.perf_counter() - start
+
+    assert all(result is not None for result in decoded)
+    assert elapsed < 1
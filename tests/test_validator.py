@@ -0,0 +1,170 @@
+import random
+
+import pytest
+from algosdk import account, encoding
+
+from algoworld_contracts import contracts
+from algoworld_contracts.common.evaluator import ADDRESS_FIELDS
+from algoworld_contracts.common.predicates import UnsupportedExpressionError
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_loop_swapper import (
+    AsasToAlgoLoopSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from tests.helpers import INCENTIVE_FEE_ADDRESS, INCENTIVE_FEE_AMOUNT
+
+pytest.importorskip("numpy")
+
+from algoworld_contracts import validator  # noqa: E402
+
+SWAP_CREATOR = encoding.decode_address(
+    "2ILRL5YU3FZ4JDQZQVXEZUYKEWF7IEIGRRCPCMI36VKSGDMAS6FHSBXZDQ"
+)
+SWAP_USER = encoding.decode_address(account.generate_account()[1])
+INCENTIVE = encoding.decode_address(INCENTIVE_FEE_ADDRESS)
+OFFERED_ASAS = {42: 1, 43: 5, 44: 2}
+
+
+def _pay(sender, receiver, amount):
+    return {
+        "TypeEnum": 1,
+        "Fee": 1000,
+        "Sender": sender,
+        "Receiver": receiver,
+        "Amount": amount,
+    }
+
+
+def _axfer(sender, receiver, asa, amount):
+    return {
+        "TypeEnum": 4,
+        "Fee": 1000,
+        "Sender": sender,
+        "XferAsset": asa,
+        "AssetAmount": amount,
+        "AssetReceiver": receiver,
+    }
+
+
+def _swapper_group(escrow):
+    return [
+        _axfer(escrow, SWAP_USER, 42, 1),
+        _axfer(SWAP_USER, SWAP_CREATOR, 69, 1),
+        _pay(SWAP_USER, INCENTIVE, INCENTIVE_FEE_AMOUNT),
+    ]
+
+
+def _multi_swapper_group(escrow):
+    return [
+        _pay(SWAP_USER, INCENTIVE, INCENTIVE_FEE_AMOUNT),
+        _pay(SWAP_USER, SWAP_CREATOR, 1_000_000),
+        *(
+            _axfer(escrow, SWAP_USER, asa, amount)
+            for asa, amount in OFFERED_ASAS.items()
+        ),
+    ]
+
+
+def _config(config_type, short_circuit=False):
+    if config_type is AsaToAsaSwapConfig:
+        return AsaToAsaSwapConfig(
+            encoding.encode_address(SWAP_CREATOR),
+            42,
+            1,
+            69,
+            1,
+            INCENTIVE_FEE_ADDRESS,
+            INCENTIVE_FEE_AMOUNT,
+            short_circuit,
+        )
+    return config_type(
+        encoding.encode_address(SWAP_CREATOR),
+        OFFERED_ASAS,
+        1_000_000,
+        1000,
+        630000,
+        INCENTIVE_FEE_ADDRESS,
+        INCENTIVE_FEE_AMOUNT,
+        short_circuit,
+    )
+
+
+def _corpus(rng, group, escrow, size=500):
+    addresses = [SWAP_CREATOR, SWAP_USER, INCENTIVE, escrow, bytes(32)]
+    corpus = []
+    for _ in range(size):
+        candidate = [dict(txn) for txn in group]
+        for _ in range(rng.randint(0, 2)):
+            txn = rng.choice(candidate)
+            field = rng.choice(
+                ["TypeEnum", "Fee", "Amount", "XferAsset", "AssetAmount", "Sender"]
+                + ["Receiver", "AssetReceiver", "RekeyTo", "AssetCloseTo"]
+            )
+            if field in ADDRESS_FIELDS:
+                txn[field] = rng.choice(addresses)
+            else:
+                value = min(txn.get(field, 0) + 1, 2**64 - 1)
+                txn[field] = rng.choice([0, 1, 4, value, 2**64 - 1])
+        corpus.append(candidate)
+    return corpus
+
+
+@pytest.mark.parametrize("short_circuit", [False, True])
+@pytest.mark.parametrize(
+    "config_type, build",
+    [
+        (AsaToAsaSwapConfig, _swapper_group),
+        (AsasToAlgoSwapConfig, _multi_swapper_group),
+    ],
+)
+def test_validate_batch_matches_predicate(config_type, build, short_circuit):
+    cfg = _config(config_type, short_circuit)
+    escrow = encoding.decode_address(contracts.get_escrow_address(cfg))
+    groups = _corpus(random.Random(config_type.__name__), build(escrow), escrow)
+    predicate = contracts.get_predicate(cfg)
+
+    result = validator.validate_batch(cfg, validator.columns_from_groups(groups))
+
+    assert result.mask.tolist() == [predicate(group) for group in groups]
+    assert 0 < result.mask.sum() < len(groups)
+    assert (result.first_failure == -1).tolist() == result.mask.tolist()
+
+
+def test_validate_batch_first_failure():
+    cfg = _config(AsaToAsaSwapConfig)
+    escrow = encoding.decode_address(contracts.get_escrow_address(cfg))
+    valid = _swapper_group(escrow)
+    wrong_amount = [dict(txn) for txn in valid]
+    wrong_amount[1]["AssetAmount"] = 2
+    wrong_type = [dict(txn) for txn in valid]
+    wrong_type[2]["TypeEnum"] = 4
+
+    result = validator.validate_batch(
+        cfg, validator.columns_from_groups([valid, wrong_amount, wrong_type])
+    )
+
+    assert result.mask.tolist() == [True, False, False]
+    assert result.first_failure[0] == -1
+    assert "AssetAmount" in result.checks[result.first_failure[1]]
+    assert "TypeEnum" in result.checks[result.first_failure[2]]
+
+
+def test_validate_batch_wrong_group_size():
+    cfg = _config(AsasToAlgoSwapConfig)
+    escrow = encoding.decode_address(contracts.get_escrow_address(cfg))
+    columns = validator.columns_from_groups([_multi_swapper_group(escrow)[:-1]])
+
+    result = validator.validate_batch(cfg, columns)
+
+    assert result.mask.tolist() == [False]
+    assert result.first_failure.tolist() == [0]
+
+
+def test_validate_batch_unsupported():
+    cfg = _config(AsasToAlgoLoopSwapConfig)
+    escrow = encoding.decode_address(contracts.get_escrow_address(cfg))
+
+    with pytest.raises(UnsupportedExpressionError):
+        validator.validate_batch(
+            cfg, validator.columns_from_groups([_multi_swapper_group(escrow)])
+        )
@@ -0,0 +1,201 @@
+import base64
+
+import pytest
+from algosdk import account
+
+from algoworld_contracts.common.assembler import program_address
+from algoworld_contracts.contracts import get_program, get_teal
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.swapper.asa_to_asa_swapper import (
+    OPTIN_FUNDING_AMOUNT,
+    AsaToAsaSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import (
+    BASE_OPTIN_FUNDING_AMOUNT,
+    AsasToAlgoSwapConfig,
+)
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from algoworld_contracts.toolkit.backfill import (
+    BackfillStore,
+    backfill,
+    classify_transactions,
+)
+from algoworld_contracts.toolkit.clients import PooledAlgodClient, PooledIndexerClient
+from algoworld_contracts.toolkit.funding import Funder
+from algoworld_contracts.toolkit.transactions import Toolkit, Wallet
+
+INCENTIVE_FEE = 10_000
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+@pytest.fixture(scope="module")
+def history(localnet: LocalNet):
+    """
+    Swapper and proxy activity, with the round range holding it.
+    """
+    toolkit = Toolkit(
+        PooledAlgodClient("a" * 64, localnet.algod_address),
+        PooledIndexerClient("a" * 64, localnet.indexer_address),
+    )
+    funder = Funder(toolkit, Wallet(localnet.dispenser_key, localnet.dispenser))
+    creator, user, incentive = funder.fund_wallets(3)
+    offered = toolkit.mint_asas(creator, [(f"Card {i}", 1, 0) for i in range(3)])
+    requested = toolkit.mint_asa(user, "Requested", 1, 0)
+    toolkit.opt_in_asas(creator, [requested])
+    toolkit.opt_in_asas(user, offered)
+    single_cfg = AsaToAsaSwapConfig(
+        creator.public_key,
+        offered[0],
+        1,
+        requested,
+        1,
+        incentive.public_key,
+        INCENTIVE_FEE,
+    )
+    multi_cfg = AsasToAlgoSwapConfig(
+        creator.public_key,
+        {str(offered[1]): 1, str(offered[2]): 1},
+        10**6,
+        1_000,
+        BASE_OPTIN_FUNDING_AMOUNT * 2,
+        incentive.public_key,
+        INCENTIVE_FEE,
+    )
+    proxy_cfg = SwapProxy(creator.public_key, "")
+    first_round = localnet.ledger.last_round + 1
+
+    single = toolkit.logic_sig_wallet(get_teal(single_cfg))
+    multi = toolkit.logic_sig_wallet(get_teal(multi_cfg))
+    proxy = toolkit.logic_sig_wallet(get_teal(proxy_cfg))
+    toolkit.swapper_opt_in(creator, single, {offered[0]: 0}, OPTIN_FUNDING_AMOUNT)
+    toolkit.swapper_deposit(creator, single, {offered[0]: 1})
+    toolkit.activate_or_save_proxy_note(
+        creator, proxy, "ipfs://single", 110_000, 2_000, 0
+    )
+    toolkit.asa_to_asa_swap(
+        single, user, {offered[0]: 1}, user, creator, {requested: 1}, incentive, 10_000
+    )
+    toolkit.swapper_opt_in(
+        creator, multi, {offered[1]: 0, offered[2]: 0}, BASE_OPTIN_FUNDING_AMOUNT * 2
+    )
+    toolkit.activate_or_save_proxy_note(creator, proxy, "ipfs://multi", 0, 2_000, 0)
+    toolkit.close_swap(
+        multi,
+        creator,
+        creator,
+        offered[1:],
+        multi,
+        creator,
+        creator,
+        creator,
+        creator,
+    )
+    expected = [
+        ("optin", single.public_key, single_cfg),
+        ("store", proxy.public_key, proxy_cfg),
+        ("swap", single.public_key, single_cfg),
+        ("optin", multi.public_key, multi_cfg),
+        ("store", proxy.public_key, proxy_cfg),
+        ("close", multi.public_key, multi_cfg),
+    ]
+    # Trailing rounds without swapper activity
+    toolkit.pay(user, account.generate_account()[1], 200_000)
+    return first_round, localnet.ledger.last_round, expected
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_backfill(localnet: LocalNet, history, tmp_path, processes: int):
+    first_round, last_round, expected = history
+    path = str(tmp_path / "backfill.sqlite")
+
+    counts = backfill(
+        path,
+        first_round,
+        last_round,
+        localnet.indexer_address,
+        shard_size=4,
+        processes=processes,
+        checkpoint_rounds=3,
+    )
+
+    assert counts["rounds"] == last_round - first_round + 1
+    assert counts["events"] == len(expected)
+    with BackfillStore(path) as store:
+        events = store.events()
+        assert store.progress() == {
+            "planned_rounds": counts["rounds"],
+            "done_rounds": counts["rounds"],
+            "events": len(expected),
+        }
+    assert [(e.kind, e.escrow, e.config) for e in events] == expected
+    assert len({txid for event in events for txid in event.txids}) == sum(
+        len(event.txids) for event in events
+    )
+
+
+def test_backfill_resumes(localnet: LocalNet, history, tmp_path):
+    first_round, last_round, expected = history
+    path = str(tmp_path / "backfill.sqlite")
+    middle = (first_round + last_round) // 2
+    with BackfillStore(path) as store:
+        shard = store.plan(first_round, middle, 100)[0]
+        # Interrupted after its first round
+        store.checkpoint(shard[0], first_round + 1, [])
+
+    first = backfill(path, first_round, middle, localnet.indexer_address, 100, 1)
+    second = backfill(path, first_round, last_round, localnet.indexer_address, 100, 1)
+    third = backfill(path, first_round, last_round, localnet.indexer_address, 100, 1)
+
+    assert first["rounds"] == middle - first_round
+    assert second["rounds"] == last_round - middle
+    assert (third["shards"], third["rounds"]) == (0, 0)
+    with BackfillStore(path) as store:
+        events = store.events(min_round=first_round + 1)
+    # Events of the skipped round were not reprocessed
+    assert [(e.kind, e.escrow) for e in events] == [
+        (kind, escrow) for kind, escrow, _ in expected
+    ][1:]
+
+
+def test_classify_transactions_skips_delegated_signatures():
+    creator = account.generate_account()[1]
+    cfg = AsaToAsaSwapConfig(creator, 1, 1, 2, 1, creator, INCENTIVE_FEE)
+    program = get_program(cfg)
+    escrow = program_address(program)
+
+    def opt_in(txid: str, sender: str, **signature) -> list:
+        group = base64.b64encode(txid.encode() * 32).decode()
+        logicsig = {"logic": base64.b64encode(program).decode(), **signature}
+        return [
+            {"id": f"{txid}0", "tx-type": "pay", "sender": creator},
+            {
+                "id": f"{txid}1",
+                "tx-type": "axfer",
+                "sender": sender,
+                "signature": {"logicsig": logicsig},
+            },
+        ], group
+
+    transactions = []
+    for txns, group in [
+        opt_in("A", escrow),
+        # The swapper program signed by its creator for the creator account
+        opt_in("B", creator, signature="c2ln"),
+        opt_in("C", creator, **{"multisig-signature": {}}),
+        # Sent by another account without delegation, as after a rekey
+        opt_in("D", creator),
+    ]:
+        for txn in txns:
+            transactions.append(dict(txn, group=group, **{"confirmed-round": 1}))
+
+    events = classify_transactions(transactions)
+
+    assert [(e.kind, e.escrow, e.txids) for e in events] == [
+        ("optin", escrow, ["A0", "A1"])
+    ]
+    assert events[0].config == cfg
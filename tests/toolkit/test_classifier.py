@@ -0,0 +1,171 @@
+import itertools
+import time
+
+import pytest
+from algosdk import account, encoding
+
+from algoworld_contracts.contracts import get_teal
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.swapper.asa_to_asa_swapper import (
+    OPTIN_FUNDING_AMOUNT,
+    AsaToAsaSwapConfig,
+)
+from algoworld_contracts.swapper.asas_to_algo_swapper import (
+    BASE_OPTIN_FUNDING_AMOUNT,
+    AsasToAlgoSwapConfig,
+)
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from algoworld_contracts.toolkit.classifier import SwapClassifier, branch_layouts
+from algoworld_contracts.toolkit.clients import PooledAlgodClient, PooledIndexerClient
+from algoworld_contracts.toolkit.confirmations import fetch_block
+from algoworld_contracts.toolkit.funding import Funder
+from algoworld_contracts.toolkit.transactions import Toolkit, Wallet
+
+INCENTIVE_FEE = 10_000
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+@pytest.fixture()
+def toolkit(localnet: LocalNet) -> Toolkit:
+    return Toolkit(
+        PooledAlgodClient("a" * 64, localnet.algod_address),
+        PooledIndexerClient("a" * 64, localnet.indexer_address),
+    )
+
+
+@pytest.fixture()
+def wallets(localnet: LocalNet, toolkit: Toolkit) -> list:
+    funder = Funder(toolkit, Wallet(localnet.dispenser_key, localnet.dispenser))
+    return funder.fund_wallets(3)
+
+
+def test_branch_layouts():
+    creator = account.generate_account()[1]
+    single = AsaToAsaSwapConfig(creator, 1, 1, 2, 1, creator, INCENTIVE_FEE)
+    multi = AsasToAlgoSwapConfig(
+        creator, {"1": 1, "2": 1}, 10**6, 1_000, 0, creator, INCENTIVE_FEE
+    )
+
+    assert {
+        k: (v.shape, v.escrow_index) for k, v in branch_layouts(single).items()
+    } == {
+        "optin": (("pay", "axfer"), 1),
+        "swap": (("axfer", "axfer", "pay"), 0),
+        "close": (("axfer", "pay", "pay"), 0),
+    }
+    assert {k: (v.shape, v.escrow_index) for k, v in branch_layouts(multi).items()} == {
+        "optin": (("pay", "axfer", "axfer"), 1),
+        "swap": (("pay", "pay", "axfer", "axfer"), 2),
+        "close": (("axfer", "axfer", "pay", "pay"), 0),
+    }
+    assert {
+        k: (v.shape, v.escrow_index)
+        for k, v in branch_layouts(SwapProxy(creator, "")).items()
+    } == {"store": (("pay", "pay"), 1)}
+
+
+def test_follow_swap_lifecycles(toolkit: Toolkit, wallets: list):
+    creator, user, incentive = wallets
+    offered = toolkit.mint_asas(creator, [(f"Card {i}", 1, 0) for i in range(3)])
+    requested = toolkit.mint_asa(user, "Requested", 1, 0)
+    toolkit.opt_in_asas(creator, [requested])
+    toolkit.opt_in_asas(user, offered)
+    single_cfg = AsaToAsaSwapConfig(
+        creator.public_key,
+        offered[0],
+        1,
+        requested,
+        1,
+        incentive.public_key,
+        INCENTIVE_FEE,
+    )
+    multi_cfg = AsasToAlgoSwapConfig(
+        creator.public_key,
+        {str(offered[1]): 1, str(offered[2]): 1},
+        10**6,
+        1_000,
+        BASE_OPTIN_FUNDING_AMOUNT * 2,
+        incentive.public_key,
+        INCENTIVE_FEE,
+    )
+    classifier = SwapClassifier([single_cfg, multi_cfg])
+    start = toolkit.algod.status()["last-round"] + 1
+
+    single = toolkit.logic_sig_wallet(get_teal(single_cfg))
+    toolkit.swapper_opt_in(creator, single, {offered[0]: 0}, OPTIN_FUNDING_AMOUNT)
+    toolkit.swapper_deposit(creator, single, {offered[0]: 1})
+    swap = toolkit.asa_to_asa_swap(
+        single, user, {offered[0]: 1}, user, creator, {requested: 1}, incentive, 10_000
+    )
+    multi = toolkit.logic_sig_wallet(get_teal(multi_cfg))
+    toolkit.swapper_opt_in(
+        creator, multi, {offered[1]: 0, offered[2]: 0}, BASE_OPTIN_FUNDING_AMOUNT * 2
+    )
+    toolkit.swapper_deposit(creator, multi, {offered[1]: 1, offered[2]: 1})
+    toolkit.close_swap(
+        multi,
+        creator,
+        creator,
+        offered[1:],
+        multi,
+        creator,
+        creator,
+        creator,
+        creator,
+    )
+    # Same shape as a swap, not sent by an escrow
+    toolkit.asa_to_asa_swap(
+        user, creator, {requested: 0}, user, user, {offered[0]: 1}, incentive, 0
+    )
+
+    events = list(itertools.islice(classifier.follow(toolkit.algod, start), 4))
+
+    assert [(event.kind, event.escrow) for event in events] == [
+        ("optin", single.public_key),
+        ("swap", single.public_key),
+        ("optin", multi.public_key),
+        ("close", multi.public_key),
+    ]
+    assert events[1].config is single_cfg
+    assert (events[1].round, events[1].txids[0]) == (
+        swap["confirmed-round"],
+        swap["txid"],
+    )
+    last_round = toolkit.algod.status()["last-round"]
+    assert [
+        event
+        for round in range(classifier.round + 1, last_round + 1)
+        for event in classifier.classify_block(fetch_block(toolkit.algod, round))
+    ] == []
+
+
+def test_unwatched_groups_are_not_checked():
+    creator, receiver = (account.generate_account()[1] for _ in range(2))
+    classifier = SwapClassifier(
+        [AsaToAsaSwapConfig(creator, 1, 1, 2, 1, receiver, INCENTIVE_FEE)]
+    )
+    sender = encoding.decode_address(creator)
+    txns = []
+    for group in range(10_000):
+        gid = group.to_bytes(32, "big")
+        txns += [
+            {"txn": {"type": "axfer", "snd": sender, "grp": gid, "xaid": 1}},
+            {"txn": {"type": "axfer", "snd": sender, "grp": gid, "xaid": 2}},
+            {"txn": {"type": "pay", "snd": sender, "grp": gid, "amt": 1}},
+        ]
+        txns.append({"txn": {"type": "pay", "snd": sender, "amt": 1}})
+    block = {"block": {"rnd": 1, "gen": "test", "gh": b"\0" * 32, "txns": txns}}
+
+    start = time.perf_counter()
+    events = classifier.classify_block(block)
+    elapsed = time.perf_counter() - start
+
+    assert events == []
+    assert (classifier.groups, classifier.checked) == (10_000, 0)
+    # Mainnet blocks of this size come every few seconds
+    assert elapsed < 1.0
@@ -0,0 +1,137 @@
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from algosdk.error import AlgodHTTPError, IndexerHTTPError
+
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.toolkit.clients import (
+    ParamsCache,
+    PooledAlgodClient,
+    PooledIndexerClient,
+)
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_connections_are_reused(localnet: LocalNet):
+    algod = PooledAlgodClient("a" * 64, localnet.algod_address)
+    indexer = PooledIndexerClient("a" * 64, localnet.indexer_address)
+
+    for _ in range(5):
+        assert algod.status()["last-round"] == localnet.ledger.last_round
+        assert indexer.health()["round"] == localnet.ledger.last_round
+
+    assert algod.pool.created == 1
+    assert indexer.pool.created == 1
+
+
+def test_connections_are_shared_across_threads(localnet: LocalNet):
+    algod = PooledAlgodClient("a" * 64, localnet.algod_address, pool_size=4)
+
+    with ThreadPoolExecutor(4) as executor:
+        rounds = list(executor.map(lambda _: algod.status()["last-round"], range(50)))
+
+    assert rounds == [localnet.ledger.last_round] * 50
+    assert algod.pool.created <= 4
+
+
+class _StaleConnection:
+    """Pooled connection closed by the node, failing on send or on response."""
+
+    def __init__(self, on_send: bool):
+        self.on_send = on_send
+        self.sent = 0
+
+    def request(self, *args):
+        if self.on_send:
+            raise BrokenPipeError()
+        self.sent += 1
+
+    def getresponse(self):
+        raise http.client.RemoteDisconnected()
+
+    def close(self):
+        pass
+
+
+def test_stale_connections(localnet: LocalNet):
+    algod = PooledAlgodClient("a" * 64, localnet.algod_address)
+
+    # Idempotent requests are sent again on a new connection
+    algod.pool._idle.put(_StaleConnection(on_send=False))
+    assert algod.pool.request("GET", "/health")[0] == 200
+    assert algod.pool.created == 1
+
+    # Others only when the node can't have received them
+    algod.pool._idle.put(_StaleConnection(on_send=True))
+    assert algod.pool.request("POST", "/v2/teal/compile", b"int 1")[0] != 0
+    assert algod.pool.created == 2
+
+    stale = _StaleConnection(on_send=False)
+    algod.pool._idle.put(stale)
+    with pytest.raises(http.client.RemoteDisconnected):
+        algod.pool.request("POST", "/v2/transactions", b"")
+    assert (stale.sent, algod.pool.created) == (1, 2)
+
+
+def test_errors(localnet: LocalNet):
+    algod = PooledAlgodClient("a" * 64, localnet.algod_address)
+    indexer = PooledIndexerClient("a" * 64, localnet.indexer_address)
+
+    with pytest.raises(AlgodHTTPError) as e:
+        algod.pending_transaction_info("A" * 52)
+    assert e.value.code == 404
+    assert str(e.value) == "txn does not exist"
+
+    with pytest.raises(IndexerHTTPError):
+        indexer.transaction("A" * 52)
+
+
+def test_params_cache_ttl(localnet: LocalNet):
+    clock = _Clock()
+    cache = ParamsCache(localnet.algod_client(), ttl=4.0, clock=clock)
+
+    params = cache.get()
+    params.fee = 5
+    assert cache.get().fee == 0
+    assert cache.fetches == 1
+    assert cache.round == localnet.ledger.last_round
+
+    clock.now = 4.5
+    cache.get()
+    assert cache.fetches == 2
+
+
+def test_params_cache_rounds(localnet: LocalNet):
+    cache = ParamsCache(localnet.algod_client())
+
+    cache.get()
+    cache.observe_round(cache.round)
+    cache.get()
+    assert cache.fetches == 1
+
+    cache.observe_round(cache.round + 1)
+    cache.get()
+    assert cache.fetches == 2
+
+
+def test_params_cache_burst(localnet: LocalNet):
+    cache = ParamsCache(localnet.algod_client())
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: cache.get(), range(100)))
+
+    assert cache.fetches == 1
@@ -0,0 +1,177 @@
+import pytest
+from algosdk import account, error
+from algosdk.future.transaction import AssetConfigTxn, PaymentTxn
+
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.toolkit import confirmations
+from algoworld_contracts.toolkit.clients import ParamsCache, PooledAlgodClient
+from algoworld_contracts.toolkit.confirmations import (
+    ConfirmationTracker,
+    block_transactions,
+)
+from algoworld_contracts.toolkit.transactions import Wallet, sign, sign_group
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+@pytest.fixture()
+def algod(localnet: LocalNet) -> PooledAlgodClient:
+    return PooledAlgodClient("a" * 64, localnet.algod_address)
+
+
+@pytest.fixture()
+def dispenser(localnet: LocalNet) -> Wallet:
+    return Wallet(localnet.dispenser_key, localnet.dispenser)
+
+
+def _payment(algod, sender: Wallet, amount: int) -> PaymentTxn:
+    receiver = account.generate_account()[1]
+    return PaymentTxn(sender.public_key, algod.suggested_params(), receiver, amount)
+
+
+def test_transactions_in_flight(algod, dispenser: Wallet):
+    signed = [sign(dispenser, _payment(algod, dispenser, 10**6)) for _ in range(20)]
+
+    # The local node makes a block of each submission
+    with ConfirmationTracker(algod, wait_rounds=len(signed)) as tracker:
+        futures = [tracker.track(stxn.get_txid()) for stxn in signed]
+        for stxn in signed:
+            algod.send_transaction(stxn)
+        infos = [future.result(10) for future in futures]
+
+    assert [info["txid"] for info in infos] == [stxn.get_txid() for stxn in signed]
+    rounds = [info["confirmed-round"] for info in infos]
+    assert rounds == sorted(rounds)
+    assert tracker.blocks == len(set(rounds))
+
+
+def test_groups_and_apply_data(algod, dispenser: Wallet):
+    params = algod.suggested_params()
+    txns = [_payment(algod, dispenser, 10**6) for _ in range(3)]
+    txns.append(
+        AssetConfigTxn(
+            dispenser.public_key,
+            params,
+            total=1,
+            default_frozen=False,
+            manager=dispenser.public_key,
+            strict_empty_address_check=False,
+        )
+    )
+    signed = sign_group([dispenser] * 4, txns)
+
+    with ConfirmationTracker(algod) as tracker:
+        group = tracker.track_group(txns[0].group)
+        last = tracker.track(signed[-1].get_txid())
+        algod.send_transactions(signed)
+        infos = group.result(10)
+
+    assert [info["txid"] for info in infos] == [stxn.get_txid() for stxn in signed]
+    assert last.result(0) == infos[-1]
+    assert algod.asset_info(infos[-1]["asset-index"])["params"]["total"] == 1
+
+
+def test_timeout(algod, dispenser: Wallet):
+    lost = sign(dispenser, _payment(algod, dispenser, 10**6))
+    params = ParamsCache(algod)
+    params.get()
+
+    sent = sign(dispenser, _payment(algod, dispenser, 10**6))
+
+    with ConfirmationTracker(algod, params, wait_rounds=1) as tracker:
+        future = tracker.track(lost.get_txid())
+        confirmed = tracker.track(sent.get_txid())
+        algod.send_transaction(sent)
+        with pytest.raises(error.ConfirmationTimeoutError):
+            future.result(10)
+
+    assert confirmed.result(0)["txid"] == sent.get_txid()
+    assert params.round is None
+
+
+class FlakyAlgod:
+    """Algod client whose first `failures` block fetches fail."""
+
+    def __init__(self, algod, failures: int):
+        self.algod = algod
+        self.failures = failures
+
+    def block_info(self, *args, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise error.AlgodHTTPError("block unavailable")
+        return self.algod.block_info(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.algod, name)
+
+
+@pytest.fixture()
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(confirmations, "RETRY_DELAY", 0.01)
+
+
+def test_retries(algod, dispenser: Wallet, fast_retries):
+    flaky = FlakyAlgod(algod, confirmations.RETRIES - 1)
+    signed = sign(dispenser, _payment(algod, dispenser, 10**6))
+
+    with ConfirmationTracker(flaky, wait_rounds=1) as tracker:
+        future = tracker.track(signed.get_txid())
+        algod.send_transaction(signed)
+        assert future.result(10)["txid"] == signed.get_txid()
+
+    assert flaky.failures == 0
+
+
+def test_failures_fail_due_transactions(algod, dispenser: Wallet, fast_retries):
+    flaky = FlakyAlgod(algod, 10**6)
+    due = sign(dispenser, _payment(algod, dispenser, 10**6))
+    later = sign(dispenser, _payment(algod, dispenser, 10**6))
+
+    with ConfirmationTracker(flaky) as tracker:
+        due_future = tracker.track(due.get_txid(), wait_rounds=1)
+        later_future = tracker.track(later.get_txid(), wait_rounds=100)
+        algod.send_transaction(due)
+        with pytest.raises(error.AlgodHTTPError):
+            due_future.result(10)
+        assert not later_future.done()
+
+    assert later_future.cancelled()
+
+
+def test_stop(algod, dispenser: Wallet):
+    tracker = ConfirmationTracker(algod)
+    future = tracker.track(sign(dispenser, _payment(algod, dispenser, 1)).get_txid())
+
+    tracker.stop()
+
+    assert future.cancelled()
+    with pytest.raises(RuntimeError):
+        tracker.track("TXID")
+
+
+def test_block_transactions(algod, dispenser: Wallet):
+    payment = _payment(algod, dispenser, 10**6)
+    txn = payment.dictify()
+    block = {
+        "block": {
+            "rnd": 7,
+            "gen": payment.genesis_id,
+            "gh": txn.pop("gh"),
+            "txns": [
+                {"txn": {k: v for k, v in txn.items() if k != "gen"}, "hgi": True},
+                # State proofs are unknown to the SDK
+                {"txn": {"type": "stpf", "snd": txn["snd"], "sp": {"c": b"c"}}},
+            ],
+        }
+    }
+
+    infos = block_transactions(block)
+
+    assert infos[0]["txid"] == payment.get_txid()
+    assert infos[0]["confirmed-round"] == 7
+    assert len(infos) == 2 and infos[1]["txid"] != infos[0]["txid"]
@@ -0,0 +1,47 @@
+import pytest
+from algosdk import account
+
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.toolkit.clients import PooledAlgodClient, PooledIndexerClient
+from algoworld_contracts.toolkit.funding import Funder, WalletPool
+from algoworld_contracts.toolkit.transactions import Toolkit, Wallet
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+@pytest.fixture()
+def funder(localnet: LocalNet) -> Funder:
+    toolkit = Toolkit(
+        PooledAlgodClient("a" * 64, localnet.algod_address),
+        PooledIndexerClient("a" * 64, localnet.indexer_address),
+    )
+    return Funder(toolkit, Wallet(localnet.dispenser_key, localnet.dispenser))
+
+
+def test_fund(funder: Funder, localnet: LocalNet):
+    addresses = [account.generate_account()[1] for _ in range(20)]
+
+    infos = funder.fund(addresses, 250_000)
+
+    assert len({info["confirmed-round"] for info in infos}) == 2
+    assert [localnet.ledger.account(a).amount for a in addresses] == [250_000] * 20
+
+
+def test_wallet_pool(funder: Funder, localnet: LocalNet):
+    pool = WalletPool(funder, 300_000, batch_size=4)
+    last_round = localnet.ledger.last_round
+
+    wallets = [pool.take() for _ in range(3)] + pool.take_many(3)
+    pool.fill(5)
+
+    assert len({wallet.public_key for wallet in wallets}) == 6
+    assert len(pool) == 6
+    assert localnet.ledger.last_round - last_round == 3
+    assert all(
+        localnet.ledger.account(wallet.public_key).amount == 300_000
+        for wallet in wallets
+    )
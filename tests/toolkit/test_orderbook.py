@@ -0,0 +1,154 @@
+import random
+import time
+
+import pytest
+from algosdk import account
+
+from algoworld_contracts.swapper.asa_to_asa_swapper import AsaToAsaSwapConfig
+from algoworld_contracts.swapper.asas_to_algo_swapper import AsasToAlgoSwapConfig
+from algoworld_contracts.swapper.swap_proxy import SwapProxy
+from algoworld_contracts.toolkit import orderbook
+from algoworld_contracts.toolkit.classifier import LifecycleEvent
+from algoworld_contracts.toolkit.orderbook import ALGO, Match, OrderBook
+
+INCENTIVE_FEE = 10_000
+CREATOR = account.generate_account()[1]
+
+
+def asa_swap(offered: int, offered_amount: int, requested: int, requested_amount: int):
+    return AsaToAsaSwapConfig(
+        CREATOR,
+        offered,
+        offered_amount,
+        requested,
+        requested_amount,
+        CREATOR,
+        INCENTIVE_FEE,
+    )
+
+
+def algo_swap(offered: dict, price: int):
+    return AsasToAlgoSwapConfig(
+        CREATOR,
+        {str(asa): amount for asa, amount in offered.items()},
+        price,
+        1_000,
+        0,
+        CREATOR,
+        INCENTIVE_FEE,
+    )
+
+
+def test_order_book():
+    book = OrderBook()
+    book.add("A", asa_swap(1, 2, 10, 3))
+    book.add("B", asa_swap(1, 1, 10, 1))
+    book.add("C", asa_swap(1, 1, 10, 2))
+    book.add("D", asa_swap(2, 1, 10, 1))
+    book.add("E", algo_swap({1: 1, 2: 1}, 3 * 10**6))
+    book.add("F", algo_swap({1: 1}, 10**6))
+
+    assert len(book) == 6 and "A" in book
+    assert [e for e, _ in book.asa_offers(1, 10)] == ["B", "A", "C"]
+    assert [e for e, _ in book.asa_offers(1, 10, max_requested_amount=2)] == [
+        "B",
+        "C",
+    ]
+    assert [e for e, _ in book.asa_offers(1, 10, limit=1)] == ["B"]
+    assert book.asa_offers(10, 1) == []
+    assert [e for e, _ in book.algo_offers()] == ["F", "E"]
+    assert [e for e, _ in book.algo_offers(2)] == ["E"]
+    assert [e for e, _ in book.algo_offers(max_price=10**6 + INCENTIVE_FEE)] == ["F"]
+    assert book.algo_offers(max_price=10**6) == []
+    assert book.algo_offers(3) == []
+
+    # Replacing the config of an escrow moves it
+    book.add("B", asa_swap(1, 1, 10, 4))
+    assert [e for e, _ in book.asa_offers(1, 10)] == ["A", "C", "B"]
+    book.add("F", algo_swap({2: 1}, 5 * 10**6))
+    assert [e for e, _ in book.algo_offers(1)] == ["E"]
+
+    assert book.remove("A") == asa_swap(1, 2, 10, 3)
+    assert book.remove("A") is None
+    for escrow in "BCDEF":
+        book.remove(escrow)
+    assert book.stats() == {"swaps": 0, "pairs": 0, "algo_offers": 0}
+    with pytest.raises(ValueError):
+        book.add("G", SwapProxy(CREATOR, ""))
+
+
+def test_match():
+    book = OrderBook()
+    book.add("A", asa_swap(1, 1, 10, 2))
+    book.add("B", asa_swap(2, 1, 10, 1))
+    book.add("C", asa_swap(3, 1, 10, 5))
+    book.add("D", asa_swap(4, 1, 11, 1))
+    book.add("E", algo_swap({5: 1, 6: 2}, 10**6))
+    book.add("F", algo_swap({7: 1}, 2 * 10**6))
+
+    assert book.match({10: 2, ALGO: 1_500_000}) == [
+        Match("B", book.get("B"), {10: 1, ALGO: INCENTIVE_FEE}, {2: 1}),
+        Match("A", book.get("A"), {10: 2, ALGO: INCENTIVE_FEE}, {1: 1}),
+        Match("E", book.get("E"), {ALGO: 10**6 + INCENTIVE_FEE}, {5: 1, 6: 2}),
+    ]
+    assert [m.escrow for m in book.match({10: 5, 11: 1, ALGO: 10**7}, limit=2)] == [
+        "B",
+        "A",
+        "D",
+        "E",
+        "F",
+    ]
+    # The incentive fee is paid in ALGO
+    assert book.match({10: 5, 11: 1}) == []
+
+
+def test_apply_events():
+    book = OrderBook()
+    single = asa_swap(1, 1, 2, 1)
+    multi = algo_swap({1: 1, 2: 1}, 10**6)
+    proxy = SwapProxy(CREATOR, "")
+    for kind, escrow, cfg in [
+        ("optin", "A", single),
+        ("optin", "B", multi),
+        ("store", "C", proxy),
+        ("swap", "A", single),
+    ]:
+        book.apply(LifecycleEvent(kind, escrow, cfg, 1, b"", []))
+    assert [e for e, _ in book.algo_offers()] == ["B"] and len(book) == 1
+    book.apply(LifecycleEvent("close", "B", multi, 2, b"", []))
+    assert len(book) == 0
+
+
+def test_order_book_scale(monkeypatch):
+    # Small buckets split and merge many times on a modest book
+    monkeypatch.setattr(orderbook, "BUCKET_SIZE", 8)
+    rnd = random.Random(0)
+    book = OrderBook()
+    swaps = {}
+    for i in range(20_000):
+        if i % 2:
+            cfg = asa_swap(
+                rnd.randrange(1, 50), 1, rnd.randrange(1, 5), rnd.randrange(1, 9)
+            )
+        else:
+            cfg = algo_swap({rnd.randrange(1, 50): 1}, rnd.randrange(10**5, 10**8))
+        swaps[f"E{i}"] = cfg
+        book.add(f"E{i}", cfg)
+    for escrow in list(swaps)[::3]:
+        book.remove(escrow)
+        del swaps[escrow]
+
+    expected = sorted(
+        (cfg.requested_algo_amount + INCENTIVE_FEE, escrow)
+        for escrow, cfg in swaps.items()
+        if isinstance(cfg, AsasToAlgoSwapConfig) and cfg.requested_algo_amount < 10**7
+    )
+    assert [e for e, _ in book.algo_offers(max_price=10**7 + INCENTIVE_FEE - 1)] == [
+        e for _, e in expected
+    ]
+
+    start = time.perf_counter()
+    for _ in range(1_000):
+        matches = book.match({rnd.randrange(1, 5): 4, ALGO: 10**6})
+    assert (time.perf_counter() - start) / 1_000 < 1e-3
+    assert all(m.pays[ALGO] <= 10**6 for m in matches)
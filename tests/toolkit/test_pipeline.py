@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+from algosdk import account
+from algosdk.error import AlgodHTTPError
+
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.swapper.asa_to_asa_swapper import (
+    OPTIN_FUNDING_AMOUNT,
+    AsaToAsaSwapConfig,
+    compile_stateless,
+    swapper,
+)
+from algoworld_contracts.toolkit.clients import PooledAlgodClient, PooledIndexerClient
+from algoworld_contracts.toolkit.pipeline import LatencyStats, SwapPipeline
+from algoworld_contracts.toolkit.transactions import Toolkit, Wallet
+
+INCENTIVE_FEE = 10_000
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+@pytest.fixture()
+def toolkit(localnet: LocalNet) -> Toolkit:
+    # The local node makes a block of each submission
+    return Toolkit(
+        PooledAlgodClient("a" * 64, localnet.algod_address),
+        PooledIndexerClient("a" * 64, localnet.indexer_address),
+        wait_rounds=1000,
+    )
+
+
+@pytest.fixture()
+def dispenser(localnet: LocalNet) -> Wallet:
+    return Wallet(localnet.dispenser_key, localnet.dispenser)
+
+
+def _wallet() -> Wallet:
+    return Wallet(*account.generate_account())
+
+
+def test_latency_stats():
+    stats = LatencyStats()
+    for seconds in (0.4, 0.1, 0.3, 0.2):
+        stats.record(seconds)
+    stats.record(1.0, failed=True)
+
+    summary = stats.summary()
+
+    assert (summary["count"], summary["errors"]) == (4, 1)
+    assert (summary["p50"], summary["p95"], summary["max"]) == (0.2, 0.4, 0.4)
+
+
+def test_bounded_concurrency(toolkit: Toolkit, dispenser: Wallet):
+    receivers = [_wallet().public_key for _ in range(60)]
+
+    async def run():
+        async with SwapPipeline(toolkit, concurrency=8) as pipeline:
+            peak = 0
+
+            async def watch():
+                nonlocal peak
+                while True:
+                    peak = max(peak, pipeline.in_flight)
+                    await asyncio.sleep(0)
+
+            watcher = asyncio.ensure_future(watch())
+            infos = await asyncio.gather(
+                *(pipeline.fund(dispenser, receiver, 10**6) for receiver in receivers)
+            )
+            watcher.cancel()
+            return pipeline, peak, infos
+
+    pipeline, peak, infos = asyncio.run(run())
+
+    assert len({info["txid"] for info in infos}) == len(receivers)
+    assert 1 < peak <= 8
+    assert pipeline.metrics["fund"].count == len(receivers)
+    assert (pipeline.in_flight, pipeline.waiting) == (0, 0)
+
+
+def test_swap_workflows(toolkit: Toolkit, dispenser: Wallet):
+    incentive = _wallet()
+    toolkit.pay(dispenser, incentive.public_key, 10**6)
+
+    async def workflow(pipeline: SwapPipeline, index: int):
+        creator, user = _wallet(), _wallet()
+        await asyncio.gather(
+            pipeline.fund(dispenser, creator.public_key, 10**7),
+            pipeline.fund(dispenser, user.public_key, 10**7),
+        )
+        loop = asyncio.get_running_loop()
+        offered, requested = await asyncio.gather(
+            loop.run_in_executor(None, toolkit.mint_asa, creator, "Offered", 1, 0),
+            loop.run_in_executor(None, toolkit.mint_asa, user, "Requested", 1, 0),
+        )
+        await loop.run_in_executor(None, toolkit.opt_in_asa, creator, [requested])
+        await loop.run_in_executor(None, toolkit.opt_in_asa, user, [offered])
+        swapper_account = toolkit.logic_sig_wallet(
+            compile_stateless(
+                swapper(
+                    AsaToAsaSwapConfig(
+                        swap_creator=creator.public_key,
+                        offered_asa_id=offered,
+                        offered_asa_amount=1,
+                        requested_asa_id=requested,
+                        requested_asa_amount=1,
+                        incentive_fee_address=incentive.public_key,
+                        incentive_fee_amount=INCENTIVE_FEE,
+                    )
+                )
+            )
+        )
+
+        await pipeline.swapper_opt_in(
+            creator, swapper_account, {offered: 0}, OPTIN_FUNDING_AMOUNT
+        )
+        await pipeline.swapper_deposit(creator, swapper_account, {offered: 1})
+        if index % 2:
+            return await pipeline.close_swap(
+                swapper_account,
+                creator,
+                creator,
+                [offered],
+                swapper_account,
+                creator,
+                creator,
+                creator,
+                creator,
+            )
+        with pytest.raises(AlgodHTTPError):
+            await pipeline.asa_to_asa_swap(
+                swapper_account,
+                user,
+                {offered: 1},
+                user,
+                creator,
+                {requested: 1},
+                incentive,
+                INCENTIVE_FEE - 1,
+            )
+        return await pipeline.asa_to_asa_swap(
+            swapper_account,
+            user,
+            {offered: 1},
+            user,
+            creator,
+            {requested: 1},
+            incentive,
+            INCENTIVE_FEE,
+        )
+
+    async def run():
+        async with SwapPipeline(toolkit, concurrency=16) as pipeline:
+            await asyncio.gather(*(workflow(pipeline, i) for i in range(8)))
+            return pipeline.summary()
+
+    summary = asyncio.run(run())
+
+    assert {name: stats["count"] for name, stats in summary.items()} == {
+        "fund": 16,
+        "swapper_opt_in": 8,
+        "swapper_deposit": 8,
+        "asa_to_asa_swap": 4,
+        "close_swap": 4,
+    }
+    assert summary["asa_to_asa_swap"]["errors"] == 4
+    assert toolkit.account_balance(incentive.public_key) == 10**6 + 4 * INCENTIVE_FEE
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from algosdk import account
+
+from algoworld_contracts.contracts import get_swapper_proxy_teal
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.toolkit.clients import PooledAlgodClient, PooledIndexerClient
+from algoworld_contracts.toolkit.proxies import ProxyIndex
+from algoworld_contracts.toolkit.transactions import Toolkit, Wallet
+
+VERSION = "0.0.3"
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+@pytest.fixture()
+def toolkit(localnet: LocalNet) -> Toolkit:
+    return Toolkit(
+        PooledAlgodClient("a" * 64, localnet.algod_address),
+        PooledIndexerClient("a" * 64, localnet.indexer_address),
+    )
+
+
+@pytest.fixture()
+def creator(localnet: LocalNet, toolkit: Toolkit) -> Wallet:
+    wallet = Wallet(*account.generate_account())
+    toolkit.pay(
+        Wallet(localnet.dispenser_key, localnet.dispenser), wallet.public_key, 10**7
+    )
+    return wallet
+
+
+def _save_note(toolkit: Toolkit, creator: Wallet, note: str, fee_amount: int = 0):
+    proxy = toolkit.logic_sig_wallet(
+        get_swapper_proxy_teal(creator.public_key, VERSION)
+    )
+    return toolkit.activate_or_save_proxy_note(
+        creator, proxy, note, fee_amount, 2_000, 0
+    )
+
+
+def test_incremental_sync(toolkit: Toolkit, creator: Wallet, localnet: LocalNet):
+    index = ProxyIndex(toolkit.indexer, page_size=2)
+    proxy = index.watch(creator.public_key, VERSION)
+    _save_note(toolkit, creator, "ipfs://first", 110_000)
+    for i in range(4):
+        _save_note(toolkit, creator, f"ipfs://config-{i}")
+
+    assert index.sync() == 5
+    assert index.synced_round(proxy) == localnet.ledger.last_round
+    assert [note.note for note in index.notes(creator.public_key)] == [
+        "ipfs://config-3",
+        "ipfs://config-2",
+        "ipfs://config-1",
+        "ipfs://config-0",
+        "ipfs://first",
+    ]
+
+    info = _save_note(toolkit, creator, "ipfs://latest")
+
+    assert index.sync() == 1
+    latest = index.latest(creator.public_key)
+    assert (latest.proxy, latest.round, latest.note) == (
+        proxy,
+        info["confirmed-round"],
+        "ipfs://latest",
+    )
+    assert index.sync() == 0
+    assert index.latest("unknown") is None
+
+
+def test_lookups_are_local(toolkit: Toolkit, creator: Wallet, tmp_path):
+    path = str(tmp_path / "proxies.sqlite")
+    with ProxyIndex(toolkit.indexer, path) as index:
+        index.watch(creator.public_key, VERSION)
+        _save_note(toolkit, creator, "ipfs://config", 110_000)
+        index.sync()
+
+    with ProxyIndex(None, path) as index:
+        start = time.perf_counter()
+        for _ in range(1000):
+            latest = index.latest(creator.public_key)
+        elapsed = time.perf_counter() - start
+
+    assert latest.note == "ipfs://config"
+    assert elapsed / 1000 < 1e-3
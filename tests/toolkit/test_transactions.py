@@ -0,0 +1,139 @@
+import pytest
+from algosdk import account, error
+from algosdk.future.transaction import PaymentTxn
+
+from algoworld_contracts.contracts import get_swapper_proxy_teal
+from algoworld_contracts.localnet.server import LocalNet
+from algoworld_contracts.toolkit.clients import PooledAlgodClient, PooledIndexerClient
+from algoworld_contracts.toolkit.transactions import (
+    Group,
+    Toolkit,
+    Wallet,
+    pack,
+    sign_group,
+)
+
+
+@pytest.fixture(scope="module")
+def localnet():
+    with LocalNet(algod_port=0, indexer_port=0, block_wait_timeout=0) as localnet:
+        yield localnet
+
+
+@pytest.fixture()
+def toolkit(localnet: LocalNet) -> Toolkit:
+    return Toolkit(
+        PooledAlgodClient("a" * 64, localnet.algod_address),
+        PooledIndexerClient("a" * 64, localnet.indexer_address),
+    )
+
+
+@pytest.fixture()
+def creator(localnet: LocalNet, toolkit: Toolkit) -> Wallet:
+    wallet = Wallet(*account.generate_account())
+    toolkit.pay(
+        Wallet(localnet.dispenser_key, localnet.dispenser), wallet.public_key, 10**7
+    )
+    return wallet
+
+
+def test_sign_group(creator: Wallet, toolkit: Toolkit):
+    params = toolkit.suggested_params()
+    txns = [
+        PaymentTxn(creator.public_key, params, creator.public_key, i) for i in range(3)
+    ]
+
+    signed = sign_group([creator] * 3, txns)
+
+    assert len({stxn.transaction.group for stxn in signed}) == 1
+    info = toolkit.send_wait(signed)
+    assert info["confirmed-round"] == toolkit.algod.status()["last-round"]
+
+
+def test_burst_costs_one_params_fetch(creator: Wallet, toolkit: Toolkit):
+    fetches = toolkit.params.fetches
+
+    params = [toolkit.suggested_params() for _ in range(100)]
+
+    assert toolkit.params.fetches - fetches == 1
+    assert len({p.first for p in params}) == 1
+
+
+def test_mint_and_opt_in(creator: Wallet, toolkit: Toolkit, localnet: LocalNet):
+    holder = Wallet(*account.generate_account())
+    toolkit.pay(creator, holder.public_key, 1_000_000)
+
+    asset_ids = [toolkit.mint_asa(creator, f"Card {i}", 10, 0) for i in range(2)]
+    toolkit.opt_in_asa(holder, asset_ids)
+
+    assert localnet.ledger.account(holder.public_key).assets == {
+        asset_id: 0 for asset_id in asset_ids
+    }
+    assert toolkit.account_balance(holder.public_key) == 1_000_000 - 2_000
+
+
+def test_pack(creator: Wallet, toolkit: Toolkit):
+    params = toolkit.suggested_params()
+    txns = [
+        PaymentTxn(creator.public_key, params, creator.public_key, i) for i in range(33)
+    ]
+
+    groups = pack([creator] * 33, txns)
+
+    assert [len(group.transactions) for group in groups] == [16, 16, 1]
+    assert [txn for group in groups for txn in group.transactions] == txns
+
+
+def test_batches(creator: Wallet, toolkit: Toolkit, localnet: LocalNet):
+    holder = Wallet(*account.generate_account())
+    toolkit.pay(creator, holder.public_key, 3 * 10**6)
+
+    asset_ids = toolkit.mint_asas(creator, [(f"Card {i}", 10, 0) for i in range(20)])
+    opt_ins = toolkit.opt_in_asas(holder, asset_ids)
+
+    assert len(set(asset_ids)) == 20
+    assert [localnet.ledger.assets[i].name for i in asset_ids] == [
+        f"Card {i}" for i in range(20)
+    ]
+    assert len(opt_ins) == 20
+    assert len({info["confirmed-round"] for info in opt_ins}) == 2
+    assert localnet.ledger.account(holder.public_key).assets == {
+        asset_id: 0 for asset_id in asset_ids
+    }
+
+
+def test_batch_failure_keeps_submitted_confirmations(creator: Wallet, toolkit: Toolkit):
+    params = toolkit.suggested_params()
+    unfunded = Wallet(*account.generate_account())
+    groups = [
+        Group(
+            [creator], [PaymentTxn(creator.public_key, params, creator.public_key, 1)]
+        ),
+        Group(
+            [unfunded],
+            [PaymentTxn(unfunded.public_key, params, creator.public_key, 10**6)],
+        ),
+    ]
+
+    with pytest.raises(error.AlgodHTTPError) as e:
+        toolkit.send_batch_async(groups)
+
+    (confirmation,) = e.value.confirmations
+    assert confirmation.result(10)[0]["confirmed-round"] > 0
+
+
+def test_proxy_note(creator: Wallet, toolkit: Toolkit):
+    proxy = toolkit.logic_sig_wallet(
+        get_swapper_proxy_teal(creator.public_key, "0.0.3")
+    )
+
+    info = toolkit.activate_or_save_proxy_note(
+        creator, proxy, "ipfs://config", 110_000, 2_000, 0
+    )
+
+    note_txid = toolkit.indexer.search_transactions_by_address(proxy.public_key)[
+        "transactions"
+    ][0]["id"]
+    assert toolkit.transaction_info(note_txid)["transaction"]["confirmed-round"] == (
+        info["confirmed-round"]
+    )